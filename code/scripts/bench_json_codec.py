@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""Banc d'essai du codec JSON (geneweb.io.codec) sur un index GWB.
+
+Compare lecture et écriture d'`index.json` pour chaque moteur disponible
+(orjson, stdlib), en mode indenté et compact.
+
+Usage:
+    python scripts/bench_json_codec.py                       # base générée (200 000 individus)
+    python scripts/bench_json_codec.py --individus 500000
+    python scripts/bench_json_codec.py --base /chemin/vers/base_gwb
+"""
+
+import argparse
+import tempfile
+import time
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+from geneweb.io import codec
+
+
+def generate_index(n: int) -> dict[str, Any]:
+    """Index au format complet, de taille et de forme proches d'une base de production."""
+    individus = [
+        {
+            "id": f"I{k}",
+            "nom": f"Lefèvre{k % 900}",
+            "prenom": f"Hélène{k % 300}",
+            "sexe": "M" if k % 2 else "F",
+            "date_naissance": f"{1700 + k % 300}-{1 + k % 12:02d}-{1 + k % 28:02d}",
+            "lieu_naissance": f"Saint-Étienne {k % 2000}",
+            "note": "Registre paroissial, acte de baptême" if k % 4 == 0 else None,
+            "sources": [f"S{k % 50}"],
+        }
+        for k in range(n)
+    ]
+    familles = [
+        {"id": f"F{k}", "pere_id": f"I{k}", "mere_id": f"I{k + 1}", "enfants_ids": [f"I{k + 2}", f"I{k + 3}"]}
+        for k in range(0, n - 3, 2)
+    ]
+    sources = [{"id": f"S{k}", "titre": f"Registre {k}"} for k in range(50)]
+    return {"individus": individus, "familles": familles, "sources": sources}
+
+
+def best_of(repeat: int, fn: Callable[..., object], *fn_args: object) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn(*fn_args)
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base", type=Path, help="Base GWB existante (répertoire contenant index.json)")
+    parser.add_argument("--individus", type=int, default=200_000, help="Taille de la base générée")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    if args.base:
+        raw = (args.base / "index.json").read_bytes()
+        codec.set_backend("stdlib")
+        data = codec.get_backend().loads(raw)
+    else:
+        data = generate_index(args.individus)
+
+    print(f"{'moteur':<8} {'mode':<8} {'taille':>10} {'écriture':>10} {'lecture':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "index.json"
+        for name in codec.BACKENDS:
+            try:
+                codec.set_backend(name)
+            except ImportError:
+                print(f"{name:<8} (non installé)")
+                continue
+            backend = codec.get_backend()
+            for mode, encode in (("indenté", backend.dumps_indented), ("compact", backend.dumps)):
+                # Moteur et encodeur passés en arguments: pas de capture de variable de boucle
+                write = best_of(args.repeat, lambda enc: path.write_bytes(enc(data)), encode)
+                read = best_of(args.repeat, lambda dec: dec.loads(path.read_bytes()), backend)
+                size = path.stat().st_size
+                print(f"{name:<8} {mode:<8} {size / 1e6:>8.1f}Mo {write * 1000:>8.0f}ms {read * 1000:>8.0f}ms")
+    codec.set_backend(None)
+
+
+if __name__ == "__main__":
+    main()
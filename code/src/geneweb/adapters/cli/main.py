@@ -13,10 +13,15 @@ from geneweb.adapters.ocaml_bridge.bridge import (
     run_ged2gwb,
     run_gwb2ged,
 )
+from geneweb.infra.base_cache import get_loaded_base
+from geneweb.io.parallel import load_workers
+from geneweb.io.shards import MAX_SHARDS
+from geneweb.io.storage import convert_base
 from geneweb.services.connectivity import compute_connected_components_from_gwb
 from geneweb.services.consanguinity import compute_inbreeding_from_gwb
 from geneweb.services.ged2gwb import ged2gwb_python
 from geneweb.services.gwb2ged import gwb2ged_python
+from geneweb.services.gwdiff import format_entry, gwdiff_bases
 
 app = typer.Typer(add_completion=False, help="CLI GeneWeb (pont OCaml et commandes Python)")
 
@@ -59,7 +64,7 @@ def gwb2ged(
     if use_py:
         # Implémentation Python native (Issue #20)
         try:
-            content = gwb2ged_python(input_dir, output_file)
+            content = gwb2ged_python(input_dir, output_file, workers=load_workers())
             typer.echo(f"Converti en GEDCOM (Python): {output_file}", err=True)
         except (FileNotFoundError, ValueError) as e:
             typer.echo(f"Erreur Python: {e}", err=True)
@@ -243,6 +248,68 @@ def connex(
             raise typer.Exit(e.returncode) from e
 
 
+@app.command()
+def gwdiff(
+    base1: Annotated[
+        Path, typer.Argument(exists=True, file_okay=False, readable=True, help="Base de référence")
+    ],
+    base2: Annotated[
+        Path, typer.Argument(exists=True, file_okay=False, readable=True, help="Base à comparer")
+    ],
+    person1: Annotated[
+        list[str], typer.Option("-1", help="ID de la personne ancre dans base1 (répétable)")
+    ],
+    person2: Annotated[
+        list[str], typer.Option("-2", help="ID de la personne ancre dans base2 (répétable)")
+    ],
+    ad_mode: Annotated[
+        bool, typer.Option("--ad", help="Compare les descendants de tous les ascendants")
+    ] = False,
+) -> None:
+    """Compare deux bases GWB à partir de personnes ancres (portage Python de gwdiff)."""
+    if len(person1) != len(person2):
+        typer.echo("Erreur: autant d'ancres -1 que d'ancres -2 sont attendues", err=True)
+        raise typer.Exit(2)
+    try:
+        loaded1 = get_loaded_base(base1)
+        loaded2 = get_loaded_base(base2)
+        entries = gwdiff_bases(
+            base1, base2, zip(person1, person2, strict=True), mode="ad" if ad_mode else "d"
+        )
+        for entry in entries:
+            for line in format_entry(entry, loaded1, loaded2):
+                typer.echo(line)
+    except (FileNotFoundError, ValueError) as e:
+        typer.echo(f"Erreur Python: {e}", err=True)
+        raise typer.Exit(1) from e
+
+
+@app.command("convert-storage")
+def convert_storage(
+    base_dir: Annotated[
+        Path, typer.Argument(exists=True, file_okay=False, readable=True, help="Répertoire base GWB")
+    ],
+    to: Annotated[str, typer.Option("--to", help="Stockage cible: json, sharded, packed ou sqlite (pas native)")],
+    output_dir: Annotated[
+        Path | None,
+        typer.Option("-o", "--output-dir", file_okay=False, help="Base convertie ailleurs (défaut: sur place)"),
+    ] = None,
+    shards: Annotated[
+        int | None, typer.Option("--shards", min=1, max=MAX_SHARDS, help="Nombre de fragments (stockage sharded)")
+    ] = None,
+) -> None:
+    """Migre une base entre les stockages JSON (index.json), fragmenté (shards/), compressé (base.gwbz) et SQLite (base.sqlite).
+
+    Une base GeneWeb native (OCaml) peut être convertie vers ces stockages, pas l'inverse.
+    """
+    try:
+        target = convert_base(base_dir, to.lower(), output_dir, shards)  # type: ignore[arg-type]
+        typer.echo(f"Base convertie ({to.lower()}): {target}", err=True)
+    except (FileNotFoundError, ValueError) as e:
+        typer.echo(f"Erreur Python: {e}", err=True)
+        raise typer.Exit(1) from e
+
+
 if __name__ == "__main__":
     app()
 
@@ -1,40 +1,50 @@
 from __future__ import annotations
 
+import asyncio
 import os
 import tempfile
-from contextlib import suppress
+import time
+from collections.abc import AsyncIterator, Awaitable, Callable
+from contextlib import asynccontextmanager, suppress
+from email.utils import formatdate, parsedate_to_datetime
 from pathlib import Path
+from typing import Any, TypeVar
 
-from fastapi import FastAPI, HTTPException, Query, Request, Response
-from fastapi.responses import RedirectResponse
+from fastapi import Body, FastAPI, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, RedirectResponse, StreamingResponse
 
+from geneweb.adapters.ocaml_bridge.async_bridge import arun_ged2gwb, astream_tool
 from geneweb.adapters.ocaml_bridge.bridge import (
     OcamlCommandError,
     run_connex,
-    run_consang,
-    run_ged2gwb,
     run_gwb2ged,
 )
+from geneweb.adapters.ocaml_bridge.cache import OUTPUT, arun_cached
+from geneweb.adapters.ocaml_bridge.registry import get_registry
+from geneweb.infra.coalesce import get_coalescer
+from geneweb.infra.jobs import JobNotFound, get_job_manager, set_job_manager
+from geneweb.infra.response_cache import get_response_cache, params_key, response_cache_enabled
+from geneweb.infra.shadow import get_shadow_runner
+from geneweb.infra.writer import WriteConflict, writers_snapshot
+from geneweb.io import codec, durable
+from geneweb.io.revision import read_revision
+from geneweb.services.comparator import compare_gedcom
 from geneweb.services.connectivity import compute_connected_components_from_gwb
 from geneweb.services.consanguinity import compute_inbreeding_from_gwb
 from geneweb.services.ged2gwb import ged2gwb_python
 from geneweb.services.gwb2ged import gwb2ged_python
+from geneweb.services.jobs import TASKS as JOB_TASKS
 from geneweb.services.gwd_routes import (
     get_ascendance,
     get_descendance,
     get_family_page,
     get_notes,
     get_person_page,
+    page_tags,
     search_persons,
 )
-from geneweb.services.gwd_modify import (
-    add_individu,
-    mod_individu,
-    add_famille,
-    mod_famille,
-    del_individu,
-    del_famille,
-)
+from geneweb.services.gwd_modify import apply_batch, apply_operation
 from geneweb.services.gwd_wiznotes import (
     list_wiznotes,
     get_wiznote,
@@ -44,16 +54,59 @@ from geneweb.services.gwd_wiznotes import (
 from geneweb.services.gwd_images import (
     list_carrousel_images,
     get_image_file,
+    images_signature,
     set_blason_image,
 )
 
-app = FastAPI(title="GeneWeb Python API", version="0.1.0")
+
+@asynccontextmanager
+async def _lifespan(_app: FastAPI) -> AsyncIterator[None]:
+	# Résolution et pré-chargement des exécutables OCaml avant la première requête
+	if os.getenv("GENEWEB_BRIDGE_WARMUP", "1").lower() not in ("0", "false", "no"):
+		await asyncio.to_thread(get_registry().warm_up)
+	yield
+	# Travaux en cours annulés à l'arrêt (marqués interrompus au redémarrage sinon)
+	set_job_manager(None)
+	# Écritures différées (GENEWEB_WRITE_BEHIND_MS) synchronisées avant de quitter
+	await asyncio.to_thread(durable.flush)
+
+
+class CodecJSONResponse(JSONResponse):
+	"""Réponse JSON encodée par le codec commun (orjson si installé)."""
+
+	def render(self, content: Any) -> bytes:
+		return codec.dumps(content)
+
+
+app = FastAPI(
+	title="GeneWeb Python API",
+	version="0.1.0",
+	lifespan=_lifespan,
+	default_response_class=CodecJSONResponse,
+)
+
+T = TypeVar("T")
 
 
 @app.get("/healthz")
 def healthz() -> dict[str, str]:
     return {"status": "ok"}
 
+
+@app.get("/healthz/bridge")
+def healthz_bridge(
+	response: Response,
+	refresh: bool = Query(False, description="Relancer la résolution des exécutables OCaml"),
+) -> dict[str, Any]:
+	"""État des exécutables OCaml résolus par le registre du bridge (503 si incomplet)."""
+	registry = get_registry()
+	if refresh or not registry.warmed:
+		registry.warm_up()
+	health = registry.health()
+	if health["status"] != "ok":
+		response.status_code = 503
+	return health
+
 def _resolve_input_dir(raw: str) -> str:
     # Si chemin absolu, utiliser tel quel
     p = Path(raw)
@@ -90,8 +143,159 @@ def _should_use_python() -> bool:
 	return os.getenv("GENEWEB_USE_PYTHON", "").lower() in ("1", "true", "yes")
 
 
+async def _unless_disconnected(request: Request, awaitable: Awaitable[T]) -> T:
+	"""Attend `awaitable`, annulé si le client se déconnecte avant la fin.
+
+	L'annulation se propage au bridge asynchrone, qui tue le processus OCaml en cours.
+	"""
+	task = asyncio.ensure_future(awaitable)
+
+	async def wait_disconnect() -> None:
+		while (await request.receive())["type"] != "http.disconnect":
+			pass
+
+	watcher = asyncio.ensure_future(wait_disconnect())
+	try:
+		await asyncio.wait({task, watcher}, return_when=asyncio.FIRST_COMPLETED)
+		if task.done() or watcher.exception() is not None:
+			return await task
+		task.cancel()
+		with suppress(asyncio.CancelledError):
+			await task
+		raise HTTPException(status_code=499, detail="Client déconnecté")
+	finally:
+		watcher.cancel()
+		task.cancel()
+
+
+def _shadow(
+	route: str,
+	primary_impl: str,
+	primary_result: Any,
+	started: float,
+	shadow_fn: Callable[[], Any],
+	compare: Callable[[Any, Any], tuple[bool, str]] | None = None,
+) -> None:
+	"""Rejoue la requête avec l'autre implémentation si elle est échantillonnée (mode shadow)."""
+	runner = get_shadow_runner()
+	if runner.should_sample():
+		elapsed_ms = (time.perf_counter() - started) * 1000.0
+		runner.submit(route, primary_impl, primary_result, elapsed_ms, shadow_fn, compare)
+
+
+def _compare_gedcom_outputs(left: str, right: str) -> tuple[bool, str]:
+	result = compare_gedcom(left, right)
+	return result.are_equal, result.diff
+
+
+def _gwb2ged_text(resolved: str, use_python: bool) -> str:
+	"""Export GEDCOM synchrone (exécution shadow, hors boucle d'événements)."""
+	with tempfile.NamedTemporaryFile(delete=False, suffix=".ged") as tmp:
+		tmp_path = Path(tmp.name)
+	try:
+		if use_python:
+			gwb2ged_python(resolved, tmp_path)
+		else:
+			run_gwb2ged([resolved, "-o", str(tmp_path)])
+		return tmp_path.read_text(encoding="utf-8", errors="ignore")
+	finally:
+		with suppress(Exception):
+			os.unlink(tmp_path)
+
+
+def _python_base_path(resolved: str) -> str:
+	base_path = Path(resolved)
+	if (base_path / "base").exists():
+		base_path = base_path / "base"
+	return str(base_path)
+
+
+def _not_modified(request: Request, response: Response, base_dir: str, extra: str = "") -> Response | None:
+	"""Requêtes conditionnelles sur la révision de la base (ETag / Last-Modified).
+
+	Renvoie une réponse 304 si le client possède déjà cette révision, avant tout
+	chargement de la base; sinon pose les validateurs sur `response` et renvoie None.
+	"""
+	revision = read_revision(base_dir)
+	etag = revision.etag(extra)
+	headers = {
+		"ETag": etag,
+		"Last-Modified": formatdate(revision.mtime, usegmt=True),
+		"Cache-Control": "no-cache",
+	}
+	fresh = False
+	if_none_match = request.headers.get("if-none-match")
+	if if_none_match is not None:
+		# If-None-Match prime sur If-Modified-Since (RFC 9110 §13.1.3)
+		tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+		fresh = "*" in tags or etag in tags
+	elif if_modified_since := request.headers.get("if-modified-since"):
+		with suppress(TypeError, ValueError):
+			fresh = int(revision.mtime) <= parsedate_to_datetime(if_modified_since).timestamp()
+	if fresh:
+		return Response(status_code=304, headers=headers)
+	response.headers.update(headers)
+	return None
+
+
+@app.get("/metrics/coalescing")
+def metrics_coalescing() -> dict[str, Any]:
+	"""Requêtes lourdes regroupées: requêtes reçues, calculs lancés, calculs économisés."""
+	return get_coalescer().snapshot()
+
+
+@app.get("/metrics/response-cache")
+def metrics_response_cache() -> dict[str, Any]:
+	"""Cache des pages /gwd: taille, succès (mémoire/disque), invalidations."""
+	return get_response_cache().snapshot()
+
+
+@app.get("/metrics/writers")
+def metrics_writers() -> dict[str, Any]:
+	"""Écrivains de base actifs: mutations reçues, appliquées, conflits, écritures groupées."""
+	return writers_snapshot()
+
+
+@app.get("/metrics/durable")
+def metrics_durable() -> dict[str, Any]:
+	"""Écritures de fichiers de base: renommages atomiques, fsync, synchronisations différées."""
+	return durable.durable_snapshot()
+
+
+@app.get("/metrics/shadow")
+def metrics_shadow() -> dict[str, Any]:
+	"""Métriques du mode shadow (latences, écarts, erreurs) par route."""
+	return get_shadow_runner().snapshot()
+
+
+async def _stream_tool_response(name: str, args: list[str]) -> StreamingResponse:
+	"""Réponse texte produite au fil de la sortie de l'outil OCaml.
+
+	Le premier morceau est attendu avant de répondre, pour que les échecs immédiats
+	(exécutable absent, erreur de lancement) donnent encore un code HTTP d'erreur.
+	"""
+	stream = astream_tool(name, args)
+	try:
+		first = await anext(stream, "")
+	except BaseException:
+		await stream.aclose()
+		raise
+
+	async def body() -> AsyncIterator[str]:
+		try:
+			if first:
+				yield first
+			async for chunk in stream:
+				yield chunk
+		finally:
+			await stream.aclose()
+
+	return StreamingResponse(body(), media_type="text/plain; charset=utf-8")
+
+
 @app.get("/export/gwb2ged")
-def export_gwb2ged(
+async def export_gwb2ged(
+	request: Request,
 	input_dir: str = Query(
 		..., description="Chemin répertoire GWB (absolu ou relatif à GENEWEB_OCAML_ROOT)"
 	),
@@ -105,39 +309,68 @@ def export_gwb2ged(
 
 	try:
 		resolved = _resolve_input_dir(input_dir)
+		started = time.perf_counter()
 		if use_py:
-			# Implémentation Python native (Issue #20)
-			with tempfile.NamedTemporaryFile(delete=False, suffix=".ged") as tmp:
-				tmp_path = Path(tmp.name)
-			try:
-				gwb2ged_python(resolved, tmp_path)
-				content = tmp_path.read_text(encoding="utf-8", errors="ignore")
-				return {"stdout": content}
-			finally:
-				with suppress(Exception):
-					os.unlink(tmp_path)
+			# Implémentation Python native (Issue #20); exports simultanés identiques regroupés
+			content = await get_coalescer().arun(
+				"/export/gwb2ged", {"input_dir": resolved}, resolved,
+				lambda: run_in_threadpool(_gwb2ged_text, resolved, True),
+			)
+			_shadow(
+				"/export/gwb2ged", "python", content, started,
+				lambda: _gwb2ged_text(resolved, use_python=False), _compare_gedcom_outputs,
+			)
+			return {"stdout": content}
 		else:
 			# Bridge OCaml (défaut)
-			with tempfile.NamedTemporaryFile(delete=False, suffix=".ged") as tmp:
-				tmp_path = Path(tmp.name)
-			try:
-				# gwb2ged attend <BASE> en positionnel, pas d'option -i
-				run_gwb2ged([resolved, "-o", str(tmp_path)])
-				content = tmp_path.read_text(encoding="utf-8", errors="ignore")
-				return {"stdout": content}
-			finally:
-				with suppress(Exception):
-					os.unlink(tmp_path)
+			# gwb2ged attend <BASE> en positionnel, pas d'option -i
+			# Résultat mis en cache par révision de la base (contenu du fichier produit,
+			# fichier temporaire alloué et supprimé par le calcul partagé)
+			content = await _unless_disconnected(
+				request,
+				arun_cached("gwb2ged", [resolved, "-o", OUTPUT], resolved, output_suffix=".ged"),
+			)
+			_shadow(
+				"/export/gwb2ged", "ocaml", content, started,
+				lambda: _gwb2ged_text(resolved, use_python=True), _compare_gedcom_outputs,
+			)
+			return {"stdout": content}
+	except HTTPException:
+		raise
 	except OcamlCommandError as e:
 		raise HTTPException(status_code=502, detail=e.stderr) from e
+	except TimeoutError as e:
+		raise HTTPException(status_code=504, detail=str(e)) from e
 	except FileNotFoundError as e:
 		raise HTTPException(status_code=502, detail=str(e)) from e
 	except Exception as e:  # Autres erreurs
 		raise HTTPException(status_code=500, detail=str(e)) from e
 
 
+def _resolve_import_paths(input_file: str, output_dir: str) -> tuple[Path, Path]:
+	"""Résout le fichier GEDCOM et le répertoire GWB de sortie (absolus ou relatifs)."""
+	# Résoudre le chemin du fichier GEDCOM (absolu ou relatif)
+	input_path = Path(input_file)
+	if not input_path.is_absolute():
+		root = os.getenv("GENEWEB_OCAML_ROOT")
+		if root:
+			input_path = Path(root) / "distribution" / input_file
+
+	if not input_path.exists():
+		raise FileNotFoundError(f"Fichier GEDCOM introuvable: {input_file}")
+
+	# Résoudre le répertoire de sortie (absolu ou relatif)
+	output_path = Path(output_dir)
+	if not output_path.is_absolute():
+		root = os.getenv("GENEWEB_OCAML_ROOT")
+		if root:
+			output_path = Path(root) / "distribution" / output_dir
+	return input_path, output_path
+
+
 @app.post("/import/ged2gwb")
-def import_ged2gwb(
+async def import_ged2gwb(
+	request: Request,
 	input_file: str = Query(
 		..., description="Chemin fichier GEDCOM (absolu ou relatif à GENEWEB_OCAML_ROOT)"
 	),
@@ -153,33 +386,22 @@ def import_ged2gwb(
 	use_py = use_python or _should_use_python()
 
 	try:
-		# Résoudre le chemin du fichier GEDCOM (absolu ou relatif)
-		input_path = Path(input_file)
-		if not input_path.is_absolute():
-			root = os.getenv("GENEWEB_OCAML_ROOT")
-			if root:
-				input_path = Path(root) / "distribution" / input_file
-		
-		if not input_path.exists():
-			raise FileNotFoundError(f"Fichier GEDCOM introuvable: {input_file}")
-
-		# Résoudre le répertoire de sortie (absolu ou relatif)
-		output_path = Path(output_dir)
-		if not output_path.is_absolute():
-			root = os.getenv("GENEWEB_OCAML_ROOT")
-			if root:
-				output_path = Path(root) / "distribution" / output_dir
+		input_path, output_path = _resolve_import_paths(input_file, output_dir)
 
 		if use_py:
 			# Implémentation Python native (Issue #28)
-			ged2gwb_python(input_path, output_path)
+			await run_in_threadpool(ged2gwb_python, input_path, output_path)
 			return {"status": "ok", "output_dir": str(output_path)}
 		else:
 			# Bridge OCaml (défaut)
-			run_ged2gwb(["-i", str(input_path), "-o", str(output_path)])
+			await _unless_disconnected(request, arun_ged2gwb(["-i", str(input_path), "-o", str(output_path)]))
 			return {"status": "ok", "output_dir": str(output_path)}
+	except HTTPException:
+		raise
 	except OcamlCommandError as e:
 		raise HTTPException(status_code=502, detail=e.stderr) from e
+	except TimeoutError as e:
+		raise HTTPException(status_code=504, detail=str(e)) from e
 	except FileNotFoundError as e:
 		raise HTTPException(status_code=404, detail=str(e)) from e
 	except ValueError as e:
@@ -188,21 +410,29 @@ def import_ged2gwb(
 		raise HTTPException(status_code=500, detail=str(e)) from e
 
 
-@app.get("/analytical/consang")
-def analytical_consang(
+@app.get("/analytical/consang", response_model=None)
+async def analytical_consang(
+	request: Request,
+	response: Response,
 	base_dir: str = Query(
 		..., description="Chemin répertoire GWB (absolu ou relatif à GENEWEB_OCAML_ROOT)"
 	),
 	use_python: bool = Query(
 		False, description="Utiliser l'implémentation Python (défaut: OCaml, ou GENEWEB_USE_PYTHON=1)"
 	),
-) -> dict[str, str | dict[str, float]]:
+	stream: bool = Query(
+		False, description="Bridge OCaml: renvoyer la sortie brute en flux (text/plain)"
+	),
+) -> dict[str, str | dict[str, float]] | StreamingResponse | Response:
 	"""Calcule les coefficients de consanguinité pour une base GWB (Issue #32)."""
 	# Priorité: paramètre API > variable d'environnement > défaut OCaml
 	use_py = use_python or _should_use_python()
 
 	try:
 		resolved = _resolve_input_dir(base_dir)
+		if not stream and (not_modified := await run_in_threadpool(_not_modified, request, response, resolved)):
+			return not_modified
+		started = time.perf_counter()
 		if use_py:
 			# Implémentation Python native (Issue #30)
 			# Chercher base.gwb dans le répertoire ou utiliser directement
@@ -210,7 +440,10 @@ def analytical_consang(
 			if (base_path / "base").exists():
 				base_path = base_path / "base"
 			
-			f_coefficients = compute_inbreeding_from_gwb(str(base_path))
+			f_coefficients = await get_coalescer().arun(
+				"/analytical/consang", {"base_dir": str(base_path)}, base_path,
+				lambda: run_in_threadpool(compute_inbreeding_from_gwb, str(base_path)),
+			)
 			
 			# Retourner en format JSON structuré
 			return {
@@ -226,10 +459,21 @@ def analytical_consang(
 		else:
 			# Bridge OCaml (défaut)
 			base_path_str = str(Path(resolved) / "base") if (Path(resolved) / "base").exists() else resolved
-			output = run_consang([base_path_str])
+			if stream:
+				return await _stream_tool_response("consang", [base_path_str])
+			output = await _unless_disconnected(request, arun_cached("consang", [base_path_str], base_path_str))
+			# Shadow Python seulement: consang OCaml écrit dans la base, il n'est jamais rejoué
+			_shadow(
+				"/analytical/consang", "ocaml", output, started,
+				lambda: compute_inbreeding_from_gwb(_python_base_path(resolved)),
+			)
 			return {"status": "ok", "implementation": "ocaml", "stdout": output}
+	except HTTPException:
+		raise
 	except OcamlCommandError as e:
 		raise HTTPException(status_code=502, detail=e.stderr) from e
+	except TimeoutError as e:
+		raise HTTPException(status_code=504, detail=str(e)) from e
 	except FileNotFoundError as e:
 		raise HTTPException(status_code=404, detail=str(e)) from e
 	except ValueError as e:
@@ -238,8 +482,10 @@ def analytical_consang(
 		raise HTTPException(status_code=500, detail=str(e)) from e
 
 
-@app.get("/analytical/connex")
-def analytical_connex(
+@app.get("/analytical/connex", response_model=None)
+async def analytical_connex(
+	request: Request,
+	response: Response,
 	base_dir: str = Query(
 		..., description="Chemin répertoire GWB (absolu ou relatif à GENEWEB_OCAML_ROOT)"
 	),
@@ -249,20 +495,35 @@ def analytical_connex(
 	all_components: bool = Query(
 		False, description="Retourner toutes les composantes (défaut: seulement la plus grande pour Python)"
 	),
-) -> dict[str, str | list[list[str]]]:
+	stream: bool = Query(
+		False, description="Bridge OCaml: renvoyer la sortie brute en flux (text/plain)"
+	),
+) -> dict[str, str | list[list[str]]] | StreamingResponse | Response:
 	"""Calcule les composantes connexes d'une base GWB (Issue #32)."""
 	# Priorité: paramètre API > variable d'environnement > défaut OCaml
 	use_py = use_python or _should_use_python()
 
 	try:
 		resolved = _resolve_input_dir(base_dir)
+		if not stream and (not_modified := await run_in_threadpool(_not_modified, request, response, resolved)):
+			return not_modified
+		started = time.perf_counter()
 		if use_py:
 			# Implémentation Python native (Issue #31)
 			base_path = Path(resolved)
 			if (base_path / "base").exists():
 				base_path = base_path / "base"
 			
-			components = compute_connected_components_from_gwb(str(base_path))
+			components = await get_coalescer().arun(
+				"/analytical/connex", {"base_dir": str(base_path)}, base_path,
+				lambda: run_in_threadpool(compute_connected_components_from_gwb, str(base_path)),
+			)
+			# Formats de sortie différents (liste vs texte OCaml): latence seulement
+			ocaml_base = str(Path(resolved) / "base") if (Path(resolved) / "base").exists() else resolved
+			_shadow(
+				"/analytical/connex", "python", components, started,
+				lambda: run_connex(["-a", ocaml_base] if all_components else [ocaml_base]),
+			)
 			
 			# Retourner en format JSON structuré
 			if all_components:
@@ -286,10 +547,20 @@ def analytical_connex(
 			# Bridge OCaml (défaut)
 			base_path_str = str(Path(resolved) / "base") if (Path(resolved) / "base").exists() else resolved
 			args = ["-a", base_path_str] if all_components else [base_path_str]
-			output = run_connex(args)
+			if stream:
+				return await _stream_tool_response("connex", args)
+			output = await _unless_disconnected(request, arun_cached("connex", args, base_path_str))
+			_shadow(
+				"/analytical/connex", "ocaml", output, started,
+				lambda: compute_connected_components_from_gwb(_python_base_path(resolved)),
+			)
 			return {"status": "ok", "implementation": "ocaml", "stdout": output}
+	except HTTPException:
+		raise
 	except OcamlCommandError as e:
 		raise HTTPException(status_code=502, detail=e.stderr) from e
+	except TimeoutError as e:
+		raise HTTPException(status_code=504, detail=str(e)) from e
 	except FileNotFoundError as e:
 		raise HTTPException(status_code=404, detail=str(e)) from e
 	except ValueError as e:
@@ -298,13 +569,117 @@ def analytical_connex(
 		raise HTTPException(status_code=500, detail=str(e)) from e
 
 
+# ============================================================================
+# Travaux en arrière-plan (calculs longs exécutés hors requête)
+# ============================================================================
+
+
+def _submit_job(kind: str, params: dict[str, object]) -> dict[str, object]:
+	job = get_job_manager(JOB_TASKS).submit(kind, params)
+	return {"job_id": job.id, "kind": job.kind, "status": job.status, "status_url": f"/jobs/{job.id}"}
+
+
+@app.post("/jobs/analytical/consang", status_code=202)
+def jobs_consang(
+	base_dir: str = Query(..., description="Chemin répertoire GWB (absolu ou relatif à GENEWEB_OCAML_ROOT)"),
+	use_python: bool = Query(False, description="Utiliser l'implémentation Python"),
+) -> dict[str, object]:
+	"""Lance le calcul de consanguinité en arrière-plan; renvoie l'identifiant du travail."""
+	resolved = _resolve_input_dir(base_dir)
+	return _submit_job("consang", {"base_dir": resolved, "use_python": use_python or _should_use_python()})
+
+
+@app.post("/jobs/analytical/connex", status_code=202)
+def jobs_connex(
+	base_dir: str = Query(..., description="Chemin répertoire GWB (absolu ou relatif à GENEWEB_OCAML_ROOT)"),
+	use_python: bool = Query(False, description="Utiliser l'implémentation Python"),
+	all_components: bool = Query(False, description="Retourner toutes les composantes"),
+) -> dict[str, object]:
+	"""Lance le calcul des composantes connexes en arrière-plan."""
+	resolved = _resolve_input_dir(base_dir)
+	return _submit_job(
+		"connex",
+		{"base_dir": resolved, "use_python": use_python or _should_use_python(), "all_components": all_components},
+	)
+
+
+@app.post("/jobs/import/ged2gwb", status_code=202)
+def jobs_ged2gwb(
+	input_file: str = Query(..., description="Chemin fichier GEDCOM (absolu ou relatif à GENEWEB_OCAML_ROOT)"),
+	output_dir: str = Query(..., description="Répertoire GWB de sortie (absolu ou relatif à GENEWEB_OCAML_ROOT)"),
+	use_python: bool = Query(False, description="Utiliser l'implémentation Python"),
+) -> dict[str, object]:
+	"""Lance un import GEDCOM en arrière-plan."""
+	try:
+		input_path, output_path = _resolve_import_paths(input_file, output_dir)
+	except FileNotFoundError as e:
+		raise HTTPException(status_code=404, detail=str(e)) from e
+	return _submit_job(
+		"ged2gwb",
+		{"input_file": str(input_path), "output_dir": str(output_path), "use_python": use_python or _should_use_python()},
+	)
+
+
+@app.get("/jobs")
+def jobs_list() -> list[dict[str, Any]]:
+	"""Liste des travaux connus (en file, en cours, terminés non purgés)."""
+	return get_job_manager(JOB_TASKS).list_jobs()
+
+
+@app.get("/jobs/{job_id}")
+def jobs_status(job_id: str) -> dict[str, Any]:
+	"""État et progression d'un travail (la consultation le maintient en vie)."""
+	try:
+		return get_job_manager(JOB_TASKS).status(job_id)
+	except JobNotFound as e:
+		raise HTTPException(status_code=404, detail=f"Travail introuvable: {job_id}") from e
+
+
+@app.get("/jobs/{job_id}/result")
+def jobs_result(job_id: str) -> Any:
+	"""Résultat d'un travail réussi (409 s'il n'est pas terminé, 500 s'il a échoué)."""
+	manager = get_job_manager(JOB_TASKS)
+	try:
+		status, result = manager.result(job_id)
+	except JobNotFound as e:
+		raise HTTPException(status_code=404, detail=f"Travail introuvable: {job_id}") from e
+	if status == "succeeded":
+		return result
+	if status == "failed":
+		raise HTTPException(status_code=500, detail=manager.status(job_id)["error"])
+	raise HTTPException(status_code=409, detail=f"Travail {status}")
+
+
+@app.delete("/jobs/{job_id}")
+def jobs_cancel(job_id: str) -> dict[str, object]:
+	"""Annule un travail en file ou en cours."""
+	try:
+		cancelled = get_job_manager(JOB_TASKS).cancel(job_id)
+	except JobNotFound as e:
+		raise HTTPException(status_code=404, detail=f"Travail introuvable: {job_id}") from e
+	return {"job_id": job_id, "cancelled": cancelled}
+
+
 # ============================================================================
 # Routes gwd - Issue #35 : Modifications (ajout/modif individu - lot 1)
 # ============================================================================
 
 
+def _write(request: Request, response: Response, resolved: str, operation: dict[str, Any]) -> Any:
+	"""Modification unitaire confiée à l'écrivain de la base.
+
+	`If-Match` (ETag d'une lecture) rend l'écriture conditionnelle: WriteConflict (412)
+	si la base a changé depuis. La réponse porte l'ETag de la nouvelle révision.
+	"""
+	written = apply_operation(resolved, operation, expected_revision=request.headers.get("if-match"))
+	response.headers["ETag"] = f'"{written.revision}"'
+	return written.value
+
+
 @app.post("/gwd/add_ind")
 def gwd_add_ind(
+	request: Request,
+	response: Response,
 	base: str = Query(..., description="Chemin répertoire GWB (absolu ou relatif GENEWEB_OCAML_ROOT)"),
 	id: str = Query(..., description="ID individu (unique)"),
 	nom: str | None = Query(None, description="Nom"),
@@ -316,7 +691,7 @@ def gwd_add_ind(
 	try:
 		resolved = _resolve_input_dir(base)
 		if use_py:
-			ind = add_individu(resolved, id=id, nom=nom, prenom=prenom, sexe=sexe)  # type: ignore[arg-type]
+			ind = _write(request, response, resolved, {"op": "add_ind", "id": id, "nom": nom, "prenom": prenom, "sexe": sexe})
 			return {
 				"status": "ok",
 				"implementation": "python",
@@ -329,6 +704,8 @@ def gwd_add_ind(
 			}
 		else:
 			raise HTTPException(status_code=501, detail="Mode OCaml non implémenté pour add_ind")
+	except WriteConflict as e:
+		raise HTTPException(status_code=412, detail=str(e)) from e
 	except ValueError as e:
 		raise HTTPException(status_code=400, detail=str(e)) from e
 	except FileNotFoundError as e:
@@ -339,6 +716,8 @@ def gwd_add_ind(
 
 @app.put("/gwd/mod_ind")
 def gwd_mod_ind(
+	request: Request,
+	response: Response,
 	base: str = Query(..., description="Chemin répertoire GWB (absolu ou relatif GENEWEB_OCAML_ROOT)"),
 	id: str = Query(..., description="ID individu existant"),
 	nom: str | None = Query(None, description="Nom (optionnel)"),
@@ -350,7 +729,7 @@ def gwd_mod_ind(
 	try:
 		resolved = _resolve_input_dir(base)
 		if use_py:
-			ind = mod_individu(resolved, id=id, nom=nom, prenom=prenom, sexe=sexe)  # type: ignore[arg-type]
+			ind = _write(request, response, resolved, {"op": "mod_ind", "id": id, "nom": nom, "prenom": prenom, "sexe": sexe})
 			return {
 				"status": "ok",
 				"implementation": "python",
@@ -363,6 +742,8 @@ def gwd_mod_ind(
 			}
 		else:
 			raise HTTPException(status_code=501, detail="Mode OCaml non implémenté pour mod_ind")
+	except WriteConflict as e:
+		raise HTTPException(status_code=412, detail=str(e)) from e
 	except ValueError as e:
 		raise HTTPException(status_code=400, detail=str(e)) from e
 	except FileNotFoundError as e:
@@ -373,6 +754,8 @@ def gwd_mod_ind(
 
 @app.post("/gwd/add_fam")
 def gwd_add_fam(
+	request: Request,
+	response: Response,
 	base: str = Query(..., description="Chemin répertoire GWB"),
 	id: str = Query(..., description="ID famille"),
 	pere_id: str | None = Query(None),
@@ -385,10 +768,12 @@ def gwd_add_fam(
 		resolved = _resolve_input_dir(base)
 		if use_py:
 			enfants = [e for e in (enfants_ids or "").split(",") if e]
-			fam = add_famille(resolved, id=id, pere_id=pere_id, mere_id=mere_id, enfants_ids=enfants)
+			fam = _write(request, response, resolved, {"op": "add_fam", "id": id, "pere_id": pere_id, "mere_id": mere_id, "enfants_ids": enfants})
 			return {"status": "ok", "implementation": "python", "famille": {"id": fam.id, "pere_id": fam.pere_id, "mere_id": fam.mere_id, "enfants_ids": fam.enfants_ids}}
 		else:
 			raise HTTPException(status_code=501, detail="Mode OCaml non implémenté pour add_fam")
+	except WriteConflict as e:
+		raise HTTPException(status_code=412, detail=str(e)) from e
 	except ValueError as e:
 		raise HTTPException(status_code=400, detail=str(e)) from e
 	except FileNotFoundError as e:
@@ -399,6 +784,8 @@ def gwd_add_fam(
 
 @app.put("/gwd/mod_fam")
 def gwd_mod_fam(
+	request: Request,
+	response: Response,
 	base: str = Query(..., description="Chemin répertoire GWB"),
 	id: str = Query(..., description="ID famille"),
 	pere_id: str | None = Query(None),
@@ -411,10 +798,12 @@ def gwd_mod_fam(
 		resolved = _resolve_input_dir(base)
 		if use_py:
 			enfants = [e for e in (enfants_ids or "").split(",") if e]
-			fam = mod_famille(resolved, id=id, pere_id=pere_id, mere_id=mere_id, enfants_ids=enfants if enfants_ids is not None else None)
+			fam = _write(request, response, resolved, {"op": "mod_fam", "id": id, "pere_id": pere_id, "mere_id": mere_id, "enfants_ids": enfants if enfants_ids is not None else None})
 			return {"status": "ok", "implementation": "python", "famille": {"id": fam.id, "pere_id": fam.pere_id, "mere_id": fam.mere_id, "enfants_ids": fam.enfants_ids}}
 		else:
 			raise HTTPException(status_code=501, detail="Mode OCaml non implémenté pour mod_fam")
+	except WriteConflict as e:
+		raise HTTPException(status_code=412, detail=str(e)) from e
 	except ValueError as e:
 		raise HTTPException(status_code=400, detail=str(e)) from e
 	except FileNotFoundError as e:
@@ -425,6 +814,8 @@ def gwd_mod_fam(
 
 @app.delete("/gwd/del_ind")
 def gwd_del_ind(
+	request: Request,
+	response: Response,
 	base: str = Query(..., description="Chemin répertoire GWB"),
 	id: str = Query(..., description="ID individu"),
 	force: bool = Query(False),
@@ -434,10 +825,12 @@ def gwd_del_ind(
 	try:
 		resolved = _resolve_input_dir(base)
 		if use_py:
-			del_individu(resolved, id=id, force=force)
+			_write(request, response, resolved, {"op": "del_ind", "id": id, "force": force})
 			return {"status": "ok", "implementation": "python"}
 		else:
 			raise HTTPException(status_code=501, detail="Mode OCaml non implémenté pour del_ind")
+	except WriteConflict as e:
+		raise HTTPException(status_code=412, detail=str(e)) from e
 	except ValueError as e:
 		raise HTTPException(status_code=400, detail=str(e)) from e
 	except FileNotFoundError as e:
@@ -448,6 +841,8 @@ def gwd_del_ind(
 
 @app.delete("/gwd/del_fam")
 def gwd_del_fam(
+	request: Request,
+	response: Response,
 	base: str = Query(..., description="Chemin répertoire GWB"),
 	id: str = Query(..., description="ID famille"),
 	force: bool = Query(False),
@@ -457,10 +852,53 @@ def gwd_del_fam(
 	try:
 		resolved = _resolve_input_dir(base)
 		if use_py:
-			del_famille(resolved, id=id, force=force)
+			_write(request, response, resolved, {"op": "del_fam", "id": id, "force": force})
 			return {"status": "ok", "implementation": "python"}
 		else:
 			raise HTTPException(status_code=501, detail="Mode OCaml non implémenté pour del_fam")
+	except WriteConflict as e:
+		raise HTTPException(status_code=412, detail=str(e)) from e
+	except ValueError as e:
+		raise HTTPException(status_code=400, detail=str(e)) from e
+	except FileNotFoundError as e:
+		raise HTTPException(status_code=404, detail=str(e)) from e
+	except Exception as e:
+		raise HTTPException(status_code=500, detail=str(e)) from e
+
+
+_BATCH_OPERATIONS = Body(
+	...,
+	embed=True,
+	description="Opérations ordonnées: {op: add_ind|mod_ind|del_ind|add_fam|mod_fam|del_fam, id, ...}",
+)
+
+
+@app.post("/gwd/batch")
+def gwd_batch(
+	request: Request,
+	response: Response,
+	base: str = Query(..., description="Chemin répertoire GWB"),
+	operations: list[dict[str, Any]] = _BATCH_OPERATIONS,
+	use_python: bool = Query(False),
+) -> dict:
+	"""Applique un lot de modifications en une transaction (une lecture, une écriture).
+
+	Les champs de chaque opération sont ceux de la route unitaire correspondante. Si une
+	opération est invalide, aucune n'est appliquée (400, avec le rang de l'opération).
+	"""
+	use_py = use_python or _should_use_python()
+	try:
+		resolved = _resolve_input_dir(base)
+		if use_py:
+			res = apply_batch(resolved, operations, expected_revision=request.headers.get("if-match"))
+			response.headers["ETag"] = f'"{res["revision"]}"'
+			return {"status": "ok", "implementation": "python", **res}
+		else:
+			raise HTTPException(status_code=501, detail="Mode OCaml non implémenté pour batch")
+	except HTTPException:
+		raise
+	except WriteConflict as e:
+		raise HTTPException(status_code=412, detail=str(e)) from e
 	except ValueError as e:
 		raise HTTPException(status_code=400, detail=str(e)) from e
 	except FileNotFoundError as e:
@@ -474,14 +912,18 @@ def gwd_del_fam(
 # ============================================================================
 
 
-@app.get("/gwd/wiznotes")
+@app.get("/gwd/wiznotes", response_model=None)
 def gwd_wiznotes_list(
+	request: Request,
+	response: Response,
 	base: str = Query(..., description="Chemin répertoire GWB"),
 	q: str | None = Query(None, description="Filtre plein texte"),
 	use_python: bool = Query(False),
-) -> dict:
+) -> dict | Response:
 	try:
 		resolved = _resolve_input_dir(base)
+		if not_modified := _not_modified(request, response, resolved):
+			return not_modified
 		res = list_wiznotes(resolved, query=q)
 		return {"status": "ok", "implementation": "python", **res}
 	except FileNotFoundError as e:
@@ -490,13 +932,17 @@ def gwd_wiznotes_list(
 		raise HTTPException(status_code=500, detail=str(e)) from e
 
 
-@app.get("/gwd/wiznotes/item")
+@app.get("/gwd/wiznotes/item", response_model=None)
 def gwd_wiznotes_get(
+	request: Request,
+	response: Response,
 	base: str = Query(...),
 	key: str = Query(..., description="Clé de note (ex: IND:I001, FAM:F001, SRC:S001)"),
-) -> dict:
+) -> dict | Response:
 	try:
 		resolved = _resolve_input_dir(base)
+		if not_modified := _not_modified(request, response, resolved):
+			return not_modified
 		res = get_wiznote(resolved, key)
 		return {"status": "ok", "implementation": "python", **res}
 	except ValueError as e:
@@ -539,13 +985,18 @@ def gwd_wiznotes_del(
 # ============================================================================
 
 
-@app.get("/gwd/images/carrousel")
+@app.get("/gwd/images/carrousel", response_model=None)
 def gwd_images_carrousel(
+	request: Request,
+	response: Response,
 	base: str = Query(...),
 	i: str | None = Query(None, description="ID individu pour filtrage heuristique"),
-) -> dict:
+) -> dict | Response:
 	try:
 		resolved = _resolve_input_dir(base)
+		# Les images sont déposées hors des écrivains de la base: leurs dossiers comptent aussi
+		if not_modified := _not_modified(request, response, resolved, images_signature(resolved)):
+			return not_modified
 		res = list_carrousel_images(resolved, person_id=i)
 		return {"status": "ok", "implementation": "python", **res}
 	except FileNotFoundError as e:
@@ -718,8 +1169,10 @@ def compat_gw(
 # ============================================================================
 
 
-@app.get("/gwd")
+@app.get("/gwd", response_model=None)
 def gwd_route(
+	request: Request,
+	response: Response,
 	base: str = Query(..., description="Nom de la base (ex: demo)"),
 	mode: str = Query("", description="Mode/route (ex: '', 'S', 'NG', 'F', 'A', 'D', 'NOTES')"),
 	i: str | None = Query(None, description="ID individu (iper)"),
@@ -729,7 +1182,7 @@ def gwd_route(
 	use_python: bool = Query(
 		False, description="Utiliser l'implémentation Python (défaut: OCaml, ou GENEWEB_USE_PYTHON=1)"
 	),
-) -> dict:
+) -> dict | Response:
 	"""Route générique pour les pages gwd (Issue #34).
 	
 	Cette route supporte les modes de lecture suivants :
@@ -748,71 +1201,89 @@ def gwd_route(
 		resolved = _resolve_input_dir(base)
 		
 		if use_py:
-			# Implémentation Python native (Issue #34)
-			if mode == "" or mode == "PERSO":
-				# Page d'accueil ou fiche individu
-				result = get_person_page(resolved, person_id=i)
-				return {
-					"status": "ok",
-					"implementation": "python",
-					"mode": mode or "home",
-					**result,
-				}
-			elif mode == "S" or mode == "NG":
-				# Recherche
-				result = search_persons(resolved, query=v)
-				return {
-					"status": "ok",
-					"implementation": "python",
-					"mode": "search",
-					**result,
-				}
-			elif mode == "F":
-				# Fiche famille
-				fam_id = f or i  # Peut être dérivé de l'individu
-				result = get_family_page(resolved, family_id=fam_id)
-				return {
-					"status": "ok",
-					"implementation": "python",
-					"mode": "family",
-					**result,
-				}
-			elif mode == "A":
-				# Ascendance
-				if not i:
-					raise ValueError("Paramètre 'i' requis pour la route A (ascendance)")
-				result = get_ascendance(resolved, person_id=i)
-				return {
-					"status": "ok",
-					"implementation": "python",
-					"mode": "ascendance",
-					**result,
-				}
-			elif mode == "D":
-				# Descendance
-				if not i:
-					raise ValueError("Paramètre 'i' requis pour la route D (descendance)")
-				result = get_descendance(resolved, person_id=i)
-				return {
-					"status": "ok",
-					"implementation": "python",
-					"mode": "descendance",
-					**result,
-				}
-			elif mode == "NOTES":
-				# Notes
-				result = get_notes(resolved, note_file=v, ajax=ajax)
-				return {
-					"status": "ok",
-					"implementation": "python",
-					"mode": "notes",
-					**result,
-				}
-			else:
-				raise HTTPException(
-					status_code=400,
-					detail=f"Mode '{mode}' non implémenté en Python. Utilisez use_python=false pour OCaml.",
-				)
+			# Page déjà connue du client pour cette révision: 304 sans charger la base
+			if not_modified := _not_modified(request, response, resolved):
+				return not_modified
+			# Implémentation Python native (Issue #34); pages identiques demandées en même
+			# temps calculées une seule fois
+			def compute() -> dict:
+				if mode == "" or mode == "PERSO":
+					# Page d'accueil ou fiche individu
+					result = get_person_page(resolved, person_id=i)
+					return {
+						"status": "ok",
+						"implementation": "python",
+						"mode": mode or "home",
+						**result,
+					}
+				elif mode == "S" or mode == "NG":
+					# Recherche
+					result = search_persons(resolved, query=v)
+					return {
+						"status": "ok",
+						"implementation": "python",
+						"mode": "search",
+						**result,
+					}
+				elif mode == "F":
+					# Fiche famille
+					fam_id = f or i  # Peut être dérivé de l'individu
+					result = get_family_page(resolved, family_id=fam_id)
+					return {
+						"status": "ok",
+						"implementation": "python",
+						"mode": "family",
+						**result,
+					}
+				elif mode == "A":
+					# Ascendance
+					if not i:
+						raise ValueError("Paramètre 'i' requis pour la route A (ascendance)")
+					result = get_ascendance(resolved, person_id=i)
+					return {
+						"status": "ok",
+						"implementation": "python",
+						"mode": "ascendance",
+						**result,
+					}
+				elif mode == "D":
+					# Descendance
+					if not i:
+						raise ValueError("Paramètre 'i' requis pour la route D (descendance)")
+					result = get_descendance(resolved, person_id=i)
+					return {
+						"status": "ok",
+						"implementation": "python",
+						"mode": "descendance",
+						**result,
+					}
+				elif mode == "NOTES":
+					# Notes
+					result = get_notes(resolved, note_file=v, ajax=ajax)
+					return {
+						"status": "ok",
+						"implementation": "python",
+						"mode": "notes",
+						**result,
+					}
+				else:
+					raise HTTPException(
+						status_code=400,
+						detail=f"Mode '{mode}' non implémenté en Python. Utilisez use_python=false pour OCaml.",
+					)
+			params = {"base": resolved, "mode": mode, "i": i, "f": f, "v": v, "ajax": ajax}
+			if not response_cache_enabled():
+				return get_coalescer().run("/gwd", params, resolved, compute)
+			# Page déjà rendue pour cette révision: servie sans appeler les services
+			cache = get_response_cache()
+			key = params_key(params)
+			revision = read_revision(resolved).token
+			body = cache.get(resolved, key, revision)
+			if body is None:
+				page = get_coalescer().run("/gwd", params, resolved, compute)
+				body = codec.dumps(page)
+				cache.put(resolved, key, revision, body, page_tags(page))
+			return Response(body, media_type="application/json", headers=dict(response.headers))
 		else:
 			# Bridge OCaml (défaut) - Pour l'instant, retourner une erreur
 			# car gwd nécessite un serveur HTTP actif
@@ -820,6 +1291,8 @@ def gwd_route(
 				status_code=501,
 				detail="Bridge OCaml pour gwd non encore implémenté. Utilisez use_python=true pour les routes Python.",
 			)
+	except HTTPException:
+		raise
 	except ValueError as e:
 		raise HTTPException(status_code=400, detail=str(e)) from e
 	except FileNotFoundError as e:
@@ -0,0 +1,167 @@
+"""API asynchrone du bridge OCaml (asyncio).
+
+Pendant asynchrone de `bridge._run_tool`, pour les routes HTTP `async`:
+
+- les processus sont lancés par `asyncio.create_subprocess_exec`: attendre un outil OCaml
+  n'occupe plus un thread du pool de FastAPI;
+- un sémaphore par exécutable borne le nombre d'instances simultanées
+  (`GENEWEB_OCAML_CONCURRENCY`, défaut 2), les appels excédentaires attendent leur tour;
+- la sortie standard est produite au fil de l'eau (`astream_tool`) au lieu d'être
+  entièrement mise en mémoire;
+- si la tâche appelante est annulée (déconnexion du client, délai dépassé), le processus
+  est tué et récolté.
+
+Le mode RPC (`GENEWEB_OCAML_BRIDGE=rpc`) reste prioritaire; l'appel bloquant au pool est
+alors délégué à un thread.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import codecs
+import os
+import threading
+import weakref
+from collections.abc import AsyncGenerator, Sequence
+from contextlib import aclosing, suppress
+
+from geneweb.adapters.ocaml_bridge.bridge import OcamlCommandError, _run_via_rpc, _tool_command
+from geneweb.adapters.ocaml_bridge.rpc import bridge_mode
+
+GENEWEB_OCAML_CONCURRENCY_ENV = "GENEWEB_OCAML_CONCURRENCY"
+DEFAULT_CONCURRENCY = 2
+DEFAULT_TIMEOUT = 120.0
+_CHUNK_SIZE = 64 * 1024
+
+# Un jeu de sémaphores par boucle d'événements (un sémaphore asyncio est lié à sa boucle)
+_semaphores: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict[str, asyncio.Semaphore]] = (
+    weakref.WeakKeyDictionary()
+)
+_semaphores_lock = threading.Lock()
+
+
+def max_concurrency() -> int:
+    """Nombre maximal d'instances simultanées d'un même exécutable OCaml."""
+    raw = os.getenv(GENEWEB_OCAML_CONCURRENCY_ENV, "")
+    try:
+        return max(1, int(raw)) if raw else DEFAULT_CONCURRENCY
+    except ValueError:
+        return DEFAULT_CONCURRENCY
+
+
+def _semaphore(name: str) -> asyncio.Semaphore:
+    loop = asyncio.get_running_loop()
+    with _semaphores_lock:
+        per_loop = _semaphores.setdefault(loop, {})
+        sem = per_loop.get(name)
+        if sem is None:
+            sem = per_loop[name] = asyncio.Semaphore(max_concurrency())
+        return sem
+
+
+async def _kill(proc: asyncio.subprocess.Process) -> None:
+    if proc.returncode is None:
+        with suppress(ProcessLookupError):
+            proc.kill()
+    with suppress(Exception):
+        await proc.wait()
+
+
+async def astream_tool(
+    name: str,
+    args: Sequence[str],
+    timeout: float | None = DEFAULT_TIMEOUT,
+) -> AsyncGenerator[str, None]:
+    """Exécute l'outil OCaml `name` et produit sa sortie standard par morceaux.
+
+    Le délai `timeout` porte sur l'exécution complète (attente du sémaphore exclue).
+    Fermer le générateur avant la fin (ou annuler la tâche qui le consomme) tue le processus.
+
+    Raises:
+        OcamlCommandError: si la commande se termine avec un code non nul
+        FileNotFoundError: si l'exécutable est introuvable
+        TimeoutError: si le délai est dépassé
+    """
+    if bridge_mode() == "rpc":
+        out = await asyncio.to_thread(_run_via_rpc, name, list(args), timeout)
+        if out is not None:
+            yield out
+            return
+
+    cmd, cwd = _tool_command(name, args)
+    async with _semaphore(name):
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout if timeout is not None else None
+
+        def remaining() -> float | None:
+            return None if deadline is None else max(0.0, deadline - loop.time())
+
+        proc = await asyncio.create_subprocess_exec(
+            *cmd,
+            cwd=str(cwd),
+            stdin=asyncio.subprocess.DEVNULL,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        assert proc.stdout is not None and proc.stderr is not None
+        # stderr lu en parallèle pour que le processus ne bloque pas sur un tube plein
+        stderr_task = asyncio.ensure_future(proc.stderr.read())
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        try:
+            try:
+                while True:
+                    chunk = await asyncio.wait_for(proc.stdout.read(_CHUNK_SIZE), remaining())
+                    if not chunk:
+                        break
+                    text = decoder.decode(chunk)
+                    if text:
+                        yield text
+                tail = decoder.decode(b"", final=True)
+                if tail:
+                    yield tail
+                returncode = await asyncio.wait_for(proc.wait(), remaining())
+            except TimeoutError:
+                raise TimeoutError(f"{name}: délai de {timeout}s dépassé") from None
+            stderr = (await stderr_task).decode("utf-8", errors="replace")
+            if returncode != 0:
+                raise OcamlCommandError(cmd, returncode, "", stderr)
+        finally:
+            stderr_task.cancel()
+            await _kill(proc)
+
+
+async def arun_tool(
+    name: str,
+    args: Sequence[str],
+    timeout: float | None = DEFAULT_TIMEOUT,
+) -> str:
+    """Exécute l'outil OCaml `name` et renvoie toute sa sortie standard."""
+    chunks: list[str] = []
+    try:
+        async with aclosing(astream_tool(name, args, timeout=timeout)) as stream:
+            async for chunk in stream:
+                chunks.append(chunk)
+    except OcamlCommandError as e:
+        e.stdout = "".join(chunks)
+        raise
+    return "".join(chunks)
+
+
+async def arun_gwb2ged(args: Sequence[str]) -> str:
+    return await arun_tool("gwb2ged", args)
+
+
+async def arun_ged2gwb(args: Sequence[str]) -> str:
+    return await arun_tool("ged2gwb", args)
+
+
+async def arun_gwd(args: Sequence[str]) -> str:
+    return await arun_tool("gwd", args)
+
+
+async def arun_consang(args: Sequence[str]) -> str:
+    return await arun_tool("consang", args)
+
+
+async def arun_connex(args: Sequence[str]) -> str:
+    return await arun_tool("connex", args)
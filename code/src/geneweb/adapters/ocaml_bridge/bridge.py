@@ -1,12 +1,22 @@
 from __future__ import annotations
 
+import json
 import os
-import shutil
 import subprocess
 from collections.abc import Sequence
 from pathlib import Path
 
+from geneweb.adapters.ocaml_bridge.rpc import (
+    METHOD_NOT_FOUND,
+    RpcError,
+    RpcUnavailable,
+    bridge_mode,
+    get_rpc_pool,
+)
+
 GENEWEB_OCAML_ROOT_ENV = "GENEWEB_OCAML_ROOT"
+# Délai par défaut d'une commande (secondes); None = sans limite (travaux de fond)
+DEFAULT_TIMEOUT = 120.0
 
 
 class OcamlCommandError(RuntimeError):
@@ -43,7 +53,7 @@ def _bin_path(root: Path, relative: str) -> Path:
     return src_bin
 
 
-def _run(cmd: Sequence[str], cwd: Path | None = None, timeout: int = 120) -> str:
+def _run(cmd: Sequence[str], cwd: Path | None = None, timeout: float | None = DEFAULT_TIMEOUT) -> str:
     completed = subprocess.run(
         cmd,
         cwd=str(cwd) if cwd else None,
@@ -57,53 +67,76 @@ def _run(cmd: Sequence[str], cwd: Path | None = None, timeout: int = 120) -> str
     return completed.stdout
 
 
-def run_gwb2ged(args: Sequence[str]) -> str:
-    root = _default_root()
-    exe = _bin_path(root, "gwb2ged/gwb2ged.exe")
-
-    if exe.exists():
-        return _run([str(exe), *args], cwd=root)
-    dune = shutil.which("dune")
-    if dune:
-        return _run([dune, "exec", str(root / "bin/gwb2ged/gwb2ged.exe"), "--", *args], cwd=root)
-    raise FileNotFoundError(
-        f"gwb2ged introuvable. Compilez avec dune dans {root} ou définissez {GENEWEB_OCAML_ROOT_ENV} vers un dépôt compilé."
-    )
+def _rpc_result_to_stdout(result: object) -> str:
+    if isinstance(result, str):
+        return result
+    stdout = result.get("stdout") if isinstance(result, dict) else None
+    if isinstance(stdout, str):
+        return stdout
+    return json.dumps(result, ensure_ascii=False)
 
 
-def run_ged2gwb(args: Sequence[str]) -> str:
-    root = _default_root()
-    exe = _bin_path(root, "ged2gwb/ged2gwb.exe")
+def _run_via_rpc(name: str, args: Sequence[str], timeout: float | None = DEFAULT_TIMEOUT) -> str | None:
+    """Tente l'exécution via le pool RPC; None si le mode subprocess doit prendre le relais.
+
+    Le serveur RPC OCaml n'expose aujourd'hui que `/pingpong`: tant qu'il ne sert pas les
+    outils, ce mode est inerte (repli subprocess systématique). Le pool retient les
+    méthodes refusées, si bien que seul le premier appel d'un outil fait l'aller-retour.
+    """
+    if bridge_mode() != "rpc":
+        return None
+    try:
+        pool = get_rpc_pool(_default_root)
+        if not pool.supports(name):
+            return None
+        return _rpc_result_to_stdout(pool.call(name, list(args), timeout=timeout))
+    except RpcUnavailable:
+        return None
+    except RpcError as e:
+        if e.code == METHOD_NOT_FOUND:
+            # Commande pas (encore) exposée par le serveur RPC
+            return None
+        raise OcamlCommandError([name, *args], e.code, "", e.message) from e
+
+
+def _tool_command(name: str, args: Sequence[str]) -> tuple[list[str], Path]:
+    """Ligne de commande (et répertoire de travail) de l'outil `name`.
+
+    Le chemin vient du registre (résolu une fois par processus, sans `dune exec`).
+    """
+    from geneweb.adapters.ocaml_bridge.registry import get_registry  # import circulaire
+
+    registry = get_registry()
+    return [str(registry.path(name)), *args], registry.root
 
-    if exe.exists():
-        return _run([str(exe), *args], cwd=root)
-    dune = shutil.which("dune")
-    if dune:
-        return _run([dune, "exec", str(root / "bin/ged2gwb/ged2gwb.exe"), "--", *args], cwd=root)
-    raise FileNotFoundError(
-        f"ged2gwb introuvable. Compilez avec dune dans {root} ou définissez {GENEWEB_OCAML_ROOT_ENV} vers un dépôt compilé."
-    )
+
+def _run_tool(name: str, args: Sequence[str], timeout: float | None = DEFAULT_TIMEOUT) -> str:
+    """Exécute l'outil OCaml `bin/<name>/<name>.exe` (RPC si activé, sinon subprocess)."""
+    out = _run_via_rpc(name, args, timeout)
+    if out is not None:
+        return out
+    cmd, cwd = _tool_command(name, args)
+    return _run(cmd, cwd=cwd, timeout=timeout)
+
+
+def run_gwb2ged(args: Sequence[str]) -> str:
+    return _run_tool("gwb2ged", args)
+
+
+def run_ged2gwb(args: Sequence[str], timeout: float | None = DEFAULT_TIMEOUT) -> str:
+    return _run_tool("ged2gwb", args, timeout)
 
 
 def run_gwd(args: Sequence[str]) -> str:
-    root = _default_root()
-    exe = _bin_path(root, "gwd/gwd.exe")
-
-    if exe.exists():
-        return _run([str(exe), *args], cwd=root)
-    dune = shutil.which("dune")
-    if dune:
-        return _run([dune, "exec", str(root / "bin/gwd/gwd.exe"), "--", *args], cwd=root)
-    raise FileNotFoundError(
-        f"gwd introuvable. Compilez avec dune dans {root} ou définissez {GENEWEB_OCAML_ROOT_ENV} vers un dépôt compilé."
-    )
+    return _run_tool("gwd", args)
 
 
-def run_consang(args: Sequence[str]) -> str:
+def run_consang(args: Sequence[str], timeout: float | None = DEFAULT_TIMEOUT) -> str:
 	"""Exécute consang OCaml (Issue #29).
 	
 	Args:
 		args: Arguments pour consang (ex: ["-fast", "/path/to/base.gwb"])
+		timeout: Délai en secondes (None: sans limite)
 	
 	Returns:
 		Sortie stdout de consang
@@ -112,24 +145,15 @@ def run_consang(args: Sequence[str]) -> str:
 		OcamlCommandError: Si la commande échoue
 		FileNotFoundError: Si consang n'est pas trouvé
 	"""
-	root = _default_root()
-	exe = _bin_path(root, "consang/consang.exe")
-
-	if exe.exists():
-		return _run([str(exe), *args], cwd=root)
-	dune = shutil.which("dune")
-	if dune:
-		return _run([dune, "exec", str(root / "bin/consang/consang.exe"), "--", *args], cwd=root)
-	raise FileNotFoundError(
-		f"consang introuvable. Compilez avec dune dans {root} ou définissez {GENEWEB_OCAML_ROOT_ENV} vers un dépôt compilé."
-	)
+	return _run_tool("consang", args, timeout)
 
 
-def run_connex(args: Sequence[str]) -> str:
+def run_connex(args: Sequence[str], timeout: float | None = DEFAULT_TIMEOUT) -> str:
 	"""Exécute connex OCaml (Issue #29).
 	
 	Args:
 		args: Arguments pour connex (ex: ["-a", "/path/to/base.gwb"])
+		timeout: Délai en secondes (None: sans limite)
 	
 	Returns:
 		Sortie stdout de connex
@@ -138,14 +162,4 @@ def run_connex(args: Sequence[str]) -> str:
 		OcamlCommandError: Si la commande échoue
 		FileNotFoundError: Si connex n'est pas trouvé
 	"""
-	root = _default_root()
-	exe = _bin_path(root, "connex/connex.exe")
-
-	if exe.exists():
-		return _run([str(exe), *args], cwd=root)
-	dune = shutil.which("dune")
-	if dune:
-		return _run([dune, "exec", str(root / "bin/connex/connex.exe"), "--", *args], cwd=root)
-	raise FileNotFoundError(
-		f"connex introuvable. Compilez avec dune dans {root} ou définissez {GENEWEB_OCAML_ROOT_ENV} vers un dépôt compilé."
-	)
+	return _run_tool("connex", args, timeout)
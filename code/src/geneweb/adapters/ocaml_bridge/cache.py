@@ -0,0 +1,199 @@
+"""Cache de résultats des commandes du bridge OCaml, indexé par révision de base.
+
+Les commandes analytiques (consang, connex) et l'export gwb2ged produisent un résultat qui
+ne dépend que de la base et des arguments. Leur sortie est conservée sur disque sous la
+clé (commande, arguments normalisés, jeton de révision de la base):
+
+- le jeton (`geneweb.io.revision.read_revision`) change à chaque écriture de la base
+  (compteur `.revision` et signature des fichiers de données), ce qui invalide
+  naturellement les entrées périmées, sans parcourir tout le répertoire;
+- le répertoire du cache est borné en taille, les entrées les moins récemment lues sont
+  évincées en premier (mtime rafraîchi à chaque lecture);
+- les appels concurrents identiques sont dédupliqués (single-flight): un seul processus
+  OCaml tourne pour tous.
+
+Configuration:
+- `GENEWEB_BRIDGE_CACHE=0` désactive le cache;
+- `GENEWEB_BRIDGE_CACHE_DIR` (défaut: `<tmp>/geneweb-bridge-cache`);
+- `GENEWEB_BRIDGE_CACHE_MAX_MB` (défaut: 256).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections.abc import Sequence
+from contextlib import suppress
+from pathlib import Path
+
+from geneweb.adapters.ocaml_bridge.async_bridge import arun_tool
+from geneweb.infra.singleflight import AsyncSingleFlight
+from geneweb.io.revision import read_revision
+
+GENEWEB_BRIDGE_CACHE_ENV = "GENEWEB_BRIDGE_CACHE"
+GENEWEB_BRIDGE_CACHE_DIR_ENV = "GENEWEB_BRIDGE_CACHE_DIR"
+GENEWEB_BRIDGE_CACHE_MAX_MB_ENV = "GENEWEB_BRIDGE_CACHE_MAX_MB"
+DEFAULT_MAX_MB = 256
+
+# À placer dans les arguments d'une commande qui écrit dans un fichier (gwb2ged -o): le
+# calcul partagé le remplace par un fichier temporaire qu'il crée et supprime lui-même.
+OUTPUT = "<output>"
+
+
+def normalize_args(args: Sequence[str]) -> list[str]:
+    """Arguments rendus indépendants de l'appel: chemins existants résolus."""
+    normalized: list[str] = []
+    for arg in args:
+        if not arg.startswith("-") and os.path.exists(arg):
+            normalized.append(str(Path(arg).resolve()))
+        else:
+            normalized.append(arg)
+    return normalized
+
+
+def make_key(command: str, args: Sequence[str], revision: str) -> str:
+    payload = json.dumps([command, list(args), revision], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResultCache:
+    """Stockage sur disque borné en taille, éviction LRU."""
+
+    def __init__(self, directory: str | Path, max_bytes: int) -> None:
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.out"
+
+    def get(self, key: str) -> str | None:
+        path = self._path(key)
+        try:
+            value = path.read_text(encoding="utf-8")
+        except FileNotFoundError:
+            with self._lock:
+                self.misses += 1
+            return None
+        with suppress(OSError):
+            os.utime(path)  # marque l'entrée comme récemment utilisée
+        with self._lock:
+            self.hits += 1
+        return value
+
+    def put(self, key: str, value: str) -> None:
+        data = value.encode("utf-8")
+        if len(data) > self.max_bytes:
+            return
+        self.directory.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as fh:
+                fh.write(data)
+            os.replace(tmp_name, self._path(key))
+        except BaseException:
+            with suppress(OSError):
+                os.unlink(tmp_name)
+            raise
+        self._evict()
+
+    def _evict(self) -> None:
+        with self._lock:
+            entries: list[tuple[int, int, Path]] = []
+            total = 0
+            for path in self.directory.glob("*.out"):
+                try:
+                    st = path.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((st.st_mtime_ns, st.st_size, path))
+                total += st.st_size
+            entries.sort()
+            for _mtime, size, path in entries:
+                if total <= self.max_bytes:
+                    break
+                with suppress(FileNotFoundError):
+                    path.unlink()
+                total -= size
+
+    def size_bytes(self) -> int:
+        return sum(p.stat().st_size for p in self.directory.glob("*.out")) if self.directory.exists() else 0
+
+    def clear(self) -> None:
+        for path in self.directory.glob("*.out"):
+            with suppress(FileNotFoundError):
+                path.unlink()
+
+
+_caches: dict[tuple[Path, int], ResultCache] = {}
+_caches_lock = threading.Lock()
+_flights: AsyncSingleFlight[str] = AsyncSingleFlight()
+
+
+def get_result_cache() -> ResultCache | None:
+    """Cache configuré par l'environnement, ou None s'il est désactivé."""
+    if os.getenv(GENEWEB_BRIDGE_CACHE_ENV, "").lower() in ("0", "false", "no", "off"):
+        return None
+    directory = Path(
+        os.getenv(GENEWEB_BRIDGE_CACHE_DIR_ENV) or Path(tempfile.gettempdir()) / "geneweb-bridge-cache"
+    )
+    try:
+        max_bytes = int(os.getenv(GENEWEB_BRIDGE_CACHE_MAX_MB_ENV, "") or DEFAULT_MAX_MB) * 1024 * 1024
+    except ValueError:
+        max_bytes = DEFAULT_MAX_MB * 1024 * 1024
+    with _caches_lock:
+        cache = _caches.get((directory, max_bytes))
+        if cache is None:
+            cache = _caches[(directory, max_bytes)] = ResultCache(directory, max_bytes)
+        return cache
+
+
+async def arun_cached(
+    name: str,
+    args: Sequence[str],
+    base: str | Path,
+    output_suffix: str = "",
+) -> str:
+    """Exécute l'outil OCaml `name` sur `base`, en réutilisant un résultat déjà calculé.
+
+    Le résultat est la sortie standard, ou, si `args` contient `OUTPUT`, le contenu du
+    fichier écrit par la commande (gwb2ged -o). Ce fichier temporaire (suffixe
+    `output_suffix`) appartient au calcul partagé: un appelant qui abandonne ne le
+    supprime pas sous les pieds des autres.
+    """
+    cache = get_result_cache()
+    if cache is None:
+        return await _execute(name, args, output_suffix)
+
+    revision = await asyncio.to_thread(read_revision, base)
+    key = make_key(name, normalize_args(args), revision.token)
+    cached = await asyncio.to_thread(cache.get, key)
+    if cached is not None:
+        return cached
+
+    async def compute() -> str:
+        value = await _execute(name, args, output_suffix)
+        await asyncio.to_thread(cache.put, key, value)
+        return value
+
+    return await _flights.do(key, compute)
+
+
+async def _execute(name: str, args: Sequence[str], output_suffix: str) -> str:
+    if OUTPUT not in args:
+        return await arun_tool(name, args)
+    fd, tmp_name = tempfile.mkstemp(suffix=output_suffix)
+    os.close(fd)
+    output = Path(tmp_name)
+    try:
+        await arun_tool(name, [tmp_name if arg == OUTPUT else arg for arg in args])
+        return await asyncio.to_thread(output.read_text, encoding="utf-8", errors="ignore")
+    finally:
+        with suppress(OSError):
+            output.unlink()
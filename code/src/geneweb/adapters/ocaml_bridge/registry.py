@@ -0,0 +1,224 @@
+"""Registre des exécutables OCaml du bridge, résolus une fois pour toutes.
+
+Sans registre, chaque appel du bridge recalcule la racine OCaml, teste l'existence du
+binaire sous `_build/` et, à défaut, se rabat sur `dune exec` (qui peut déclencher une
+compilation au milieu d'une requête). Le registre fait ce travail une seule fois:
+
+- résolution et validation (fichier présent et exécutable) de chaque outil, dans
+  `_build/default/bin/<outil>/<outil>.exe` puis `distribution/gw/<outil>`;
+- au démarrage de l'API (`warm_up`): lecture complète des binaires pour les charger dans
+  le cache de pages (empreinte `build_id` calculée au passage) et relevé de la version
+  GeneWeb (`lib/version.txt`, sinon `gwd -version`);
+- compilation `dune build` des outils manquants uniquement si demandée explicitement
+  (`GENEWEB_OCAML_BUILD=1`), à l'échauffement et jamais pendant une requête.
+
+Un outil introuvable est mémorisé avec son erreur: les requêtes échouent immédiatement
+(FileNotFoundError) et l'état est exposé par `GET /healthz/bridge`.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import re
+import shutil
+import subprocess
+import threading
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any
+
+from geneweb.adapters.ocaml_bridge.bridge import GENEWEB_OCAML_ROOT_ENV, _bin_path, _default_root
+
+GENEWEB_OCAML_BUILD_ENV = "GENEWEB_OCAML_BUILD"
+
+TOOLS = ("gwb2ged", "ged2gwb", "gwd", "consang", "connex")
+
+_PREWARM_CHUNK = 1024 * 1024
+_VERSION_RE = re.compile(r'ver\s*=\s*"([^"]+)"')
+_GWD_VERSION_RE = re.compile(r"Geneweb version\s+(\S+)")
+
+
+@dataclass(frozen=True)
+class ToolInfo:
+    """Résultat de la résolution d'un outil OCaml."""
+
+    name: str
+    path: Path | None
+    size: int | None = None
+    build_id: str | None = None
+    version: str | None = None
+    error: str | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.path is not None and self.error is None
+
+    def as_dict(self) -> dict[str, Any]:
+        data = asdict(self)
+        data["path"] = str(self.path) if self.path else None
+        data["ok"] = self.ok
+        return data
+
+
+def _candidates(root: Path, name: str) -> list[Path]:
+    return [_bin_path(root, f"{name}/{name}.exe"), root / "distribution" / "gw" / name]
+
+
+def _prewarm(path: Path) -> str:
+    """Lit tout le binaire (cache de pages) et renvoie son empreinte."""
+    digest = hashlib.blake2b(digest_size=12)
+    with open(path, "rb") as fh:
+        while chunk := fh.read(_PREWARM_CHUNK):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _version_from_source(root: Path) -> str | None:
+    version_file = root / "lib" / "version.txt"
+    try:
+        match = _VERSION_RE.search(version_file.read_text(encoding="utf-8"))
+    except OSError:
+        return None
+    return match.group(1) if match else None
+
+
+def _version_from_gwd(gwd: Path) -> str | None:
+    try:
+        completed = subprocess.run(
+            [str(gwd), "-version"], text=True, capture_output=True, timeout=5, check=False
+        )
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+    match = _GWD_VERSION_RE.search(completed.stdout)
+    return match.group(1) if match else None
+
+
+class BridgeRegistry:
+    """Chemins résolus des outils OCaml pour une racine donnée."""
+
+    def __init__(self, root: Path, tools: tuple[str, ...] = TOOLS) -> None:
+        self.root = root
+        self.tools = tools
+        self._infos: dict[str, ToolInfo] = {}
+        self._lock = threading.Lock()
+        self.warmed = False
+        self.build_log: str | None = None
+
+    def _resolve_one(self, name: str) -> ToolInfo:
+        for candidate in _candidates(self.root, name):
+            if candidate.is_file():
+                if not os.access(candidate, os.X_OK):
+                    return ToolInfo(name, None, error=f"{candidate} n'est pas exécutable")
+                return ToolInfo(name, candidate, size=candidate.stat().st_size)
+        return ToolInfo(
+            name,
+            None,
+            error=(
+                f"{name} introuvable. Compilez avec dune dans {self.root} (ou {GENEWEB_OCAML_BUILD_ENV}=1) "
+                f"ou définissez {GENEWEB_OCAML_ROOT_ENV} vers un dépôt compilé."
+            ),
+        )
+
+    def resolve_all(self) -> dict[str, ToolInfo]:
+        with self._lock:
+            self._infos = {name: self._resolve_one(name) for name in self.tools}
+            return dict(self._infos)
+
+    def _build_missing(self) -> None:
+        missing = [name for name, info in self._infos.items() if not info.ok]
+        dune = shutil.which("dune")
+        if not missing or dune is None:
+            return
+        targets = [f"bin/{name}/{name}.exe" for name in missing]
+        try:
+            completed = subprocess.run(
+                [dune, "build", *targets], cwd=self.root, text=True, capture_output=True, check=False
+            )
+            self.build_log = (completed.stdout + completed.stderr).strip() or None
+        except OSError as e:
+            self.build_log = str(e)
+
+    def warm_up(self, build: bool | None = None, prewarm: bool = True) -> dict[str, ToolInfo]:
+        """Résout, compile au besoin (opt-in), pré-charge et relève les versions."""
+        if build is None:
+            build = os.getenv(GENEWEB_OCAML_BUILD_ENV, "").lower() in ("1", "true", "yes")
+        self.resolve_all()
+        if build:
+            self._build_missing()
+            self.resolve_all()
+
+        version = _version_from_source(self.root)
+        gwd = self._infos.get("gwd")
+        if version is None and gwd is not None and gwd.ok and gwd.path is not None:
+            version = _version_from_gwd(gwd.path)
+
+        infos: dict[str, ToolInfo] = {}
+        for name, info in self._infos.items():
+            if info.ok and info.path is not None:
+                build_id = None
+                if prewarm:
+                    try:
+                        build_id = _prewarm(info.path)
+                    except OSError as e:
+                        info = ToolInfo(name, None, error=f"Lecture impossible: {info.path} ({e})")
+                infos[name] = ToolInfo(name, info.path, info.size, build_id, version, info.error)
+            else:
+                infos[name] = info
+        with self._lock:
+            self._infos = infos
+            self.warmed = True
+        return dict(infos)
+
+    def info(self, name: str) -> ToolInfo:
+        with self._lock:
+            info = self._infos.get(name)
+        if info is None:
+            # Première utilisation sans échauffement: résolution seule (pas de compilation)
+            info = self._resolve_one(name)
+            with self._lock:
+                info = self._infos.setdefault(name, info)
+        return info
+
+    def path(self, name: str) -> Path:
+        """Chemin résolu de l'outil; FileNotFoundError (mémorisée) s'il est indisponible."""
+        info = self.info(name)
+        if not info.ok or info.path is None:
+            raise FileNotFoundError(info.error or f"{name} indisponible")
+        return info.path
+
+    def health(self) -> dict[str, Any]:
+        with self._lock:
+            infos = dict(self._infos)
+        tools = {name: info.as_dict() for name, info in sorted(infos.items())}
+        return {
+            "status": "ok" if infos and all(i.ok for i in infos.values()) else "degraded",
+            "root": str(self.root),
+            "warmed": self.warmed,
+            "tools": tools,
+            "build_log": self.build_log,
+        }
+
+
+# Indexé par la valeur de GENEWEB_OCAML_ROOT: la racine n'est calculée qu'une fois par valeur
+_registries: dict[str | None, BridgeRegistry] = {}
+_registries_lock = threading.Lock()
+
+
+def get_registry() -> BridgeRegistry:
+    """Registre de la racine OCaml courante (créé à la première utilisation)."""
+    env = os.getenv(GENEWEB_OCAML_ROOT_ENV)
+    registry = _registries.get(env)
+    if registry is not None:
+        return registry
+    with _registries_lock:
+        registry = _registries.get(env)
+        if registry is None:
+            registry = _registries[env] = BridgeRegistry(_default_root())
+        return registry
+
+
+def reset_registry() -> None:
+    """Oublie toutes les résolutions (outil recompilé, racine déplacée)."""
+    with _registries_lock:
+        _registries.clear()
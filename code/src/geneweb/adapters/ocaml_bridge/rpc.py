@@ -0,0 +1,445 @@
+"""Pool de workers OCaml persistants via le serveur RPC (`geneweb/rpc/server`).
+
+Le serveur RPC OCaml expose des services JSON-RPC 2.0 sur WebSocket, un service par
+chemin (ex: `/pingpong`, méthode `ping`). Plutôt que de lancer un processus par appel
+(et de rouvrir la base à chaque fois), le bridge peut garder quelques serveurs RPC
+démarrés et leur envoyer les commandes:
+
+- une connexion WebSocket par (worker, chemin), multiplexée: plusieurs requêtes en vol
+  sur la même connexion, réponses associées par `id` par un thread lecteur;
+- un thread de surveillance qui envoie `ping` périodiquement et redémarre les workers
+  qui ne répondent plus;
+- `RpcUnavailable` lorsque aucun worker n'est utilisable, pour que l'appelant retombe
+  sur le mode subprocess. Seuls les échecs de transport (connexion perdue, envoi
+  impossible) retirent un worker du pool; un chemin refusé (`RpcRejected`) ou une
+  erreur JSON-RPC laissent le worker en place.
+
+Le serveur de `rpc/server/main.ml` n'enregistre que le service `/pingpong`, et répond
+à une requête sur un chemin inconnu par une erreur sans `id`: les commandes sont donc
+envoyées par défaut à `/pingpong`, où une méthode absente renvoie `METHOD_NOT_FOUND`.
+Tant que le serveur n'expose pas les outils (`consang`, `gwd`, ...), ce mode est donc
+inerte: chaque commande finit en subprocess. Le pool mémorise les méthodes refusées,
+pour que seul le premier appel de chaque commande paie l'aller-retour RPC avant le
+repli. `GENEWEB_RPC_COMMAND_PATH` désigne un autre service.
+
+Activation: `GENEWEB_OCAML_BRIDGE=rpc`. Les workers sont lancés depuis
+`_build/default/rpc/server/main.exe`, ou bien des serveurs déjà démarrés sont utilisés
+via `GENEWEB_RPC_URLS` (ex: `ws://127.0.0.1:8080,ws://127.0.0.1:8081`).
+"""
+
+from __future__ import annotations
+
+import itertools
+import json
+import os
+import socket
+import subprocess
+import threading
+import time
+from collections.abc import Callable, Sequence
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from contextlib import suppress
+from pathlib import Path
+from typing import Any
+
+GENEWEB_OCAML_BRIDGE_ENV = "GENEWEB_OCAML_BRIDGE"
+GENEWEB_RPC_URLS_ENV = "GENEWEB_RPC_URLS"
+GENEWEB_RPC_WORKERS_ENV = "GENEWEB_RPC_WORKERS"
+GENEWEB_RPC_COMMAND_PATH_ENV = "GENEWEB_RPC_COMMAND_PATH"
+
+HEALTH_PATH = "/pingpong"
+# Seul service enregistré par le serveur RPC OCaml (Route.route de rpc/server/main.ml)
+DEFAULT_COMMAND_PATH = HEALTH_PATH
+
+# Codes JSON-RPC 2.0 signifiant que le serveur ne sait pas traiter la commande
+METHOD_NOT_FOUND = -32601
+
+
+class RpcUnavailable(RuntimeError):
+    """Aucun worker RPC utilisable (non démarré, injoignable ou en échec)."""
+
+
+class RpcRejected(RpcUnavailable):
+    """Serveur joignable mais chemin refusé (poignée de main ou requête sans `id`)."""
+
+
+class RpcError(RuntimeError):
+    """Erreur JSON-RPC renvoyée par le serveur."""
+
+    def __init__(self, code: int, message: str, data: Any = None) -> None:
+        super().__init__(f"RPC error {code}: {message}")
+        self.code = code
+        self.message = message
+        self.data = data
+
+
+class RpcConnection:
+    """Connexion WebSocket JSON-RPC multiplexée."""
+
+    def __init__(self, uri: str, open_timeout: float = 5.0) -> None:
+        try:
+            from websockets.sync.client import connect
+        except ImportError as e:  # dépendance fournie par uvicorn[standard]
+            raise RpcUnavailable("Paquet 'websockets' requis pour le mode RPC") from e
+        try:
+            self._ws = connect(uri, open_timeout=open_timeout, max_size=None)
+        except (OSError, TimeoutError) as e:
+            raise RpcUnavailable(f"Connexion RPC impossible: {uri} ({e})") from e
+        except Exception as e:  # handshake refusé, etc.
+            raise RpcRejected(f"Connexion RPC refusée: {uri} ({e})") from e
+        self.uri = uri
+        self._ids = itertools.count(1)
+        self._pending: dict[int, Future[Any]] = {}
+        self._lock = threading.Lock()
+        self._closed = False
+        self._reader = threading.Thread(target=self._read_loop, name=f"rpc-reader {uri}", daemon=True)
+        self._reader.start()
+
+    @property
+    def alive(self) -> bool:
+        return not self._closed
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._pending)
+
+    def _read_loop(self) -> None:
+        closed: Exception = RpcUnavailable(f"Connexion RPC fermée: {self.uri}")
+        try:
+            for raw in self._ws:
+                try:
+                    msg = json.loads(raw)
+                except ValueError:
+                    continue
+                if not isinstance(msg, dict):
+                    continue
+                if msg.get("id") is None and "error" in msg:
+                    # Erreur sans id: le serveur refuse le chemin de la connexion entière
+                    closed = RpcRejected(f"Chemin RPC refusé: {self.uri} ({msg['error']})")
+                    break
+                if not isinstance(msg.get("id"), int):
+                    continue
+                with self._lock:
+                    fut = self._pending.pop(msg["id"], None)
+                if fut is None:
+                    continue
+                if "error" in msg:
+                    err = msg["error"] or {}
+                    fut.set_exception(
+                        RpcError(int(err.get("code", 0)), str(err.get("message", "")), err.get("data"))
+                    )
+                else:
+                    fut.set_result(msg.get("result"))
+        except Exception:
+            pass
+        finally:
+            self._fail_pending(closed)
+            if isinstance(closed, RpcRejected):
+                self.close()
+
+    def _fail_pending(self, exc: Exception) -> None:
+        self._closed = True
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        for fut in pending.values():
+            if not fut.done():
+                fut.set_exception(exc)
+
+    def call(self, method: str, params: Sequence[Any] = (), timeout: float | None = 120.0) -> Any:
+        """Envoie une requête et attend sa réponse; sûr depuis plusieurs threads."""
+        if self._closed:
+            raise RpcUnavailable(f"Connexion RPC fermée: {self.uri}")
+        req_id = next(self._ids)
+        fut: Future[Any] = Future()
+        request = {"jsonrpc": "2.0", "id": req_id, "method": method, "params": list(params)}
+        with self._lock:
+            self._pending[req_id] = fut
+            try:
+                self._ws.send(json.dumps(request))
+            except Exception as e:
+                self._pending.pop(req_id, None)
+                raise RpcUnavailable(f"Envoi RPC impossible: {self.uri} ({e})") from e
+        try:
+            return fut.result(timeout=timeout)
+        except FutureTimeoutError as e:
+            with self._lock:
+                self._pending.pop(req_id, None)
+            raise TimeoutError(f"RPC {method} sans réponse après {timeout}s") from e
+
+    def close(self) -> None:
+        self._closed = True
+        with suppress(Exception):
+            self._ws.close()
+
+
+def _free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.bind(("127.0.0.1", 0))
+        return int(s.getsockname()[1])
+
+
+class RpcWorker:
+    """Un serveur RPC (processus lancé par le pool, ou externe) et ses connexions."""
+
+    def __init__(
+        self,
+        url: str | None = None,
+        exe: Path | None = None,
+        base_dir: Path | None = None,
+        startup_timeout: float = 10.0,
+    ) -> None:
+        if url is None and exe is None:
+            raise ValueError("RpcWorker: url ou exe requis")
+        self.exe = exe
+        self.base_dir = base_dir
+        self.startup_timeout = startup_timeout
+        self.url = url
+        self.process: subprocess.Popen[bytes] | None = None
+        self._conns: dict[str, RpcConnection] = {}
+        self._lock = threading.Lock()
+        self.failures = 0
+        self.last_ok: float | None = None
+
+    @property
+    def managed(self) -> bool:
+        return self.exe is not None
+
+    def start(self) -> None:
+        if not self.managed:
+            return
+        port = _free_port()
+        cmd = [str(self.exe), "-i", "127.0.0.1", "-p", str(port)]
+        if self.base_dir is not None:
+            cmd += ["-b", str(self.base_dir)]
+        self.process = subprocess.Popen(
+            cmd, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        self.url = f"ws://127.0.0.1:{port}"
+        deadline = time.monotonic() + self.startup_timeout
+        while True:
+            try:
+                self.ping(timeout=1.0)
+                return
+            except (RpcUnavailable, RpcError, TimeoutError):
+                if self.process.poll() is not None or time.monotonic() > deadline:
+                    self.stop()
+                    raise RpcUnavailable(f"Le serveur RPC n'a pas démarré: {' '.join(cmd)}") from None
+                time.sleep(0.1)
+
+    def connection(self, path: str) -> RpcConnection:
+        with self._lock:
+            conn = self._conns.get(path)
+            if conn is None or not conn.alive:
+                if self.url is None:
+                    raise RpcUnavailable("Worker RPC non démarré")
+                conn = RpcConnection(self.url.rstrip("/") + path)
+                self._conns[path] = conn
+            return conn
+
+    @property
+    def in_flight(self) -> int:
+        return sum(c.in_flight for c in self._conns.values())
+
+    def call(self, path: str, method: str, params: Sequence[Any], timeout: float | None) -> Any:
+        return self.connection(path).call(method, params, timeout=timeout)
+
+    def ping(self, timeout: float = 2.0) -> None:
+        self.call(HEALTH_PATH, "ping", (), timeout)
+        self.last_ok = time.monotonic()
+
+    def healthy(self) -> bool:
+        if self.process is not None and self.process.poll() is not None:
+            return False
+        try:
+            self.ping()
+        except (RpcUnavailable, RpcError, TimeoutError):
+            return False
+        return True
+
+    def stop(self) -> None:
+        with self._lock:
+            conns, self._conns = self._conns, {}
+        for conn in conns.values():
+            conn.close()
+        if self.process is not None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+            self.process = None
+
+    def describe(self) -> dict[str, Any]:
+        return {
+            "url": self.url,
+            "managed": self.managed,
+            "pid": self.process.pid if self.process else None,
+            "failures": self.failures,
+            "in_flight": self.in_flight,
+        }
+
+
+class RpcWorkerPool:
+    """Pool de workers RPC avec répartition par charge et surveillance de santé."""
+
+    def __init__(
+        self,
+        workers: Sequence[RpcWorker],
+        command_path: str = DEFAULT_COMMAND_PATH,
+        health_interval: float = 15.0,
+    ) -> None:
+        if not workers:
+            raise ValueError("RpcWorkerPool: au moins un worker requis")
+        self.workers = list(workers)
+        self.command_path = command_path
+        self.health_interval = health_interval
+        self._healthy: set[int] = set()
+        # Méthodes auxquelles le serveur a répondu `METHOD_NOT_FOUND` (repli direct)
+        self._unsupported: set[str] = set()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._monitor: threading.Thread | None = None
+
+    def start(self) -> None:
+        for idx, worker in enumerate(self.workers):
+            try:
+                worker.start()
+                worker.ping()
+                self._healthy.add(idx)
+            except (RpcUnavailable, RpcError, TimeoutError, OSError):
+                worker.failures += 1
+        if self.health_interval > 0 and self._monitor is None:
+            self._monitor = threading.Thread(target=self._monitor_loop, name="rpc-health", daemon=True)
+            self._monitor.start()
+
+    def _monitor_loop(self) -> None:
+        while not self._stop.wait(self.health_interval):
+            self.check_health()
+
+    def check_health(self) -> None:
+        """Ping chaque worker; redémarre les workers gérés qui ne répondent plus."""
+        for idx, worker in enumerate(self.workers):
+            if worker.healthy():
+                with self._lock:
+                    self._healthy.add(idx)
+                continue
+            with self._lock:
+                self._healthy.discard(idx)
+            worker.failures += 1
+            if worker.managed:
+                worker.stop()
+                try:
+                    worker.start()
+                    with self._lock:
+                        self._healthy.add(idx)
+                except (RpcUnavailable, OSError):
+                    pass
+
+    def _pick(self) -> tuple[int, RpcWorker]:
+        with self._lock:
+            candidates = [(i, self.workers[i]) for i in self._healthy]
+        if not candidates:
+            raise RpcUnavailable("Aucun worker RPC disponible")
+        return min(candidates, key=lambda item: item[1].in_flight)
+
+    def supports(self, method: str) -> bool:
+        """False si le serveur a déjà répondu `METHOD_NOT_FOUND` pour `method`."""
+        return method not in self._unsupported
+
+    def call(self, method: str, params: Sequence[Any] = (), timeout: float | None = 120.0) -> Any:
+        """Appelle `method` sur le worker le moins chargé (chemin de commande du pool).
+
+        Le worker n'est retiré du pool que sur un échec de transport: un chemin refusé
+        ne dit rien de sa santé (le moniteur le réintégrerait au ping suivant). Une
+        méthode refusée une fois l'est ensuite sans aller-retour.
+        """
+        if method in self._unsupported:
+            raise RpcError(METHOD_NOT_FOUND, f"Method not found: {method}")
+        idx, worker = self._pick()
+        try:
+            return worker.call(self.command_path, method, params, timeout)
+        except RpcError as e:
+            if e.code == METHOD_NOT_FOUND:
+                with self._lock:
+                    self._unsupported.add(method)
+            raise
+        except RpcRejected:
+            raise
+        except RpcUnavailable:
+            with self._lock:
+                self._healthy.discard(idx)
+            worker.failures += 1
+            raise
+
+    def health(self) -> list[dict[str, Any]]:
+        with self._lock:
+            healthy = set(self._healthy)
+        return [
+            {**worker.describe(), "healthy": idx in healthy}
+            for idx, worker in enumerate(self.workers)
+        ]
+
+    def close(self) -> None:
+        self._stop.set()
+        for worker in self.workers:
+            worker.stop()
+
+
+def bridge_mode() -> str:
+    """Mode du bridge OCaml: "subprocess" (défaut) ou "rpc"."""
+    return os.getenv(GENEWEB_OCAML_BRIDGE_ENV, "subprocess").lower()
+
+
+_pool: RpcWorkerPool | None = None
+_pool_failed_at: float | None = None
+_pool_lock = threading.Lock()
+# Délai avant une nouvelle tentative de démarrage du pool après un échec
+_RETRY_AFTER = 30.0
+
+
+def get_rpc_pool(root_factory: Callable[[], Path]) -> RpcWorkerPool:
+    """Retourne le pool RPC du processus, en le démarrant au premier appel.
+
+    Raises:
+        RpcUnavailable: si aucun worker n'a pu être démarré (le prochain essai a lieu
+            après `_RETRY_AFTER` secondes, pour ne pas sonder le disque à chaque appel)
+    """
+    global _pool, _pool_failed_at
+    with _pool_lock:
+        if _pool is not None:
+            return _pool
+        if _pool_failed_at is not None and time.monotonic() - _pool_failed_at < _RETRY_AFTER:
+            raise RpcUnavailable("Pool RPC indisponible (échec récent)")
+
+        command_path = os.getenv(GENEWEB_RPC_COMMAND_PATH_ENV, DEFAULT_COMMAND_PATH)
+        urls = [u.strip() for u in os.getenv(GENEWEB_RPC_URLS_ENV, "").split(",") if u.strip()]
+        if urls:
+            workers = [RpcWorker(url=u) for u in urls]
+        else:
+            root = root_factory()
+            exe = root / "_build" / "default" / "rpc" / "server" / "main.exe"
+            if not exe.exists():
+                _pool_failed_at = time.monotonic()
+                raise RpcUnavailable(f"Serveur RPC introuvable: {exe}")
+            size = max(1, int(os.getenv(GENEWEB_RPC_WORKERS_ENV, "2")))
+            workers = [RpcWorker(exe=exe, base_dir=root / "distribution" / "bases") for _ in range(size)]
+
+        pool = RpcWorkerPool(workers, command_path=command_path)
+        pool.start()
+        if not any(h["healthy"] for h in pool.health()):
+            pool.close()
+            _pool_failed_at = time.monotonic()
+            raise RpcUnavailable("Aucun worker RPC n'a démarré")
+        _pool = pool
+        return pool
+
+
+def reset_rpc_pool() -> None:
+    """Arrête le pool du processus (tests, rechargement de configuration)."""
+    global _pool, _pool_failed_at
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+        _pool = None
+        _pool_failed_at = None
@@ -2,11 +2,17 @@
 
 Ce module définit les structures de données de base pour représenter
 les entités généalogiques : individus, familles, événements et sources.
+
+Les dataclasses sont à slots (pas de `__dict__` par instance) et leurs champs de
+références ont pour défaut le tuple vide partagé `()`: sur les grosses bases, la
+surcharge par objet domine la mémoire. Pour les calculs qui ne lisent que quelques
+colonnes, voir la vue en tableaux parallèles `geneweb.domain.table.BaseTable`.
 """
 
 from __future__ import annotations
 
-from dataclasses import dataclass, field
+from collections.abc import Sequence
+from dataclasses import dataclass
 from datetime import date
 from enum import Enum
 from typing import Optional
@@ -34,7 +40,7 @@ class TypeEvenement(Enum):
     AUTRE = "OTHER"
 
 
-@dataclass
+@dataclass(slots=True)
 class Individu:
     """Représente un individu dans l'arbre généalogique."""
 
@@ -54,14 +60,14 @@ class Individu:
 
     # Références aux familles
     famille_enfance_id: Optional[str] = None
-    famille_adultes: list[str] = field(default_factory=list)  # IDs des familles où il est parent
+    famille_adultes: Sequence[str] = ()  # IDs des familles où il est parent
 
     # Métadonnées
     note: Optional[str] = None
-    sources: list[str] = field(default_factory=list)  # IDs des sources
+    sources: Sequence[str] = ()  # IDs des sources
 
 
-@dataclass
+@dataclass(slots=True)
 class Famille:
     """Représente une famille (couple et enfants)."""
 
@@ -73,17 +79,17 @@ class Famille:
     mere_id: Optional[str] = None
 
     # Références aux enfants
-    enfants_ids: list[str] = field(default_factory=list)
+    enfants_ids: Sequence[str] = ()
 
     # Références aux événements familiaux
-    evenements: list[str] = field(default_factory=list)  # IDs des événements
+    evenements: Sequence[str] = ()  # IDs des événements
 
     # Métadonnées
     note: Optional[str] = None
-    sources: list[str] = field(default_factory=list)  # IDs des sources
+    sources: Sequence[str] = ()  # IDs des sources
 
 
-@dataclass
+@dataclass(slots=True)
 class Evenement:
     """Représente un événement généalogique."""
 
@@ -98,14 +104,14 @@ class Evenement:
     lieu: Optional[str] = None
 
     # Références aux personnes concernées
-    personnes_ids: list[str] = field(default_factory=list)
+    personnes_ids: Sequence[str] = ()
 
     # Informations complémentaires
     note: Optional[str] = None
-    sources: list[str] = field(default_factory=list)  # IDs des sources
+    sources: Sequence[str] = ()  # IDs des sources
 
 
-@dataclass
+@dataclass(slots=True)
 class Source:
     """Représente une source documentaire."""
 
@@ -0,0 +1,170 @@
+"""Vue compacte d'une base en tableaux parallèles (struct-of-arrays).
+
+Les calculs de graphe (connexité, consanguinité) ne lisent que les identifiants,
+le sexe, les dates et les liens familiaux. `BaseTable` range ces colonnes dans des
+tableaux d'entiers (`array`) indexés par un entier dense, sans objet par individu:
+
+- individus `0 .. n_individus - 1` dans l'ordre de la base (première occurrence
+  d'un identifiant), puis les identifiants seulement référencés par des familles
+  (parents ou enfants absents de la liste des individus);
+- `sexe`: code par individu (`SEXES`), dates en ordinal (`date.toordinal`, 0 si inconnue);
+- familles: père et mère (indices, -1 si absent), enfants au format CSR
+  (`enfants[enfants_start[f]:enfants_start[f + 1]]`).
+
+La correspondance identifiant ↔ entier est un `IdMap`, réutilisable tel quel par
+les analyses (voir `StringPool.ids` dans `geneweb.io.gwb`).
+"""
+
+from __future__ import annotations
+
+import sys
+from array import array
+from collections.abc import Iterable
+from datetime import date
+
+from geneweb.domain.models import Famille, Individu, Sexe
+
+SEXES: tuple[Sexe | None, ...] = (None, Sexe.M, Sexe.F, Sexe.X)
+_SEXE_CODES = {sexe: code for code, sexe in enumerate(SEXES)}
+
+
+def _ordinal(value: object) -> int:
+    return value.toordinal() if isinstance(value, date) else 0
+
+
+class IdMap:
+    """Correspondance bidirectionnelle identifiant ↔ entier dense (ordre d'ajout)."""
+
+    __slots__ = ("ids", "index")
+
+    def __init__(self, ids: Iterable[str] = ()) -> None:
+        self.ids: list[str] = []
+        self.index: dict[str, int] = {}
+        for value in ids:
+            self.add(value)
+
+    def add(self, value: str) -> int:
+        """Entier de l'identifiant, attribué à la première rencontre."""
+        k = self.index.get(value)
+        if k is None:
+            k = self.index[value] = len(self.ids)
+            self.ids.append(value)
+        return k
+
+    def get(self, value: str, default: int = -1) -> int:
+        return self.index.get(value, default)
+
+    def __getitem__(self, k: int) -> str:
+        return self.ids[k]
+
+    def __contains__(self, value: object) -> bool:
+        return value in self.index
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+
+class BaseTable:
+    """Colonnes d'une base: individus et familles indexés par entiers denses."""
+
+    __slots__ = (
+        "id_map",
+        "n_individus",
+        "sexe",
+        "naissance",
+        "deces",
+        "fam_ids",
+        "pere",
+        "mere",
+        "enfants_start",
+        "enfants",
+    )
+
+    def __init__(self, id_map: IdMap | None = None) -> None:
+        # Un IdMap fourni (celui d'un StringPool) ne doit encore contenir que des individus
+        self.id_map = id_map if id_map is not None else IdMap()
+        self.n_individus = 0
+        self.sexe = bytearray()
+        self.naissance = array("i")
+        self.deces = array("i")
+        self.fam_ids: list[str] = []
+        self.pere = array("i")
+        self.mere = array("i")
+        self.enfants_start = array("i", [0])
+        self.enfants = array("i")
+
+    @property
+    def ids(self) -> list[str]:
+        return self.id_map.ids
+
+    @property
+    def index(self) -> dict[str, int]:
+        return self.id_map.index
+
+    def intern_id(self, person_id: str) -> int:
+        """Indice dense de l'identifiant, ajouté (sans données) s'il est inconnu."""
+        return self.id_map.add(person_id)
+
+    def add_individu(self, person_id: str, sexe: Sexe | None, naissance: object, deces: object) -> None:
+        """Ajoute un individu; à appeler avant toute famille (les références suivent)."""
+        if self.id_map.add(person_id) < self.n_individus:
+            return
+        self.n_individus += 1
+        self.sexe.append(_SEXE_CODES.get(sexe, 0))
+        self.naissance.append(_ordinal(naissance))
+        self.deces.append(_ordinal(deces))
+
+    def add_famille(
+        self, family_id: str, pere_id: str | None, mere_id: str | None, enfants_ids: Iterable[str]
+    ) -> None:
+        self.fam_ids.append(sys.intern(family_id))
+        self.pere.append(self.intern_id(pere_id) if pere_id else -1)
+        self.mere.append(self.intern_id(mere_id) if mere_id else -1)
+        self.enfants.extend(self.intern_id(child_id) for child_id in enfants_ids)
+        self.enfants_start.append(len(self.enfants))
+
+    @classmethod
+    def from_models(
+        cls, individus: Iterable[Individu], familles: Iterable[Famille], id_map: IdMap | None = None
+    ) -> BaseTable:
+        table = cls(id_map)
+        for ind in individus:
+            table.add_individu(ind.id, ind.sexe, ind.date_naissance, ind.date_deces)
+        for fam in familles:
+            table.add_famille(fam.id, fam.pere_id, fam.mere_id, fam.enfants_ids)
+        return table
+
+    @property
+    def n_familles(self) -> int:
+        return len(self.fam_ids)
+
+    def is_individu(self, k: int) -> bool:
+        """Vrai pour un individu de la base, faux pour un identifiant seulement référencé."""
+        return 0 <= k < self.n_individus
+
+    def children(self, f: int) -> array[int]:
+        return self.enfants[self.enfants_start[f] : self.enfants_start[f + 1]]
+
+    def sexe_of(self, k: int) -> Sexe | None:
+        return SEXES[self.sexe[k]] if k < self.n_individus else None
+
+    def naissance_of(self, k: int) -> date | None:
+        ordinal = self.naissance[k] if k < self.n_individus else 0
+        return date.fromordinal(ordinal) if ordinal else None
+
+    def deces_of(self, k: int) -> date | None:
+        ordinal = self.deces[k] if k < self.n_individus else 0
+        return date.fromordinal(ordinal) if ordinal else None
+
+    def parents(self) -> tuple[array[int], array[int]]:
+        """Père et mère de chaque identifiant (-1 si inconnu).
+
+        Un enfant listé dans plusieurs familles prend les parents de la dernière.
+        """
+        pere = array("i", [-1]) * len(self.ids)
+        mere = array("i", [-1]) * len(self.ids)
+        for f in range(self.n_familles):
+            for child in self.children(f):
+                pere[child] = self.pere[f]
+                mere[child] = self.mere[f]
+        return pere, mere
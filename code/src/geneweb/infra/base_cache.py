@@ -0,0 +1,119 @@
+"""Cache de bases GWB chargées en mémoire.
+
+Une base est identifiée par son chemin résolu; l'entrée en cache est invalidée dès que la
+signature de `index.json` (mtime_ns, taille) change (jeton de révision pour une base
+SQLite, dont le fichier ne change pas à chaque validation en mode WAL, ou fragmentée).
+Les objets renvoyés sont partagés entre appelants: ils doivent être traités en lecture
+seule.
+
+Chaque entrée porte aussi les index usuels (par id, familles d'un parent, famille d'enfance)
+pour éviter aux services de parcourir les listes complètes à chaque requête.
+
+Les bases sont chargées en mode interné (`StringPool`): chaînes répétées partagées, et
+`strings.ids` donne aux analyses un entier dense par individu.
+"""
+
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+from geneweb.domain.models import Famille, Individu, Source
+from geneweb.io.gwb import StringPool, load_gwb_minimal
+from geneweb.io.native import is_native
+from geneweb.io.packed import is_packed
+from geneweb.io.revision import read_revision
+from geneweb.io.shards import is_sharded
+from geneweb.io.storage import SQLITE_FILE
+
+
+class LoadedBase:
+    """Base GWB chargée avec ses index de parcours."""
+
+    def __init__(
+        self,
+        root_dir: Path,
+        individus: list[Individu],
+        familles: list[Famille],
+        sources: list[Source],
+        strings: StringPool | None = None,
+    ) -> None:
+        self.root_dir = root_dir
+        self.strings = strings
+        self.individus = individus
+        self.familles = familles
+        self.sources = sources
+
+        self.ind_by_id: dict[str, Individu] = {ind.id: ind for ind in individus}
+        self.fam_by_id: dict[str, Famille] = {fam.id: fam for fam in familles}
+        # Familles où l'individu est parent (ordre du fichier)
+        self.families_of: dict[str, list[Famille]] = {}
+        # Famille d'enfance (première occurrence, comme get_ascendance)
+        self.parents_of: dict[str, Famille] = {}
+        for fam in familles:
+            for parent_id in (fam.pere_id, fam.mere_id):
+                if parent_id:
+                    self.families_of.setdefault(parent_id, []).append(fam)
+            for child_id in fam.enfants_ids:
+                self.parents_of.setdefault(child_id, fam)
+        for ind in individus:
+            if ind.famille_enfance_id and ind.famille_enfance_id in self.fam_by_id:
+                self.parents_of[ind.id] = self.fam_by_id[ind.famille_enfance_id]
+
+    def as_tuple(self) -> tuple[list[Individu], list[Famille], list[Source]]:
+        return (self.individus, self.familles, self.sources)
+
+
+def _signature(root: Path) -> tuple[int, int] | str:
+    index_path = root / "index.json"
+    if not index_path.exists():
+        if (root / SQLITE_FILE).exists() or is_sharded(root) or is_packed(root) or is_native(root):
+            return read_revision(root).token
+        raise FileNotFoundError(f"Index GWB minimal introuvable: {index_path}")
+    st = index_path.stat()
+    return (st.st_mtime_ns, st.st_size)
+
+
+class BaseCache:
+    """Cache LRU de bases chargées, borné en nombre de bases."""
+
+    def __init__(self, maxsize: int = 4) -> None:
+        self.maxsize = maxsize
+        self._entries: OrderedDict[Path, tuple[tuple[int, int] | str, LoadedBase]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, root_dir: str | Path) -> LoadedBase:
+        root = Path(root_dir).resolve()
+        signature = _signature(root)
+        with self._lock:
+            entry = self._entries.get(root)
+            if entry is not None and entry[0] == signature:
+                self._entries.move_to_end(root)
+                self.hits += 1
+                return entry[1]
+        # Chargement hors verrou: deux chargements concurrents de la même base sont
+        # possibles mais sans incohérence (le dernier gagne).
+        strings = StringPool()
+        loaded = LoadedBase(root, *load_gwb_minimal(root, strings=strings), strings=strings)
+        with self._lock:
+            self.misses += 1
+            self._entries[root] = (signature, loaded)
+            self._entries.move_to_end(root)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return loaded
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+_default_cache = BaseCache()
+
+
+def get_loaded_base(root_dir: str | Path) -> LoadedBase:
+    """Charge (ou récupère du cache partagé du processus) une base GWB."""
+    return _default_cache.get(root_dir)
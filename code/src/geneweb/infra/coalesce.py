@@ -0,0 +1,105 @@
+"""Regroupement ("coalescing") des requêtes lourdes identiques.
+
+Quand plusieurs clients demandent en même temps la même page ou le même calcul
+analytique, un seul calcul est lancé et son résultat est partagé. La clé regroupe:
+
+- la route;
+- les paramètres normalisés (valeurs None ignorées, ordre indifférent);
+- la révision de la base (`read_revision`): une requête arrivée après une écriture ne
+  rejoint pas un calcul lancé sur l'état précédent.
+
+Seuls les calculs *en cours* sont partagés (pas de cache): une fois terminé, le calcul
+suivant repart de zéro. Les métriques par route indiquent le nombre de requêtes, de
+calculs effectivement lancés et de calculs économisés.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+from collections.abc import Awaitable, Callable, Hashable, Mapping
+from pathlib import Path
+from typing import Any, TypeVar
+
+from geneweb.infra.singleflight import AsyncSingleFlight, SingleFlight
+from geneweb.io.revision import read_revision
+
+T = TypeVar("T")
+
+
+def coalesce_key(route: str, params: Mapping[str, object], base: str | Path | None) -> Hashable:
+    normalized = tuple(sorted((k, str(v)) for k, v in params.items() if v is not None))
+    revision = read_revision(base).token if base is not None else None
+    return (route, normalized, str(base) if base is not None else None, revision)
+
+
+class RequestCoalescer:
+    """Partage des calculs en cours entre requêtes identiques (threads et coroutines)."""
+
+    def __init__(self) -> None:
+        self._flight: SingleFlight[Any] = SingleFlight()
+        self._async_flight: AsyncSingleFlight[Any] = AsyncSingleFlight()
+        self._lock = threading.Lock()
+        self._stats: dict[str, dict[str, int]] = {}
+
+    def _count(self, route: str, field: str) -> None:
+        with self._lock:
+            stats = self._stats.setdefault(route, {"requests": 0, "computed": 0})
+            stats[field] += 1
+
+    def run(
+        self,
+        route: str,
+        params: Mapping[str, object],
+        base: str | Path | None,
+        fn: Callable[[], T],
+    ) -> T:
+        """Exécute `fn` ou attend le calcul identique déjà en cours (appel bloquant)."""
+        key = coalesce_key(route, params, base)
+        self._count(route, "requests")
+
+        def compute() -> T:
+            self._count(route, "computed")
+            return fn()
+
+        return self._flight.do(key, compute)  # type: ignore[no-any-return]
+
+    async def arun(
+        self,
+        route: str,
+        params: Mapping[str, object],
+        base: str | Path | None,
+        fn: Callable[[], Awaitable[T]],
+    ) -> T:
+        """Pendant asynchrone de `run` (la révision de base est lue dans un thread)."""
+        key = await asyncio.to_thread(coalesce_key, route, params, base)
+        self._count(route, "requests")
+
+        async def compute() -> T:
+            self._count(route, "computed")
+            return await fn()
+
+        return await self._async_flight.do(key, compute)  # type: ignore[no-any-return]
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            routes = {
+                route: {**stats, "saved": stats["requests"] - stats["computed"]}
+                for route, stats in sorted(self._stats.items())
+            }
+        return {
+            "routes": routes,
+            "saved": sum(r["saved"] for r in routes.values()),
+        }
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self._stats.clear()
+
+
+_coalescer = RequestCoalescer()
+
+
+def get_coalescer() -> RequestCoalescer:
+    """Coalesceur partagé du processus."""
+    return _coalescer
@@ -0,0 +1,446 @@
+"""Exécution de travaux longs en arrière-plan, dans des processus séparés.
+
+Les calculs de plusieurs minutes (consanguinité, composantes connexes, import GEDCOM) ne
+doivent ni dépasser les délais des proxys ni occuper les workers HTTP. Le `JobManager`:
+
+- met les travaux en file et les exécute chacun dans un processus dédié (contexte
+  `spawn`, priorité abaissée), au plus `max_workers` à la fois;
+- persiste l'état de chaque travail sur disque (`<jobs_dir>/<id>/job.json`), sa
+  progression (`progress.json`, écrite par le processus) et son résultat (`result.json`)
+  ou son erreur (`error.json`);
+- annule (processus terminé) les travaux abandonnés: sans consultation de l'état ou du
+  résultat pendant `abandon_after` secondes;
+- purge les travaux terminés depuis plus de `retention` secondes.
+
+Le disque fait foi: plusieurs gestionnaires (un par worker uvicorn) partagent
+`jobs_dir`. Chaque travail enregistre son propriétaire (pid, hôte, jeton du
+gestionnaire) et chaque gestionnaire rafraîchit son battement de cœur
+(`<jobs_dir>/.owners/<jeton>`). Un gestionnaire ne déclare en échec que les travaux
+dont le propriétaire est mort (pid disparu, ou battement périmé), et répond pour les
+travaux des autres depuis leur répertoire: consultation (fichier `seen`, qui repousse
+l'abandon) et annulation (`cancel.json`, appliquée par le propriétaire).
+
+Une tâche est une fonction de module (sérialisable par référence) de signature
+`task(params, progress) -> dict`, où `progress(fraction, message)` publie l'avancement.
+"""
+
+from __future__ import annotations
+
+import json
+import multiprocessing
+import os
+import shutil
+import socket
+import tempfile
+import threading
+import time
+import uuid
+from collections.abc import Callable, Mapping
+from contextlib import suppress
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any
+
+GENEWEB_JOBS_DIR_ENV = "GENEWEB_JOBS_DIR"
+GENEWEB_JOBS_WORKERS_ENV = "GENEWEB_JOBS_WORKERS"
+GENEWEB_JOBS_ABANDON_AFTER_ENV = "GENEWEB_JOBS_ABANDON_AFTER"
+
+ProgressFn = Callable[[float, str], None]
+Task = Callable[[Mapping[str, Any], ProgressFn], dict[str, Any]]
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED = (SUCCEEDED, FAILED, CANCELLED)
+
+OWNERS_DIR = ".owners"
+# Battement de cœur plus ancien: le gestionnaire propriétaire est considéré mort
+OWNER_STALE_AFTER = 30.0
+
+
+class JobNotFound(KeyError):
+    """Identifiant de travail inconnu (ou purgé)."""
+
+
+def _write_json(path: Path, data: Any) -> None:
+    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    with os.fdopen(fd, "w", encoding="utf-8") as fh:
+        json.dump(data, fh, ensure_ascii=False)
+    os.replace(tmp, path)
+
+
+def _read_json(path: Path) -> Any:
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def _job_main(task: Task, params: dict[str, Any], job_dir: str) -> None:
+    """Point d'entrée du processus de travail."""
+    directory = Path(job_dir)
+    with suppress(OSError, AttributeError):
+        os.nice(5)  # le travail de fond passe après les requêtes interactives
+
+    def progress(fraction: float, message: str) -> None:
+        _write_json(directory / "progress.json", {"fraction": max(0.0, min(1.0, fraction)), "message": message})
+
+    try:
+        progress(0.0, "démarrage")
+        result = task(params, progress)
+        _write_json(directory / "result.json", result)
+        progress(1.0, "terminé")
+    except BaseException as e:  # l'erreur est rapportée au parent via error.json
+        _write_json(directory / "error.json", {"type": type(e).__name__, "message": str(e)})
+        raise SystemExit(1) from None
+
+
+@dataclass
+class Job:
+    """État d'un travail (persisté dans job.json)."""
+
+    id: str
+    kind: str
+    params: dict[str, Any]
+    status: str = QUEUED
+    created_at: float = field(default_factory=time.time)
+    started_at: float | None = None
+    finished_at: float | None = None
+    error: str | None = None
+    last_seen: float = field(default_factory=time.time)
+    owner_pid: int | None = None
+    owner_host: str | None = None
+    owner_token: str | None = None
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:  # existe, mais appartient à un autre utilisateur
+        return True
+    return True
+
+
+def _mtime(path: Path) -> float | None:
+    try:
+        return path.stat().st_mtime
+    except OSError:
+        return None
+
+
+class JobManager:
+    """File de travaux exécutés dans des processus, avec état persistant."""
+
+    def __init__(
+        self,
+        jobs_dir: str | Path,
+        tasks: Mapping[str, Task],
+        max_workers: int = 2,
+        abandon_after: float = 600.0,
+        retention: float = 86400.0,
+        poll_interval: float = 0.2,
+    ) -> None:
+        self.jobs_dir = Path(jobs_dir)
+        self.jobs_dir.mkdir(parents=True, exist_ok=True)
+        self.tasks = dict(tasks)
+        self.max_workers = max(1, max_workers)
+        self.abandon_after = abandon_after
+        self.retention = retention
+        self.poll_interval = poll_interval
+        self._ctx = multiprocessing.get_context("spawn")
+        self._lock = threading.Lock()
+        self._jobs: dict[str, Job] = {}
+        self._queue: list[str] = []
+        self._procs: dict[str, Any] = {}
+        self._stop = threading.Event()
+        self._token = uuid.uuid4().hex
+        self._host = socket.gethostname()
+        self._heartbeat()
+        self._load_existing()
+        self._monitor = threading.Thread(target=self._monitor_loop, name="geneweb-jobs", daemon=True)
+        self._monitor.start()
+
+    # -- persistance ---------------------------------------------------------
+
+    def _dir(self, job_id: str) -> Path:
+        return self.jobs_dir / job_id
+
+    def _save(self, job: Job) -> None:
+        _write_json(self._dir(job.id) / "job.json", asdict(job))
+
+    def _heartbeat(self) -> None:
+        path = self.jobs_dir / OWNERS_DIR / self._token
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            path.parent.mkdir(exist_ok=True)
+            path.touch()
+
+    def _owner_alive(self, job: Job) -> bool:
+        if job.owner_token is None:
+            return False  # travail d'une version sans propriétaire
+        if job.owner_token == self._token:
+            return True
+        if job.owner_host == self._host and job.owner_pid is not None and not _pid_alive(job.owner_pid):
+            return False
+        # pid vivant (ou autre hôte): le battement de cœur départage une réutilisation de pid
+        beat = _mtime(self.jobs_dir / OWNERS_DIR / job.owner_token)
+        return beat is not None and time.time() - beat < OWNER_STALE_AFTER
+
+    def _read_job(self, job_id: str) -> Job | None:
+        data = _read_json(self._dir(job_id) / "job.json")
+        if not isinstance(data, dict):
+            return None
+        try:
+            return Job(**data)
+        except TypeError:
+            return None
+
+    def _adopt_if_orphan(self, job: Job) -> Job:
+        """Déclare en échec (et reprend) un travail inachevé dont le propriétaire est mort."""
+        if job.status in FINISHED or self._owner_alive(job):
+            return job
+        job.status = FAILED
+        job.error = "Interrompu par l'arrêt du serveur qui l'exécutait"
+        job.finished_at = time.time()
+        job.owner_pid, job.owner_host, job.owner_token = os.getpid(), self._host, self._token
+        self._save(job)
+        self._jobs[job.id] = job
+        return job
+
+    def _load_existing(self) -> None:
+        for meta_path in self.jobs_dir.glob("*/job.json"):
+            job = self._read_job(meta_path.parent.name)
+            if job is None:
+                continue
+            job = self._adopt_if_orphan(job)
+            if job.status in FINISHED:
+                self._jobs[job.id] = job
+
+    # -- API -----------------------------------------------------------------
+
+    def submit(self, kind: str, params: Mapping[str, Any]) -> Job:
+        if kind not in self.tasks:
+            raise ValueError(f"Type de travail inconnu: {kind}")
+        job = Job(
+            id=uuid.uuid4().hex,
+            kind=kind,
+            params=dict(params),
+            owner_pid=os.getpid(),
+            owner_host=self._host,
+            owner_token=self._token,
+        )
+        self._dir(job.id).mkdir(parents=True)
+        with self._lock:
+            self._jobs[job.id] = job
+            self._queue.append(job.id)
+            self._save(job)
+            self._start_queued()
+        return job
+
+    def _get(self, job_id: str) -> Job:
+        """Travail de ce gestionnaire, ou à défaut état lu sur disque (appelé verrou pris)."""
+        job = self._jobs.get(job_id)
+        if job is not None:
+            return job
+        job = self._read_job(job_id) if job_id.isalnum() else None
+        if job is None:
+            raise JobNotFound(job_id)
+        return self._adopt_if_orphan(job)
+
+    def _touch(self, job: Job) -> None:
+        """Marque le travail comme suivi (appelé verrou pris)."""
+        job.last_seen = time.time()
+        if job.id not in self._jobs and job.status not in FINISHED:
+            # Travail d'un autre gestionnaire: son propriétaire lit `seen`
+            with suppress(OSError):
+                (self._dir(job.id) / "seen").touch()
+
+    def status(self, job_id: str) -> dict[str, Any]:
+        """État et progression; marque le travail comme suivi (pas d'abandon)."""
+        with self._lock:
+            job = self._get(job_id)
+            self._touch(job)
+            data = asdict(job)
+        if job.status == QUEUED:
+            data["progress"] = {"fraction": 0.0, "message": "en attente"}
+            data["queue_position"] = self._queue.index(job_id) + 1 if job_id in self._queue else None
+        else:
+            data["progress"] = _read_json(self._dir(job_id) / "progress.json")
+        return data
+
+    def result(self, job_id: str) -> tuple[str, Any]:
+        """(statut, résultat) — résultat None tant que le travail n'a pas réussi."""
+        with self._lock:
+            job = self._get(job_id)
+            self._touch(job)
+            status = job.status
+        if status != SUCCEEDED:
+            return status, None
+        return status, _read_json(self._dir(job_id) / "result.json")
+
+    def cancel(self, job_id: str, reason: str = "Annulé") -> bool:
+        """Annule un travail en file ou en cours; False s'il était déjà terminé.
+
+        Le travail d'un autre gestionnaire est annulé par son propriétaire, à son
+        prochain passage (demande déposée dans `cancel.json`).
+        """
+        with self._lock:
+            job = self._get(job_id)
+            if job.status in FINISHED:
+                return False
+            if job_id not in self._jobs:
+                _write_json(self._dir(job_id) / "cancel.json", {"reason": reason})
+                return True
+            with suppress(ValueError):
+                self._queue.remove(job_id)
+            proc = self._procs.pop(job_id, None)
+            if proc is not None:
+                proc.terminate()
+            job.status = CANCELLED
+            job.error = reason
+            job.finished_at = time.time()
+            self._save(job)
+            self._start_queued()
+        if proc is not None:
+            proc.join(timeout=5)
+            if proc.is_alive():
+                proc.kill()
+        return True
+
+    def list_jobs(self) -> list[dict[str, Any]]:
+        """Travaux de tous les gestionnaires partageant `jobs_dir`."""
+        with self._lock:
+            jobs = dict(self._jobs)
+            for meta_path in self.jobs_dir.glob("*/job.json"):
+                job_id = meta_path.parent.name
+                if job_id not in jobs:
+                    job = self._read_job(job_id)
+                    if job is not None:
+                        jobs[job_id] = self._adopt_if_orphan(job)
+            return [asdict(job) for job in sorted(jobs.values(), key=lambda j: j.created_at)]
+
+    def wait(self, job_id: str, timeout: float = 30.0) -> str:
+        """Attend la fin d'un travail (tests, CLI); renvoie le statut final ou courant."""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            with self._lock:
+                status = self._get(job_id).status
+            if status in FINISHED:
+                return status
+            time.sleep(self.poll_interval / 2)
+        return status
+
+    def shutdown(self) -> None:
+        self._stop.set()
+        self._monitor.join(timeout=5)
+        with self._lock:
+            running = list(self._procs)
+        for job_id in running:
+            self.cancel(job_id, reason="Arrêt du serveur")
+        with suppress(OSError):
+            (self.jobs_dir / OWNERS_DIR / self._token).unlink()
+
+    # -- ordonnancement ------------------------------------------------------
+
+    def _start_queued(self) -> None:
+        # Appelé verrou pris
+        while self._queue and len(self._procs) < self.max_workers:
+            job_id = self._queue.pop(0)
+            job = self._jobs[job_id]
+            proc = self._ctx.Process(
+                target=_job_main,
+                args=(self.tasks[job.kind], job.params, str(self._dir(job_id))),
+                name=f"geneweb-job-{job.kind}",
+                daemon=True,
+            )
+            proc.start()
+            self._procs[job_id] = proc
+            job.status = RUNNING
+            job.started_at = time.time()
+            self._save(job)
+
+    def _reap(self) -> None:
+        now = time.time()
+        with self._lock:
+            for job_id, proc in list(self._procs.items()):
+                if proc.is_alive():
+                    continue
+                proc.join()
+                del self._procs[job_id]
+                job = self._jobs[job_id]
+                job.finished_at = now
+                if (self._dir(job_id) / "result.json").exists():
+                    job.status = SUCCEEDED
+                else:
+                    error = _read_json(self._dir(job_id) / "error.json") or {}
+                    job.status = FAILED
+                    job.error = error.get("message") or f"Processus terminé (code {proc.exitcode})"
+                self._save(job)
+            self._start_queued()
+            requested: list[tuple[str, str]] = []
+            abandoned: list[str] = []
+            for job in self._jobs.values():
+                if job.status in FINISHED:
+                    continue
+                request = _read_json(self._dir(job.id) / "cancel.json")
+                if isinstance(request, dict):
+                    requested.append((job.id, str(request.get("reason") or "Annulé")))
+                    continue
+                seen = max(job.last_seen, _mtime(self._dir(job.id) / "seen") or 0.0)
+                if now - seen > self.abandon_after:
+                    abandoned.append(job.id)
+            expired = [
+                job.id
+                for job in self._jobs.values()
+                if job.status in FINISHED and job.finished_at and now - job.finished_at > self.retention
+            ]
+            for job_id in expired:
+                del self._jobs[job_id]
+        for job_id, reason in requested:
+            self.cancel(job_id, reason=reason)
+        for job_id in abandoned:
+            self.cancel(job_id, reason="Abandonné (plus consulté par le client)")
+        for job_id in expired:
+            shutil.rmtree(self._dir(job_id), ignore_errors=True)
+
+    def _monitor_loop(self) -> None:
+        while not self._stop.wait(self.poll_interval):
+            with suppress(Exception):
+                self._heartbeat()
+                self._reap()
+
+
+_manager: JobManager | None = None
+_manager_lock = threading.Lock()
+
+
+def get_job_manager(tasks: Mapping[str, Task]) -> JobManager:
+    """Gestionnaire du processus, configuré par l'environnement à la première utilisation."""
+    global _manager
+    with _manager_lock:
+        if _manager is None:
+            jobs_dir = os.getenv(GENEWEB_JOBS_DIR_ENV) or Path(tempfile.gettempdir()) / "geneweb-jobs"
+            try:
+                workers = int(os.getenv(GENEWEB_JOBS_WORKERS_ENV, "") or 2)
+            except ValueError:
+                workers = 2
+            try:
+                abandon_after = float(os.getenv(GENEWEB_JOBS_ABANDON_AFTER_ENV, "") or 600)
+            except ValueError:
+                abandon_after = 600.0
+            _manager = JobManager(jobs_dir, tasks, max_workers=workers, abandon_after=abandon_after)
+        return _manager
+
+
+def set_job_manager(manager: JobManager | None) -> None:
+    """Remplace le gestionnaire du processus (tests); l'ancien est arrêté."""
+    global _manager
+    with _manager_lock:
+        previous, _manager = _manager, manager
+    if previous is not None and previous is not manager:
+        previous.shutdown()
@@ -0,0 +1,256 @@
+"""Cache des réponses rendues des pages de lecture, invalidé par les écritures.
+
+Une page `/gwd` ne dépend que de ses paramètres et de l'état de la base. Le cache
+conserve le corps JSON sérialisé sous la clé (base, paramètres), estampillé de la
+révision de base (`read_revision`) pour laquelle il a été calculé:
+
+- en mémoire: LRU borné en octets (somme des corps);
+- sur disque (optionnel, `GENEWEB_RESPONSE_CACHE_DIR`): second niveau indexé par
+  (base, paramètres, révision), borné en taille comme le cache du bridge OCaml.
+
+Invalidation précise: chaque entrée porte des étiquettes (individus et familles
+affichés, `ALL_TAG` pour les pages qui résument toute la base). Un écrivain déclare ce
+qu'il touche dans un bloc `writing()`; à la sortie, les entrées concernées sont retirées
+et les autres, calculées sur la révision précédente, sont ré-estampillées avec la
+nouvelle: elles restent servies sans recalcul. Toute autre modification de la base
+(hors écrivains) change la révision et rend simplement les entrées périmées.
+
+Configuration:
+- `GENEWEB_RESPONSE_CACHE=0` désactive le cache;
+- `GENEWEB_RESPONSE_CACHE_MAX_MB` (défaut: 64) borne le niveau mémoire;
+- `GENEWEB_RESPONSE_CACHE_DIR` active le niveau disque
+  (`GENEWEB_RESPONSE_CACHE_DISK_MAX_MB`, défaut: 256).
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from collections.abc import Iterable, Iterator, Mapping
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from geneweb.adapters.ocaml_bridge.cache import ResultCache
+from geneweb.io.revision import read_revision, revision_root
+
+GENEWEB_RESPONSE_CACHE_ENV = "GENEWEB_RESPONSE_CACHE"
+GENEWEB_RESPONSE_CACHE_MAX_MB_ENV = "GENEWEB_RESPONSE_CACHE_MAX_MB"
+GENEWEB_RESPONSE_CACHE_DIR_ENV = "GENEWEB_RESPONSE_CACHE_DIR"
+GENEWEB_RESPONSE_CACHE_DISK_MAX_MB_ENV = "GENEWEB_RESPONSE_CACHE_DISK_MAX_MB"
+DEFAULT_MAX_MB = 64
+DEFAULT_DISK_MAX_MB = 256
+
+# Étiquette des pages qui dépendent de toute la base (accueil, recherche, notes)
+ALL_TAG = "*"
+
+
+def person_tag(person_id: str) -> str:
+    return f"I:{person_id}"
+
+
+def family_tag(family_id: str) -> str:
+    return f"F:{family_id}"
+
+
+def source_tag(source_id: str) -> str:
+    return f"S:{source_id}"
+
+
+def params_key(params: Mapping[str, object]) -> str:
+    """Clé stable de paramètres (valeurs None ignorées, ordre indifférent)."""
+    return json.dumps(sorted((k, str(v)) for k, v in params.items() if v is not None), ensure_ascii=False)
+
+
+def _base_key(base: str | Path) -> str:
+    return str(revision_root(base).resolve())
+
+
+@dataclass
+class _Entry:
+    revision: str
+    body: bytes
+    tags: frozenset[str]
+
+
+class ResponseCache:
+    """Corps de réponses sérialisés, LRU mémoire borné en octets + niveau disque optionnel."""
+
+    def __init__(self, max_bytes: int, disk: ResultCache | None = None) -> None:
+        self.max_bytes = max_bytes
+        self.disk = disk
+        self._entries: OrderedDict[tuple[str, str], _Entry] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._write_locks: dict[str, threading.RLock] = {}
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.invalidated = 0
+        self.restamped = 0
+
+    # -- lecture / écriture --------------------------------------------------
+
+    def _disk_key(self, base: str, key: str, revision: str) -> str:
+        return hashlib.sha256(f"{base}\0{key}\0{revision}".encode()).hexdigest()
+
+    def get(self, base: str | Path, key: str, revision: str) -> bytes | None:
+        """Corps en cache pour cette révision de base, ou None."""
+        base_key = _base_key(base)
+        with self._lock:
+            entry = self._entries.get((base_key, key))
+            if entry is not None and entry.revision == revision:
+                self._entries.move_to_end((base_key, key))
+                self.hits += 1
+                return entry.body
+        if self.disk is not None:
+            stored = self.disk.get(self._disk_key(base_key, key, revision))
+            if stored is not None:
+                tags_line, _, body = stored.partition("\n")
+                data = body.encode("utf-8")
+                self._store(base_key, key, _Entry(revision, data, frozenset(json.loads(tags_line))))
+                with self._lock:
+                    self.disk_hits += 1
+                return data
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, base: str | Path, key: str, revision: str, body: bytes, tags: Iterable[str]) -> None:
+        base_key = _base_key(base)
+        entry = _Entry(revision, body, frozenset(tags))
+        self._store(base_key, key, entry)
+        if self.disk is not None:
+            payload = json.dumps(sorted(entry.tags)) + "\n" + body.decode("utf-8")
+            self.disk.put(self._disk_key(base_key, key, revision), payload)
+
+    def _store(self, base_key: str, key: str, entry: _Entry) -> None:
+        if len(entry.body) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop((base_key, key), None)
+            if previous is not None:
+                self._bytes -= len(previous.body)
+            self._entries[(base_key, key)] = entry
+            self._bytes += len(entry.body)
+            while self._bytes > self.max_bytes and self._entries:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted.body)
+
+    # -- invalidation --------------------------------------------------------
+
+    def invalidate(self, base: str | Path, touched: Iterable[str], before: str | None = None, after: str | None = None) -> int:
+        """Retire les entrées de `base` étiquetées par `touched`.
+
+        Si `before`/`after` sont fournis, les entrées restantes calculées sur la révision
+        `before` passent à `after` (l'écriture ne les concerne pas).
+        """
+        base_key = _base_key(base)
+        touched_set = frozenset(touched)
+        removed = 0
+        with self._lock:
+            for (entry_base, key), entry in list(self._entries.items()):
+                if entry_base != base_key:
+                    continue
+                if entry.tags & touched_set:
+                    del self._entries[(entry_base, key)]
+                    self._bytes -= len(entry.body)
+                    removed += 1
+                elif before is not None and after is not None and entry.revision == before:
+                    entry.revision = after
+                    self.restamped += 1
+            self.invalidated += removed
+        return removed
+
+    @contextmanager
+    def writing(self, base: str | Path) -> Iterator[set[str]]:
+        """Encadre une écriture de `base`; l'appelant ajoute au set ce qu'il modifie.
+
+        Les écritures d'une même base sont sérialisées: le ré-estampillage suppose qu'aucune
+        autre écriture ne s'intercale entre les révisions avant et après.
+        """
+        base_key = _base_key(base)
+        with self._lock:
+            write_lock = self._write_locks.setdefault(base_key, threading.RLock())
+        touched: set[str] = set()
+        with write_lock:
+            try:
+                before: str | None = read_revision(base).token
+            except FileNotFoundError:
+                before = None
+            try:
+                yield touched
+            finally:
+                try:
+                    after: str | None = read_revision(base).token
+                except FileNotFoundError:
+                    after = None
+                self.invalidate(base, touched, before, after)
+
+    # -- état ----------------------------------------------------------------
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+        if self.disk is not None:
+            self.disk.clear()
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "invalidated": self.invalidated,
+                "restamped": self.restamped,
+                "disk": str(self.disk.directory) if self.disk is not None else None,
+            }
+
+
+def _mb_env(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, "") or default) * 1024 * 1024
+    except ValueError:
+        return default * 1024 * 1024
+
+
+_cache: ResponseCache | None = None
+_cache_lock = threading.Lock()
+
+
+def response_cache_enabled() -> bool:
+    return os.getenv(GENEWEB_RESPONSE_CACHE_ENV, "").lower() not in ("0", "false", "no", "off")
+
+
+def get_response_cache() -> ResponseCache:
+    """Cache du processus, configuré par l'environnement à la première utilisation.
+
+    Toujours disponible (les écrivains y déclarent leurs modifications); la route de
+    lecture le contourne si `response_cache_enabled()` est faux.
+    """
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            directory = os.getenv(GENEWEB_RESPONSE_CACHE_DIR_ENV)
+            disk = (
+                ResultCache(directory, _mb_env(GENEWEB_RESPONSE_CACHE_DISK_MAX_MB_ENV, DEFAULT_DISK_MAX_MB))
+                if directory
+                else None
+            )
+            _cache = ResponseCache(_mb_env(GENEWEB_RESPONSE_CACHE_MAX_MB_ENV, DEFAULT_MAX_MB), disk)
+        return _cache
+
+
+def set_response_cache(cache: ResponseCache | None) -> None:
+    """Remplace le cache du processus (tests); None le recrée depuis l'environnement."""
+    global _cache
+    with _cache_lock:
+        _cache = cache
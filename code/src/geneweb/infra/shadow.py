@@ -0,0 +1,263 @@
+"""Mode "shadow" : exécution de l'autre implémentation en arrière-plan, pour mesure.
+
+Dans la logique strangler-fig (ADR 0001), une requête est servie par une seule
+implémentation (OCaml par défaut, Python via `use_python` / `GENEWEB_USE_PYTHON`). Le
+mode shadow rejoue une fraction échantillonnée des requêtes avec l'autre implémentation,
+dans un pool de threads dédié, sans jamais retarder ni modifier la réponse:
+
+- les deux latences sont relevées sur la même requête (latence primaire telle que servie,
+  cache éventuel compris);
+- les sorties sont comparées quand un comparateur est fourni (ex: GEDCOM normalisé);
+- les métriques sont agrégées par route et par sens ("ocaml->python", "python->ocaml").
+
+Configuration: `GENEWEB_SHADOW_RATE` (fraction 0..1, défaut 0 = désactivé) et
+`GENEWEB_SHADOW_WORKERS` (défaut 1). Les travaux en attente sont bornés: au-delà, les
+échantillons sont abandonnés (compteur `dropped`) plutôt que d'accumuler du retard.
+"""
+
+from __future__ import annotations
+
+import os
+import random
+import threading
+import time
+from collections import deque
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any
+
+GENEWEB_SHADOW_RATE_ENV = "GENEWEB_SHADOW_RATE"
+GENEWEB_SHADOW_WORKERS_ENV = "GENEWEB_SHADOW_WORKERS"
+
+_LATENCY_WINDOW = 512
+_MISMATCH_SAMPLES = 5
+
+# comparateur: (sortie primaire, sortie shadow) -> (identiques, détail de l'écart)
+Comparator = Callable[[Any, Any], tuple[bool, str]]
+
+
+def _percentile(values: list[float], q: float) -> float:
+    ordered = sorted(values)
+    idx = min(len(ordered) - 1, max(0, round(q * (len(ordered) - 1))))
+    return ordered[idx]
+
+
+@dataclass
+class _LatencyWindow:
+    values: deque[float] = field(default_factory=lambda: deque(maxlen=_LATENCY_WINDOW))
+    count: int = 0
+    total: float = 0.0
+
+    def add(self, ms: float) -> None:
+        self.values.append(ms)
+        self.count += 1
+        self.total += ms
+
+    def summary(self) -> dict[str, float | int]:
+        if not self.count:
+            return {"count": 0}
+        window = list(self.values)
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total / self.count, 3),
+            "p50_ms": round(_percentile(window, 0.5), 3),
+            "p95_ms": round(_percentile(window, 0.95), 3),
+            "max_ms": round(max(window), 3),
+        }
+
+
+@dataclass
+class RouteShadowStats:
+    """Métriques shadow d'une route, pour un sens (primaire -> shadow)."""
+
+    sampled: int = 0
+    completed: int = 0
+    errors: int = 0
+    mismatches: int = 0
+    primary: _LatencyWindow = field(default_factory=_LatencyWindow)
+    shadow: _LatencyWindow = field(default_factory=_LatencyWindow)
+    last_error: str | None = None
+    mismatch_samples: deque[str] = field(default_factory=lambda: deque(maxlen=_MISMATCH_SAMPLES))
+
+    def as_dict(self) -> dict[str, Any]:
+        compared = self.completed
+        return {
+            "sampled": self.sampled,
+            "completed": self.completed,
+            "errors": self.errors,
+            "mismatches": self.mismatches,
+            "mismatch_rate": round(self.mismatches / compared, 4) if compared else None,
+            "primary_latency": self.primary.summary(),
+            "shadow_latency": self.shadow.summary(),
+            # > 1: l'implémentation shadow est plus rapide que la primaire
+            "speedup": (
+                round((self.primary.total / self.primary.count) / (self.shadow.total / self.shadow.count), 3)
+                if self.primary.count and self.shadow.count and self.shadow.total
+                else None
+            ),
+            "last_error": self.last_error,
+            "mismatch_samples": list(self.mismatch_samples),
+        }
+
+
+class ShadowRunner:
+    """Échantillonne des requêtes et rejoue l'autre implémentation en arrière-plan."""
+
+    def __init__(
+        self,
+        rate: float,
+        max_workers: int = 1,
+        max_pending: int | None = None,
+        sampler: Callable[[], float] = random.random,
+    ) -> None:
+        self.rate = max(0.0, min(1.0, rate))
+        self.max_workers = max(1, max_workers)
+        self.max_pending = max_pending if max_pending is not None else 4 * self.max_workers
+        self._sampler = sampler
+        self._executor: ThreadPoolExecutor | None = None
+        self._lock = threading.Lock()
+        self._pending = 0
+        self.dropped = 0
+        self._stats: dict[tuple[str, str], RouteShadowStats] = {}
+
+    @property
+    def enabled(self) -> bool:
+        return self.rate > 0.0
+
+    def should_sample(self) -> bool:
+        return self.enabled and self._sampler() < self.rate
+
+    def _stats_for(self, route: str, direction: str) -> RouteShadowStats:
+        key = (route, direction)
+        stats = self._stats.get(key)
+        if stats is None:
+            stats = self._stats[key] = RouteShadowStats()
+        return stats
+
+    def submit(
+        self,
+        route: str,
+        primary_impl: str,
+        primary_result: Any,
+        primary_ms: float,
+        shadow_fn: Callable[[], Any],
+        compare: Comparator | None = None,
+    ) -> bool:
+        """Planifie l'exécution shadow; False si l'échantillon est abandonné (file pleine)."""
+        shadow_impl = "python" if primary_impl == "ocaml" else "ocaml"
+        direction = f"{primary_impl}->{shadow_impl}"
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self.dropped += 1
+                return False
+            self._pending += 1
+            stats = self._stats_for(route, direction)
+            stats.sampled += 1
+            stats.primary.add(primary_ms)
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="geneweb-shadow"
+                )
+            executor = self._executor
+        try:
+            future = executor.submit(self._run, stats, primary_result, shadow_fn, compare)
+        except RuntimeError:  # runner arrêté entre-temps
+            self._done()
+            return False
+        # Aussi appelé pour une tâche annulée avant d'avoir tourné (shutdown)
+        future.add_done_callback(lambda _f: self._done())
+        return True
+
+    def _done(self) -> None:
+        with self._lock:
+            self._pending -= 1
+
+    def _run(
+        self,
+        stats: RouteShadowStats,
+        primary_result: Any,
+        shadow_fn: Callable[[], Any],
+        compare: Comparator | None,
+    ) -> None:
+        start = time.perf_counter()
+        try:
+            shadow_result = shadow_fn()
+        except Exception as e:  # l'échec shadow ne concerne que les métriques
+            with self._lock:
+                stats.errors += 1
+                stats.last_error = f"{type(e).__name__}: {e}"
+            return
+        elapsed_ms = (time.perf_counter() - start) * 1000.0
+        equal, detail = compare(primary_result, shadow_result) if compare else (True, "")
+        with self._lock:
+            stats.completed += 1
+            stats.shadow.add(elapsed_ms)
+            if not equal:
+                stats.mismatches += 1
+                stats.mismatch_samples.append(detail[:2000])
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            routes: dict[str, dict[str, Any]] = {}
+            for (route, direction), stats in sorted(self._stats.items()):
+                routes.setdefault(route, {})[direction] = stats.as_dict()
+            return {
+                "enabled": self.enabled,
+                "rate": self.rate,
+                "pending": self._pending,
+                "dropped": self.dropped,
+                "routes": routes,
+            }
+
+    def wait_idle(self, timeout: float = 10.0) -> bool:
+        """Attend la fin des exécutions en cours (tests, arrêt propre)."""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            with self._lock:
+                if self._pending == 0:
+                    return True
+            time.sleep(0.01)
+        return False
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _rate_from_env() -> float:
+    try:
+        return float(os.getenv(GENEWEB_SHADOW_RATE_ENV, "") or 0.0)
+    except ValueError:
+        return 0.0
+
+
+def _workers_from_env() -> int:
+    try:
+        return int(os.getenv(GENEWEB_SHADOW_WORKERS_ENV, "") or 1)
+    except ValueError:
+        return 1
+
+
+_runner: ShadowRunner | None = None
+_runner_lock = threading.Lock()
+
+
+def get_shadow_runner() -> ShadowRunner:
+    """Runner shadow du processus, configuré par l'environnement au premier appel."""
+    global _runner
+    with _runner_lock:
+        if _runner is None:
+            _runner = ShadowRunner(_rate_from_env(), _workers_from_env())
+        return _runner
+
+
+def set_shadow_runner(runner: ShadowRunner | None) -> None:
+    """Remplace le runner du processus (None: reconfiguration depuis l'environnement)."""
+    global _runner
+    with _runner_lock:
+        previous, _runner = _runner, runner
+    if previous is not None and previous is not runner:
+        previous.shutdown()
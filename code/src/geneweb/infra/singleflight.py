@@ -0,0 +1,88 @@
+"""Déduplication des appels concurrents identiques ("single-flight").
+
+Tant qu'un calcul est en cours pour une clé, les appels suivants avec la même clé
+attendent son résultat au lieu de relancer le travail. Une fois le calcul terminé (succès
+ou erreur), la clé est libérée: l'appel suivant recalcule (la mise en cache durable est
+l'affaire de l'appelant).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+from collections.abc import Awaitable, Callable, Hashable
+from concurrent.futures import Future
+from typing import Generic, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight(Generic[T]):
+    """Single-flight pour des appels bloquants (threads)."""
+
+    def __init__(self) -> None:
+        self._calls: dict[Hashable, Future[T]] = {}
+        self._lock = threading.Lock()
+        self.shared = 0
+
+    def do(self, key: Hashable, fn: Callable[[], T]) -> T:
+        with self._lock:
+            fut = self._calls.get(key)
+            leader = fut is None
+            if fut is None:
+                fut = self._calls[key] = Future()
+            else:
+                self.shared += 1
+        if not leader:
+            return fut.result()
+        try:
+            result = fn()
+        except BaseException as e:
+            fut.set_exception(e)
+            raise
+        else:
+            fut.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+
+
+class AsyncSingleFlight(Generic[T]):
+    """Single-flight pour des coroutines.
+
+    Le calcul partagé tourne dans sa propre tâche: l'annulation d'un appelant ne l'interrompt
+    pas tant que d'autres attendent encore; il n'est annulé que lorsque le dernier appelant
+    abandonne.
+    """
+
+    def __init__(self) -> None:
+        self._calls: dict[Hashable, tuple[asyncio.Task[T], list[int]]] = {}
+        self.shared = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        entry = self._calls.get(key)
+        if entry is None or entry[0].cancelled() or entry[0].cancelling():
+            # Pas de calcul en cours (ou calcul abandonné par tous ses appelants)
+            task: asyncio.Task[T] = asyncio.ensure_future(fn())
+            new_entry = entry = self._calls[key] = (task, [0])
+            task.add_done_callback(lambda _t: self._release(key, new_entry))
+        else:
+            self.shared += 1
+        task, waiters = entry
+        waiters[0] += 1
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if waiters[0] == 1 and not task.done():
+                task.cancel()
+            raise
+        finally:
+            waiters[0] -= 1
+
+    def _release(self, key: Hashable, entry: tuple[asyncio.Task[T], list[int]]) -> None:
+        if self._calls.get(key) is entry:
+            del self._calls[key]
+
+    def in_flight(self) -> int:
+        return len(self._calls)
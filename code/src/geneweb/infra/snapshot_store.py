@@ -0,0 +1,158 @@
+"""Publication et partage des instantanés de bases entre processus workers.
+
+Mode activé par `GENEWEB_SNAPSHOT=1`. Pour chaque base, un répertoire
+(`GENEWEB_SNAPSHOT_DIR`, défaut: `<tmp>/geneweb-snapshots/<empreinte du chemin>`) contient:
+
+- `<génération>.snap`: instantanés immuables (`geneweb.io.snapshot`);
+- `CURRENT`: numéro de la génération courante (remplacé atomiquement);
+- `lock`: verrou de publication (un seul processus construit une génération).
+
+Le processus qui écrit la base (écrivain de `gwd_modify`) publie la nouvelle génération
+depuis sa copie résidente, sans relire le fichier. Les workers lisent `CURRENT` à chaque
+accès (une petite lecture) et se rattachent à la nouvelle génération quand elle change;
+si la base a été modifiée par un autre moyen (révision différente), le premier worker
+qui le constate publie lui-même. Les anciennes générations sont supprimées: les
+processus qui les projettent encore les gardent lisibles jusqu'à leur détachement.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import tempfile
+import threading
+from collections.abc import Iterator, Sequence
+from contextlib import contextmanager, suppress
+from pathlib import Path
+from typing import Any
+
+from geneweb.domain.models import Famille, Individu, Source
+from geneweb.io.durable import write_atomic
+from geneweb.io.gwb import load_gwb_minimal
+from geneweb.io.revision import read_revision
+from geneweb.io.snapshot import SnapshotBase, build_snapshot
+
+try:  # verrou de publication inter-processus (POSIX)
+    import fcntl
+except ImportError:  # pragma: no cover - Windows: verrou limité au processus
+    fcntl = None  # type: ignore[assignment]
+
+GENEWEB_SNAPSHOT_ENV = "GENEWEB_SNAPSHOT"
+GENEWEB_SNAPSHOT_DIR_ENV = "GENEWEB_SNAPSHOT_DIR"
+
+BaseData = tuple[Sequence[Individu], Sequence[Famille], Sequence[Source]]
+
+
+def snapshot_enabled() -> bool:
+    return os.getenv(GENEWEB_SNAPSHOT_ENV, "").lower() in ("1", "true", "yes")
+
+
+class SnapshotStore:
+    """Instantanés publiés sous `directory`, et ceux projetés par ce processus."""
+
+    def __init__(self, directory: str | Path) -> None:
+        self.directory = Path(directory)
+        self._attached: dict[Path, SnapshotBase] = {}
+        self._lock = threading.RLock()
+        self.publications = 0
+        self.attachments = 0
+
+    def _dir(self, base: Path) -> Path:
+        return self.directory / hashlib.sha256(str(base).encode("utf-8")).hexdigest()[:16]
+
+    @staticmethod
+    def _current(directory: Path) -> int:
+        try:
+            return int((directory / "CURRENT").read_text(encoding="ascii"))
+        except (FileNotFoundError, ValueError):
+            return 0
+
+    @contextmanager
+    def _publishing(self, directory: Path) -> Iterator[None]:
+        directory.mkdir(parents=True, exist_ok=True)
+        with self._lock, open(directory / "lock", "a+b") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def publish(self, base_dir: str | Path, data: BaseData | None = None, revision: str | None = None) -> SnapshotBase:
+        """Publie une génération pour l'état courant de la base (ou `data` à `revision`)."""
+        base = Path(base_dir).resolve()
+        directory = self._dir(base)
+        with self._publishing(directory):
+            if revision is None:
+                # Révision lue avant le chargement: une écriture concurrente rendra
+                # l'instantané périmé (republié), jamais faussement à jour
+                revision = read_revision(base).token
+            generation = self._current(directory)
+            if generation:
+                with suppress(FileNotFoundError, ValueError):
+                    current = SnapshotBase(directory / f"{generation}.snap")
+                    if current.revision == revision:
+                        return self._attach(base, current)
+            individus, familles, sources = data if data is not None else load_gwb_minimal(base)
+            generation += 1
+            path = directory / f"{generation}.snap"
+            # Instantanés reconstructibles depuis la base: pas de fsync
+            write_atomic(path, build_snapshot(individus, familles, sources, revision, generation), sync=False)
+            write_atomic(directory / "CURRENT", str(generation).encode("ascii"), sync=False)
+            for old in directory.glob("*.snap"):
+                if old != path:
+                    with suppress(FileNotFoundError):
+                        old.unlink()
+            self.publications += 1
+            return self._attach(base, SnapshotBase(path))
+
+    def _attach(self, base: Path, snapshot: SnapshotBase) -> SnapshotBase:
+        with self._lock:
+            previous = self._attached.get(base)
+            if previous is None or previous.generation != snapshot.generation:
+                self._attached[base] = snapshot
+                self.attachments += 1
+                return snapshot
+            return previous
+
+    def get(self, base_dir: str | Path) -> SnapshotBase:
+        """Instantané à jour de la base, publié au besoin."""
+        base = Path(base_dir).resolve()
+        directory = self._dir(base)
+        generation = self._current(directory)
+        snapshot = self._attached.get(base)
+        if generation and (snapshot is None or snapshot.generation != generation):
+            with suppress(FileNotFoundError, ValueError):
+                snapshot = self._attach(base, SnapshotBase(directory / f"{generation}.snap"))
+        if snapshot is None or snapshot.revision != read_revision(base).token:
+            snapshot = self.publish(base)
+        return snapshot
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "directory": str(self.directory),
+            "attached": {str(base): snap.generation for base, snap in self._attached.items()},
+            "publications": self.publications,
+            "attachments": self.attachments,
+        }
+
+
+_store: SnapshotStore | None = None
+_store_lock = threading.Lock()
+
+
+def get_snapshot_store() -> SnapshotStore:
+    global _store
+    with _store_lock:
+        if _store is None:
+            directory = os.getenv(GENEWEB_SNAPSHOT_DIR_ENV) or Path(tempfile.gettempdir()) / "geneweb-snapshots"
+            _store = SnapshotStore(directory)
+        return _store
+
+
+def set_snapshot_store(store: SnapshotStore | None) -> None:
+    """Remplace le magasin du processus (tests); None le recrée depuis l'environnement."""
+    global _store
+    with _store_lock:
+        _store = store
@@ -0,0 +1,222 @@
+"""Écrivain unique par base: file de mutations, copie résidente et écriture groupée.
+
+Sans coordination, deux modifications concurrentes d'une même base font chacune
+chargement → modification → réécriture complète: la dernière écrase la première (mise
+à jour perdue) et chaque éditeur paie une réécriture. Le `BaseWriter` d'une base:
+
+- reçoit les mutations dans une file et les applique dans l'ordre, une à la fois, sur
+  une copie résidente de la base (rechargée si la base a changé hors de lui);
+- regroupe les mutations en attente en une seule écriture (group commit): le débit
+  d'écriture croît avec le nombre d'éditeurs au lieu de s'effondrer;
+- ne rend la main à l'appelant qu'après l'écriture sur disque, avec la nouvelle
+  révision de la base (`read_revision`).
+
+Concurrence optimiste: une mutation peut porter la révision attendue (`If-Match`). Elle
+est refusée (`WriteConflict`) si la base n'est plus à cette révision, y compris parce
+qu'une mutation précédente du même groupe vient d'être appliquée.
+
+Une mutation qui échoue est isolée: la copie résidente est rechargée et les mutations
+déjà acceptées du groupe y sont rejouées. Le fil d'un écrivain s'arrête (et libère la
+copie résidente) après `GENEWEB_WRITER_IDLE` secondes sans mutation (défaut: 60).
+"""
+
+from __future__ import annotations
+
+import os
+import queue
+import threading
+from collections.abc import Callable
+from concurrent.futures import Future
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Generic, TypeVar
+
+from geneweb.io.revision import read_revision
+
+GENEWEB_WRITER_IDLE_ENV = "GENEWEB_WRITER_IDLE"
+
+S = TypeVar("S")
+R = TypeVar("R")
+
+
+class WriteConflict(Exception):
+    """La base n'est plus à la révision attendue par le client (HTTP 412)."""
+
+    def __init__(self, expected: str, current: str) -> None:
+        super().__init__(f"Révision attendue {expected}, révision courante \"{current}\"")
+        self.expected = expected
+        self.current = current
+
+
+def revision_matches(if_match: str, token: str) -> bool:
+    """Compare une valeur d'en-tête If-Match (liste d'ETags ou `*`) à un jeton de révision."""
+    tags = {tag.strip().removeprefix("W/").strip('"') for tag in if_match.split(",")}
+    return "*" in tags or token in tags
+
+
+@dataclass(frozen=True)
+class WriteResult(Generic[R]):
+    """Valeur renvoyée par la mutation et révision de la base après son écriture."""
+
+    value: R
+    revision: str
+
+
+@dataclass
+class _Request:
+    mutation: Callable[[Any], Any]
+    expected: str | None
+    future: Future[WriteResult[Any]]
+
+
+class BaseWriter(Generic[S]):
+    """Acteur d'écriture d'une base: un fil, une file, une copie résidente."""
+
+    def __init__(
+        self,
+        base_path: Path,
+        load: Callable[[Path], S],
+        save: Callable[[Path, S], None],
+        max_group: int = 512,
+        idle_timeout: float = 60.0,
+    ) -> None:
+        self.base_path = base_path
+        self._load = load
+        self._save = save
+        self.max_group = max_group
+        self.idle_timeout = idle_timeout
+        self._queue: queue.SimpleQueue[_Request] = queue.SimpleQueue()
+        self._state: S | None = None
+        self._revision: str | None = None
+        self.stats = {"submitted": 0, "applied": 0, "failed": 0, "conflicts": 0, "flushes": 0, "reloads": 0}
+        self._thread = threading.Thread(target=self._run, name=f"geneweb-writer-{base_path.name}", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    # -- boucle ----------------------------------------------------------------
+
+    def _run(self) -> None:
+        while True:
+            try:
+                first = self._queue.get(timeout=self.idle_timeout)
+            except queue.Empty:
+                if _retire(self):
+                    return
+                continue
+            group = [first]
+            while len(group) < self.max_group:
+                try:
+                    group.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self._process(group)
+            except BaseException as e:  # ne jamais laisser un appelant sans réponse
+                self._state = None
+                for req in group:
+                    if not req.future.done():
+                        req.future.set_exception(e)
+
+    def _reload(self) -> S:
+        self._state = self._load(self.base_path)
+        self.stats["reloads"] += 1
+        return self._state
+
+    def _process(self, group: list[_Request]) -> None:
+        try:
+            disk_revision = read_revision(self.base_path).token
+            state = self._state
+            if state is None or disk_revision != self._revision:
+                # Base modifiée hors de l'écrivain (ou premier usage): copie à jour
+                state = self._reload()
+                self._revision = disk_revision
+        except BaseException as e:
+            self._state = None
+            for req in group:
+                req.future.set_exception(e)
+            return
+
+        applied: list[tuple[_Request, Any]] = []
+        for req in group:
+            if req.expected is not None and (applied or not revision_matches(req.expected, disk_revision)):
+                self.stats["conflicts"] += 1
+                req.future.set_exception(WriteConflict(req.expected, disk_revision))
+                continue
+            try:
+                value = req.mutation(state)
+            except BaseException as e:
+                self.stats["failed"] += 1
+                req.future.set_exception(e)
+                # La mutation a pu modifier partiellement la copie: repartir du disque
+                state = self._reload()
+                applied = [(r, r.mutation(state)) for r, _ in applied]
+                continue
+            applied.append((req, value))
+
+        if not applied:
+            return
+        try:
+            self._save(self.base_path, state)
+            self._revision = read_revision(self.base_path).token
+        except BaseException as e:
+            self._state = None
+            for req, _ in applied:
+                req.future.set_exception(e)
+            return
+        self.stats["flushes"] += 1
+        self.stats["applied"] += len(applied)
+        for req, value in applied:
+            req.future.set_result(WriteResult(value, self._revision))
+
+
+# Écrivains actifs, par chemin résolu de base
+_writers: dict[Path, BaseWriter[Any]] = {}
+_writers_lock = threading.Lock()
+
+
+def _retire(writer: BaseWriter[Any]) -> bool:
+    # Arrêt sur inactivité, sous le verrou des écrivains: aucun dépôt ne peut se perdre
+    with _writers_lock:
+        if not writer._queue.empty():
+            return False
+        if _writers.get(writer.base_path) is writer:
+            del _writers[writer.base_path]
+        return True
+
+
+def _idle_timeout() -> float:
+    try:
+        return float(os.getenv(GENEWEB_WRITER_IDLE_ENV, "") or 60)
+    except ValueError:
+        return 60.0
+
+
+def submit_write(
+    base_path: str | Path,
+    mutation: Callable[[S], R],
+    load: Callable[[Path], S],
+    save: Callable[[Path, S], None],
+    expected_revision: str | None = None,
+) -> WriteResult[R]:
+    """Confie `mutation` à l'écrivain de la base et attend son écriture sur disque.
+
+    Raises:
+        WriteConflict: la base n'est plus à `expected_revision`
+        Exception: toute erreur levée par la mutation (la base n'est pas modifiée)
+    """
+    path = Path(base_path).resolve()
+    future: Future[WriteResult[R]] = Future()
+    with _writers_lock:
+        writer = _writers.get(path)
+        if writer is None:
+            writer = _writers[path] = BaseWriter(path, load, save, idle_timeout=_idle_timeout())
+            writer.start()
+        writer.stats["submitted"] += 1
+        writer._queue.put(_Request(mutation, expected_revision, future))
+    return future.result()
+
+
+def writers_snapshot() -> dict[str, Any]:
+    with _writers_lock:
+        return {str(path): dict(writer.stats) for path, writer in sorted(_writers.items())}
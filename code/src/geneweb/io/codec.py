@@ -0,0 +1,115 @@
+"""Codec JSON commun: fichiers GWB, wiznotes, blasons et réponses HTTP.
+
+Le moteur est choisi au premier usage (`GENEWEB_JSON_BACKEND`, défaut `auto`):
+`orjson` s'il est installé (extra `fast`), sinon `json` de la bibliothèque
+standard. Les deux produisent de l'UTF-8 sans échappement ASCII
+(équivalent de `ensure_ascii=False`).
+
+Écriture sur disque: indentée (2 espaces) par défaut, compacte avec
+`GENEWEB_JSON_COMPACT=1`; la lecture accepte les deux formes.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
+
+GENEWEB_JSON_BACKEND_ENV = "GENEWEB_JSON_BACKEND"
+GENEWEB_JSON_COMPACT_ENV = "GENEWEB_JSON_COMPACT"
+
+BACKENDS = ("orjson", "stdlib")
+
+
+@dataclass(frozen=True)
+class JsonBackend:
+    name: str
+    dumps: Callable[[Any], bytes]
+    dumps_indented: Callable[[Any], bytes]
+    loads: Callable[[bytes | str], Any]
+
+
+def _stdlib() -> JsonBackend:
+    return JsonBackend(
+        "stdlib",
+        lambda obj: json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8"),
+        lambda obj: json.dumps(obj, ensure_ascii=False, indent=2).encode("utf-8"),
+        json.loads,
+    )
+
+
+def _orjson() -> JsonBackend:
+    import orjson
+
+    # Clés non chaînes acceptées et converties, comme `json.dumps`
+    option = orjson.OPT_NON_STR_KEYS
+    return JsonBackend(
+        "orjson",
+        lambda obj: orjson.dumps(obj, option=option),
+        lambda obj: orjson.dumps(obj, option=option | orjson.OPT_INDENT_2),
+        orjson.loads,
+    )
+
+
+_FACTORIES: dict[str, Callable[[], JsonBackend]] = {
+    "orjson": _orjson,
+    "stdlib": _stdlib,
+}
+
+_backend: JsonBackend | None = None
+_lock = threading.Lock()
+
+
+def _select(name: str) -> JsonBackend:
+    if name == "auto":
+        for candidate in BACKENDS:
+            try:
+                return _FACTORIES[candidate]()
+            except ImportError:
+                continue
+    if name not in _FACTORIES:
+        raise ValueError(f"Moteur JSON inconnu: {name} (attendu: auto, {', '.join(BACKENDS)})")
+    return _FACTORIES[name]()
+
+
+def get_backend() -> JsonBackend:
+    global _backend
+    if _backend is None:
+        with _lock:
+            if _backend is None:
+                _backend = _select(os.getenv(GENEWEB_JSON_BACKEND_ENV, "auto").lower())
+    return _backend
+
+
+def set_backend(name: str | None) -> JsonBackend | None:
+    """Force un moteur (`orjson`, `stdlib`, `auto`); None revient à l'environnement."""
+    global _backend
+    with _lock:
+        _backend = None if name is None else _select(name)
+    return _backend
+
+
+def backend_name() -> str:
+    return get_backend().name
+
+
+def compact_on_disk() -> bool:
+    return os.getenv(GENEWEB_JSON_COMPACT_ENV, "").lower() in ("1", "true", "yes")
+
+
+def dumps(obj: Any, *, indent: bool = False) -> bytes:
+    """Encode `obj` en JSON UTF-8 (compact, ou indenté sur 2 espaces)."""
+    backend = get_backend()
+    return backend.dumps_indented(obj) if indent else backend.dumps(obj)
+
+
+def loads(data: bytes | str) -> Any:
+    return get_backend().loads(data)
+
+
+def dumps_file(obj: Any) -> bytes:
+    """Encodage des fichiers de base (index.json, wiznotes, blasons)."""
+    return dumps(obj, indent=not compact_on_disk())
@@ -0,0 +1,161 @@
+"""Écritures atomiques et durables des fichiers de base.
+
+Tous les écrivains de base (`index.json`, `.revision`, wiznotes, blasons) passent par
+`write_atomic`: fichier temporaire dans le même répertoire, `fsync`, renommage
+atomique (`os.replace`) puis `fsync` du répertoire. Un lecteur concurrent voit
+l'ancienne ou la nouvelle version, jamais un fichier tronqué; après un arrêt brutal,
+le fichier est l'une des deux versions complètes.
+
+Mode différé (`GENEWEB_WRITE_BEHIND_MS` > 0): le fichier temporaire est toujours
+synchronisé avant son renommage (sinon un arrêt brutal pourrait laisser, sous le nom
+définitif, un fichier renommé mais vide ou tronqué); seuls les `fsync` de répertoire
+sont regroupés et faits en arrière-plan au plus tard après ce délai, un par répertoire
+pour une rafale de réécritures. En contrepartie, un arrêt brutal peut perdre les
+renommages de la dernière fenêtre: le fichier reste alors dans une version antérieure
+complète. `flush()` force la synchronisation (appelé à l'arrêt du serveur).
+"""
+
+from __future__ import annotations
+
+import atexit
+import os
+import stat
+import tempfile
+import threading
+import time
+from contextlib import suppress
+from pathlib import Path
+from typing import Any
+
+GENEWEB_WRITE_BEHIND_ENV = "GENEWEB_WRITE_BEHIND_MS"
+
+_DEFAULT_MODE = 0o644
+
+
+def write_behind_delay() -> float:
+    """Délai du mode différé en secondes (0: synchronisation à chaque écriture)."""
+    try:
+        return max(0.0, float(os.getenv(GENEWEB_WRITE_BEHIND_ENV, "0")) / 1000)
+    except ValueError:
+        return 0.0
+
+
+def fsync_directory(directory: str | Path) -> None:
+    """Rend durable le renommage d'une entrée du répertoire (sans effet hors POSIX)."""
+    if os.name != "posix":  # pragma: no cover
+        return
+    fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+class _SyncBatcher:
+    """Répertoires en attente de `fsync` (renommages récents), synchronisés par un fil
+    d'arrière-plan."""
+
+    def __init__(self) -> None:
+        self._pending: dict[Path, None] = {}
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self.writes = 0
+        self.fsyncs = 0
+        self.flushes = 0
+
+    def record(self, fsyncs: int) -> None:
+        with self._lock:
+            self.writes += 1
+            self.fsyncs += fsyncs
+
+    def schedule(self, directory: Path, delay: float) -> None:
+        with self._lock:
+            self._pending[directory] = None
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, args=(delay,), name="geneweb-write-behind", daemon=True
+                )
+                self._thread.start()
+
+    def _run(self, delay: float) -> None:
+        while True:
+            time.sleep(delay)
+            if not self.flush():
+                with self._lock:
+                    if not self._pending:
+                        self._thread = None
+                        return
+
+    def flush(self) -> int:
+        """Synchronise les répertoires en attente; renvoie leur nombre."""
+        with self._lock:
+            pending, self._pending = list(self._pending), {}
+        if not pending:
+            return 0
+        for directory in pending:
+            with suppress(FileNotFoundError):
+                fsync_directory(directory)
+        with self._lock:
+            self.fsyncs += len(pending)
+            self.flushes += 1
+        return len(pending)
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "write_behind_ms": write_behind_delay() * 1000,
+                "writes": self.writes,
+                "fsyncs": self.fsyncs,
+                "flushes": self.flushes,
+                "pending": len(self._pending),
+            }
+
+
+_batcher = _SyncBatcher()
+atexit.register(_batcher.flush)
+
+
+def write_atomic(path: str | Path, data: bytes, *, sync: bool = True) -> None:
+    """Remplace `path` par `data` de façon atomique.
+
+    `sync=False` pour les fichiers dérivés (reconstructibles): renommage atomique sans
+    `fsync`. Sinon le contenu est synchronisé avant le renommage, et le répertoire
+    après, immédiatement ou en différé (mode write-behind).
+    Les permissions d'un fichier existant sont conservées.
+    """
+    path = Path(path)
+    try:
+        mode = stat.S_IMODE(path.stat().st_mode)
+    except FileNotFoundError:
+        mode = _DEFAULT_MODE
+    delay = write_behind_delay() if sync else 0.0
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as fh:
+            fh.write(data)
+            if sync:
+                fh.flush()
+                os.fsync(fh.fileno())
+        os.chmod(tmp, mode)
+        os.replace(tmp, path)
+    except BaseException:
+        with suppress(OSError):
+            os.unlink(tmp)
+        raise
+    if not sync:
+        _batcher.record(fsyncs=0)
+    elif delay:
+        _batcher.record(fsyncs=1)
+        _batcher.schedule(path.parent, delay)
+    else:
+        fsync_directory(path.parent)
+        _batcher.record(fsyncs=2)
+
+
+def flush() -> int:
+    """Synchronise immédiatement les écritures différées en attente."""
+    return _batcher.flush()
+
+
+def durable_snapshot() -> dict[str, Any]:
+    return _batcher.snapshot()
@@ -19,13 +19,24 @@ le portage; la prise en charge du format GWB natif sera ajoutée ensuite.
 
 from __future__ import annotations
 
-import json
 import unicodedata
+from collections.abc import Callable
+from dataclasses import dataclass
 from datetime import date
+from functools import partial
 from pathlib import Path
-from typing import Iterable, List
+from typing import TYPE_CHECKING, Iterable, List
 
 from geneweb.domain.models import Famille, Individu, Sexe, Source
+from geneweb.domain.table import BaseTable, IdMap
+from geneweb.io import codec, durable
+from geneweb.io.native import NativeBase
+from geneweb.io.packed import is_packed, read_packed, remove_packed, write_packed
+from geneweb.io.revision import bump_revision
+from geneweb.io.shards import read_shards, remove_shards, shard_count, write_shards
+
+if TYPE_CHECKING:
+    from geneweb.io.storage import StorageKind
 
 
 def _parse_sexe(value: object) -> Sexe | None:
@@ -72,7 +83,88 @@ def _normalize_unicode(value: str | None) -> str | None:
     return unicodedata.normalize("NFC", value)
 
 
-def load_gwb_minimal(root_dir: str | Path) -> tuple[List[Individu], List[Famille], List[Source]]:
+def _same(value: str) -> str:
+    return value
+
+
+class StringPool:
+    """Pool de chaînes d'une base pour le chargement interné (`load_gwb_minimal(strings=...)`).
+
+    Noms, lieux et notes se répètent beaucoup dans une base: chaque valeur distincte
+    n'est normalisée en NFC qu'une fois et partagée par tous les enregistrements.
+    `ids` associe à chaque identifiant d'individu un entier dense (ordre de la base).
+    """
+
+    def __init__(self) -> None:
+        self._strings: dict[str, str] = {}
+        self._normalized: dict[str, str] = {}
+        self._dates: dict[str, date | None] = {}
+        self.ids = IdMap()
+
+    def __len__(self) -> int:
+        return len(self._strings)
+
+    def intern(self, value: str) -> str:
+        return self._strings.setdefault(value, value)
+
+    def normalize(self, value: str | None) -> str | None:
+        """`_normalize_unicode` mis en cache par chaîne distincte."""
+        if value is None:
+            return None
+        try:
+            return self._normalized[value]
+        except KeyError:
+            normalized = self._normalized[value] = self.intern(unicodedata.normalize("NFC", value))
+            return normalized
+
+    def date(self, value: object) -> date | None:
+        if not isinstance(value, str):
+            return None
+        try:
+            return self._dates[value]
+        except KeyError:
+            parsed = self._dates[value] = _parse_date_iso(value)
+            return parsed
+
+    def person_id(self, value: str) -> str:
+        value = self._strings.setdefault(value, value)
+        self.ids.add(value)
+        return value
+
+
+def _storage_kind(root_path: Path) -> StorageKind:
+    # Import local: `storage` s'appuie sur ce module. Même précédence que `open_storage`
+    # (SQLite d'abord): un chargement lit ce que les écrivains modifient
+    from geneweb.io.storage import storage_kind
+
+    return storage_kind(root_path)
+
+
+def _load_sqlite(
+    root_path: Path, strings: StringPool | None = None
+) -> tuple[list[Individu], list[Famille], list[Source]]:
+    from geneweb.io.storage import SqliteStorage
+
+    with SqliteStorage(root_path) as sqlite_base:
+        return sqlite_base.load(strings=strings)
+
+
+def _save_sqlite(
+    root_path: Path, individus: Iterable[Individu], familles: Iterable[Famille], sources: Iterable[Source] | None
+) -> None:
+    from geneweb.io.storage import SqliteStorage
+
+    with SqliteStorage(root_path) as sqlite_base:
+        sqlite_base.save(individus, familles, sources)
+
+
+def load_gwb_minimal(
+    root_dir: str | Path,
+    *,
+    strings: StringPool | None = None,
+    lazy: bool | None = None,
+    workers: int | None = None,
+) -> tuple[List[Individu], List[Famille], List[Source]]:
     """Charge les individus, familles et sources depuis `root_dir/index.json` (Issues #13, #23, #24, #25).
 
     Supporte deux formats pour rétrocompatibilité:
@@ -83,152 +175,237 @@ def load_gwb_minimal(root_dir: str | Path) -> tuple[List[Individu], List[Famille
     - Individus: id/nom/prenom/sexe + date_naissance/lieu_naissance/date_deces/lieu_deces + note/sources
     - Familles: id/pere_id/mere_id/enfants_ids + note/sources
     - Sources: id/titre/auteur/date_publication/url/fichier/note
+
+    Avec `strings` (mode interné), chaînes, identifiants et dates passent par le pool de
+    la base: une seule instance par valeur distincte, normalisée une seule fois, et les
+    identifiants d'individus reçoivent un entier dense (`strings.ids`).
+
+    Avec `lazy` (défaut: `GENEWEB_LAZY_LOAD`, sans `strings`), individus et familles
+    ne décodent leurs champs qu'au premier accès (`geneweb.io.lazy`).
+
+    Avec `workers` > 1 (défaut: 1; les chargements en masse passent `load_workers()`,
+    soit `GENEWEB_LOAD_WORKERS`), le décodage d'un gros `index.json` est réparti sur
+    autant de processus (`geneweb.io.parallel`).
     """
+    # Imports locaux: `lazy` et `parallel` s'appuient sur ce module
+    from geneweb.io.lazy import lazy_enabled, parse_lazy
+    from geneweb.io.parallel import load_index_parallel
+
+    if lazy is None:
+        lazy = strings is None and lazy_enabled()
+    elif lazy and strings is not None:
+        raise ValueError("Chargement paresseux et interné incompatibles")
+    parse = parse_lazy if lazy else partial(parse_gwb_data, strings=strings)
 
     root_path = Path(root_dir)
     index_path = root_path / "index.json"
+    kind = _storage_kind(root_path)
+    if kind == "sqlite":
+        # Base convertie au stockage SQLite (`geneweb.io.storage`)
+        return _load_sqlite(root_path, strings)
+    if kind == "sharded":
+        # Base découpée en fragments (`geneweb.io.shards`), lus en parallèle
+        return parse(read_shards(root_path))
+    if kind == "packed":
+        # Conteneur compressé par blocs (`geneweb.io.packed`)
+        return parse(read_packed(root_path))
+    if kind == "native":
+        # Base GeneWeb native (OCaml), lue directement (`geneweb.io.native`)
+        with NativeBase(root_path) as native:
+            individus, familles = native.load()
+        if strings is not None:
+            for ind in individus:
+                ind.id = strings.person_id(ind.id)
+        return individus, familles, []
     if not index_path.exists():
         raise FileNotFoundError(f"Index GWB minimal introuvable: {index_path}")
 
-    data = json.loads(index_path.read_text(encoding="utf-8"))
+    if not lazy and workers is not None and workers > 1:
+        return load_index_parallel(index_path, workers=workers, strings=strings)
+    return parse(codec.loads(index_path.read_bytes()))
+
 
+@dataclass(frozen=True)
+class _Decoders:
+    """Conversions des champs d'un index: directes, ou par le pool de chaînes d'une base."""
+
+    normalize: Callable[[str | None], str | None]
+    parse_date: Callable[[object], date | None]
+    ident: Callable[[str], str]
+    person_id: Callable[[str], str]
+
+    @classmethod
+    def of(cls, strings: StringPool | None) -> _Decoders:
+        if strings is None:
+            return cls(_normalize_unicode, _parse_date_iso, _same, _same)
+        return cls(strings.normalize, strings.date, strings.intern, strings.person_id)
+
+    def refs(self, value: object) -> list[str] | tuple[()]:
+        """Liste de références (sources) nettoyée; () si vide ou invalide."""
+        if not isinstance(value, list):
+            return ()
+        return [self.ident(str(ref).strip()) for ref in value if ref] or ()
+
+
+def _parse_individus(items: Iterable[object], dec: _Decoders) -> list[Individu]:
+    normalize, parse_date, refs = dec.normalize, dec.parse_date, dec.refs
     individus: list[Individu] = []
+    for item in items:
+        if not isinstance(item, dict):
+            continue
+        iid = str(item.get("id", "")).strip()
+        if not iid:
+            continue
+        individus.append(
+            Individu(
+                id=dec.person_id(iid),
+                nom=normalize(item.get("nom")),
+                prenom=normalize(item.get("prenom")),
+                sexe=_parse_sexe(item.get("sexe")),
+                date_naissance=parse_date(item.get("date_naissance")),
+                lieu_naissance=normalize(item.get("lieu_naissance")),
+                date_deces=parse_date(item.get("date_deces")),
+                lieu_deces=normalize(item.get("lieu_deces")),
+                # Notes et sources (Issue #25)
+                note=normalize(item.get("note")),
+                sources=refs(item.get("sources", [])),
+            )
+        )
+    return individus
+
+
+def _parse_familles(items: Iterable[object], dec: _Decoders) -> list[Famille]:
+    """Familles (Issue #24)."""
     familles: list[Famille] = []
+    for item in items:
+        if not isinstance(item, dict):
+            continue
+        fid = str(item.get("id", "")).strip()
+        if not fid:
+            continue
+        pere_id = item.get("pere_id")
+        mere_id = item.get("mere_id")
+        enfants_ids = item.get("enfants_ids", [])
+        if not isinstance(enfants_ids, list):
+            enfants_ids = []
+        familles.append(
+            Famille(
+                id=dec.ident(fid),
+                pere_id=dec.ident(pere_id) if pere_id else None,
+                mere_id=dec.ident(mere_id) if mere_id else None,
+                # IDs d'enfants convertis en str, vides enlevés
+                enfants_ids=[dec.ident(str(eid).strip()) for eid in enfants_ids if eid and str(eid).strip()],
+                note=item.get("note"),
+                sources=dec.refs(item.get("sources", [])),
+            )
+        )
+    return familles
+
+
+def _parse_sources(items: Iterable[object], dec: _Decoders) -> list[Source]:
+    """Sources (Issue #25)."""
+    normalize, parse_date = dec.normalize, dec.parse_date
     sources: list[Source] = []
+    for item in items:
+        if not isinstance(item, dict):
+            continue
+        sid = str(item.get("id", "")).strip()
+        if not sid:
+            continue
+        sources.append(
+            Source(
+                id=dec.ident(sid),
+                titre=normalize(item.get("titre")),
+                auteur=normalize(item.get("auteur")),
+                date_publication=parse_date(item.get("date_publication")),
+                url=normalize(item.get("url")),
+                fichier=normalize(item.get("fichier")),
+                note=normalize(item.get("note")),
+            )
+        )
+    return sources
+
+
+def parse_gwb_data(
+    data: object, *, strings: StringPool | None = None
+) -> tuple[List[Individu], List[Famille], List[Source]]:
+    """Construit individus, familles et sources depuis le contenu décodé d'un index GWB.
 
+    Mêmes formats et mêmes règles que `load_gwb_minimal`.
+    """
+    dec = _Decoders.of(strings)
     # Détecter le format (rétrocompatibilité)
     if isinstance(data, list):
         # Format ancien (liste simple d'individus)
-        for item in data:
-            if not isinstance(item, dict):
-                continue
-            iid = str(item.get("id", "")).strip()
-            if not iid:
-                continue
-            nom = _normalize_unicode(item.get("nom"))
-            prenom = _normalize_unicode(item.get("prenom"))
-            sexe = _parse_sexe(item.get("sexe"))
-            date_naissance = _parse_date_iso(item.get("date_naissance"))
-            lieu_naissance = _normalize_unicode(item.get("lieu_naissance"))
-            date_deces = _parse_date_iso(item.get("date_deces"))
-            lieu_deces = _normalize_unicode(item.get("lieu_deces"))
-            # Notes et sources (Issue #25)
-            note = _normalize_unicode(item.get("note"))
-            sources_ids = item.get("sources", [])
-            if not isinstance(sources_ids, list):
-                sources_ids = []
-            individus.append(
-                Individu(
-                    id=iid,
-                    nom=nom,
-                    prenom=prenom,
-                    sexe=sexe,
-                    date_naissance=date_naissance,
-                    lieu_naissance=lieu_naissance,
-                    date_deces=date_deces,
-                    lieu_deces=lieu_deces,
-                    note=note,
-                    sources=[str(sid).strip() for sid in sources_ids if sid],
-                )
-            )
+        return _parse_individus(data, dec), [], []
+    if isinstance(data, dict):
+        # Format nouveau (objet avec individus, familles et sources)
+        return (
+            _parse_individus(data.get("individus", []), dec),
+            _parse_familles(data.get("familles", []), dec),
+            _parse_sources(data.get("sources", []), dec),
+        )
+    raise ValueError("index.json invalide: attendu une liste ou un objet")
+
+
+def load_gwb_table(root_dir: str | Path) -> BaseTable:
+    """Charge les colonnes de graphe de `root_dir/index.json` dans une `BaseTable`.
+
+    Mêmes règles de lecture que `load_gwb_minimal` (identifiants nettoyés, entrées sans
+    identifiant ignorées), mais sans construire d'`Individu`/`Famille`: seuls les
+    identifiants, le sexe, les dates et les liens sont conservés.
+    """
+    index_path = Path(root_dir) / "index.json"
+    kind = _storage_kind(Path(root_dir))
+    if kind == "sqlite":
+        individus, familles, _ = _load_sqlite(Path(root_dir))
+        return BaseTable.from_models(individus, familles)
+    if kind == "sharded":
+        data = read_shards(Path(root_dir))
+    elif kind == "packed":
+        data = read_packed(Path(root_dir))
+    elif kind == "native":
+        with NativeBase(Path(root_dir)) as native:
+            return BaseTable.from_models(*native.load())
+    elif not index_path.exists():
+        raise FileNotFoundError(f"Index GWB minimal introuvable: {index_path}")
+    else:
+        data = codec.loads(index_path.read_bytes())
+    if isinstance(data, list):
+        individus_data, familles_data = data, []
     elif isinstance(data, dict):
-        # Format nouveau (objet avec individus et familles)
-        individus_data = data.get("individus", [])
-        familles_data = data.get("familles", [])
-
-        # Parser les individus
-        for item in individus_data:
-            if not isinstance(item, dict):
-                continue
-            iid = str(item.get("id", "")).strip()
-            if not iid:
-                continue
-            nom = _normalize_unicode(item.get("nom"))
-            prenom = _normalize_unicode(item.get("prenom"))
-            sexe = _parse_sexe(item.get("sexe"))
-            date_naissance = _parse_date_iso(item.get("date_naissance"))
-            lieu_naissance = _normalize_unicode(item.get("lieu_naissance"))
-            date_deces = _parse_date_iso(item.get("date_deces"))
-            lieu_deces = _normalize_unicode(item.get("lieu_deces"))
-            # Notes et sources (Issue #25)
-            note = _normalize_unicode(item.get("note"))
-            sources_ids = item.get("sources", [])
-            if not isinstance(sources_ids, list):
-                sources_ids = []
-            individus.append(
-                Individu(
-                    id=iid,
-                    nom=nom,
-                    prenom=prenom,
-                    sexe=sexe,
-                    date_naissance=date_naissance,
-                    lieu_naissance=lieu_naissance,
-                    date_deces=date_deces,
-                    lieu_deces=lieu_deces,
-                    note=note,
-                    sources=[str(sid).strip() for sid in sources_ids if sid],
-                )
-            )
-
-        # Parser les familles (Issue #24)
-        for item in familles_data:
-            if not isinstance(item, dict):
-                continue
-            fid = str(item.get("id", "")).strip()
-            if not fid:
-                continue
-            pere_id = item.get("pere_id")
-            mere_id = item.get("mere_id")
-            enfants_ids = item.get("enfants_ids", [])
-            if not isinstance(enfants_ids, list):
-                enfants_ids = []
-            # Nettoyer les IDs d'enfants (convertir en str, enlever vides)
-            enfants_ids_clean = [str(eid).strip() for eid in enfants_ids if eid and str(eid).strip()]
-            # Notes et sources (Issue #25)
-            note = item.get("note")
-            sources_ids = item.get("sources", [])
-            if not isinstance(sources_ids, list):
-                sources_ids = []
-            familles.append(
-                Famille(
-                    id=fid,
-                    pere_id=pere_id if pere_id else None,
-                    mere_id=mere_id if mere_id else None,
-                    enfants_ids=enfants_ids_clean,
-                    note=note,
-                    sources=[str(sid).strip() for sid in sources_ids if sid],
-                )
-            )
-
-        # Parser les sources (Issue #25)
-        sources_data = data.get("sources", [])
-        for item in sources_data:
-            if not isinstance(item, dict):
-                continue
-            sid = str(item.get("id", "")).strip()
-            if not sid:
-                continue
-            titre = _normalize_unicode(item.get("titre"))
-            auteur = _normalize_unicode(item.get("auteur"))
-            date_publication = _parse_date_iso(item.get("date_publication"))
-            url = _normalize_unicode(item.get("url"))
-            fichier = _normalize_unicode(item.get("fichier"))
-            note = _normalize_unicode(item.get("note"))
-            sources.append(
-                Source(
-                    id=sid,
-                    titre=titre,
-                    auteur=auteur,
-                    date_publication=date_publication,
-                    url=url,
-                    fichier=fichier,
-                    note=note,
-                )
-            )
+        individus_data, familles_data = data.get("individus", []), data.get("familles", [])
     else:
         raise ValueError("index.json invalide: attendu une liste ou un objet")
 
-    return (individus, familles, sources)
+    table = BaseTable()
+    for item in individus_data:
+        if not isinstance(item, dict):
+            continue
+        iid = str(item.get("id", "")).strip()
+        if iid:
+            table.add_individu(
+                iid,
+                _parse_sexe(item.get("sexe")),
+                _parse_date_iso(item.get("date_naissance")),
+                _parse_date_iso(item.get("date_deces")),
+            )
+    for item in familles_data:
+        if not isinstance(item, dict):
+            continue
+        fid = str(item.get("id", "")).strip()
+        if not fid:
+            continue
+        enfants_ids = item.get("enfants_ids", [])
+        if not isinstance(enfants_ids, list):
+            enfants_ids = []
+        table.add_famille(
+            fid,
+            item.get("pere_id") or None,
+            item.get("mere_id") or None,
+            [str(eid).strip() for eid in enfants_ids if eid and str(eid).strip()],
+        )
+    return table
 
 
 def _serialize_sexe(sexe: Sexe | None) -> str | None:
@@ -243,6 +420,8 @@ def write_gwb_minimal(
     familles: Iterable[Famille],
     root_dir: str | Path,
     sources: Iterable[Source] | None = None,
+    shards: int | None = None,
+    packed: bool | None = None,
 ) -> None:
     """Écrit les individus, familles et sources dans `root_dir/index.json` (Issues #22, #23, #24, #25).
 
@@ -251,6 +430,14 @@ def write_gwb_minimal(
         familles: Liste de familles à écrire (avec métadonnées)
         root_dir: Répertoire GWB cible où créer index.json
         sources: Liste de sources à écrire (Issue #25, optionnel)
+        shards: Nombre de fragments (`geneweb.io.shards`); 0 pour un `index.json` unique,
+            None pour conserver la disposition actuelle de la base
+        packed: Conteneur compressé par blocs `base.gwbz` (`geneweb.io.packed`); None
+            pour le conserver si la base en a déjà un (sans `shards` explicite)
+
+    Une base SQLite (`base.sqlite`) est réécrite dans sa table, sauf disposition
+    explicite (`shards`/`packed`, conversion): un `index.json` écrit à côté serait
+    masqué par `base.sqlite` au chargement.
 
     Raises:
         OSError: Si le répertoire ne peut pas être créé ou le fichier écrit
@@ -261,6 +448,9 @@ def write_gwb_minimal(
         si des familles ou sources sont présentes, sinon format simple pour rétrocompatibilité.
     """
     root_path = Path(root_dir)
+    if shards is None and packed is None and _storage_kind(root_path) == "sqlite":
+        _save_sqlite(root_path, individus, familles, sources)
+        return
     # Créer le répertoire s'il n'existe pas
     root_path.mkdir(parents=True, exist_ok=True)
 
@@ -368,9 +558,29 @@ def write_gwb_minimal(
         # Format simple (rétrocompatibilité) : liste d'individus uniquement
         output_data = individus_data
 
-    # Écrire le fichier JSON
-    index_path.write_text(
-        json.dumps(output_data, ensure_ascii=False, indent=2), encoding="utf-8"
-    )
+    if packed is None:
+        packed = shards is None and is_packed(root_path) and not index_path.exists()
+    if shards is None:
+        shards = shard_count(root_path)
+    if packed:
+        # Conteneur compressé: un seul fichier, réécrit en entier
+        write_packed(
+            root_path, {"individus": individus_data, "familles": familles_data, "sources": sources_data}
+        )
+        if index_path.exists():
+            index_path.unlink()
+        remove_shards(root_path)
+    elif shards:
+        # Base fragmentée: seuls les fragments dont le contenu change sont réécrits
+        write_shards(root_path, individus_data, familles_data, sources_data, shards)
+        if index_path.exists():
+            index_path.unlink()
+        remove_packed(root_path)
+    else:
+        # Écrire le fichier JSON
+        durable.write_atomic(index_path, codec.dumps_file(output_data))
+        remove_shards(root_path)
+        remove_packed(root_path)
+    bump_revision(root_path)
 
 
@@ -0,0 +1,182 @@
+"""Chargement paresseux des bases GWB minimales.
+
+`load_gwb_minimal(..., lazy=True)` (ou `GENEWEB_LAZY_LOAD=1`) ne construit que des
+enveloppes autour des enregistrements JSON décodés: seul l'identifiant est lu au
+chargement. Chaque champ (normalisation Unicode, `date.fromisoformat`, sexe, sources)
+est décodé au premier accès puis conservé dans l'objet.
+
+`LazyIndividu` et `LazyFamille` sont des sous-classes d'`Individu` et `Famille`:
+`isinstance`, l'égalité avec un objet chargé normalement, `dataclasses.fields`/
+`asdict`/`replace`, la copie et le pickle se comportent comme pour les modèles. Les
+listes renvoyées sont de vraies listes.
+
+Un service qui ne lit que quelques champs de quelques individus (routes gwd) évite
+ainsi l'essentiel du décodage; en contrepartie, les enregistrements bruts restent en
+mémoire tant que l'objet n'est pas entièrement décodé.
+"""
+
+from __future__ import annotations
+
+import os
+from collections.abc import Callable
+from dataclasses import fields
+from typing import Any
+
+from geneweb.domain.models import Famille, Individu, Source
+from geneweb.io.gwb import _normalize_unicode, _parse_date_iso, _parse_sexe, parse_gwb_data
+
+GENEWEB_LAZY_LOAD_ENV = "GENEWEB_LAZY_LOAD"
+
+Raw = dict[str, Any]
+
+
+def lazy_enabled() -> bool:
+    return os.getenv(GENEWEB_LAZY_LOAD_ENV, "").lower() in ("1", "true", "yes")
+
+
+def _lazy_field(cls: type, name: str, decode: Callable[[Raw], Any]) -> property:
+    """Champ décodé depuis `_raw` au premier accès, puis stocké dans le slot du modèle."""
+    slot = cls.__dict__[name]
+
+    def get(self: Any) -> Any:
+        try:
+            return slot.__get__(self, cls)
+        except AttributeError:
+            value = decode(self._raw)
+            slot.__set__(self, value)
+            return value
+
+    def set_(self: Any, value: Any) -> None:
+        slot.__set__(self, value)
+
+    return property(get, set_, doc=f"{cls.__name__}.{name} (décodé à la demande)")
+
+
+def _ref_list(value: object) -> list[str] | tuple[()]:
+    if not isinstance(value, list):
+        return ()
+    return [str(sid).strip() for sid in value if sid] or ()
+
+
+def _as_model(obj: Any, model: type) -> tuple[Any, ...]:
+    return tuple(getattr(obj, f.name) for f in fields(model))
+
+
+class _LazyModel:
+    __slots__ = ()
+
+    _model: type
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, self._model):
+            return _as_model(self, self._model) == _as_model(other, self._model)
+        return NotImplemented
+
+    __hash__ = None  # type: ignore[assignment]
+
+
+def _text(key: str) -> Callable[[Raw], Any]:
+    return lambda raw: _normalize_unicode(raw.get(key))
+
+
+def _iso_date(key: str) -> Callable[[Raw], Any]:
+    return lambda raw: _parse_date_iso(raw.get(key))
+
+
+def _enfants(raw: Raw) -> list[str]:
+    enfants_ids = raw.get("enfants_ids", [])
+    if not isinstance(enfants_ids, list):
+        return []
+    return [str(eid).strip() for eid in enfants_ids if eid and str(eid).strip()]
+
+
+# Mêmes règles que `parse_gwb_data`, champ par champ
+_INDIVIDU_DECODERS: dict[str, Callable[[Raw], Any]] = {
+    "nom": _text("nom"),
+    "prenom": _text("prenom"),
+    "sexe": lambda raw: _parse_sexe(raw.get("sexe")),
+    "date_naissance": _iso_date("date_naissance"),
+    "lieu_naissance": _text("lieu_naissance"),
+    "date_deces": _iso_date("date_deces"),
+    "lieu_deces": _text("lieu_deces"),
+    "note": _text("note"),
+    "sources": lambda raw: _ref_list(raw.get("sources", [])),
+}
+_FAMILLE_DECODERS: dict[str, Callable[[Raw], Any]] = {
+    "pere_id": lambda raw: raw.get("pere_id") or None,
+    "mere_id": lambda raw: raw.get("mere_id") or None,
+    "enfants_ids": _enfants,
+    # Note de famille non normalisée, comme le chargement complet
+    "note": lambda raw: raw.get("note"),
+    "sources": lambda raw: _ref_list(raw.get("sources", [])),
+}
+
+
+class LazyIndividu(_LazyModel, Individu):
+    """`Individu` dont les champs sont décodés depuis l'enregistrement JSON à la demande."""
+
+    __slots__ = ("_raw",)
+
+    _raw: Raw
+    _model = Individu
+
+    @classmethod
+    def from_raw(cls, iid: str, raw: Raw) -> LazyIndividu:
+        ind = cls.__new__(cls)
+        ind._raw = raw
+        ind.id = iid
+        ind.famille_enfance_id = None
+        ind.famille_adultes = ()
+        return ind
+
+
+class LazyFamille(_LazyModel, Famille):
+    """`Famille` dont les champs sont décodés depuis l'enregistrement JSON à la demande."""
+
+    __slots__ = ("_raw",)
+
+    _raw: Raw
+    _model = Famille
+
+    @classmethod
+    def from_raw(cls, fid: str, raw: Raw) -> LazyFamille:
+        fam = cls.__new__(cls)
+        fam._raw = raw
+        fam.id = fid
+        fam.evenements = ()
+        return fam
+
+
+for _name, _decode in _INDIVIDU_DECODERS.items():
+    setattr(LazyIndividu, _name, _lazy_field(Individu, _name, _decode))
+for _name, _decode in _FAMILLE_DECODERS.items():
+    setattr(LazyFamille, _name, _lazy_field(Famille, _name, _decode))
+
+
+def parse_lazy(data: object) -> tuple[list[Individu], list[Famille], list[Source]]:
+    """Équivalent paresseux de `parse_gwb_data` (les sources, peu nombreuses, sont décodées)."""
+    if isinstance(data, list):
+        individus_data, familles_data, sources_data = data, [], []
+    elif isinstance(data, dict):
+        individus_data = data.get("individus", [])
+        familles_data = data.get("familles", [])
+        sources_data = data.get("sources", [])
+    else:
+        raise ValueError("index.json invalide: attendu une liste ou un objet")
+
+    individus: list[Individu] = []
+    for item in individus_data:
+        if not isinstance(item, dict):
+            continue
+        iid = str(item.get("id", "")).strip()
+        if iid:
+            individus.append(LazyIndividu.from_raw(iid, item))
+    familles: list[Famille] = []
+    for item in familles_data:
+        if not isinstance(item, dict):
+            continue
+        fid = str(item.get("id", "")).strip()
+        if fid:
+            familles.append(LazyFamille.from_raw(fid, item))
+    _, _, sources = parse_gwb_data({"sources": sources_data})
+    return individus, familles, sources
@@ -0,0 +1,428 @@
+"""Lecture directe des bases GeneWeb natives (OCaml, `gwc`), sans conversion.
+
+Une base native (`X.gwb/`) range ses tableaux dans le fichier `base`, chaque élément
+au format de sérialisation OCaml (`Iovalue`, encodage d'`output_value` sans
+en-tête), et leurs positions dans `base.acc` (entiers 32 bits gros-boutistes):
+
+- en-tête de `base`: `GnWb0024`, nombres d'individus, de familles et de chaînes,
+  puis position de chacun des tableaux `persons`, `ascends`, `unions`, `families`,
+  `couples`, `descends`, `strings`;
+- `base.acc`: positions des éléments de ces tableaux, dans le même ordre.
+
+`NativeBase` projette les deux fichiers en mémoire et expose `persons`, `families`
+et `strings` comme séquences paresseuses en lecture seule: un élément n'est décodé
+qu'à l'accès (quelques lectures aléatoires), converti vers `Individu`/`Famille`
+(identifiants `I<iper>`/`F<ifam>`). Conversion des champs:
+
+- dates: seules les dates grégoriennes sûres et complètes deviennent des `date`
+  (les dates approximatives, partielles, textuelles ou d'un autre calendrier n'ont
+  pas d'équivalent dans le modèle et sont ignorées);
+- notes: `notes` (individu) et `comment` (famille); sources: non reprises (texte libre
+  côté OCaml, identifiants côté Python).
+
+Non pris en charge: les autres versions du format (`GnWb0020` à `GnWb0023`), les
+index de noms (`names.inx`, `snames.inx`, `fnames.inx`: la recherche parcourt les
+individus) et les modifications en attente de `gwd` (fichier `patches`: la base est
+refusée plutôt que servie sans elles, la recompiler avec `gwu`/`gwc`).
+"""
+
+from __future__ import annotations
+
+import mmap
+import os
+import struct
+from collections import OrderedDict
+from collections.abc import Callable, Iterator, Sequence
+from contextlib import suppress
+from datetime import date
+from functools import cached_property, lru_cache
+from pathlib import Path
+from typing import Any, TypeVar, overload
+
+from geneweb.domain.models import Famille, Individu, Sexe
+
+BASE_FILE = "base"
+ACCESS_FILE = "base.acc"
+PATCHES_FILE = "patches"
+# Index de noms construits par `gwc` (non lus ici)
+NAME_INDEX_FILES = ("names.inx", "names.acc", "snames.inx", "snames.dat", "fnames.inx", "fnames.dat", "strings.inx")
+# Fichiers de données d'une base native: les notes, images et autres fichiers n'en font pas partie
+DATA_FILES = (BASE_FILE, ACCESS_FILE, PATCHES_FILE, *NAME_INDEX_FILES)
+MAGIC = b"GnWb0024"
+
+ARRAYS = ("persons", "ascends", "unions", "families", "couples", "descends", "strings")
+
+T = TypeVar("T")
+
+_INT32 = struct.Struct(">i")
+
+# Codes du format de sérialisation OCaml (`intext.h`)
+_PREFIX_SMALL_BLOCK = 0x80
+_PREFIX_SMALL_INT = 0x40
+_PREFIX_SMALL_STRING = 0x20
+_CODE_INT64 = 0x03
+_CODE_SHARED8, _CODE_SHARED16, _CODE_SHARED32 = 0x04, 0x05, 0x06
+_CODE_BLOCK32 = 0x08
+_CODE_BLOCK64 = 0x13
+_CODE_STRING8 = 0x09
+_CODE_STRING32 = 0x0A
+
+# Champs des enregistrements OCaml (`Def.gen_person`, `Def.gen_family`) utilisés ici
+_P_FIRST_NAME, _P_SURNAME, _P_SEX = 0, 1, 13
+_P_BIRTH, _P_BIRTH_PLACE = 15, 16
+_P_DEATH, _P_DEATH_PLACE = 23, 24
+_P_NOTES = 32
+_F_COMMENT, _F_INDEX = 8, 11
+
+# Constructeurs constants de `Def.sex`
+_SEXES = (Sexe.M, Sexe.F, Sexe.X)
+
+# Étiquettes des constructeurs de `Adef.cdate`
+_CGREGORIAN, _CDATE = 0, 5
+
+# Familles supprimées par version du fichier `base` (chemin, inode, taille, mtime):
+# le décompte parcourt toutes les familles, une fois par version et par processus
+_DELETED_FAMILIES: OrderedDict[tuple[str, int, int, int], int] = OrderedDict()
+_DELETED_FAMILIES_MAX = 32
+
+
+def is_native(root: Path) -> bool:
+    return (root / BASE_FILE).is_file() and (root / ACCESS_FILE).is_file()
+
+
+def remove_native(root: Path) -> None:
+    """Supprime les fichiers de données d'une base native (pas `index.json`, ni les notes)."""
+    for name in DATA_FILES:
+        with suppress(FileNotFoundError):
+            (root / name).unlink()
+
+
+class _Decoder:
+    """Décodeur du format de sérialisation OCaml (entiers, blocs, chaînes, partage).
+
+    Les blocs deviennent des `Block` (étiquette et champs), les chaînes des `str`
+    (UTF-8, octets invalides remplacés). Chaque code de sérialisation a son lecteur
+    (`_READERS`, indexé par l'octet de code).
+    """
+
+    def __init__(self, data: bytes | mmap.mmap, pos: int) -> None:
+        self.data = data
+        self.pos = pos
+        self.objects: list[Any] = []
+
+    def _take(self, n: int) -> bytes:
+        start = self.pos
+        self.pos += n
+        if self.pos > len(self.data):
+            raise ValueError("Valeur OCaml tronquée")
+        return self.data[start:self.pos]
+
+    def _int(self, n: int) -> int:
+        return int.from_bytes(self._take(n), "big", signed=True)
+
+    def _string(self, n: int) -> str:
+        value = self._take(n).decode("utf-8", errors="replace")
+        self.objects.append(value)
+        return value
+
+    def _block(self, tag: int, size: int) -> Any:
+        if size == 0:
+            return Block(tag, ())
+        block = Block(tag, [])
+        self.objects.append(block)
+        for _ in range(size):
+            block.fields.append(self.read())
+        block.fields = tuple(block.fields)
+        return block
+
+    def read(self) -> Any:
+        pos = self.pos
+        if pos >= len(self.data):
+            raise ValueError("Valeur OCaml tronquée")
+        code = self.data[pos]
+        self.pos = pos + 1
+        if _PREFIX_SMALL_INT <= code < _PREFIX_SMALL_BLOCK:
+            # Petit entier: le cas le plus fréquent, sans appel de lecteur
+            return code & 0x3F
+        return _READERS[code](self, code)
+
+    # --- Lecteurs par code ---
+
+    def _small_block(self, code: int) -> Any:
+        return self._block(code & 0x0F, (code >> 4) & 0x07)
+
+    def _small_int(self, code: int) -> int:
+        return code & 0x3F
+
+    def _small_string(self, code: int) -> str:
+        return self._string(code & 0x1F)
+
+    def _sized_int(self, code: int) -> int:
+        return self._int((1, 2, 4, 8)[code])
+
+    def _shared(self, code: int) -> Any:
+        # Partage: distance (non signée) vers un objet déjà décodé
+        distance = int.from_bytes(self._take((1, 2, 4)[code - _CODE_SHARED8]), "big")
+        return self.objects[len(self.objects) - distance]
+
+    def _block32(self, _code: int) -> Any:
+        header = self._int(4) & 0xFFFFFFFF
+        return self._block(header & 0xFF, header >> 10)
+
+    def _block64(self, _code: int) -> Any:
+        header = self._int(8) & 0xFFFFFFFFFFFFFFFF
+        return self._block(header & 0xFF, header >> 10)
+
+    def _string8(self, _code: int) -> str:
+        return self._string(self._take(1)[0])
+
+    def _string32(self, _code: int) -> str:
+        return self._string(self._int(4) & 0xFFFFFFFF)
+
+    def _unsupported(self, code: int) -> Any:
+        raise ValueError(f"Code de sérialisation OCaml non pris en charge: {code:#x}")
+
+
+def _reader_table() -> tuple[Callable[[_Decoder, int], Any], ...]:
+    table: list[Callable[[_Decoder, int], Any]] = [_Decoder._unsupported] * 256
+    for code in range(_CODE_INT64 + 1):
+        table[code] = _Decoder._sized_int
+    for code in (_CODE_SHARED8, _CODE_SHARED16, _CODE_SHARED32):
+        table[code] = _Decoder._shared
+    table[_CODE_BLOCK32] = _Decoder._block32
+    table[_CODE_BLOCK64] = _Decoder._block64
+    table[_CODE_STRING8] = _Decoder._string8
+    table[_CODE_STRING32] = _Decoder._string32
+    for code in range(_PREFIX_SMALL_STRING, _PREFIX_SMALL_INT):
+        table[code] = _Decoder._small_string
+    for code in range(_PREFIX_SMALL_INT, _PREFIX_SMALL_BLOCK):
+        table[code] = _Decoder._small_int
+    for code in range(_PREFIX_SMALL_BLOCK, 256):
+        table[code] = _Decoder._small_block
+    return tuple(table)
+
+
+_READERS = _reader_table()
+
+
+class Block:
+    """Bloc OCaml décodé: enregistrement, constructeur non constant, tableau."""
+
+    __slots__ = ("tag", "fields")
+
+    def __init__(self, tag: int, fields: Any) -> None:
+        self.tag = tag
+        self.fields = fields
+
+    def __getitem__(self, k: int) -> Any:
+        return self.fields[k]
+
+    def __len__(self) -> int:
+        return len(self.fields)
+
+    def __repr__(self) -> str:
+        return f"Block({self.tag}, {self.fields!r})"
+
+
+def _decompress_date(value: int) -> date | None:
+    """Date grégorienne compressée (`Adef.Cgregorian`), si sûre et complète."""
+    year = value % 2500
+    value //= 2500
+    month = value % 13
+    value //= 13
+    day = value % 32
+    precision = value // 32
+    if precision != 0 or not (day and month and year):
+        return None
+    try:
+        return date(year, month, day)
+    except ValueError:
+        return None
+
+
+def _cdate(value: Any) -> date | None:
+    # Constructeur constant: `Cnone`; `Cgregorian` (étiquette 0), `Cdate` (étiquette 5)
+    if not isinstance(value, Block):
+        return None
+    if value.tag == _CGREGORIAN:
+        return _decompress_date(value[0])
+    if value.tag == _CDATE:
+        dgreg = value[0]
+        # `Dgreg (dmy, Dgregorian)` avec `prec = Sure`, `delta = 0`
+        if isinstance(dgreg, Block) and dgreg.tag == 0 and dgreg[1] == 0:
+            day, month, year, prec, delta = dgreg[0].fields
+            if prec == 0 and delta == 0 and day and month and year > 0:
+                try:
+                    return date(year, month, day)
+                except ValueError:
+                    return None
+    return None
+
+
+class _Lazy(Sequence[T]):
+    """Séquence en lecture seule dont chaque élément est décodé à l'accès."""
+
+    def __init__(self, length: int, get: Callable[[int], T]) -> None:
+        self._length = length
+        self._get = get
+
+    def __len__(self) -> int:
+        return self._length
+
+    @overload
+    def __getitem__(self, k: int) -> T: ...
+
+    @overload
+    def __getitem__(self, k: slice) -> list[T]: ...
+
+    def __getitem__(self, k: int | slice) -> T | list[T]:
+        if isinstance(k, slice):
+            return [self._get(i) for i in range(*k.indices(self._length))]
+        if k < 0:
+            k += self._length
+        if not 0 <= k < self._length:
+            raise IndexError(k)
+        return self._get(k)
+
+    def __iter__(self) -> Iterator[T]:
+        return (self._get(k) for k in range(self._length))
+
+
+class NativeBase:
+    """Base GeneWeb native ouverte en lecture seule (fichiers projetés en mémoire)."""
+
+    def __init__(self, root: str | Path) -> None:
+        self.root = Path(root)
+        if (self.root / PATCHES_FILE).exists():
+            raise ValueError(
+                f"Base native avec modifications en attente ({PATCHES_FILE}): "
+                f"la recompiler (gwu puis gwc) avant de la lire: {self.root}"
+            )
+        self._files: list[mmap.mmap] = []
+        self._identities: dict[str, tuple[str, int, int, int]] = {}
+        self._base = self._map(BASE_FILE)
+        self._access = self._map(ACCESS_FILE)
+        if self._base[:len(MAGIC)] != MAGIC:
+            found = bytes(self._base[:len(MAGIC)])
+            self.close()
+            raise ValueError(f"Format de base native non pris en charge ({found!r}, attendu {MAGIC!r}): {self.root}")
+        # Les positions des 7 tableaux qui suivent sont inutiles: `base.acc` les donne par élément
+        n_persons, n_families, n_strings = struct.unpack_from(">3i", self._base, len(MAGIC))
+        lengths = {
+            "persons": n_persons, "ascends": n_persons, "unions": n_persons,
+            "families": n_families, "couples": n_families, "descends": n_families,
+            "strings": n_strings,
+        }
+        self.lengths = lengths
+        self._access_start: dict[str, int] = {}
+        start = 0
+        for name in ARRAYS:
+            self._access_start[name] = start
+            start += 4 * lengths[name]
+
+        self.value = lru_cache(maxsize=4096)(self._value)
+        self.string = lru_cache(maxsize=65536)(self._string)
+        self.strings: Sequence[str] = _Lazy(n_strings, self.string)
+        self.persons: Sequence[Individu] = _Lazy(n_persons, self.person)
+        self.families: Sequence[Famille] = _Lazy(n_families, self.family)
+
+    def _map(self, name: str) -> mmap.mmap:
+        with open(self.root / name, "rb") as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            st = os.fstat(f.fileno())
+        self._identities[name] = (str(self.root.resolve() / name), st.st_ino, st.st_size, st.st_mtime_ns)
+        self._files.append(mapped)
+        return mapped
+
+    def __enter__(self) -> NativeBase:
+        return self
+
+    def __exit__(self, *_exc: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        for mapped in self._files:
+            mapped.close()
+        self._files.clear()
+
+    # --- Accès bruts ---
+
+    def _value(self, array: str, k: int) -> Any:
+        """Élément `k` d'un tableau, décodé depuis sa position dans `base.acc`."""
+        if not 0 <= k < self.lengths[array]:
+            raise IndexError(f"{array}[{k}]")
+        (pos,) = _INT32.unpack_from(self._access, self._access_start[array] + 4 * k)
+        return _Decoder(self._base, pos).read()
+
+    def _string(self, istr: int) -> str:
+        value = self.value("strings", istr)
+        if not isinstance(value, str):
+            raise ValueError(f"strings[{istr}]: chaîne attendue, trouvé {type(value).__name__}")
+        return value
+
+    def _text(self, istr: int) -> str | None:
+        return self.string(istr) or None
+
+    # --- Modèles ---
+
+    def person(self, iper: int) -> Individu:
+        p = self.value("persons", iper)
+        ascend = self.value("ascends", iper)
+        union = self.value("unions", iper)
+        death = p[_P_DEATH]
+        parents = ascend[0]
+        return Individu(
+            id=f"I{iper}",
+            nom=self._text(p[_P_SURNAME]),
+            prenom=self._text(p[_P_FIRST_NAME]),
+            sexe=_SEXES[p[_P_SEX]] if isinstance(p[_P_SEX], int) and p[_P_SEX] < len(_SEXES) else None,
+            date_naissance=_cdate(p[_P_BIRTH]),
+            lieu_naissance=self._text(p[_P_BIRTH_PLACE]),
+            # `Death (raison, date)`: seul constructeur porteur d'une date
+            date_deces=_cdate(death[1]) if isinstance(death, Block) else None,
+            lieu_deces=self._text(p[_P_DEATH_PLACE]),
+            famille_enfance_id=f"F{parents[0]}" if isinstance(parents, Block) else None,
+            famille_adultes=[f"F{ifam}" for ifam in union[0]] or (),
+            note=self._text(p[_P_NOTES]),
+        )
+
+    def family(self, ifam: int) -> Famille:
+        f = self.value("families", ifam)
+        couple = self.value("couples", ifam)
+        descend = self.value("descends", ifam)
+        return Famille(
+            id=f"F{ifam}",
+            pere_id=f"I{couple[0]}",
+            mere_id=f"I{couple[1]}",
+            enfants_ids=[f"I{iper}" for iper in descend[0]],
+            note=self._text(f[_F_COMMENT]),
+        )
+
+    def family_deleted(self, ifam: int) -> bool:
+        """Famille supprimée dans la base (`fam_index` factice)."""
+        index = self.value("families", ifam)[_F_INDEX]
+        return isinstance(index, int) and index < 0
+
+    @cached_property
+    def deleted_families(self) -> int:
+        """Nombre de familles supprimées, compté une fois par version du fichier `base`."""
+        identity = self._identities[BASE_FILE]
+        count = _DELETED_FAMILIES.get(identity)
+        if count is None:
+            count = sum(self.family_deleted(ifam) for ifam in range(len(self.families)))
+            _DELETED_FAMILIES[identity] = count
+            while len(_DELETED_FAMILIES) > _DELETED_FAMILIES_MAX:
+                _DELETED_FAMILIES.popitem(last=False)
+        return count
+
+    def load(self) -> tuple[list[Individu], list[Famille]]:
+        """Individus et familles (hors familles supprimées), dans l'ordre de la base."""
+        familles = [self.family(ifam) for ifam in range(len(self.families)) if not self.family_deleted(ifam)]
+        return list(self.persons), familles
+
+
+def parse_native_id(ident: str, prefix: str) -> int | None:
+    """Indice OCaml d'un identifiant `I<iper>`/`F<ifam>` (None s'il n'en est pas un)."""
+    if not ident.startswith(prefix) or not ident[1:].isdigit():
+        return None
+    return int(ident[1:])
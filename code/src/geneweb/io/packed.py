@@ -0,0 +1,292 @@
+"""Conteneur compressé des bases GWB minimales (`base.gwbz`).
+
+Les enregistrements (mêmes objets JSON que dans `index.json`) sont regroupés, dans
+l'ordre de la base, en blocs de `block_size` enregistrements compressés
+indépendamment: zstd si le paquet `zstandard` est installé (extra `zstd`), zlib
+sinon. Disposition du fichier:
+
+- en-tête: `MAGIC` puis le nom de l'algorithme sur 4 octets (`zstd`, `zlib`);
+- blocs compressés (tableaux JSON compacts), individus, puis familles, puis sources;
+- tables d'identifiants, une par type et une pour les liens (familles de chaque
+  individu): couples (identifiant, position dans la base) triés, en blocs compressés
+  de `block_size` couples;
+- index compressé: format, taille des blocs, pour chaque type la liste des blocs
+  (décalage, longueur, effectif), pour chaque table l'effectif, la première clé et
+  l'emplacement de chaque bloc;
+- pied: décalage et longueur de l'index (`<QQ`) puis `MAGIC`.
+
+Ouvrir un conteneur ne décode que ce petit index (une entrée par bloc), quelle que
+soit la taille de la base. Une lecture ponctuelle (`PackedReader.find`) trouve par
+dichotomie sur les premières clés le bloc de table de l'identifiant, puis ne
+décompresse que ce bloc et celui de l'enregistrement; une lecture complète
+(`read_packed`, `PackedReader.scan`) décompresse les blocs un par un, les suivants
+étant lus et décompressés en avance dans un fil pendant le décodage du bloc courant. Le fichier est réécrit en entier
+(atomiquement) à chaque sauvegarde: un lecteur garde la version qu'il a ouverte.
+"""
+
+from __future__ import annotations
+
+import mmap
+import struct
+import zlib
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from collections.abc import Callable, Iterable, Iterator, Mapping, Sequence
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import suppress
+from pathlib import Path
+from typing import Any
+
+from geneweb.io import codec, durable
+
+PACKED_FILE = "base.gwbz"
+PACKED_FORMAT = "gwb-packed/2"
+MAGIC = b"GWBZ1\n"
+DEFAULT_BLOCK_SIZE = 512
+DEFAULT_READAHEAD = 2
+
+KINDS = ("individus", "familles", "sources")
+
+_HEADER = len(MAGIC) + 4
+_TRAILER = struct.Struct("<QQ")
+# Blocs décompressés gardés par un lecteur (lectures ponctuelles voisines)
+_CACHED_BLOCKS = 8
+
+
+def _zstd() -> Any:
+    import zstandard
+
+    return zstandard
+
+
+def default_compression() -> str:
+    try:
+        _zstd()
+    except ImportError:
+        return "zlib"
+    return "zstd"
+
+
+def _compressor(name: str) -> Callable[[bytes], bytes]:
+    if name == "zstd":
+        compress: Callable[[bytes], bytes] = _zstd().ZstdCompressor(level=3).compress
+        return compress
+    if name == "zlib":
+        return lambda data: zlib.compress(data, 6)
+    raise ValueError(f"Compression inconnue: {name} (attendu: zstd, zlib)")
+
+
+def _decompressor(name: str) -> Callable[[bytes], bytes]:
+    if name == "zstd":
+        try:
+            zstandard = _zstd()
+        except ImportError as e:
+            raise ImportError("Base compressée en zstd: installer l'extra `zstd` (paquet zstandard)") from e
+        # Un décompresseur par appel: les fils de lecture anticipée en utilisent un chacun
+        return lambda data: zstandard.ZstdDecompressor().decompress(data)
+    if name == "zlib":
+        return zlib.decompress
+    raise ValueError(f"Compression inconnue: {name}")
+
+
+def is_packed(root: Path) -> bool:
+    return (root / PACKED_FILE).exists()
+
+
+def remove_packed(root: Path) -> None:
+    with suppress(FileNotFoundError):
+        (root / PACKED_FILE).unlink()
+
+
+def write_packed(
+    root: Path,
+    data: Mapping[str, Sequence[dict[str, Any]]],
+    *,
+    block_size: int = DEFAULT_BLOCK_SIZE,
+    compression: str | None = None,
+) -> None:
+    """Écrit la base dans `root/base.gwbz` (remplacement atomique).
+
+    `data` a la forme renvoyée par `read_packed` (enregistrements par type de `KINDS`,
+    un type absent est vide).
+    """
+    if block_size < 1:
+        raise ValueError(f"Taille de bloc invalide: {block_size}")
+    compression = compression or default_compression()
+    compress = _compressor(compression)
+
+    parts = [MAGIC, compression.encode("ascii")]
+    offset = _HEADER
+    records_by_kind = {kind: data.get(kind, ()) for kind in KINDS}
+    blocks: dict[str, list[list[int]]] = {}
+    for kind, records in records_by_kind.items():
+        blocks[kind] = []
+        for start in range(0, len(records), block_size):
+            chunk = list(records[start:start + block_size])
+            payload = compress(codec.dumps(chunk))
+            blocks[kind].append([offset, len(payload), len(chunk)])
+            parts.append(payload)
+            offset += len(payload)
+
+    # Tables (identifiant, position): une par type, une pour les familles de chaque membre
+    pairs: dict[str, Iterable[tuple[str, int]]] = {
+        kind: [(item["id"], position) for position, item in enumerate(records)]
+        for kind, records in records_by_kind.items()
+    }
+    pairs["links"] = {
+        (member, position)
+        for position, item in enumerate(records_by_kind["familles"])
+        for member in (item.get("pere_id"), item.get("mere_id"), *item.get("enfants_ids", ()))
+        if member
+    }
+    tables: dict[str, dict[str, Any]] = {}
+    for name, table_pairs in pairs.items():
+        entries = sorted(table_pairs)
+        table: dict[str, Any] = {"count": len(entries), "first": [], "blocks": []}
+        for start in range(0, len(entries), block_size):
+            group = entries[start:start + block_size]
+            payload = compress(codec.dumps(group))
+            table["first"].append(group[0][0])
+            table["blocks"].append([offset, len(payload)])
+            parts.append(payload)
+            offset += len(payload)
+        tables[name] = table
+
+    index = compress(
+        codec.dumps({
+            "format": PACKED_FORMAT,
+            "block_size": block_size,
+            "blocks": blocks,
+            "tables": tables,
+        })
+    )
+    parts += [index, _TRAILER.pack(offset, len(index)), MAGIC]
+    durable.write_atomic(root / PACKED_FILE, b"".join(parts))
+
+
+class PackedReader:
+    """Lecture d'un conteneur `base.gwbz` (fichier projeté en mémoire).
+
+    `blocks_read` compte les blocs d'enregistrements décompressés (mesure des lectures
+    ponctuelles; les blocs de tables d'identifiants n'y figurent pas).
+    """
+
+    def __init__(self, root: Path) -> None:
+        self.path = root / PACKED_FILE
+        with open(self.path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        data = self._map
+        if data[:len(MAGIC)] != MAGIC or data[-len(MAGIC):] != MAGIC:
+            self.close()
+            raise ValueError(f"Conteneur compressé invalide: {self.path}")
+        self.compression = bytes(data[len(MAGIC):_HEADER]).decode("ascii")
+        self._decompress = _decompressor(self.compression)
+        index_offset, index_length = _TRAILER.unpack_from(data, len(data) - len(MAGIC) - _TRAILER.size)
+        index = codec.loads(self._decompress(data[index_offset:index_offset + index_length]))
+        if not isinstance(index, dict) or index.get("format") != PACKED_FORMAT:
+            self.close()
+            raise ValueError(f"Conteneur compressé invalide: {self.path}")
+        self.block_size: int = index["block_size"]
+        self.blocks: dict[str, list[list[int]]] = index["blocks"]
+        self._tables: dict[str, dict[str, Any]] = index["tables"]
+        self._table_cache: OrderedDict[tuple[str, int], list[list[Any]]] = OrderedDict()
+        self._cache: OrderedDict[tuple[str, int], list[dict[str, Any]]] = OrderedDict()
+        self.blocks_read = 0
+
+    def __enter__(self) -> PackedReader:
+        return self
+
+    def __exit__(self, *_exc: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._map.close()
+
+    @property
+    def counts(self) -> dict[str, int]:
+        return {kind: self._tables[kind]["count"] for kind in KINDS}
+
+    def _decode(self, kind: str, k: int) -> list[dict[str, Any]]:
+        offset, length, _ = self.blocks[kind][k]
+        records: list[dict[str, Any]] = codec.loads(self._decompress(self._map[offset:offset + length]))
+        self.blocks_read += 1
+        return records
+
+    def block(self, kind: str, k: int) -> list[dict[str, Any]]:
+        """Enregistrements du bloc `k` de `kind` (cache des derniers blocs lus)."""
+        key = (kind, k)
+        records = self._cache.get(key)
+        if records is None:
+            records = self._cache[key] = self._decode(kind, k)
+            if len(self._cache) > _CACHED_BLOCKS:
+                self._cache.popitem(last=False)
+        else:
+            self._cache.move_to_end(key)
+        return records
+
+    def scan(self, kind: str, readahead: int = DEFAULT_READAHEAD) -> Iterator[dict[str, Any]]:
+        """Enregistrements de `kind` dans l'ordre de la base, bloc par bloc.
+
+        Les `readahead` blocs suivants sont décompressés dans un fil pendant que
+        l'appelant consomme le bloc courant.
+        """
+        count = len(self.blocks[kind])
+        if readahead < 1 or count <= 1:
+            for k in range(count):
+                yield from self._decode(kind, k)
+            return
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            pending: list[Future[list[dict[str, Any]]]] = []
+            for k in range(min(readahead, count)):
+                pending.append(pool.submit(self._decode, kind, k))
+            for k in range(count):
+                records = pending.pop(0).result()
+                if k + readahead < count:
+                    pending.append(pool.submit(self._decode, kind, k + readahead))
+                yield from records
+
+    def read_all(self) -> dict[str, list[dict[str, Any]]]:
+        """Contenu complet, même forme que `index.json`."""
+        return {kind: list(self.scan(kind)) for kind in KINDS}
+
+    def _table_block(self, name: str, k: int) -> list[list[Any]]:
+        key = (name, k)
+        entries = self._table_cache.get(key)
+        if entries is None:
+            offset, length = self._tables[name]["blocks"][k]
+            entries = self._table_cache[key] = codec.loads(self._decompress(self._map[offset:offset + length]))
+            if len(self._table_cache) > _CACHED_BLOCKS:
+                self._table_cache.popitem(last=False)
+        else:
+            self._table_cache.move_to_end(key)
+        return entries
+
+    def _lookup(self, name: str, ident: str) -> list[int]:
+        # Les couples `ident` commencent dans le bloc qui précède la première clé
+        # `>= ident` et peuvent déborder sur les blocs qui commencent par `ident`
+        first = self._tables[name]["first"]
+        positions: list[int] = []
+        for k in range(max(bisect_left(first, ident) - 1, 0), bisect_right(first, ident)):
+            positions.extend(position for key, position in self._table_block(name, k) if key == ident)
+        return positions
+
+    def positions(self, kind: str, ident: str) -> list[int]:
+        """Positions des occurrences de `ident`, dans l'ordre de la base."""
+        return self._lookup(kind, ident)
+
+    def record(self, kind: str, position: int) -> dict[str, Any]:
+        return self.block(kind, position // self.block_size)[position % self.block_size]
+
+    def find(self, kind: str, ident: str) -> dict[str, Any] | None:
+        """Première occurrence de `ident`: un seul bloc décompressé."""
+        positions = self.positions(kind, ident)
+        return self.record(kind, positions[0]) if positions else None
+
+    def links(self, person_id: str) -> list[int]:
+        """Positions des familles (parent ou enfant) de l'individu, dans l'ordre de la base."""
+        return self._lookup("links", person_id)
+
+
+def read_packed(root: Path) -> dict[str, list[dict[str, Any]]]:
+    with PackedReader(root) as reader:
+        return reader.read_all()
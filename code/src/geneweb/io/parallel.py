@@ -0,0 +1,335 @@
+"""Décodage parallèle des gros `index.json` (chargements complets).
+
+`load_gwb_minimal(..., workers=N)` répartit le décodage d'un `index.json` d'au moins
+`PARALLEL_MIN_BYTES` octets sur un pool de processus (contexte `spawn`, sûr dans un
+serveur à fils), créé une fois et gardé pour la vie du processus. Le processus
+principal ne décode pas le JSON: il repère la structure du document (tableaux
+`individus`, `familles`, `sources`) et des points de coupe `}, {` entre
+enregistrements, puis chaque processus lit sa plage d'octets du fichier, la décode,
+applique les règles de `parse_gwb_data` et renvoie une forme compacte (`Chunk`)
+plutôt que des dataclasses sérialisées:
+
+- un tas de chaînes (une seule `str` et ses bornes), chaque valeur distincte de la
+  tranche n'y figurant qu'une fois;
+- une colonne `array('i')` par champ, indice dans le tas (-1 pour None, -2 et moins
+  pour les rares valeurs qui ne sont pas des chaînes, transmises telles quelles);
+- pour les listes (sources, enfants), des indices à plat et leurs décalages.
+
+Un point de coupe est vérifié par le décodage lui-même: une tranche qui commence sur
+une frontière d'enregistrement ne se décode que si elle finit sur une autre (hors
+chaîne, hors objet imbriqué). Si une tranche échoue ou si le fichier a été remplacé
+entre-temps, le chargement repart en séquentiel.
+
+Le processus principal reconstruit les modèles dans l'ordre de la base (chaînes et
+dates partagées par tranche, ou par le `StringPool` de l'appelant). Le nombre de
+processus est donné par l'appelant; `GENEWEB_LOAD_WORKERS` (`load_workers()`) n'est
+lu que par les chargements en masse (CLI, tâches de fond), pas par les routes.
+"""
+
+from __future__ import annotations
+
+import atexit
+import mmap
+import multiprocessing
+import os
+import re
+import threading
+from array import array
+from collections.abc import Sequence
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, fields
+from datetime import date
+from itertools import repeat
+from pathlib import Path
+from typing import Any
+
+from geneweb.domain.models import Famille, Individu, Sexe, Source
+from geneweb.io import codec
+from geneweb.io.gwb import StringPool, parse_gwb_data
+
+GENEWEB_LOAD_WORKERS_ENV = "GENEWEB_LOAD_WORKERS"
+
+# En deçà, le décodage séquentiel coûte moins que la répartition
+PARALLEL_MIN_BYTES = 32 * 1024 * 1024
+DEFAULT_CHUNK_BYTES = 8 * 1024 * 1024
+
+_KINDS = ("individus", "familles", "sources")
+
+# Champs de chaque type, dans l'ordre des colonnes; dates et sexe passent par le tas
+_FIELDS: dict[str, tuple[str, ...]] = {
+    "individus": ("id", "nom", "prenom", "sexe", "date_naissance", "lieu_naissance", "date_deces", "lieu_deces", "note"),
+    "familles": ("id", "pere_id", "mere_id", "note"),
+    "sources": ("id", "titre", "auteur", "date_publication", "url", "fichier", "note"),
+}
+_LISTS: dict[str, tuple[str, ...]] = {
+    "individus": ("sources",),
+    "familles": ("enfants_ids", "sources"),
+    "sources": (),
+}
+_DATES = frozenset({"date_naissance", "date_deces", "date_publication"})
+
+# Structure du document: début (objet ou liste), clé d'un tableau, fin d'un tableau
+_OBJECT_START = re.compile(rb"\s*\{")
+_LIST_START = re.compile(rb"\s*\[")
+_ARRAY_KEY = re.compile(rb'\s*"(individus|familles|sources)"\s*:\s*\[')
+_ARRAY_END = re.compile(rb'\]\s*(?:,(?=\s*"(?:individus|familles|sources)"\s*:\s*\[)|\}\s*\Z)')
+_RECORD_BOUNDARY = re.compile(rb"\}\s*,\s*\{")
+_BLANK = re.compile(rb"\s*\Z")
+_TRAILING_SPACE = frozenset(b" \t\r\n")
+
+
+def load_workers() -> int:
+    try:
+        return max(1, int(os.getenv(GENEWEB_LOAD_WORKERS_ENV, "") or 1))
+    except ValueError:
+        return 1
+
+
+@dataclass(frozen=True)
+class Chunk:
+    """Tranche décodée d'un tableau d'enregistrements, sous forme transférable."""
+
+    kind: str
+    count: int
+    heap: str
+    bounds: array[int]
+    columns: dict[str, array[int]]
+    lists: dict[str, tuple[array[int], array[int]]]
+    extras: tuple[Any, ...] = ()
+
+    def strings(self) -> list[str]:
+        bounds = self.bounds.tolist()
+        heap = self.heap
+        return [heap[bounds[k]:bounds[k + 1]] for k in range(len(bounds) - 1)]
+
+
+def _encode(kind: str, objects: Sequence[Any]) -> Chunk:
+    table: dict[str, int] = {}
+    parts: list[str] = []
+    extras: list[Any] = []
+
+    def ref(value: Any) -> int:
+        if value is None:
+            return -1
+        if isinstance(value, Sexe):
+            value = value.value
+        elif isinstance(value, date):
+            value = value.isoformat()
+        elif not isinstance(value, str):
+            # Valeur d'un autre type (identifiant entier...): hors du tas, telle quelle
+            extras.append(value)
+            return -1 - len(extras)
+        k = table.get(value)
+        if k is None:
+            k = table[value] = len(parts)
+            parts.append(value)
+        return k
+
+    columns = {name: array("i", [ref(getattr(obj, name)) for obj in objects]) for name in _FIELDS[kind]}
+    lists: dict[str, tuple[array[int], array[int]]] = {}
+    for name in _LISTS[kind]:
+        offsets, values = array("i", [0]), array("i")
+        for obj in objects:
+            values.extend(ref(v) for v in getattr(obj, name))
+            offsets.append(len(values))
+        lists[name] = (offsets, values)
+    bounds = array("q", [0])
+    for part in parts:
+        bounds.append(bounds[-1] + len(part))
+    return Chunk(kind, len(objects), "".join(parts), bounds, columns, lists, tuple(extras))
+
+
+def decode_chunk(kind: str, records: list[Any]) -> Chunk:
+    """Décode une tranche d'enregistrements bruts."""
+    # Résultat de `parse_gwb_data` dans l'ordre de `_KINDS`
+    return _encode(kind, parse_gwb_data({kind: records})[_KINDS.index(kind)])
+
+
+def decode_range(path: str, identity: tuple[int, int, int], kind: str, start: int, stop: int) -> Chunk | None:
+    """Décode les enregistrements `[start, stop)` du fichier (exécuté dans un processus du pool).
+
+    None si le fichier n'est plus celui découpé par l'appelant, ou si la plage ne
+    tombe pas sur des frontières d'enregistrements.
+    """
+    with open(path, "rb") as f:
+        if _identity(os.fstat(f.fileno())) != identity:
+            return None
+        f.seek(start)
+        raw = f.read(stop - start)
+    try:
+        records = codec.loads(b"[" + raw + b"]")
+    except ValueError:
+        return None
+    return decode_chunk(kind, records)
+
+
+def _identity(st: os.stat_result) -> tuple[int, int, int]:
+    return st.st_ino, st.st_size, st.st_mtime_ns
+
+
+def _arrays(data: Any) -> list[tuple[str, int, int]] | None:
+    """Plages `(nature, début, fin)` du contenu de chaque tableau, None si structure inattendue."""
+    list_start = _LIST_START.match(data)
+    if list_start is not None:
+        # Format ancien: une liste d'individus
+        stop = len(data)
+        while stop and data[stop - 1] in _TRAILING_SPACE:
+            stop -= 1
+        if stop <= list_start.end() or data[stop - 1] != ord("]"):
+            return None
+        return [("individus", list_start.end(), stop - 1)]
+    start = _OBJECT_START.match(data)
+    if start is None:
+        return None
+    arrays: list[tuple[str, int, int]] = []
+    position = start.end()
+    while True:
+        key = _ARRAY_KEY.match(data, position)
+        if key is None:
+            return None
+        kind = key.group(1).decode()
+        end = _ARRAY_END.search(data, key.end())
+        if end is None or any(kind == seen for seen, _, _ in arrays):
+            return None
+        arrays.append((kind, key.end(), end.start()))
+        if data[end.end() - 1] == ord("}"):
+            return arrays
+        position = end.end()
+
+
+def _split(data: Any, chunk_bytes: int) -> list[tuple[str, int, int]] | None:
+    """Tranches `(nature, début, fin)` d'environ `chunk_bytes` octets, coupées entre enregistrements."""
+    arrays = _arrays(data)
+    if arrays is None:
+        return None
+    tasks: list[tuple[str, int, int]] = []
+    for kind, start, stop in arrays:
+        if _BLANK.match(data, start, stop):
+            continue
+        while stop - start > chunk_bytes:
+            boundary = _RECORD_BOUNDARY.search(data, start + chunk_bytes, stop)
+            if boundary is None:
+                break
+            tasks.append((kind, start, boundary.start() + 1))
+            start = boundary.end() - 1
+        tasks.append((kind, start, stop))
+    return tasks
+
+
+_pool: ProcessPoolExecutor | None = None
+_pool_workers = 0
+_pool_lock = threading.Lock()
+
+
+def _executor(workers: int) -> ProcessPoolExecutor:
+    """Pool du processus, recréé seulement si le nombre de processus demandé change."""
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is None or _pool_workers != workers:
+            if _pool is not None:
+                _pool.shutdown(wait=False)
+            _pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+            _pool_workers = workers
+        return _pool
+
+
+@atexit.register
+def shutdown_pool() -> None:
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=True, cancel_futures=True)
+        _pool, _pool_workers = None, 0
+
+
+def _rebuild(chunk: Chunk, strings: StringPool | None, dates: dict[str, date]) -> list[Any]:
+    table = chunk.strings()
+    if strings is not None:
+        table = [strings.intern(s) for s in table]
+    extras = chunk.extras
+
+    def cached_date(s: str) -> date | None:
+        value = dates.get(s)
+        if value is None:
+            value = dates[s] = date.fromisoformat(s)
+        return value
+
+    # Avec un pool, dates partagées avec celui de l'appelant
+    as_date = cached_date if strings is None else strings.date
+
+    def value(k: int) -> Any:
+        if k >= 0:
+            return table[k]
+        return None if k == -1 else extras[-2 - k]
+
+    def column(name: str) -> list[Any]:
+        refs = chunk.columns[name].tolist()
+        if name in _DATES:
+            return [as_date(table[k]) if k >= 0 else None for k in refs]
+        if name == "sexe":
+            return [Sexe(table[k]) if k >= 0 else None for k in refs]
+        return [value(k) for k in refs]
+
+    def list_column(name: str) -> list[Any]:
+        offsets, refs = (values.tolist() for values in chunk.lists[name])
+        lists = [[value(k) for k in refs[offsets[j]:offsets[j + 1]]] for j in range(chunk.count)]
+        # Le chargement séquentiel garde les listes d'enfants vides, pas celles de sources
+        return lists if name == "enfants_ids" else [values or () for values in lists]
+
+    model: Any = {"individus": Individu, "familles": Famille, "sources": Source}[chunk.kind]
+    values = {name: column(name) for name in _FIELDS[chunk.kind]}
+    values.update((name, list_column(name)) for name in _LISTS[chunk.kind])
+    # Arguments positionnels dans l'ordre des champs du modèle (défauts pour les autres)
+    args = [values[f.name] if f.name in values else repeat(f.default, chunk.count) for f in fields(model)]
+    objects = [model(*row) for row in zip(*args, strict=True)]
+    if strings is not None and chunk.kind == "individus":
+        for ind in objects:
+            ind.id = strings.person_id(ind.id)
+    return objects
+
+
+def load_index_parallel(
+    index_path: Path,
+    *,
+    workers: int,
+    strings: StringPool | None = None,
+    min_bytes: int = PARALLEL_MIN_BYTES,
+    chunk_bytes: int = DEFAULT_CHUNK_BYTES,
+) -> tuple[list[Individu], list[Famille], list[Source]]:
+    """Équivalent de `parse_gwb_data(codec.loads(...))` réparti sur `workers` processus.
+
+    Séquentiel pour un fichier de moins de `min_bytes` octets, ou si le découpage
+    échoue (structure inattendue, fichier remplacé pendant la lecture).
+    """
+    with index_path.open("rb") as f:
+        st = os.fstat(f.fileno())
+        if workers <= 1 or st.st_size < max(min_bytes, 1):
+            return parse_gwb_data(codec.loads(f.read()), strings=strings)
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            tasks = _split(data, chunk_bytes)
+            chunks: list[Chunk | None] = [None]
+            if tasks is not None and len(tasks) > 1:
+                kinds, starts, stops = zip(*tasks, strict=True)
+                try:
+                    chunks = list(
+                        _executor(workers).map(
+                            decode_range,
+                            repeat(str(index_path)),
+                            repeat(_identity(st)),
+                            kinds,
+                            starts,
+                            stops,
+                        )
+                    )
+                except BrokenProcessPool:
+                    shutdown_pool()
+            decoded = [chunk for chunk in chunks if chunk is not None]
+            if len(decoded) < len(chunks):
+                return parse_gwb_data(codec.loads(data[:]), strings=strings)
+
+    dates: dict[str, date] = {}
+    result: dict[str, list[Any]] = {kind: [] for kind in _KINDS}
+    for chunk in decoded:
+        result[chunk.kind].extend(_rebuild(chunk, strings, dates))
+    return result["individus"], result["familles"], result["sources"]
@@ -0,0 +1,145 @@
+"""Révision d'une base sur disque.
+
+Deux niveaux:
+
+- `base_fingerprint`: empreinte de l'état de tous les fichiers d'une base (chemin
+  relatif, taille, mtime_ns). Toute écriture la fait changer, sans relire le contenu;
+  elle fonctionne pour tout type de base (GWB minimale, base OCaml native, fichier seul)
+  mais parcourt le répertoire.
+- `read_revision`: jeton bon marché (une lecture et quelques `stat`). Les écrivains
+  (`write_gwb_minimal`, notes wizard, blasons) appellent `bump_revision`, qui réécrit le
+  petit fichier `.revision` de la base; le jeton combine ce compteur et la signature
+  (taille, mtime) des fichiers de données: `index.json`, ou à défaut ceux des autres
+  dispositions (manifeste des tranches, `base.gwbz`, SQLite, `base`/`base.acc`/`patches`
+  d'une base OCaml native). Une réécriture externe (gwc, autre outil) reste donc visible.
+  Sans `.revision` ni fichier de données connu, repli sur `base_fingerprint`.
+
+Le jeton sert de validateur HTTP (ETag / Last-Modified) et de clé de cache.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import secrets
+from dataclasses import dataclass
+from pathlib import Path
+
+from geneweb.io import durable
+
+REVISION_FILE = ".revision"
+# Fichiers de données stat-és par `read_revision` quand `index.json` est absent
+_DATA_FILES = (
+    "manifest.json",
+    "base.gwbz",
+    "base.sqlite",
+    "base.sqlite-wal",
+    "base",
+    "base.acc",
+    "patches",
+)
+
+
+def _iter_entries(root: Path) -> list[tuple[str, int, int]]:
+    if root.is_file():
+        st = root.stat()
+        return [(root.name, st.st_size, st.st_mtime_ns)]
+    entries: list[tuple[str, int, int]] = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        for filename in sorted(filenames):
+            if filename == REVISION_FILE and Path(dirpath) == root:
+                continue
+            path = Path(dirpath) / filename
+            try:
+                st = path.stat()
+            except FileNotFoundError:  # fichier supprimé pendant le parcours
+                continue
+            entries.append((path.relative_to(root).as_posix(), st.st_size, st.st_mtime_ns))
+    return entries
+
+
+def base_fingerprint(path: str | Path) -> str:
+    """Empreinte hexadécimale de l'état des fichiers d'une base.
+
+    Raises:
+        FileNotFoundError: si le chemin n'existe pas
+    """
+    root = Path(path)
+    if not root.exists():
+        raise FileNotFoundError(f"Base introuvable: {root}")
+    digest = hashlib.blake2b(digest_size=16)
+    for rel, size, mtime_ns in _iter_entries(root):
+        digest.update(f"{rel}\0{size}\0{mtime_ns}\n".encode())
+    return digest.hexdigest()
+
+
+def revision_root(base_dir: str | Path) -> Path:
+    """Répertoire portant la révision (une base peut ranger ses données dans `base/`)."""
+    root = Path(base_dir)
+    return root / "base" if (root / "base").is_dir() else root
+
+
+@dataclass(frozen=True)
+class Revision:
+    """Révision courante d'une base: jeton opaque et date de dernière modification."""
+
+    token: str
+    mtime: float
+
+    def etag(self, extra: str = "") -> str:
+        """ETag fort dérivé du jeton (et d'un complément propre à la représentation)."""
+        if not extra:
+            return f'"{self.token}"'
+        digest = hashlib.blake2b(f"{self.token}\0{extra}".encode(), digest_size=12).hexdigest()
+        return f'"{digest}"'
+
+
+def read_revision(base_dir: str | Path) -> Revision:
+    """Révision courante d'une base, sans charger son contenu.
+
+    Raises:
+        FileNotFoundError: si la base n'existe pas
+    """
+    root = revision_root(base_dir)
+    parts: list[str] = []
+    mtimes: list[float] = []
+    if root.is_file():
+        return Revision(base_fingerprint(root), root.stat().st_mtime)
+    rev_path = root / REVISION_FILE
+    try:
+        parts.append(rev_path.read_text(encoding="utf-8").strip())
+        mtimes.append(rev_path.stat().st_mtime)
+    except FileNotFoundError:
+        pass
+    for name in ("index.json", *_DATA_FILES):
+        try:
+            st = (root / name).stat()
+        except FileNotFoundError:
+            continue
+        parts.append(f"{name}:{st.st_mtime_ns}:{st.st_size}")
+        mtimes.append(st.st_mtime)
+        if name == "index.json":
+            break
+    if not parts:
+        # Disposition inconnue: empreinte complète du répertoire
+        entries = _iter_entries(root) if root.exists() else None
+        if entries is None:
+            raise FileNotFoundError(f"Base introuvable: {root}")
+        latest = max((mtime_ns for _rel, _size, mtime_ns in entries), default=0)
+        return Revision(base_fingerprint(root), latest / 1e9)
+    token = hashlib.blake2b("|".join(parts).encode(), digest_size=12).hexdigest()
+    return Revision(token, max(mtimes))
+
+
+def bump_revision(base_dir: str | Path) -> str:
+    """Marque la base comme modifiée (à appeler par chaque écrivain); renvoie le compteur."""
+    root = revision_root(base_dir)
+    rev_path = root / REVISION_FILE
+    try:
+        counter = int(rev_path.read_text(encoding="utf-8").split("-", 1)[0])
+    except (FileNotFoundError, ValueError):
+        counter = 0
+    value = f"{counter + 1}-{secrets.token_hex(4)}"
+    durable.write_atomic(rev_path, value.encode("utf-8"))
+    return value
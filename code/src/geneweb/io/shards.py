@@ -0,0 +1,291 @@
+"""Disposition fragmentée des bases GWB minimales (très grosses bases).
+
+Au lieu d'un `index.json` unique, les enregistrements sont répartis dans N fragments
+`shards/<k>-<empreinte>.json` selon le hachage (CRC-32) de leur identifiant: un
+individu et les familles de même identifiant haché tombent dans le fragment
+`shard_of(id, N)`. Un petit manifeste (`shards/manifest.json`) liste les fichiers de
+fragments, celui des sources, celui de l'ordre et les effectifs.
+
+Chaque fragment range ses enregistrements dans leur ordre relatif de la base et, pour
+chaque individu qui y est haché, les familles dont il est membre (`links`): retrouver
+un individu et ses familles n'ouvre que quelques fragments (`ShardReader`). L'ordre
+global est un fichier binaire à part (`order-<empreinte>.bin`): le numéro de fragment
+de chaque individu puis de chaque famille, un octet par enregistrement, dans l'ordre de
+l'index d'origine (reconstitué au chargement complet). Insérer ou supprimer un
+enregistrement ne change donc que son fragment, ceux de ses liens et ce fichier d'ordre.
+
+Les noms de fichiers portent l'empreinte de leur contenu: une réécriture ne touche que
+les fragments modifiés, puis remplace le manifeste (atomique). Un lecteur voit donc
+toujours un ensemble cohérent de fragments; s'il arrive après le nettoyage des
+anciens fichiers, il relit le manifeste.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import shutil
+import zlib
+from collections.abc import Sequence
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import suppress
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, cast
+
+from geneweb.io import codec, durable
+
+SHARDS_DIR = "shards"
+MANIFEST_FILE = "manifest.json"
+MANIFEST_FORMAT = "gwb-shards/2"
+DEFAULT_SHARDS = 16
+# Numéro de fragment sur un octet dans le fichier d'ordre
+MAX_SHARDS = 256
+
+GENEWEB_SHARD_WORKERS_ENV = "GENEWEB_SHARD_WORKERS"
+
+# Tentatives de lecture face à une réécriture concurrente
+_READ_ATTEMPTS = 3
+
+
+def shard_of(ident: str, n: int) -> int:
+    """Fragment d'un identifiant (stable d'un processus et d'une version à l'autre)."""
+    return zlib.crc32(ident.encode("utf-8")) % n
+
+
+def is_sharded(root: Path) -> bool:
+    return (root / SHARDS_DIR / MANIFEST_FILE).exists()
+
+
+def read_manifest(root: Path) -> dict[str, Any]:
+    manifest_path = root / SHARDS_DIR / MANIFEST_FILE
+    if not manifest_path.exists():
+        raise FileNotFoundError(f"Manifeste de fragments introuvable: {manifest_path}")
+    manifest = codec.loads(manifest_path.read_bytes())
+    if not isinstance(manifest, dict) or manifest.get("format") != MANIFEST_FORMAT:
+        raise ValueError(f"Manifeste de fragments invalide: {manifest_path}")
+    return manifest
+
+
+def shard_count(root: Path) -> int:
+    """Nombre de fragments de la base (0 si elle n'est pas fragmentée)."""
+    if not is_sharded(root):
+        return 0
+    return len(read_manifest(root)["shards"])
+
+
+def shard_workers() -> int:
+    try:
+        value = int(os.getenv(GENEWEB_SHARD_WORKERS_ENV, "") or 0)
+    except ValueError:
+        value = 0
+    return value if value > 0 else min(8, os.cpu_count() or 1)
+
+
+def _write_file(directory: Path, prefix: str, payload: bytes, suffix: str = ".json") -> tuple[str, bool]:
+    name = f"{prefix}-{hashlib.blake2b(payload, digest_size=8).hexdigest()}{suffix}"
+    if (directory / name).exists():
+        return name, False
+    durable.write_atomic(directory / name, payload)
+    return name, True
+
+
+def write_shards(
+    root: Path,
+    individus_data: Sequence[dict[str, Any]],
+    familles_data: Sequence[dict[str, Any]],
+    sources_data: Sequence[dict[str, Any]],
+    n: int,
+) -> int:
+    """Écrit la base en `n` fragments; renvoie le nombre de fichiers réellement écrits."""
+    if not 1 <= n <= MAX_SHARDS:
+        raise ValueError(f"Nombre de fragments invalide: {n} (1 à {MAX_SHARDS})")
+    directory = root / SHARDS_DIR
+    directory.mkdir(parents=True, exist_ok=True)
+
+    buckets: list[dict[str, Any]] = [{"individus": [], "familles": [], "links": {}} for _ in range(n)]
+    order = bytearray()
+    for item in individus_data:
+        k = shard_of(item["id"], n)
+        buckets[k]["individus"].append(item)
+        order.append(k)
+    for item in familles_data:
+        fid = item["id"]
+        k = shard_of(fid, n)
+        buckets[k]["familles"].append(item)
+        order.append(k)
+        for member in (item.get("pere_id"), item.get("mere_id"), *item.get("enfants_ids", ())):
+            if member:
+                links = buckets[shard_of(member, n)]["links"].setdefault(member, [])
+                if fid not in links:
+                    links.append(fid)
+
+    written = 0
+    files: list[str] = []
+    for k, bucket in enumerate(buckets):
+        name, fresh = _write_file(directory, f"{k:05d}", codec.dumps_file(bucket))
+        files.append(name)
+        written += fresh
+    sources_name, fresh = _write_file(directory, "sources", codec.dumps_file(list(sources_data)))
+    written += fresh
+    order_name, fresh = _write_file(directory, "order", bytes(order), suffix=".bin")
+    written += fresh
+
+    manifest = {
+        "format": MANIFEST_FORMAT,
+        "partition": "crc32",
+        "shards": files,
+        "sources": sources_name,
+        "order": order_name,
+        "counts": {"individus": len(individus_data), "familles": len(familles_data), "sources": len(sources_data)},
+    }
+    durable.write_atomic(directory / MANIFEST_FILE, codec.dumps_file(manifest))
+
+    # Anciens fragments: plus référencés par le manifeste courant
+    keep = {*files, sources_name, order_name, MANIFEST_FILE}
+    for path in [*directory.glob("*.json"), *directory.glob("*.bin")]:
+        if path.name not in keep:
+            with suppress(FileNotFoundError):
+                path.unlink()
+    return written
+
+
+def remove_shards(root: Path) -> None:
+    shutil.rmtree(root / SHARDS_DIR, ignore_errors=True)
+
+
+def _load_file(directory: Path, name: str) -> Any:
+    return codec.loads((directory / name).read_bytes())
+
+
+def _split_order(order: bytes, counts: dict[str, int]) -> dict[str, bytes]:
+    """Ordre global découpé par nature d'enregistrement (individus, familles)."""
+    n_individus = counts["individus"]
+    if len(order) != n_individus + counts["familles"]:
+        raise ValueError("Fichier d'ordre des fragments incohérent avec le manifeste")
+    return {"individus": order[:n_individus], "familles": order[n_individus:]}
+
+
+def _occurrences(order: bytes, k: int) -> list[int]:
+    """Positions dans la base des enregistrements du fragment `k`."""
+    needle = bytes([k])
+    positions: list[int] = []
+    position = order.find(needle)
+    while position >= 0:
+        positions.append(position)
+        position = order.find(needle, position + 1)
+    return positions
+
+
+def read_shards(root: Path, workers: int | None = None) -> dict[str, list[dict[str, Any]]]:
+    """Contenu complet d'une base fragmentée, dans l'ordre de la base.
+
+    Les fragments sont lus et décodés en parallèle (`GENEWEB_SHARD_WORKERS` fils,
+    défaut: nombre de processeurs, au plus 8). Même forme que `index.json`.
+    """
+    directory = root / SHARDS_DIR
+    workers = workers or shard_workers()
+    for attempt in range(_READ_ATTEMPTS):
+        manifest = read_manifest(root)
+        names = [*manifest["shards"], manifest["sources"]]
+        try:
+            if workers > 1 and len(names) > 1:
+                with ThreadPoolExecutor(max_workers=min(workers, len(names))) as pool:
+                    contents = list(pool.map(lambda name: _load_file(directory, name), names))
+            else:
+                contents = [_load_file(directory, name) for name in names]
+            order = (directory / manifest["order"]).read_bytes()
+        except FileNotFoundError:
+            # Fragment supprimé par une réécriture concurrente: relire le manifeste
+            if attempt == _READ_ATTEMPTS - 1:
+                raise
+            continue
+        break
+
+    *shards, sources = contents
+    data: dict[str, list[Any]] = {}
+    for kind, kind_order in _split_order(order, manifest["counts"]).items():
+        # Chaque fragment est dans l'ordre relatif de la base: l'ordre global dit de quel
+        # fragment vient l'enregistrement suivant
+        records = [iter(shard[kind]) for shard in shards]
+        data[kind] = [next(records[k]) for k in kind_order]
+    data["sources"] = sources
+    return data
+
+
+# Occurrences (position dans la base, données) d'un identifiant
+Records = list[tuple[int, dict[str, Any]]]
+
+
+@dataclass(frozen=True)
+class _Shard:
+    """Fragment ouvert: enregistrements par genre puis par identifiant, et liens."""
+
+    by_id: dict[str, dict[str, Records]]
+    links: dict[str, list[str]]
+
+
+class ShardReader:
+    """Accès par identifiant à une base fragmentée, fragment par fragment, à la demande.
+
+    Les fragments ouverts restent en mémoire le temps de vie du lecteur.
+    """
+
+    def __init__(self, root: Path) -> None:
+        self.root = root
+        self.directory = root / SHARDS_DIR
+        self.manifest = read_manifest(root)
+        self.n = len(self.manifest["shards"])
+        self._shards: dict[int, _Shard] = {}
+        self._order: dict[str, bytes] | None = None
+
+    @property
+    def counts(self) -> dict[str, int]:
+        return cast(dict[str, int], self.manifest["counts"])
+
+    @property
+    def opened(self) -> int:
+        return len(self._shards)
+
+    def _read(self, k: int) -> tuple[dict[str, Any], dict[str, bytes]]:
+        data = _load_file(self.directory, self.manifest["shards"][k])
+        if self._order is None:
+            order = (self.directory / self.manifest["order"]).read_bytes()
+            self._order = _split_order(order, self.counts)
+        return data, self._order
+
+    def shard(self, k: int) -> _Shard:
+        shard = self._shards.get(k)
+        if shard is None:
+            try:
+                data, order = self._read(k)
+            except FileNotFoundError:
+                # Réécriture concurrente: repartir du nouveau manifeste
+                self.manifest = read_manifest(self.root)
+                self._shards.clear()
+                self._order = None
+                data, order = self._read(k)
+            shard = self._index(k, data, order)
+            self._shards[k] = shard
+        return shard
+
+    @staticmethod
+    def _index(k: int, data: dict[str, Any], order: dict[str, bytes]) -> _Shard:
+        by_id: dict[str, dict[str, Records]] = {}
+        for kind in ("individus", "familles"):
+            index: dict[str, Records] = {}
+            for position, item in zip(_occurrences(order[kind], k), data[kind], strict=True):
+                index.setdefault(item["id"], []).append((position, item))
+            by_id[kind] = index
+        return _Shard(by_id, data["links"])
+
+    def persons(self, person_id: str) -> Records:
+        """Enregistrements (position, données) de l'individu, dans l'ordre de la base."""
+        return self.shard(shard_of(person_id, self.n)).by_id["individus"].get(person_id, [])
+
+    def families(self, family_id: str) -> Records:
+        return self.shard(shard_of(family_id, self.n)).by_id["familles"].get(family_id, [])
+
+    def links(self, person_id: str) -> list[str]:
+        """Familles (parent ou enfant) de l'individu."""
+        return self.shard(shard_of(person_id, self.n)).links.get(person_id, [])
@@ -0,0 +1,328 @@
+"""Instantané compact et immuable d'une base GWB minimale, lu par mmap.
+
+Une base chargée par `load_gwb_minimal` est un graphe d'objets Python (dataclasses,
+chaînes, listes) propre à chaque processus: avec N workers uvicorn, N copies. L'instantané
+range la même information dans un fichier à plat, fait de tableaux d'entiers 32 bits et
+d'une table de chaînes UTF-8:
+
+- en-tête: magique, génération, révision de base, effectifs;
+- `individus`: une ligne de `IND_WIDTH` entiers par individu (indices de chaînes, -1 pour
+  None) + famille d'enfance résolue (règle de `get_ascendance`);
+- `familles`: id, père, mère (indices d'individus), note, plage d'enfants;
+- index triés par identifiant (recherche dichotomique), familles où chaque individu est
+  parent (format CSR, ordre du fichier).
+
+`SnapshotBase` projette le fichier en mémoire (`mmap`, lecture seule) et lit les tableaux
+sans copie (`memoryview.cast`): les pages sont partagées par tous les processus qui
+ouvrent le même fichier, la mémoire reste à peu près constante avec le nombre de workers.
+C'est un `StorageBackend` en lecture seule: les routes gwd l'interrogent comme n'importe
+quel moteur (les modèles ne sont construits que pour les enregistrements demandés).
+L'instantané ne conserve ni les sources (seulement leur nombre) ni les références aux
+sources des individus et familles.
+"""
+
+from __future__ import annotations
+
+import mmap
+import struct
+from collections.abc import Iterable, Sequence
+from datetime import date
+from pathlib import Path
+
+from geneweb.domain.models import Famille, Individu, Sexe, Source
+from geneweb.io.gwb import StringPool
+from geneweb.io.storage import BaseData, StorageBackend, _search
+
+MAGIC = b"GWSNAP01"
+_HEADER = struct.Struct("<8sQIIIIIII32s")
+_HEADER_SIZE = 96  # en-tête aligné (tableaux d'entiers alignés sur 4 octets)
+
+IND_FIELDS = (
+    "id",
+    "nom",
+    "prenom",
+    "sexe",
+    "date_naissance",
+    "lieu_naissance",
+    "date_deces",
+    "lieu_deces",
+    "note",
+)
+_PARENT_FAMILY = len(IND_FIELDS)
+IND_WIDTH = len(IND_FIELDS) + 1
+# id, père, mère, note, début et fin des enfants
+FAM_WIDTH = 6
+
+
+def build_snapshot(
+    individus: Sequence[Individu],
+    familles: Sequence[Famille],
+    sources: Sequence[Source],
+    revision: str,
+    generation: int,
+) -> bytes:
+    """Sérialise une base au format instantané."""
+    strings: dict[str, int] = {}
+
+    def intern(value: object) -> int:
+        if value is None:
+            return -1
+        text = value.value if hasattr(value, "value") else str(value)
+        index = strings.get(text)
+        if index is None:
+            index = strings[text] = len(strings)
+        return index
+
+    # Première occurrence d'un identifiant en double, comme les autres moteurs
+    person_index: dict[str, int] = {}
+    for k, ind in enumerate(individus):
+        person_index.setdefault(ind.id, k)
+    fam_index: dict[str, int] = {}
+    child_to_family: dict[str, int] = {}
+    for k, fam in enumerate(familles):
+        fam_index.setdefault(fam.id, k)
+        for child_id in fam.enfants_ids:
+            child_to_family.setdefault(child_id, k)
+
+    ind_rows: list[int] = []
+    for ind in individus:
+        ind_rows.extend(intern(getattr(ind, name)) for name in IND_FIELDS)
+        if ind.famille_enfance_id:
+            ind_rows.append(fam_index.get(ind.famille_enfance_id, -1))
+        else:
+            ind_rows.append(child_to_family.get(ind.id, -1))
+
+    fam_rows: list[int] = []
+    children: list[int] = []
+    parent_links: list[list[int]] = [[] for _ in individus]
+    for k, fam in enumerate(familles):
+        pere = person_index.get(fam.pere_id, -1) if fam.pere_id else -1
+        mere = person_index.get(fam.mere_id, -1) if fam.mere_id else -1
+        start = len(children)
+        children.extend(person_index.get(c, -1) if c else -1 for c in fam.enfants_ids)
+        fam_rows.extend((intern(fam.id), pere, mere, intern(fam.note), start, len(children)))
+        for parent in {pere, mere} - {-1}:
+            parent_links[parent].append(k)
+    links_start = [0]
+    links: list[int] = []
+    for fams in parent_links:
+        links.extend(fams)
+        links_start.append(len(links))
+
+    encoded = [text.encode("utf-8") for text in strings]
+    str_offsets = [0]
+    for data in encoded:
+        str_offsets.append(str_offsets[-1] + len(data))
+    ind_by_id = sorted(range(len(individus)), key=lambda k: (individus[k].id.encode("utf-8"), k))
+    fam_by_id = sorted(range(len(familles)), key=lambda k: (familles[k].id.encode("utf-8"), k))
+
+    arrays = [str_offsets, ind_rows, ind_by_id, fam_rows, fam_by_id, children, links_start, links]
+    body = b"".join(struct.pack(f"<{len(a)}i", *a) for a in arrays)
+    header = _HEADER.pack(
+        MAGIC,
+        generation,
+        len(individus),
+        len(familles),
+        len(sources),
+        len(encoded),
+        len(children),
+        len(links),
+        str_offsets[-1],
+        revision.encode("ascii")[:32],
+    )
+    return header.ljust(_HEADER_SIZE, b"\0") + body + b"".join(encoded)
+
+
+class SnapshotBase(StorageBackend):
+    """Instantané projeté en mémoire, en lecture seule.
+
+    La projection appartient au magasin qui l'a ouverte (`infra.snapshot_store`):
+    `close` (sortie d'un bloc `with`) la laisse ouverte.
+    """
+
+    kind = "snapshot"  # type: ignore[assignment]  # pas un moteur de `open_storage`
+
+    def __init__(self, path: str | Path) -> None:
+        super().__init__(path)
+        self.path = self.base_dir
+        with open(self.path, "rb") as fh:
+            self._mmap = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        (
+            magic,
+            self.generation,
+            self.n_individus,
+            self.n_familles,
+            self.n_sources,
+            n_strings,
+            n_children,
+            n_links,
+            n_bytes,
+            revision,
+        ) = _HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC:
+            raise ValueError(f"Instantané invalide: {self.path}")
+        self.revision = revision.rstrip(b"\0").decode("ascii")
+
+        view = memoryview(self._mmap)
+        offset = _HEADER_SIZE
+
+        def take(count: int) -> memoryview:
+            nonlocal offset
+            array = view[offset : offset + 4 * count].cast("i")
+            offset += 4 * count
+            return array
+
+        self._str_offsets = take(n_strings + 1)
+        self._ind = take(self.n_individus * IND_WIDTH)
+        self._ind_by_id = take(self.n_individus)
+        self._fam = take(self.n_familles * FAM_WIDTH)
+        self._fam_by_id = take(self.n_familles)
+        self._children = take(n_children)
+        self._links_start = take(self.n_individus + 1)
+        self._links = take(n_links)
+        self._str_data = view[offset : offset + n_bytes]
+
+    # -- chaînes -------------------------------------------------------------
+
+    def _raw(self, index: int) -> bytes:
+        return bytes(self._str_data[self._str_offsets[index] : self._str_offsets[index + 1]])
+
+    def string(self, index: int) -> str | None:
+        return None if index < 0 else self._raw(index).decode("utf-8")
+
+    def _lookup(self, order: memoryview, ids: memoryview, width: int, key: str) -> list[int]:
+        """Indices de toutes les occurrences de `key`, dans l'ordre du fichier."""
+        target = key.encode("utf-8")
+        lo, hi = 0, len(order)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._raw(ids[order[mid] * width]) < target:
+                lo = mid + 1
+            else:
+                hi = mid
+        found: list[int] = []
+        while lo < len(order) and self._raw(ids[order[lo] * width]) == target:
+            found.append(order[lo])
+            lo += 1
+        return found
+
+    # -- individus -----------------------------------------------------------
+
+    def person_index(self, person_id: str) -> int:
+        """Indice (ordre du fichier) de l'individu, -1 s'il est absent."""
+        found = self._lookup(self._ind_by_id, self._ind, IND_WIDTH, person_id)
+        return found[0] if found else -1
+
+    def person_field(self, index: int, name: str) -> str | None:
+        return self.string(self._ind[index * IND_WIDTH + IND_FIELDS.index(name)])
+
+    def person(self, index: int) -> dict[str, str | None]:
+        row = index * IND_WIDTH
+        return {name: self.string(self._ind[row + k]) for k, name in enumerate(IND_FIELDS)}
+
+    def parent_family_index(self, index: int) -> int:
+        """Famille d'enfance (indice) de l'individu, -1 sans parents connus."""
+        return self._ind[index * IND_WIDTH + _PARENT_FAMILY]
+
+    def families_of(self, index: int) -> memoryview:
+        """Familles où l'individu est parent, dans l'ordre du fichier."""
+        return self._links[self._links_start[index] : self._links_start[index + 1]]
+
+    # -- familles ------------------------------------------------------------
+
+    def family_index(self, family_id: str) -> int:
+        found = self._lookup(self._fam_by_id, self._fam, FAM_WIDTH, family_id)
+        return found[0] if found else -1
+
+    def family_id(self, index: int) -> str:
+        return self._raw(self._fam[index * FAM_WIDTH]).decode("utf-8")
+
+    def family_parents(self, index: int) -> tuple[int, int]:
+        row = index * FAM_WIDTH
+        return self._fam[row + 1], self._fam[row + 2]
+
+    def family_note(self, index: int) -> str | None:
+        return self.string(self._fam[index * FAM_WIDTH + 3])
+
+    def children_of(self, index: int) -> memoryview:
+        """Enfants (indices d'individus, -1 si inconnus) dans l'ordre de la famille."""
+        row = index * FAM_WIDTH
+        return self._children[self._fam[row + 4] : self._fam[row + 5]]
+
+    # -- StorageBackend ------------------------------------------------------
+
+    def _individu(self, index: int) -> Individu:
+        row = self.person(index)
+        sexe, naissance, deces = row["sexe"], row["date_naissance"], row["date_deces"]
+        return Individu(
+            id=row["id"] or "",
+            nom=row["nom"],
+            prenom=row["prenom"],
+            sexe=Sexe(sexe) if sexe else None,
+            date_naissance=date.fromisoformat(naissance) if naissance else None,
+            lieu_naissance=row["lieu_naissance"],
+            date_deces=date.fromisoformat(deces) if deces else None,
+            lieu_deces=row["lieu_deces"],
+            note=row["note"],
+        )
+
+    def _famille(self, index: int) -> Famille:
+        pere, mere = self.family_parents(index)
+        return Famille(
+            id=self.family_id(index),
+            pere_id=self.person_field(pere, "id") if pere >= 0 else None,
+            mere_id=self.person_field(mere, "id") if mere >= 0 else None,
+            enfants_ids=[self.person_field(child, "id") or "" for child in self.children_of(index) if child >= 0],
+            note=self.family_note(index),
+        )
+
+    def exists(self) -> bool:
+        return self.path.exists()
+
+    def load(self, *, strings: StringPool | None = None) -> BaseData:
+        """Base reconstruite depuis l'instantané (sans sources)."""
+        individus = [self._individu(k) for k in range(self.n_individus)]
+        return individus, [self._famille(k) for k in range(self.n_familles)], []
+
+    def save(
+        self, individus: Iterable[Individu], familles: Iterable[Famille], sources: Iterable[Source] | None = None
+    ) -> None:
+        raise ValueError(f"Instantané en lecture seule: {self.path}")
+
+    def counts(self) -> tuple[int, int, int]:
+        return self.n_individus, self.n_familles, self.n_sources
+
+    def get_person(self, person_id: str) -> Individu | None:
+        index = self.person_index(person_id)
+        return self._individu(index) if index >= 0 else None
+
+    def get_family(self, family_id: str) -> Famille | None:
+        index = self.family_index(family_id)
+        return self._famille(index) if index >= 0 else None
+
+    def family_children(self, family: Famille) -> list[Individu]:
+        indices = {
+            k for eid in dict.fromkeys(family.enfants_ids)
+            for k in self._lookup(self._ind_by_id, self._ind, IND_WIDTH, eid)
+        }
+        return [self._individu(k) for k in sorted(indices)]
+
+    def search(self, query: str | None = None) -> list[Individu]:
+        if not query:
+            return _search([self._individu(k) for k in range(self.n_individus)], query)
+        # Filtre sur les chaînes, modèles construits pour les seuls résultats
+        query_lower = query.lower()
+        return [
+            self._individu(k) for k in range(self.n_individus)
+            if query_lower in (self.person_field(k, "nom") or "").lower()
+            or query_lower in (self.person_field(k, "prenom") or "").lower()
+        ]
+
+    def parent_family(self, person_id: str) -> Famille | None:
+        index = self.person_index(person_id)
+        family = self.parent_family_index(index) if index >= 0 else -1
+        return self._famille(family) if family >= 0 else None
+
+    def families_as_parent(self, person_id: str) -> list[Famille]:
+        index = self.person_index(person_id)
+        return [self._famille(k) for k in self.families_of(index)] if index >= 0 else []
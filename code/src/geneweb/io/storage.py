@@ -0,0 +1,943 @@
+"""Moteurs de stockage d'une base: JSON (`index.json`, fragments ou conteneur compressé),
+SQLite (`base.sqlite`) et base GeneWeb native (OCaml, lecture seule).
+
+`StorageBackend` regroupe ce dont les routes gwd et l'écrivain ont besoin: chargement
+et écriture complets (`load`/`save`), et requêtes ponctuelles (fiche, famille,
+recherche, liens parent/enfant, notes). Le moteur JSON répond aux requêtes sur la base
+matérialisée (lecture complète du fichier); le moteur fragmenté (`geneweb.io.shards`)
+n'ouvre que les fragments des enregistrements demandés, le moteur compressé
+(`geneweb.io.packed`) que leurs blocs; le moteur SQLite les traduit
+en requêtes indexées, sans charger la base, et se modifie ligne à ligne
+(`SqliteStorage.add_person`, `update_family`...). Une base native (`geneweb.io.native`)
+est lue directement dans ses fichiers `base`/`base.acc`, élément par élément.
+
+Schéma SQLite (mode WAL: lecteurs et écrivain ne se bloquent pas):
+
+- `persons`, `families`, `sources`: une ligne par entrée, dans l'ordre de la base
+  (`rowid`); les identifiants ne sont pas uniques (comme dans `index.json`), les
+  requêtes prennent la première occurrence;
+- `children(family, position, child_id)`: enfants de chaque famille, ordonnés;
+- `notes(kind, owner, note)`: notes des individus (`I`), familles (`F`) et sources (`S`);
+- index sur les identifiants, nom/prénom, dates et lieux de naissance/décès, parents
+  et enfants.
+
+`open_storage` choisit le moteur d'après les fichiers présents; `convert_base` migre
+une base dans un sens ou dans l'autre.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+from abc import ABC, abstractmethod
+from collections.abc import Iterable, Sequence
+from contextlib import suppress
+from datetime import date
+from functools import cached_property
+from pathlib import Path
+from typing import Any, Literal
+
+from geneweb.domain.models import Famille, Individu, Source
+from geneweb.io import codec
+from geneweb.io.gwb import (
+    StringPool,
+    _normalize_unicode,
+    _parse_date_iso,
+    _parse_sexe,
+    load_gwb_minimal,
+    parse_gwb_data,
+    write_gwb_minimal,
+)
+from geneweb.io.native import NativeBase, is_native, parse_native_id, remove_native
+from geneweb.io.packed import PackedReader, is_packed, remove_packed
+from geneweb.io.revision import bump_revision
+from geneweb.io.shards import DEFAULT_SHARDS, ShardReader, is_sharded, remove_shards, shard_count
+
+JSON_FILE = "index.json"
+SQLITE_FILE = "base.sqlite"
+
+StorageKind = Literal["json", "sharded", "packed", "sqlite", "native"]
+
+BaseData = tuple[list[Individu], list[Famille], list[Source]]
+
+
+class StorageBackend(ABC):
+    """Stockage d'une base GWB.
+
+    Les requêtes ont une implémentation par défaut sur la base chargée (`load`, une
+    fois par instance); un moteur indexé les redéfinit. Un identifiant en double
+    désigne sa première occurrence. Résultats dans l'ordre de la base, sauf mention.
+    """
+
+    kind: StorageKind
+    _memo: _Loaded | None = None
+
+    def __init__(self, base_dir: str | Path) -> None:
+        self.base_dir = Path(base_dir)
+
+    def __enter__(self) -> StorageBackend:
+        return self
+
+    def __exit__(self, *_exc: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Libère les ressources du moteur (ici, la base chargée par les requêtes)."""
+        self._memo = None
+
+    @abstractmethod
+    def exists(self) -> bool: ...
+
+    @abstractmethod
+    def load(self, *, strings: StringPool | None = None) -> BaseData:
+        """Base complète (individus, familles, sources)."""
+
+    @abstractmethod
+    def save(
+        self, individus: Iterable[Individu], familles: Iterable[Famille], sources: Iterable[Source] | None = None
+    ) -> None:
+        """Remplace toute la base et marque sa révision."""
+
+    # --- Requêtes ---
+
+    def _loaded(self) -> _Loaded:
+        """Base chargée une fois par instance, et ses index (requêtes par défaut)."""
+        if self._memo is None:
+            self._memo = _Loaded(*self.load())
+        return self._memo
+
+    def counts(self) -> tuple[int, int, int]:
+        loaded = self._loaded()
+        return len(loaded.individus), len(loaded.familles), len(loaded.sources)
+
+    def get_person(self, person_id: str) -> Individu | None:
+        return self._loaded().persons.get(person_id)
+
+    def get_family(self, family_id: str) -> Famille | None:
+        return self._loaded().families.get(family_id)
+
+    def family_children(self, family: Famille) -> list[Individu]:
+        """Individus enfants de `family`, dans l'ordre des individus de la base."""
+        ids = set(family.enfants_ids)
+        return [ind for ind in self._loaded().individus if ind.id in ids]
+
+    def search(self, query: str | None = None) -> list[Individu]:
+        """Individus dont le nom ou le prénom contient `query` (sans casse).
+
+        Sans `query`: tous les individus, triés par (nom, prénom).
+        """
+        return _search(self._loaded().individus, query)
+
+    def parent_family(self, person_id: str) -> Famille | None:
+        """Première famille qui compte `person_id` parmi ses enfants."""
+        return self._loaded().parent_families.get(person_id)
+
+    def families_as_parent(self, person_id: str) -> list[Famille]:
+        return self._loaded().parent_links.get(person_id, [])
+
+    def notes(self) -> BaseData:
+        """Individus, familles et sources portant une note."""
+        loaded = self._loaded()
+        return (
+            [ind for ind in loaded.individus if ind.note],
+            [fam for fam in loaded.familles if fam.note],
+            [src for src in loaded.sources if src.note],
+        )
+
+
+class _Loaded:
+    """Base chargée et index des requêtes par défaut (première occurrence d'un id)."""
+
+    def __init__(self, individus: list[Individu], familles: list[Famille], sources: list[Source]) -> None:
+        self.individus, self.familles, self.sources = individus, familles, sources
+
+    @cached_property
+    def persons(self) -> dict[str, Individu]:
+        persons: dict[str, Individu] = {}
+        for ind in self.individus:
+            persons.setdefault(ind.id, ind)
+        return persons
+
+    @cached_property
+    def families(self) -> dict[str, Famille]:
+        families: dict[str, Famille] = {}
+        for fam in self.familles:
+            families.setdefault(fam.id, fam)
+        return families
+
+    @cached_property
+    def parent_families(self) -> dict[str, Famille]:
+        parent_families: dict[str, Famille] = {}
+        for fam in self.familles:
+            for child_id in fam.enfants_ids:
+                parent_families.setdefault(child_id, fam)
+        return parent_families
+
+    @cached_property
+    def parent_links(self) -> dict[str, list[Famille]]:
+        links: dict[str, list[Famille]] = {}
+        for fam in self.familles:
+            for parent_id in dict.fromkeys((fam.pere_id, fam.mere_id)):
+                if parent_id:
+                    links.setdefault(parent_id, []).append(fam)
+        return links
+
+
+def _search(individus: list[Individu], query: str | None) -> list[Individu]:
+    if not query:
+        return sorted(individus, key=lambda ind: (ind.nom or "", ind.prenom or ""))
+    query_lower = query.lower()
+    return [
+        ind for ind in individus
+        if query_lower in (ind.nom or "").lower() or query_lower in (ind.prenom or "").lower()
+    ]
+
+
+class JsonStorage(StorageBackend):
+    """Base `index.json` unique (format GWB minimal), lue et écrite en entier."""
+
+    kind: StorageKind = "json"
+
+    def exists(self) -> bool:
+        return (self.base_dir / JSON_FILE).exists()
+
+    def load(self, *, strings: StringPool | None = None) -> BaseData:
+        return load_gwb_minimal(self.base_dir, strings=strings)
+
+    def save(
+        self, individus: Iterable[Individu], familles: Iterable[Famille], sources: Iterable[Source] | None = None
+    ) -> None:
+        write_gwb_minimal(individus, familles, self.base_dir, sources=sources, shards=0)
+        self._memo = None
+
+
+class ShardedStorage(StorageBackend):
+    """Base fragmentée (`shards/`): requêtes ponctuelles sur les seuls fragments utiles."""
+
+    kind: StorageKind = "sharded"
+
+    def __init__(self, base_dir: str | Path, shards: int | None = None) -> None:
+        super().__init__(base_dir)
+        self.shards = shards
+        self._reader: ShardReader | None = None
+
+    @property
+    def reader(self) -> ShardReader:
+        if self._reader is None:
+            self._reader = ShardReader(self.base_dir)
+        return self._reader
+
+    def exists(self) -> bool:
+        return is_sharded(self.base_dir)
+
+    def load(self, *, strings: StringPool | None = None) -> BaseData:
+        return load_gwb_minimal(self.base_dir, strings=strings)
+
+    def save(
+        self, individus: Iterable[Individu], familles: Iterable[Famille], sources: Iterable[Source] | None = None
+    ) -> None:
+        shards = self.shards or shard_count(self.base_dir) or DEFAULT_SHARDS
+        write_gwb_minimal(individus, familles, self.base_dir, sources=sources, shards=shards)
+        self._reader = self._memo = None
+
+    # --- Requêtes ---
+
+    @staticmethod
+    def _persons(records: Iterable[tuple[int, dict[str, Any]]]) -> list[Individu]:
+        return parse_gwb_data({"individus": [item for _, item in records]})[0]
+
+    @staticmethod
+    def _families(records: Iterable[tuple[int, dict[str, Any]]]) -> list[Famille]:
+        return parse_gwb_data({"familles": [item for _, item in records]})[1]
+
+    def _linked(self, person_id: str) -> list[tuple[int, dict[str, Any]]]:
+        """Familles de l'individu (toutes occurrences), dans l'ordre de la base."""
+        records = [record for fid in self.reader.links(person_id) for record in self.reader.families(fid)]
+        return sorted(records, key=lambda record: record[0])
+
+    def counts(self) -> tuple[int, int, int]:
+        counts = self.reader.counts
+        return counts["individus"], counts["familles"], counts["sources"]
+
+    def get_person(self, person_id: str) -> Individu | None:
+        persons = self._persons(self.reader.persons(person_id)[:1])
+        return persons[0] if persons else None
+
+    def get_family(self, family_id: str) -> Famille | None:
+        familles = self._families(self.reader.families(family_id)[:1])
+        return familles[0] if familles else None
+
+    def family_children(self, family: Famille) -> list[Individu]:
+        records = [record for eid in dict.fromkeys(family.enfants_ids) for record in self.reader.persons(eid)]
+        return self._persons(sorted(records, key=lambda record: record[0]))
+
+    def parent_family(self, person_id: str) -> Famille | None:
+        for _, item in self._linked(person_id):
+            if person_id in (item.get("enfants_ids") or ()):
+                return self._families([(0, item)])[0]
+        return None
+
+    def families_as_parent(self, person_id: str) -> list[Famille]:
+        return self._families(
+            (position, item)
+            for position, item in self._linked(person_id)
+            if person_id in (item.get("pere_id"), item.get("mere_id"))
+        )
+
+
+class PackedStorage(StorageBackend):
+    """Conteneur compressé par blocs (`base.gwbz`): requêtes ponctuelles sur les seuls
+    blocs utiles, recherche par parcours des blocs d'individus."""
+
+    kind: StorageKind = "packed"
+
+    def __init__(self, base_dir: str | Path) -> None:
+        super().__init__(base_dir)
+        self._reader: PackedReader | None = None
+
+    @property
+    def reader(self) -> PackedReader:
+        if self._reader is None:
+            self._reader = PackedReader(self.base_dir)
+        return self._reader
+
+    def close(self) -> None:
+        if self._reader is not None:
+            self._reader.close()
+            self._reader = None
+
+    def exists(self) -> bool:
+        return is_packed(self.base_dir)
+
+    def load(self, *, strings: StringPool | None = None) -> BaseData:
+        return load_gwb_minimal(self.base_dir, strings=strings)
+
+    def save(
+        self, individus: Iterable[Individu], familles: Iterable[Famille], sources: Iterable[Source] | None = None
+    ) -> None:
+        self.close()
+        write_gwb_minimal(individus, familles, self.base_dir, sources=sources, packed=True)
+        self._memo = None
+
+    # --- Requêtes ---
+
+    def _linked(self, person_id: str) -> list[dict[str, Any]]:
+        return [self.reader.record("familles", position) for position in self.reader.links(person_id)]
+
+    def counts(self) -> tuple[int, int, int]:
+        counts = self.reader.counts
+        return counts["individus"], counts["familles"], counts["sources"]
+
+    def get_person(self, person_id: str) -> Individu | None:
+        item = self.reader.find("individus", person_id)
+        return None if item is None else parse_gwb_data({"individus": [item]})[0][0]
+
+    def get_family(self, family_id: str) -> Famille | None:
+        item = self.reader.find("familles", family_id)
+        return None if item is None else parse_gwb_data({"familles": [item]})[1][0]
+
+    def family_children(self, family: Famille) -> list[Individu]:
+        reader = self.reader
+        positions = sorted(p for eid in set(family.enfants_ids) for p in reader.positions("individus", eid))
+        return parse_gwb_data({"individus": [reader.record("individus", p) for p in positions]})[0]
+
+    def search(self, query: str | None = None) -> list[Individu]:
+        return _search(parse_gwb_data({"individus": list(self.reader.scan("individus"))})[0], query)
+
+    def parent_family(self, person_id: str) -> Famille | None:
+        for item in self._linked(person_id):
+            if person_id in (item.get("enfants_ids") or ()):
+                return parse_gwb_data({"familles": [item]})[1][0]
+        return None
+
+    def families_as_parent(self, person_id: str) -> list[Famille]:
+        familles = [item for item in self._linked(person_id) if person_id in (item.get("pere_id"), item.get("mere_id"))]
+        return parse_gwb_data({"familles": familles})[1]
+
+
+class NativeStorage(StorageBackend):
+    """Base GeneWeb native (`base`, `base.acc`), en lecture seule: requêtes ponctuelles
+    par indice OCaml (`I<iper>`, `F<ifam>`), recherche par parcours des individus."""
+
+    kind: StorageKind = "native"
+
+    def __init__(self, base_dir: str | Path) -> None:
+        super().__init__(base_dir)
+        self._base: NativeBase | None = None
+
+    @property
+    def base(self) -> NativeBase:
+        if self._base is None:
+            self._base = NativeBase(self.base_dir)
+        return self._base
+
+    def close(self) -> None:
+        if self._base is not None:
+            self._base.close()
+            self._base = None
+
+    def exists(self) -> bool:
+        return is_native(self.base_dir)
+
+    def load(self, *, strings: StringPool | None = None) -> BaseData:
+        individus, familles = self.base.load()
+        return individus, familles, []
+
+    def save(
+        self, individus: Iterable[Individu], familles: Iterable[Famille], sources: Iterable[Source] | None = None
+    ) -> None:
+        raise ValueError(f"Base GeneWeb native en lecture seule: {self.base_dir}")
+
+    # --- Requêtes ---
+
+    def _family(self, ifam: int) -> Famille | None:
+        base = self.base
+        if not 0 <= ifam < len(base.families) or base.family_deleted(ifam):
+            return None
+        return base.family(ifam)
+
+    def counts(self) -> tuple[int, int, int]:
+        base = self.base
+        return len(base.persons), len(base.families) - base.deleted_families, 0
+
+    def get_person(self, person_id: str) -> Individu | None:
+        iper = parse_native_id(person_id, "I")
+        if iper is None or iper >= len(self.base.persons):
+            return None
+        return self.base.persons[iper]
+
+    def get_family(self, family_id: str) -> Famille | None:
+        ifam = parse_native_id(family_id, "F")
+        return None if ifam is None else self._family(ifam)
+
+    def family_children(self, family: Famille) -> list[Individu]:
+        persons = (self.get_person(eid) for eid in dict.fromkeys(family.enfants_ids))
+        return sorted((ind for ind in persons if ind is not None), key=lambda ind: int(ind.id[1:]))
+
+    def search(self, query: str | None = None) -> list[Individu]:
+        return _search(list(self.base.persons), query)
+
+    def parent_family(self, person_id: str) -> Famille | None:
+        person = self.get_person(person_id)
+        if person is None or person.famille_enfance_id is None:
+            return None
+        return self.get_family(person.famille_enfance_id)
+
+    def families_as_parent(self, person_id: str) -> list[Famille]:
+        person = self.get_person(person_id)
+        if person is None:
+            return []
+        familles = (self.get_family(fid) for fid in person.famille_adultes)
+        return sorted((fam for fam in familles if fam is not None), key=lambda fam: int(fam.id[1:]))
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS persons (
+    rowid INTEGER PRIMARY KEY,
+    id TEXT NOT NULL,
+    nom TEXT,
+    prenom TEXT,
+    sexe TEXT,
+    date_naissance TEXT,
+    lieu_naissance TEXT,
+    date_deces TEXT,
+    lieu_deces TEXT,
+    sources TEXT
+);
+CREATE TABLE IF NOT EXISTS families (
+    rowid INTEGER PRIMARY KEY,
+    id TEXT NOT NULL,
+    pere_id TEXT,
+    mere_id TEXT,
+    sources TEXT
+);
+CREATE TABLE IF NOT EXISTS children (
+    family INTEGER NOT NULL REFERENCES families(rowid) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    child_id TEXT NOT NULL,
+    PRIMARY KEY (family, position)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS sources (
+    rowid INTEGER PRIMARY KEY,
+    id TEXT NOT NULL,
+    titre TEXT,
+    auteur TEXT,
+    date_publication TEXT,
+    url TEXT,
+    fichier TEXT
+);
+CREATE TABLE IF NOT EXISTS notes (
+    kind TEXT NOT NULL,
+    owner INTEGER NOT NULL,
+    note TEXT NOT NULL,
+    PRIMARY KEY (kind, owner)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS persons_id ON persons(id);
+CREATE INDEX IF NOT EXISTS persons_nom ON persons(coalesce(nom, ''), coalesce(prenom, ''));
+CREATE INDEX IF NOT EXISTS persons_prenom ON persons(prenom);
+CREATE INDEX IF NOT EXISTS persons_naissance ON persons(date_naissance);
+CREATE INDEX IF NOT EXISTS persons_deces ON persons(date_deces);
+CREATE INDEX IF NOT EXISTS persons_lieu_naissance ON persons(lieu_naissance);
+CREATE INDEX IF NOT EXISTS persons_lieu_deces ON persons(lieu_deces);
+CREATE INDEX IF NOT EXISTS families_id ON families(id);
+CREATE INDEX IF NOT EXISTS families_pere ON families(pere_id);
+CREATE INDEX IF NOT EXISTS families_mere ON families(mere_id);
+CREATE INDEX IF NOT EXISTS children_child ON children(child_id);
+CREATE INDEX IF NOT EXISTS sources_id ON sources(id);
+"""
+
+_PERSON_COLUMNS = (
+    "p.id, p.nom, p.prenom, p.sexe, p.date_naissance, p.lieu_naissance, p.date_deces, p.lieu_deces, "
+    "p.sources, (SELECT note FROM notes WHERE kind = 'I' AND owner = p.rowid)"
+)
+_FAMILY_COLUMNS = (
+    "f.rowid, f.id, f.pere_id, f.mere_id, f.sources, "
+    "(SELECT note FROM notes WHERE kind = 'F' AND owner = f.rowid)"
+)
+
+
+def _py_lower(value: str | None) -> str | None:
+    # `lower()` de SQLite ne traite que l'ASCII: même casse que la recherche Python
+    return value.lower() if value is not None else None
+
+
+def _iso(value: date | None) -> str | None:
+    return value.isoformat() if value is not None else None
+
+
+def _refs(values: Sequence[str]) -> str | None:
+    return codec.dumps(list(values)).decode("utf-8") if values else None
+
+
+def _parse_refs(value: str | None) -> list[str] | tuple[()]:
+    return codec.loads(value) if value else ()
+
+
+class SqliteStorage(StorageBackend):
+    """Base `base.sqlite` (mode WAL), interrogée et modifiée par requêtes indexées.
+
+    Les méthodes de modification (`add_person`, `update_person`, ...) travaillent dans
+    la transaction courante de la connexion; `commit` la valide et marque la révision
+    de la base, `rollback` l'annule.
+    """
+
+    kind: StorageKind = "sqlite"
+
+    def __init__(self, base_dir: str | Path) -> None:
+        super().__init__(base_dir)
+        self.path = self.base_dir / SQLITE_FILE
+        self._conn: sqlite3.Connection | None = None
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        if self._conn is None:
+            if not self.base_dir.is_dir():
+                raise FileNotFoundError(f"Base GWB introuvable: {self.base_dir}")
+            # Connexion partageable entre fils: l'écrivain d'une base peut changer de fil
+            conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA foreign_keys=ON")
+            conn.create_function("py_lower", 1, _py_lower, deterministic=True)
+            conn.executescript(_SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def exists(self) -> bool:
+        return self.path.exists()
+
+    def commit(self) -> None:
+        self.conn.commit()
+        bump_revision(self.base_dir)
+
+    def rollback(self) -> None:
+        self.conn.rollback()
+
+    # --- Conversion lignes <-> modèles ---
+
+    @staticmethod
+    def _person(row: Sequence[Any], strings: StringPool | None = None) -> Individu:
+        iid, nom, prenom, sexe, naissance, lieu_naissance, deces, lieu_deces, refs, note = row
+        if strings is not None:
+            iid = strings.person_id(iid)
+            nom, prenom, lieu_naissance, lieu_deces, note = (
+                strings.intern(v) if v is not None else None for v in (nom, prenom, lieu_naissance, lieu_deces, note)
+            )
+        return Individu(
+            id=iid,
+            nom=nom,
+            prenom=prenom,
+            sexe=_parse_sexe(sexe),
+            date_naissance=strings.date(naissance) if strings is not None else _parse_date_iso(naissance),
+            lieu_naissance=lieu_naissance,
+            date_deces=strings.date(deces) if strings is not None else _parse_date_iso(deces),
+            lieu_deces=lieu_deces,
+            note=note,
+            sources=_parse_refs(refs),
+        )
+
+    def _family(self, row: Sequence[Any]) -> Famille:
+        rowid, fid, pere_id, mere_id, refs, note = row
+        enfants = [
+            child for (child,) in self.conn.execute(
+                "SELECT child_id FROM children WHERE family = ? ORDER BY position", (rowid,)
+            )
+        ]
+        return Famille(
+            id=fid, pere_id=pere_id, mere_id=mere_id, enfants_ids=enfants, note=note, sources=_parse_refs(refs)
+        )
+
+    # --- Chargement et écriture complets ---
+
+    def load(self, *, strings: StringPool | None = None) -> BaseData:
+        if not self.exists():
+            raise FileNotFoundError(f"Base SQLite introuvable: {self.path}")
+        conn = self.conn
+        individus = [
+            self._person(row, strings)
+            for row in conn.execute(f"SELECT {_PERSON_COLUMNS} FROM persons p ORDER BY p.rowid")
+        ]
+        children: dict[int, list[str]] = {}
+        for family, child in conn.execute("SELECT family, child_id FROM children ORDER BY family, position"):
+            children.setdefault(family, []).append(child)
+        familles = [
+            Famille(
+                id=fid,
+                pere_id=pere_id,
+                mere_id=mere_id,
+                enfants_ids=children.get(rowid, []),
+                note=note,
+                sources=_parse_refs(refs),
+            )
+            for rowid, fid, pere_id, mere_id, refs, note in conn.execute(
+                f"SELECT {_FAMILY_COLUMNS} FROM families f ORDER BY f.rowid"
+            )
+        ]
+        sources = [
+            Source(
+                id=sid,
+                titre=titre,
+                auteur=auteur,
+                date_publication=_parse_date_iso(publication),
+                url=url,
+                fichier=fichier,
+                note=note,
+            )
+            for sid, titre, auteur, publication, url, fichier, note in conn.execute(
+                "SELECT s.id, s.titre, s.auteur, s.date_publication, s.url, s.fichier, "
+                "(SELECT note FROM notes WHERE kind = 'S' AND owner = s.rowid) FROM sources s ORDER BY s.rowid"
+            )
+        ]
+        return individus, familles, sources
+
+    def save(
+        self, individus: Iterable[Individu], familles: Iterable[Famille], sources: Iterable[Source] | None = None
+    ) -> None:
+        conn = self.conn
+        try:
+            conn.executescript("BEGIN; DELETE FROM children; DELETE FROM notes; DELETE FROM persons; "
+                               "DELETE FROM families; DELETE FROM sources;")
+            for ind in individus:
+                if ind.id and ind.id.strip():
+                    self.add_person(ind)
+            for fam in familles:
+                if fam.id and fam.id.strip():
+                    self.add_family(fam)
+            for src in sources or ():
+                if not src.id or not src.id.strip():
+                    continue
+                cur = conn.execute(
+                    "INSERT INTO sources (id, titre, auteur, date_publication, url, fichier) VALUES (?, ?, ?, ?, ?, ?)",
+                    (
+                        src.id.strip(),
+                        _normalize_unicode(src.titre),
+                        _normalize_unicode(src.auteur),
+                        _iso(src.date_publication),
+                        _normalize_unicode(src.url),
+                        _normalize_unicode(src.fichier),
+                    ),
+                )
+                self._set_note("S", cur.lastrowid, src.note)
+        except BaseException:
+            conn.rollback()
+            raise
+        self.commit()
+
+    # --- Modifications ligne à ligne (transaction courante) ---
+
+    def _set_note(self, kind: str, owner: int | None, note: str | None) -> None:
+        if note is None:
+            self.conn.execute("DELETE FROM notes WHERE kind = ? AND owner = ?", (kind, owner))
+        else:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO notes (kind, owner, note) VALUES (?, ?, ?)",
+                (kind, owner, _normalize_unicode(note)),
+            )
+
+    def _person_values(self, ind: Individu) -> tuple[Any, ...]:
+        return (
+            _normalize_unicode(ind.nom),
+            _normalize_unicode(ind.prenom),
+            ind.sexe.value if ind.sexe else None,
+            _iso(ind.date_naissance),
+            _normalize_unicode(ind.lieu_naissance),
+            _iso(ind.date_deces),
+            _normalize_unicode(ind.lieu_deces),
+            _refs(ind.sources),
+        )
+
+    def add_person(self, ind: Individu) -> None:
+        cur = self.conn.execute(
+            "INSERT INTO persons (id, nom, prenom, sexe, date_naissance, lieu_naissance, date_deces, lieu_deces, "
+            "sources) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (ind.id.strip(), *self._person_values(ind)),
+        )
+        if ind.note is not None:
+            self._set_note("I", cur.lastrowid, ind.note)
+
+    def update_person(self, ind: Individu) -> None:
+        """Réécrit la (première) ligne de l'individu `ind.id`."""
+        rowid = self._rowid("persons", ind.id)
+        self.conn.execute(
+            "UPDATE persons SET nom = ?, prenom = ?, sexe = ?, date_naissance = ?, lieu_naissance = ?, "
+            "date_deces = ?, lieu_deces = ?, sources = ? WHERE rowid = ?",
+            (*self._person_values(ind), rowid),
+        )
+        self._set_note("I", rowid, ind.note)
+
+    def delete_person(self, person_id: str) -> None:
+        """Supprime l'individu et le retire des familles (parent ou enfant)."""
+        conn = self.conn
+        conn.execute(
+            "DELETE FROM notes WHERE kind = 'I' AND owner IN (SELECT rowid FROM persons WHERE id = ?)", (person_id,)
+        )
+        conn.execute("DELETE FROM persons WHERE id = ?", (person_id,))
+        conn.execute("UPDATE families SET pere_id = NULL WHERE pere_id = ?", (person_id,))
+        conn.execute("UPDATE families SET mere_id = NULL WHERE mere_id = ?", (person_id,))
+        conn.execute("DELETE FROM children WHERE child_id = ?", (person_id,))
+
+    def add_family(self, fam: Famille) -> None:
+        cur = self.conn.execute(
+            "INSERT INTO families (id, pere_id, mere_id, sources) VALUES (?, ?, ?, ?)",
+            (fam.id.strip(), fam.pere_id or None, fam.mere_id or None, _refs(fam.sources)),
+        )
+        self._set_children(cur.lastrowid, fam.enfants_ids)
+        if fam.note is not None:
+            self._set_note("F", cur.lastrowid, fam.note)
+
+    def update_family(self, fam: Famille) -> None:
+        """Réécrit la (première) ligne de la famille `fam.id` et ses enfants."""
+        rowid = self._rowid("families", fam.id)
+        self.conn.execute(
+            "UPDATE families SET pere_id = ?, mere_id = ?, sources = ? WHERE rowid = ?",
+            (fam.pere_id or None, fam.mere_id or None, _refs(fam.sources), rowid),
+        )
+        self.conn.execute("DELETE FROM children WHERE family = ?", (rowid,))
+        self._set_children(rowid, fam.enfants_ids)
+        self._set_note("F", rowid, fam.note)
+
+    def delete_family(self, family_id: str) -> None:
+        rowid = self._rowid("families", family_id)
+        self.conn.execute("DELETE FROM notes WHERE kind = 'F' AND owner = ?", (rowid,))
+        self.conn.execute("DELETE FROM families WHERE rowid = ?", (rowid,))
+
+    def _set_children(self, family: int | None, enfants_ids: Sequence[str]) -> None:
+        self.conn.executemany(
+            "INSERT INTO children (family, position, child_id) VALUES (?, ?, ?)",
+            [(family, k, eid) for k, eid in enumerate(enfants_ids)],
+        )
+
+    def _rowid(self, table: str, ident: str) -> int:
+        row = self.conn.execute(f"SELECT min(rowid) FROM {table} WHERE id = ?", (ident,)).fetchone()
+        if row is None or row[0] is None:
+            raise KeyError(ident)
+        return int(row[0])
+
+    def person_exists(self, person_id: str) -> bool:
+        return self.conn.execute("SELECT 1 FROM persons WHERE id = ? LIMIT 1", (person_id,)).fetchone() is not None
+
+    def family_exists(self, family_id: str) -> bool:
+        return self.conn.execute("SELECT 1 FROM families WHERE id = ? LIMIT 1", (family_id,)).fetchone() is not None
+
+    def linked_families(self, person_id: str) -> list[str]:
+        """Familles dont l'individu est parent ou enfant, dans l'ordre de la base."""
+        rows = self.conn.execute(
+            "SELECT id FROM families WHERE pere_id = ?1 OR mere_id = ?1 "
+            "OR rowid IN (SELECT family FROM children WHERE child_id = ?1) ORDER BY rowid",
+            (person_id,),
+        )
+        return list(dict.fromkeys(fid for (fid,) in rows))
+
+    # --- Requêtes indexées ---
+
+    def counts(self) -> tuple[int, int, int]:
+        (n_individus,), = self.conn.execute("SELECT count(*) FROM persons")
+        (n_familles,), = self.conn.execute("SELECT count(*) FROM families")
+        (n_sources,), = self.conn.execute("SELECT count(*) FROM sources")
+        return n_individus, n_familles, n_sources
+
+    def get_person(self, person_id: str) -> Individu | None:
+        row = self.conn.execute(
+            f"SELECT {_PERSON_COLUMNS} FROM persons p WHERE p.id = ? ORDER BY p.rowid LIMIT 1", (person_id,)
+        ).fetchone()
+        return self._person(row) if row else None
+
+    def get_family(self, family_id: str) -> Famille | None:
+        row = self.conn.execute(
+            f"SELECT {_FAMILY_COLUMNS} FROM families f WHERE f.id = ? ORDER BY f.rowid LIMIT 1", (family_id,)
+        ).fetchone()
+        return self._family(row) if row else None
+
+    def family_children(self, family: Famille) -> list[Individu]:
+        if not family.enfants_ids:
+            return []
+        ids = list(dict.fromkeys(family.enfants_ids))
+        marks = ", ".join("?" * len(ids))
+        return [
+            self._person(row)
+            for row in self.conn.execute(
+                f"SELECT {_PERSON_COLUMNS} FROM persons p WHERE p.id IN ({marks}) ORDER BY p.rowid", ids
+            )
+        ]
+
+    def search(self, query: str | None = None) -> list[Individu]:
+        if not query:
+            # Parcours de l'index (nom, prénom); rowid départage comme le tri stable
+            sql = (
+                f"SELECT {_PERSON_COLUMNS} FROM persons p "
+                "ORDER BY coalesce(p.nom, ''), coalesce(p.prenom, ''), p.rowid"
+            )
+            params: tuple[Any, ...] = ()
+        else:
+            sql = (
+                f"SELECT {_PERSON_COLUMNS} FROM persons p "
+                "WHERE instr(py_lower(coalesce(p.nom, '')), ?1) OR instr(py_lower(coalesce(p.prenom, '')), ?1) "
+                "ORDER BY p.rowid"
+            )
+            params = (query.lower(),)
+        return [self._person(row) for row in self.conn.execute(sql, params)]
+
+    def parent_family(self, person_id: str) -> Famille | None:
+        row = self.conn.execute(
+            f"SELECT {_FAMILY_COLUMNS} FROM families f "
+            "WHERE f.rowid IN (SELECT family FROM children WHERE child_id = ?) ORDER BY f.rowid LIMIT 1",
+            (person_id,),
+        ).fetchone()
+        return self._family(row) if row else None
+
+    def families_as_parent(self, person_id: str) -> list[Famille]:
+        rows = self.conn.execute(
+            f"SELECT {_FAMILY_COLUMNS} FROM families f WHERE f.pere_id = ?1 OR f.mere_id = ?1 ORDER BY f.rowid",
+            (person_id,),
+        ).fetchall()
+        return [self._family(row) for row in rows]
+
+    def notes(self) -> BaseData:
+        conn = self.conn
+        individus = [
+            self._person(row)
+            for row in conn.execute(
+                f"SELECT {_PERSON_COLUMNS} FROM persons p JOIN notes n ON n.kind = 'I' AND n.owner = p.rowid "
+                "WHERE n.note != '' ORDER BY p.rowid"
+            )
+        ]
+        rows = conn.execute(
+            f"SELECT {_FAMILY_COLUMNS} FROM families f JOIN notes n ON n.kind = 'F' AND n.owner = f.rowid "
+            "WHERE n.note != '' ORDER BY f.rowid"
+        ).fetchall()
+        familles = [self._family(row) for row in rows]
+        sources = [
+            Source(id=sid, titre=titre, note=note)
+            for sid, titre, note in conn.execute(
+                "SELECT s.id, s.titre, n.note FROM sources s JOIN notes n ON n.kind = 'S' AND n.owner = s.rowid "
+                "WHERE n.note != '' ORDER BY s.rowid"
+            )
+        ]
+        return individus, familles, sources
+
+
+def storage_kind(base_dir: str | Path) -> StorageKind:
+    """Moteur d'une base: SQLite si `base.sqlite` est présent, fragmenté, compressé ou
+    natif si la base n'a qu'un manifeste de fragments, un `base.gwbz` ou les fichiers
+    `base`/`base.acc` d'OCaml, JSON sinon."""
+    root = Path(base_dir)
+    if (root / SQLITE_FILE).exists():
+        return "sqlite"
+    if not (root / JSON_FILE).exists():
+        if is_sharded(root):
+            return "sharded"
+        if is_packed(root):
+            return "packed"
+        if is_native(root):
+            return "native"
+    return "json"
+
+
+def open_storage(base_dir: str | Path, kind: StorageKind | None = None, shards: int | None = None) -> StorageBackend:
+    kind = kind or storage_kind(base_dir)
+    if kind == "sqlite":
+        return SqliteStorage(base_dir)
+    if kind == "sharded":
+        return ShardedStorage(base_dir, shards)
+    if kind == "packed":
+        return PackedStorage(base_dir)
+    if kind == "native":
+        return NativeStorage(base_dir)
+    if kind == "json":
+        return JsonStorage(base_dir)
+    raise ValueError(f"Moteur de stockage inconnu: {kind} (attendu: json, sharded, packed, sqlite, native)")
+
+
+def _remove(storage: StorageBackend) -> None:
+    if isinstance(storage, SqliteStorage):
+        storage.close()
+        for suffix in ("", "-wal", "-shm"):
+            with suppress(FileNotFoundError):
+                storage.path.with_name(storage.path.name + suffix).unlink()
+    elif isinstance(storage, ShardedStorage):
+        remove_shards(storage.base_dir)
+    elif isinstance(storage, PackedStorage):
+        storage.close()
+        remove_packed(storage.base_dir)
+    elif isinstance(storage, NativeStorage):
+        storage.close()
+        remove_native(storage.base_dir)
+    else:
+        with suppress(FileNotFoundError):
+            (storage.base_dir / JSON_FILE).unlink()
+
+
+def convert_base(
+    base_dir: str | Path, to: StorageKind, output_dir: str | Path | None = None, shards: int | None = None
+) -> Path:
+    """Migre une base vers le moteur `to`; renvoie le répertoire de la base convertie.
+
+    Sans `output_dir`, conversion sur place: l'ancien fichier de données est supprimé
+    une fois le nouveau écrit (les autres fichiers de la base sont conservés). `shards`
+    fixe le nombre de fragments d'une base fragmentée (défaut: `DEFAULT_SHARDS`, ou
+    celui de la base source pour un changement de nombre de fragments).
+
+    Raises:
+        FileNotFoundError: base introuvable
+        ValueError: moteur inconnu ou natif (lecture seule), ou base déjà dans ce format
+            (conversion sur place)
+    """
+    source = open_storage(base_dir)
+    if to == "native":
+        raise ValueError("Conversion vers une base native impossible (lecture seule): utiliser gwc")
+    target_dir = Path(output_dir) if output_dir is not None else Path(base_dir)
+    if output_dir is None and source.kind == to and (to != "sharded" or not shards):
+        raise ValueError(f"La base {base_dir} est déjà au format {to}")
+    target = open_storage(target_dir, to, shards)
+    with source, target:
+        data = source.load()
+        target_dir.mkdir(parents=True, exist_ok=True)
+        if target.kind != source.kind or output_dir is not None:
+            _remove(target)
+        target.save(*data)
+        if output_dir is None and source.kind != target.kind:
+            _remove(source)
+    return target_dir
@@ -1,9 +1,14 @@
 from __future__ import annotations
 
 import difflib
+import hashlib
 import unicodedata
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator
 from dataclasses import dataclass
+from itertools import zip_longest
 from pathlib import Path
+from typing import Any, Literal
 
 from geneweb.domain.models import Famille, Individu, Source
 
@@ -47,68 +52,251 @@ def compare_gedcom(left_text: str, right_text: str, context: int = 3) -> Compare
 	return CompareResult(False, diff=diff_text, left_count=len(left), right_count=len(right))
 
 
-def compare_files(left_path: str | Path, right_path: str | Path, context: int = 3) -> CompareResult:
-	left_text = Path(left_path).read_text(encoding="utf-8", errors="ignore")
-	right_text = Path(right_path).read_text(encoding="utf-8", errors="ignore")
-	return compare_gedcom(left_text, right_text, context=context)
+# ============================================================================
+# Comparaison GEDCOM en flux (fichiers volumineux)
+# ============================================================================
 
 
-def _serialize_individu_for_diff(ind: Individu) -> str:
-	"""Sérialise un Individu en format texte pour comparaison."""
-	parts = [f"ID: {ind.id}"]
+def iter_normalized_lines(path: str | Path) -> Iterator[str]:
+	"""Lit un GEDCOM ligne par ligne et produit les lignes normalisées (cf. normalize_gedcom)."""
+	with open(path, encoding="utf-8", errors="ignore") as fh:
+		for line in fh:
+			if line.strip():
+				yield _normalize_line(line)
+
+
+def _first_difference(left: Iterator[str], right: Iterator[str]) -> tuple[int, str | None, str | None]:
+	"""Parcourt les deux flux en parallèle jusqu'à la première différence.
+
+	Retourne (nombre de lignes identiques, ligne gauche, ligne droite). Les deux lignes
+	valent None si les flux sont identiques; une seule vaut None si un flux est plus court.
+	"""
+	count = 0
+	for lline, rline in zip_longest(left, right):
+		if lline != rline:
+			return count, lline, rline
+		count += 1
+	return count, None, None
+
+
+def files_equal(left_path: str | Path, right_path: str | Path) -> bool:
+	"""Égalité de deux GEDCOM après normalisation, avec arrêt à la première différence."""
+	_count, lline, rline = _first_difference(
+		iter_normalized_lines(left_path), iter_normalized_lines(right_path)
+	)
+	return lline is None and rline is None
+
+
+def _iter_records(lines: Iterable[str]) -> Iterator[list[str]]:
+	"""Regroupe les lignes normalisées en enregistrements de niveau 0."""
+	record: list[str] = []
+	for line in lines:
+		if line.startswith("0 ") and record:
+			yield record
+			record = []
+		record.append(line)
+	if record:
+		yield record
+
+
+def iter_gedcom_record_diff(
+	left_lines: Iterable[str], right_lines: Iterable[str], context: int = 3
+) -> Iterator[str]:
+	"""Diff aligné sur les enregistrements de niveau 0, produit en flux.
+
+	Les enregistrements sont appariés par leur ligne d'en-tête (ex: `0 @I1@ INDI`).
+	Les deux fichiers sont parcourus en parallèle; en cas de désalignement, les
+	enregistrements non appariés sont mis en attente jusqu'à ce que leur homologue
+	apparaisse de l'autre côté (resynchronisation), sans LCS global. La mémoire
+	utilisée est proportionnelle à l'écart entre les deux fichiers, pas à leur taille.
+	"""
+	pending_left: dict[str, deque[list[str]]] = {}
+	pending_right: dict[str, deque[list[str]]] = {}
+
+	def record_diff(lrec: list[str], rrec: list[str]) -> Iterator[str]:
+		if lrec == rrec:
+			return
+		yield f"=== {lrec[0]}"
+		hunks = difflib.unified_diff(lrec, rrec, n=context, lineterm="")
+		for line in hunks:
+			if line.startswith(("---", "+++")):
+				continue
+			yield line
+
+	def take(pending: dict[str, deque[list[str]]], header: str) -> list[str] | None:
+		queue = pending.get(header)
+		if not queue:
+			return None
+		rec = queue.popleft()
+		if not queue:
+			del pending[header]
+		return rec
+
+	for lrec, rrec in zip_longest(_iter_records(left_lines), _iter_records(right_lines)):
+		if lrec is not None and rrec is not None and lrec[0] == rrec[0]:
+			yield from record_diff(lrec, rrec)
+			continue
+		if lrec is not None:
+			match = take(pending_right, lrec[0])
+			if match is None:
+				pending_left.setdefault(lrec[0], deque()).append(lrec)
+			else:
+				yield from record_diff(lrec, match)
+		if rrec is not None:
+			match = take(pending_left, rrec[0])
+			if match is None:
+				pending_right.setdefault(rrec[0], deque()).append(rrec)
+			else:
+				yield from record_diff(match, rrec)
+
+	for queue in pending_left.values():
+		for rec in queue:
+			yield f"--- {rec[0]}"
+			yield from (f"-{line}" for line in rec)
+	for queue in pending_right.values():
+		for rec in queue:
+			yield f"+++ {rec[0]}"
+			yield from (f"+{line}" for line in rec)
+
+
+class _CountingIter:
+	"""Itérateur qui compte les éléments consommés."""
+
+	def __init__(self, it: Iterable[str]) -> None:
+		self._it = iter(it)
+		self.count = 0
+
+	def __iter__(self) -> _CountingIter:
+		return self
+
+	def __next__(self) -> str:
+		item = next(self._it)
+		self.count += 1
+		return item
+
+
+def compare_files(
+	left_path: str | Path,
+	right_path: str | Path,
+	context: int = 3,
+	mode: Literal["unified", "equal", "records"] = "unified",
+) -> CompareResult:
+	"""Compare deux fichiers GEDCOM normalisés.
+
+	Modes:
+	- "unified": unified diff global (historique). L'égalité est d'abord vérifiée en flux;
+		les fichiers ne sont chargés en mémoire que s'ils diffèrent.
+	- "equal": égalité seule, arrêt à la première différence. `diff` contient alors la
+		première paire de lignes divergentes; les compteurs sont ceux des lignes lues.
+	- "records": diff aligné sur les enregistrements de niveau 0 (iter_gedcom_record_diff),
+		calculé en flux. Les enregistrements y sont appariés par en-tête: deux fichiers
+		qui ne diffèrent que par l'ordre des enregistrements donnent un diff vide.
+
+	Dans tous les modes, `are_equal` vient de la même égalité stricte ligne à ligne
+	(en flux): des enregistrements réordonnés ne sont pas égaux.
+	"""
+	left_it = _CountingIter(iter_normalized_lines(left_path))
+	right_it = _CountingIter(iter_normalized_lines(right_path))
+	same, lline, rline = _first_difference(left_it, right_it)
+	if lline is None and rline is None:
+		return CompareResult(True, diff="", left_count=same, right_count=same)
+
+	if mode == "records":
+		left_it = _CountingIter(iter_normalized_lines(left_path))
+		right_it = _CountingIter(iter_normalized_lines(right_path))
+		diff_text = "\n".join(iter_gedcom_record_diff(left_it, right_it, context=context))
+		return CompareResult(False, diff=diff_text, left_count=left_it.count, right_count=right_it.count)
+
+	if mode == "equal":
+		diff_lines = [f"@@ ligne {same + 1} @@"]
+		if lline is not None:
+			diff_lines.append(f"-{lline}")
+		if rline is not None:
+			diff_lines.append(f"+{rline}")
+		return CompareResult(False, diff="\n".join(diff_lines), left_count=left_it.count, right_count=right_it.count)
+
+	left = list(iter_normalized_lines(left_path))
+	right = list(iter_normalized_lines(right_path))
+	d = difflib.unified_diff(left, right, fromfile="left", tofile="right", n=context)
+	diff_text = "\n".join(d)
+	return CompareResult(False, diff=diff_text, left_count=len(left), right_count=len(right))
+
+
+def _canonical_individu(ind: Individu) -> list[tuple[str, str]]:
+	"""Forme canonique d'un Individu: liste ordonnée (champ, valeur) des champs définis."""
+	fields = [("ID", ind.id)]
 	if ind.nom is not None:
-		parts.append(f"Nom: {ind.nom}")
+		fields.append(("Nom", ind.nom))
 	if ind.prenom is not None:
-		parts.append(f"Prénom: {ind.prenom}")
+		fields.append(("Prénom", ind.prenom))
 	if ind.sexe is not None:
-		parts.append(f"Sexe: {ind.sexe.value}")
+		fields.append(("Sexe", ind.sexe.value))
 	if ind.date_naissance is not None:
-		parts.append(f"Date naissance: {ind.date_naissance.isoformat()}")
+		fields.append(("Date naissance", ind.date_naissance.isoformat()))
 	if ind.lieu_naissance is not None:
-		parts.append(f"Lieu naissance: {ind.lieu_naissance}")
+		fields.append(("Lieu naissance", ind.lieu_naissance))
 	if ind.date_deces is not None:
-		parts.append(f"Date décès: {ind.date_deces.isoformat()}")
+		fields.append(("Date décès", ind.date_deces.isoformat()))
 	if ind.lieu_deces is not None:
-		parts.append(f"Lieu décès: {ind.lieu_deces}")
+		fields.append(("Lieu décès", ind.lieu_deces))
 	if ind.note is not None:
-		parts.append(f"Note: {ind.note}")
+		fields.append(("Note", ind.note))
 	if ind.sources:
-		parts.append(f"Sources: {', '.join(sorted(ind.sources))}")
-	return " | ".join(parts)
+		fields.append(("Sources", ", ".join(sorted(ind.sources))))
+	return fields
 
 
-def _serialize_famille_for_diff(fam: Famille) -> str:
-	"""Sérialise une Famille en format texte pour comparaison."""
-	parts = [f"ID: {fam.id}"]
+def _canonical_famille(fam: Famille) -> list[tuple[str, str]]:
+	"""Forme canonique d'une Famille: liste ordonnée (champ, valeur) des champs définis."""
+	fields = [("ID", fam.id)]
 	if fam.pere_id is not None:
-		parts.append(f"Père: {fam.pere_id}")
+		fields.append(("Père", fam.pere_id))
 	if fam.mere_id is not None:
-		parts.append(f"Mère: {fam.mere_id}")
+		fields.append(("Mère", fam.mere_id))
 	if fam.enfants_ids:
-		parts.append(f"Enfants: {', '.join(sorted(fam.enfants_ids))}")
+		fields.append(("Enfants", ", ".join(sorted(fam.enfants_ids))))
 	if fam.note is not None:
-		parts.append(f"Note: {fam.note}")
+		fields.append(("Note", fam.note))
 	if fam.sources:
-		parts.append(f"Sources: {', '.join(sorted(fam.sources))}")
-	return " | ".join(parts)
+		fields.append(("Sources", ", ".join(sorted(fam.sources))))
+	return fields
 
 
-def _serialize_source_for_diff(src: Source) -> str:
-	"""Sérialise une Source en format texte pour comparaison."""
-	parts = [f"ID: {src.id}"]
+def _canonical_source(src: Source) -> list[tuple[str, str]]:
+	"""Forme canonique d'une Source: liste ordonnée (champ, valeur) des champs définis."""
+	fields = [("ID", src.id)]
 	if src.titre is not None:
-		parts.append(f"Titre: {src.titre}")
+		fields.append(("Titre", src.titre))
 	if src.auteur is not None:
-		parts.append(f"Auteur: {src.auteur}")
+		fields.append(("Auteur", src.auteur))
 	if src.date_publication is not None:
-		parts.append(f"Date publication: {src.date_publication.isoformat()}")
+		fields.append(("Date publication", src.date_publication.isoformat()))
 	if src.url is not None:
-		parts.append(f"URL: {src.url}")
+		fields.append(("URL", src.url))
 	if src.fichier is not None:
-		parts.append(f"Fichier: {src.fichier}")
+		fields.append(("Fichier", src.fichier))
 	if src.note is not None:
-		parts.append(f"Note: {src.note}")
-	return " | ".join(parts)
+		fields.append(("Note", src.note))
+	return fields
+
+
+def _join_canonical(fields: list[tuple[str, str]]) -> str:
+	return " | ".join(f"{label}: {value}" for label, value in fields)
+
+
+def _serialize_individu_for_diff(ind: Individu) -> str:
+	"""Sérialise un Individu en format texte pour comparaison."""
+	return _join_canonical(_canonical_individu(ind))
+
+
+def _serialize_famille_for_diff(fam: Famille) -> str:
+	"""Sérialise une Famille en format texte pour comparaison."""
+	return _join_canonical(_canonical_famille(fam))
+
+
+def _serialize_source_for_diff(src: Source) -> str:
+	"""Sérialise une Source en format texte pour comparaison."""
+	return _join_canonical(_canonical_source(src))
 
 
 def _serialize_gwb_for_diff(individus: list[Individu], familles: list[Famille], sources: list[Source]) -> list[str]:
@@ -136,41 +324,202 @@ def _serialize_gwb_for_diff(individus: list[Individu], familles: list[Famille],
 	return lines
 
 
+# ============================================================================
+# Comparaison GWB indexée par identifiant (diff par empreinte, O(n))
+# ============================================================================
+
+GwbTuple = tuple[list[Individu], list[Famille], list[Source]]
+
+# Au-delà de ce nombre d'enregistrements, le rendu unified diff (quadratique au pire)
+# n'est plus utilisé en mode "auto" : on bascule sur le rapport indexé.
+UNIFIED_DIFF_MAX_RECORDS = 2000
+
+@dataclass(frozen=True)
+class RecordDelta:
+	"""Différence sur un enregistrement identifié par (kind, id).
+
+	- status: "added" (présent à droite seulement), "removed" (à gauche seulement),
+		"modified" (présent des deux côtés avec une forme canonique différente; seule la
+		première occurrence d'un id est comparée) ou "duplicate" (occurrences suivantes
+		d'un id en double différentes d'un côté à l'autre)
+	- fields: pour "modified", {champ: (valeur_gauche, valeur_droite)}; pour
+		"duplicate", {"Occurrences": (nombre_gauche, nombre_droite)}; None = absent
+	- left/right: forme canonique sérialisée de chaque côté (None si absent)
+	"""
+
+	kind: str
+	id: str
+	status: str
+	fields: dict[str, tuple[str | None, str | None]]
+	left: str | None = None
+	right: str | None = None
+
+
+def _fingerprint(canonical: list[tuple[str, str]]) -> bytes:
+	"""Empreinte stable de la forme canonique (blake2b 128 bits)."""
+	h = hashlib.blake2b(digest_size=16)
+	for label, value in canonical:
+		h.update(label.encode("utf-8"))
+		h.update(b"\x1f")
+		h.update(value.encode("utf-8"))
+		h.update(b"\x1e")
+	return h.digest()
+
+
+def _iter_kind_deltas(
+	kind: str,
+	left_items: list[Any],
+	right_items: list[Any],
+	canonical: Callable[[Any], list[tuple[str, str]]],
+) -> Iterator[RecordDelta]:
+	# Seul le côté gauche est indexé (id -> empreinte); le côté droit est parcouru en flux.
+	# Même règle des deux côtés pour un id en double: la première occurrence fait foi,
+	# les suivantes (empreintes) sont comparées à part et signalées en "duplicate".
+	left_index: dict[str, tuple[bytes, Any]] = {}
+	left_extra: dict[str, list[bytes]] = {}
+	for item in left_items:
+		fp = _fingerprint(canonical(item))
+		if item.id in left_index:
+			left_extra.setdefault(item.id, []).append(fp)
+		else:
+			left_index[item.id] = (fp, item)
+
+	seen: set[str] = set()
+	right_extra: dict[str, list[bytes]] = {}
+	for item in right_items:
+		right_canon = canonical(item)
+		if item.id in seen:
+			right_extra.setdefault(item.id, []).append(_fingerprint(right_canon))
+			continue
+		seen.add(item.id)
+		entry = left_index.get(item.id)
+		if entry is None:
+			yield RecordDelta(kind, item.id, "added", {}, right=_join_canonical(right_canon))
+			continue
+		left_fp, left_item = entry
+		if left_fp == _fingerprint(right_canon):
+			continue
+		left_canon = canonical(left_item)
+		left_fields = dict(left_canon)
+		right_fields = dict(right_canon)
+		fields = {
+			label: (left_fields.get(label), right_fields.get(label))
+			for label in dict.fromkeys([*left_fields, *right_fields])
+			if left_fields.get(label) != right_fields.get(label)
+		}
+		yield RecordDelta(
+			kind,
+			item.id,
+			"modified",
+			fields,
+			left=_join_canonical(left_canon),
+			right=_join_canonical(right_canon),
+		)
+
+	for iid, (_fp, item) in left_index.items():
+		if iid not in seen:
+			yield RecordDelta(kind, iid, "removed", {}, left=_join_canonical(canonical(item)))
+
+	for iid in dict.fromkeys([*left_extra, *right_extra]):
+		lextra, rextra = left_extra.get(iid, []), right_extra.get(iid, [])
+		if sorted(lextra) != sorted(rextra):
+			occurrences = (
+				str(len(lextra) + (iid in left_index)),
+				str(len(rextra) + (iid in seen)),
+			)
+			yield RecordDelta(kind, iid, "duplicate", {"Occurrences": occurrences})
+
+
+def iter_gwb_deltas(left: GwbTuple, right: GwbTuple) -> Iterator[RecordDelta]:
+	"""Compare deux bases GWB enregistrement par enregistrement, en flux.
+
+	Chaque enregistrement est réduit à une empreinte de sa forme canonique, indexée par id:
+	le coût est linéaire en nombre d'enregistrements, quel que soit le nombre de différences.
+	Les deltas sont produits au fil de l'eau (individus, puis familles, puis sources).
+	"""
+	yield from _iter_kind_deltas("INDIVIDUS", left[0], right[0], _canonical_individu)
+	yield from _iter_kind_deltas("FAMILLES", left[1], right[1], _canonical_famille)
+	yield from _iter_kind_deltas("SOURCES", left[2], right[2], _canonical_source)
+
+
+def _format_value(value: str | None) -> str:
+	return "∅" if value is None else repr(value)
+
+
+def render_delta(delta: RecordDelta) -> list[str]:
+	"""Rend un delta sous forme de lignes texte (rapport indexé)."""
+	if delta.status == "added":
+		return [f"+ [{delta.kind}] {delta.right}"]
+	if delta.status == "removed":
+		return [f"- [{delta.kind}] {delta.left}"]
+	if delta.status == "duplicate":
+		lcount, rcount = delta.fields["Occurrences"]
+		return [f"! [{delta.kind}] ID: {delta.id} en double ({lcount} -> {rcount} occurrences)"]
+	lines = [f"~ [{delta.kind}] ID: {delta.id}"]
+	for label, (lval, rval) in delta.fields.items():
+		lines.append(f"    {label}: {_format_value(lval)} -> {_format_value(rval)}")
+	return lines
+
+
+def iter_gwb_report(left: GwbTuple, right: GwbTuple) -> Iterator[str]:
+	"""Rapport indexé ligne par ligne, adapté aux bases volumineuses (flux)."""
+	for delta in iter_gwb_deltas(left, right):
+		yield from render_delta(delta)
+
+
+def _render_unified_gwb(left: GwbTuple, right: GwbTuple, context: int) -> str:
+	left_lines = _serialize_gwb_for_diff(*left)
+	right_lines = _serialize_gwb_for_diff(*right)
+	d = difflib.unified_diff(left_lines, right_lines, fromfile="left", tofile="right", n=context, lineterm="")
+	return "\n".join(d)
+
+
 def compare_gwb(
-	left: tuple[list[Individu], list[Famille], list[Source]],
-	right: tuple[list[Individu], list[Famille], list[Source]],
+	left: GwbTuple,
+	right: GwbTuple,
 	context: int = 3,
+	renderer: Literal["auto", "keyed", "unified"] = "auto",
 ) -> CompareResult:
 	"""Compare deux bases GWB et retourne un diff lisible.
 	
+	L'égalité est toujours déterminée par le moteur indexé (empreintes par id, O(n)).
+	Le texte du diff dépend de `renderer`:
+	- "keyed": rapport indexé (ajouts/suppressions/modifications champ par champ)
+	- "unified": unified diff historique sur la sérialisation triée (petites bases)
+	- "auto": "unified" si les deux bases ont au plus UNIFIED_DIFF_MAX_RECORDS
+		enregistrements, "keyed" sinon
+	
 	Args:
 		left: Tuple (individus, familles, sources) de la base de gauche
 		right: Tuple (individus, familles, sources) de la base de droite
-		context: Nombre de lignes de contexte dans le diff
+		context: Nombre de lignes de contexte dans le diff (rendu unified)
+		renderer: Rendu du diff ("auto", "keyed" ou "unified")
 		
 	Returns:
 		CompareResult avec are_equal, diff, left_count, right_count
 	"""
-	left_individus, left_familles, left_sources = left
-	right_individus, right_familles, right_sources = right
-	
-	left_lines = _serialize_gwb_for_diff(left_individus, left_familles, left_sources)
-	right_lines = _serialize_gwb_for_diff(right_individus, right_familles, right_sources)
-	
-	are_equal = left_lines == right_lines
-	if are_equal:
-		return CompareResult(
-			are_equal=True,
-			diff="",
-			left_count=len(left_individus) + len(left_familles) + len(left_sources),
-			right_count=len(right_individus) + len(right_familles) + len(right_sources),
-		)
-	
-	d = difflib.unified_diff(left_lines, right_lines, fromfile="left", tofile="right", n=context, lineterm="")
-	diff_text = "\n".join(d)
+	left_count = sum(len(items) for items in left)
+	right_count = sum(len(items) for items in right)
+
+	deltas = iter_gwb_deltas(left, right)
+	first = next(deltas, None)
+	if first is None:
+		return CompareResult(are_equal=True, diff="", left_count=left_count, right_count=right_count)
+
+	if renderer == "auto":
+		small = max(left_count, right_count) <= UNIFIED_DIFF_MAX_RECORDS
+		renderer = "unified" if small else "keyed"
+
+	if renderer == "unified":
+		diff_text = _render_unified_gwb(left, right, context)
+	else:
+		lines = render_delta(first)
+		for delta in deltas:
+			lines.extend(render_delta(delta))
+		diff_text = "\n".join(lines)
 	return CompareResult(
 		are_equal=False,
 		diff=diff_text,
-		left_count=len(left_individus) + len(left_familles) + len(left_sources),
-		right_count=len(right_individus) + len(right_familles) + len(right_sources),
+		left_count=left_count,
+		right_count=right_count,
 	)
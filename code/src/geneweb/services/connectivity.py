@@ -15,10 +15,12 @@ Sortie: liste de composantes connexes (chaque composante = liste d'IDs d'individ
 
 from __future__ import annotations
 
+from array import array
 from typing import Dict, Iterable, List, Set
 
 from geneweb.domain.models import Famille, Individu
-from geneweb.io.gwb import load_gwb_minimal
+from geneweb.domain.table import BaseTable
+from geneweb.io.gwb import load_gwb_table
 
 
 def _build_adjacency_graph(
@@ -129,11 +131,77 @@ def compute_connected_components(
     return components
 
 
+def _table_adjacency(table: BaseTable) -> tuple[array[int], array[int]]:
+    """Graphe d'adjacence de `_build_adjacency_graph` au format CSR (indices de la table).
+
+    Seuls les individus de la base ont des voisins; un identifiant seulement référencé
+    (parent absent de la base) peut être voisin, comme dans la version par objets.
+    """
+    sources, targets = array("i"), array("i")
+
+    def edge(src: int, dst: int) -> None:
+        sources.append(src)
+        targets.append(dst)
+
+    for f in range(table.n_familles):
+        pere, mere = table.pere[f], table.mere[f]
+        if pere >= 0 and mere >= 0:
+            if table.is_individu(pere):
+                edge(pere, mere)
+            if table.is_individu(mere):
+                edge(mere, pere)
+        parents = [p for p in (pere, mere) if p >= 0]
+        for child in table.children(f):
+            if table.is_individu(child):
+                for parent in parents:
+                    edge(child, parent)
+                    if table.is_individu(parent):
+                        edge(parent, child)
+
+    start = array("i", [0]) * (table.n_individus + 1)
+    for src in sources:
+        start[src + 1] += 1
+    for k in range(table.n_individus):
+        start[k + 1] += start[k]
+    neighbors = array("i", [0]) * len(targets)
+    fill = array("i", start[:-1])
+    for src, dst in zip(sources, targets, strict=True):
+        neighbors[fill[src]] = dst
+        fill[src] += 1
+    return start, neighbors
+
+
+def compute_connected_components_table(table: BaseTable) -> List[List[str]]:
+    """Même résultat que `compute_connected_components`, sur une `BaseTable`."""
+    start, neighbors = _table_adjacency(table)
+    visited = bytearray(len(table.ids))
+    components: List[List[str]] = []
+
+    for node in range(table.n_individus):
+        if visited[node]:
+            continue
+        component: List[str] = []
+        stack = [node]
+        while stack:
+            current = stack.pop()
+            if visited[current]:
+                continue
+            visited[current] = 1
+            component.append(table.ids[current])
+            if table.is_individu(current):
+                stack.extend(n for n in neighbors[start[current] : start[current + 1]] if not visited[n])
+        components.append(sorted(component))
+
+    components.sort(key=len, reverse=True)
+    return components
+
+
 def compute_connected_components_from_gwb(root_dir: str) -> List[List[str]]:
     """Charge une base GWB minimale et calcule les composantes connexes.
 
     Utile pour des validations rapides sur des fixtures. Cette fonction
-    s'appuie sur `load_gwb_minimal` (rétrocompatible formats simple/complet).
+    s'appuie sur `load_gwb_table` (rétrocompatible formats simple/complet) et
+    ne construit pas d'objets par individu.
 
     Args:
         root_dir: Chemin vers le répertoire racine de la base GWB
@@ -141,8 +209,7 @@ def compute_connected_components_from_gwb(root_dir: str) -> List[List[str]]:
     Returns:
         Liste de composantes connexes (liste d'IDs d'individus)
     """
-    individus, familles, _sources = load_gwb_minimal(root_dir)
-    return compute_connected_components(individus, familles)
+    return compute_connected_components_table(load_gwb_table(root_dir))
 
 
 def get_largest_component(
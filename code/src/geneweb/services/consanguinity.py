@@ -18,7 +18,8 @@ from __future__ import annotations
 from typing import Dict, Iterable, Optional, Tuple
 
 from geneweb.domain.models import Famille, Individu
-from geneweb.io.gwb import load_gwb_minimal
+from geneweb.domain.table import BaseTable
+from geneweb.io.gwb import load_gwb_table
 
 
 ParentsMap = Dict[str, Tuple[Optional[str], Optional[str]]]
@@ -149,6 +150,60 @@ class InbreedingCalculator:
         return value
 
 
+class TableInbreedingCalculator:
+    """`InbreedingCalculator` sur une `BaseTable`: indices entiers, -1 pour inconnu.
+
+    Mêmes règles et même ordre de récursion/mémoïsation que la version par
+    identifiants, donc mêmes valeurs.
+    """
+
+    def __init__(self, table: BaseTable) -> None:
+        self.table = table
+        self.pere, self.mere = table.parents()
+        self._n = len(table.ids)
+        self._f_cache: Dict[int, float] = {}
+        self._kinship_cache: Dict[int, float] = {}
+
+    def kinship(self, a: int, b: int) -> float:
+        if a < 0 or b < 0:
+            return 0.0
+        cache_key = a * self._n + b if a <= b else b * self._n + a
+        cached = self._kinship_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        if a == b:
+            result = (1.0 + self.F(a)) / 2.0
+        else:
+            fa, ma = self.pere[a], self.mere[a]
+            if fa < 0 and ma < 0:
+                fb, mb = self.pere[b], self.mere[b]
+                if fb < 0 and mb < 0:
+                    result = 0.0
+                else:
+                    result = (self.kinship(a, fb) + self.kinship(a, mb)) / 2.0
+            else:
+                result = (self.kinship(fa, b) + self.kinship(ma, b)) / 2.0
+
+        self._kinship_cache[cache_key] = result
+        return result
+
+    def F(self, k: int) -> float:
+        cached = self._f_cache.get(k)
+        if cached is not None:
+            return cached
+        father, mother = self.pere[k], self.mere[k]
+        value = 0.0 if father < 0 and mother < 0 else self.kinship(father, mother)
+        self._f_cache[k] = value
+        return value
+
+
+def compute_inbreeding_table(table: BaseTable) -> Dict[str, float]:
+    """Calcule F pour tous les individus d'une `BaseTable` ({id_individu: F})."""
+    calc = TableInbreedingCalculator(table)
+    return {table.ids[k]: calc.F(k) for k in range(table.n_individus)}
+
+
 def compute_inbreeding_coefficients(
     individus: Iterable[Individu], familles: Iterable[Famille]
 ) -> Dict[str, float]:
@@ -172,9 +227,9 @@ def compute_inbreeding_from_gwb(root_dir: str) -> Dict[str, float]:
     """Charge une base GWB minimale et calcule F pour tous les individus.
 
     Utile pour des validations rapides sur des fixtures. Cette fonction
-    s'appuie sur `load_gwb_minimal` (rétrocompatible formats simple/complet).
+    s'appuie sur `load_gwb_table` (rétrocompatible formats simple/complet) et
+    ne construit pas d'objets par individu.
     """
-    individus, familles, _sources = load_gwb_minimal(root_dir)
-    return compute_inbreeding_coefficients(individus, familles)
+    return compute_inbreeding_table(load_gwb_table(root_dir))
 
 
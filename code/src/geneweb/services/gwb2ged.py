@@ -12,12 +12,13 @@ from geneweb.io.gedcom import serialize_gedcom_minimal
 from geneweb.io.gwb import load_gwb_minimal
 
 
-def gwb2ged_python(input_dir: str | Path, output_file: str | Path) -> str:
+def gwb2ged_python(input_dir: str | Path, output_file: str | Path, *, workers: int | None = None) -> str:
     """Convertit un répertoire GWB en fichier GEDCOM en utilisant l'implémentation Python native.
 
     Args:
         input_dir: Répertoire contenant la base GWB (doit contenir index.json)
         output_file: Fichier GEDCOM de sortie
+        workers: Processus de décodage d'un gros index (voir `load_gwb_minimal`)
 
     Returns:
         Contenu GEDCOM généré
@@ -31,7 +32,7 @@ def gwb2ged_python(input_dir: str | Path, output_file: str | Path) -> str:
         raise FileNotFoundError(f"Répertoire GWB introuvable: {input_dir}")
 
     # Charger les individus, familles et sources depuis GWB (Issues #24, #25)
-    individus, familles, sources = load_gwb_minimal(root_path)
+    individus, familles, sources = load_gwb_minimal(root_path, workers=workers)
 
     # Sérialiser en GEDCOM
     gedcom_content = serialize_gedcom_minimal(individus, familles, sources)
@@ -1,9 +1,14 @@
 from __future__ import annotations
 
 import mimetypes
+import os
 from pathlib import Path
 from typing import Any
 
+from geneweb.infra.response_cache import get_response_cache, person_tag
+from geneweb.io import codec, durable
+from geneweb.io.revision import bump_revision
+
 
 def _images_dir(base_dir: str | Path) -> Path:
     # Cherche un sous-dossier images dans la base, sinon retourne la base elle-même
@@ -30,6 +35,17 @@ def list_carrousel_images(base_dir: str | Path, person_id: str | None = None) ->
     return {"images": files}
 
 
+def images_signature(base_dir: str | Path) -> str:
+    # Les fichiers images sont ajoutés directement sur disque: la date de modification
+    # des dossiers (ajout, suppression, renommage) complète la révision de la base
+    images_root = _images_dir(base_dir)
+    latest = max(
+        (Path(dirpath).stat().st_mtime_ns for dirpath, _dirs, _files in os.walk(images_root)),
+        default=0,
+    )
+    return str(latest)
+
+
 def get_image_file(base_dir: str | Path, relative_path: str) -> tuple[bytes, str]:
     # Sécurise le chemin (pas de traversée)
     root = _images_dir(base_dir)
@@ -45,20 +61,21 @@ def get_image_file(base_dir: str | Path, relative_path: str) -> tuple[bytes, str
 
 def set_blason_image(base_dir: str | Path, person_id: str, image_name: str) -> dict[str, str]:
     # Place-holder: enregistre une association simple dans un fichier blasons.json
-    import json
-
     p = Path(base_dir)
     if not p.exists():
         raise FileNotFoundError(base_dir)
     fp = p / "blasons.json"
-    data: dict[str, str] = {}
-    if fp.exists():
-        try:
-            data = json.loads(fp.read_text(encoding="utf-8"))
-        except Exception:
-            data = {}
-    data[person_id] = image_name
-    fp.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8")
+    with get_response_cache().writing(p) as touched:
+        data: dict[str, str] = {}
+        if fp.exists():
+            try:
+                data = codec.loads(fp.read_bytes())
+            except Exception:
+                data = {}
+        data[person_id] = image_name
+        touched.add(person_tag(person_id))
+        durable.write_atomic(fp, codec.dumps_file(data))
+        bump_revision(p)
     return {"person_id": person_id, "blason": image_name}
 
 
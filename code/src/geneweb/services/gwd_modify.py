@@ -1,10 +1,19 @@
 from __future__ import annotations
 
+import copy
+import threading
+import weakref
+from collections.abc import Callable, Mapping, Sequence
 from pathlib import Path
-from typing import Literal
+from typing import Any, Literal, TypedDict, TypeVar, Unpack
 
 from geneweb.domain.models import Individu, Sexe, Famille
-from geneweb.io.gwb import load_gwb_minimal, write_gwb_minimal
+from geneweb.infra.response_cache import ALL_TAG, family_tag, get_response_cache, person_tag
+from geneweb.infra.snapshot_store import get_snapshot_store, snapshot_enabled
+from geneweb.infra.writer import WriteResult, submit_write
+from geneweb.io.gwb import StringPool, load_gwb_minimal, write_gwb_minimal
+from geneweb.io.revision import read_revision
+from geneweb.io.storage import SqliteStorage, storage_kind
 
 
 def _resolve_base_dir(base_dir: str | Path) -> Path:
@@ -14,188 +23,534 @@ def _resolve_base_dir(base_dir: str | Path) -> Path:
     return p
 
 
-def add_individu(
-    base_dir: str | Path,
-    *,
-    id: str,
-    nom: str | None = None,
-    prenom: str | None = None,
-    sexe: Literal["M", "F", "X", None] = None,
-) -> Individu:
-    base_path = _resolve_base_dir(base_dir)
-    individus, familles, sources = load_gwb_minimal(base_path)
+R = TypeVar("R")
 
-    if any(ind.id == id for ind in individus):
-        raise ValueError(f"Individu {id} existe déjà")
 
-    sexe_enum = None
-    if sexe:
-        sexe_enum = Sexe(sexe)
+def _family_tags(fam: Famille) -> set[str]:
+    # Une famille modifiée change sa fiche et les vues de chacun de ses membres
+    members = [fam.pere_id, fam.mere_id, *fam.enfants_ids]
+    return {family_tag(fam.id), *(person_tag(m) for m in members if m)}
 
-    new_ind = Individu(
-        id=id,
-        nom=nom,
-        prenom=prenom,
-        sexe=sexe_enum,
-    )
-    individus.append(new_ind)
-    write_gwb_minimal(individus, familles, base_path, sources=sources)
-    return new_ind
 
+def _members(fam: Famille) -> list[str]:
+    return [m for m in (fam.pere_id, fam.mere_id, *fam.enfants_ids) if m]
 
-def mod_individu(
-    base_dir: str | Path,
-    *,
-    id: str,
-    nom: str | None = None,
-    prenom: str | None = None,
-    sexe: Literal["M", "F", "X", None] | None = None,
-) -> Individu:
-    base_path = _resolve_base_dir(base_dir)
-    individus, familles, sources = load_gwb_minimal(base_path)
 
-    ind = next((x for x in individus if x.id == id), None)
-    if not ind:
-        raise ValueError(f"Individu {id} introuvable")
+class _BaseEdit:
+    """Base chargée en mémoire et indexée, modifiée par une suite d'opérations.
 
-    if nom is not None:
-        ind.nom = nom
-    if prenom is not None:
-        ind.prenom = prenom
-    if sexe is not None:
-        ind.sexe = Sexe(sexe) if sexe else None
-
-    write_gwb_minimal(individus, familles, base_path, sources=sources)
-    return ind
+    Copie résidente de l'écrivain de la base (`infra/writer.py`): les opérations
+    valident puis appliquent chacune leur changement en O(taille de l'opération) grâce
+    aux index; l'écrivain écrit la base une fois par groupe de mutations (`_save`).
+    """
 
+    def __init__(self, base_path: Path) -> None:
+        individus, familles, self.sources = load_gwb_minimal(base_path, strings=StringPool())
+        self.individus: dict[str, Individu] = {ind.id: ind for ind in individus}
+        self.familles: dict[str, Famille] = {fam.id: fam for fam in familles}
+        # Familles liées à chaque individu (parent ou enfant), ordre du fichier
+        self.links: dict[str, dict[str, None]] = {}
+        for fam in familles:
+            self._link(fam)
+        # Références famille -> individus (famille_enfance_id, famille_adultes), à la demande
+        self._fam_refs: dict[str, set[str]] | None = None
+        self.touched: set[str] = set()
+
+    def _link(self, fam: Famille) -> None:
+        for member in _members(fam):
+            self.links.setdefault(member, {})[fam.id] = None
+
+    def _unlink(self, fam: Famille) -> None:
+        for member in _members(fam):
+            self.links.get(member, {}).pop(fam.id, None)
+
+    def _check_person(self, person_id: str | None, role: str) -> None:
+        if person_id and person_id not in self.individus:
+            raise ValueError(f"{role} introuvable: {person_id}")
+
+    # --- Individus ---
+
+    def add_individu(
+        self,
+        *,
+        id: str,
+        nom: str | None = None,
+        prenom: str | None = None,
+        sexe: Literal["M", "F", "X", None] = None,
+    ) -> Individu:
+        if id in self.individus:
+            raise ValueError(f"Individu {id} existe déjà")
+
+        sexe_enum = None
+        if sexe:
+            sexe_enum = Sexe(sexe)
+
+        new_ind = Individu(
+            id=id,
+            nom=nom,
+            prenom=prenom,
+            sexe=sexe_enum,
+        )
+        self.individus[id] = new_ind
+        self.touched.update({person_tag(id), ALL_TAG})
+        return new_ind
+
+    def mod_individu(
+        self,
+        *,
+        id: str,
+        nom: str | None = None,
+        prenom: str | None = None,
+        sexe: Literal["M", "F", "X", None] | None = None,
+    ) -> Individu:
+        ind = self.individus.get(id)
+        if not ind:
+            raise ValueError(f"Individu {id} introuvable")
+
+        sexe_enum = (Sexe(sexe) if sexe else None) if sexe is not None else ind.sexe
+        if nom is not None:
+            ind.nom = nom
+        if prenom is not None:
+            ind.prenom = prenom
+        ind.sexe = sexe_enum
+
+        self.touched.update({person_tag(id), ALL_TAG})
+        return ind
+
+    def del_individu(self, *, id: str, force: bool = False) -> None:
+        if id not in self.individus:
+            raise ValueError(f"Individu {id} introuvable")
+
+        # Vérifier liens
+        linked = list(self.links.get(id, {}))
+        if linked and not force:
+            raise ValueError(f"Individu {id} lie aux familles {linked} (utiliser force=true)")
+
+        # Si force, nettoyer les liens
+        for fid in linked:
+            fam = self.familles[fid]
+            if fam.pere_id == id:
+                fam.pere_id = None
+            if fam.mere_id == id:
+                fam.mere_id = None
+            if id in fam.enfants_ids:
+                fam.enfants_ids = [e for e in fam.enfants_ids if e != id]
+        self.links.pop(id, None)
+
+        # Supprimer l'individu
+        del self.individus[id]
+        self.touched.update({person_tag(id), ALL_TAG, *(family_tag(fid) for fid in linked)})
+
+    # --- Familles ---
+
+    def add_famille(
+        self,
+        *,
+        id: str,
+        pere_id: str | None = None,
+        mere_id: str | None = None,
+        enfants_ids: list[str] | None = None,
+    ) -> Famille:
+        if id in self.familles:
+            raise ValueError(f"Famille {id} existe déjà")
+
+        # Valider existence des personnes référencées (si fournies)
+        self._check_person(pere_id, "Père")
+        self._check_person(mere_id, "Mère")
+        enfants_ids = enfants_ids or []
+        for eid in enfants_ids:
+            if eid not in self.individus:
+                raise ValueError(f"Enfant introuvable: {eid}")
 
-# --- Familles ---
+        new_fam = Famille(
+            id=id,
+            pere_id=pere_id,
+            mere_id=mere_id,
+            enfants_ids=list(enfants_ids),
+        )
+        self.familles[id] = new_fam
+        self._link(new_fam)
+        self.touched.update(_family_tags(new_fam) | {ALL_TAG})
+        return new_fam
+
+    def mod_famille(
+        self,
+        *,
+        id: str,
+        pere_id: str | None = None,
+        mere_id: str | None = None,
+        enfants_ids: list[str] | None = None,
+    ) -> Famille:
+        fam = self.familles.get(id)
+        if not fam:
+            raise ValueError(f"Famille {id} introuvable")
+
+        # Tout valider avant de modifier: une opération refusée ne laisse aucune trace
+        if pere_id:
+            self._check_person(pere_id, "Père")
+        if mere_id:
+            self._check_person(mere_id, "Mère")
+        for eid in enfants_ids or []:
+            if eid not in self.individus:
+                raise ValueError(f"Enfant introuvable: {eid}")
 
+        self.touched.update(_family_tags(fam))  # anciens membres
+        self._unlink(fam)
+        if pere_id is not None:
+            fam.pere_id = pere_id or None
+        if mere_id is not None:
+            fam.mere_id = mere_id or None
+        if enfants_ids is not None:
+            fam.enfants_ids = list(enfants_ids)
+        self._link(fam)
+
+        self.touched.update(_family_tags(fam))
+        return fam
+
+    def del_famille(self, *, id: str, force: bool = False) -> None:
+        fam = self.familles.get(id)
+        if not fam:
+            raise ValueError(f"Famille {id} introuvable")
+
+        # Famille avec parents/enfants => demander force
+        if not force and (fam.pere_id or fam.mere_id or fam.enfants_ids):
+            raise ValueError(f"Famille {id} a des liens (utiliser force=true)")
+        self.touched.update(_family_tags(fam))
+
+        # Nettoyer les liens (force)
+        if self._fam_refs is None:
+            self._fam_refs = {}
+            for ind in self.individus.values():
+                for fid in (ind.famille_enfance_id, *(ind.famille_adultes or [])):
+                    if fid:
+                        self._fam_refs.setdefault(fid, set()).add(ind.id)
+        for ind_id in self._fam_refs.pop(id, set()):
+            member = self.individus.get(ind_id)
+            if member is None:
+                continue
+            if member.famille_enfance_id == id:
+                member.famille_enfance_id = None
+            if member.famille_adultes and id in member.famille_adultes:
+                member.famille_adultes = [fid for fid in member.famille_adultes if fid != id]
+
+        self._unlink(fam)
+        del self.familles[id]
+        self.touched.add(ALL_TAG)
+
+
+# Copie de travail SQLite vivante de chaque base (une par écrivain)
+_sqlite_edits: weakref.WeakValueDictionary[Path, _SqliteEdit] = weakref.WeakValueDictionary()
+_sqlite_edits_lock = threading.Lock()
+
+
+class _SqliteEdit:
+    """Base SQLite modifiée par requêtes indexées, sans chargement en mémoire.
+
+    Même interface et mêmes erreurs que `_BaseEdit`. Les opérations d'un groupe de
+    mutations s'accumulent dans une transaction, validée par `_save`. Recharger la base
+    (après une mutation en échec) ferme la copie précédente, ce qui annule sa
+    transaction: l'écrivain rejoue ensuite les mutations acceptées du groupe.
+    """
+
+    storage: SqliteStorage
+
+    def __init__(self, base_path: Path) -> None:
+        with _sqlite_edits_lock:
+            previous = _sqlite_edits.get(base_path)
+            if previous is not None:
+                previous.storage.close()
+            _sqlite_edits[base_path] = self
+        self.storage = SqliteStorage(base_path)
+        self.touched: set[str] = set()
+
+    def _check_person(self, person_id: str | None, role: str) -> None:
+        if person_id and not self.storage.person_exists(person_id):
+            raise ValueError(f"{role} introuvable: {person_id}")
+
+    # --- Individus ---
+
+    def add_individu(
+        self,
+        *,
+        id: str,
+        nom: str | None = None,
+        prenom: str | None = None,
+        sexe: Literal["M", "F", "X", None] = None,
+    ) -> Individu:
+        if self.storage.person_exists(id):
+            raise ValueError(f"Individu {id} existe déjà")
+
+        new_ind = Individu(id=id, nom=nom, prenom=prenom, sexe=Sexe(sexe) if sexe else None)
+        self.storage.add_person(new_ind)
+        self.touched.update({person_tag(id), ALL_TAG})
+        return new_ind
+
+    def mod_individu(
+        self,
+        *,
+        id: str,
+        nom: str | None = None,
+        prenom: str | None = None,
+        sexe: Literal["M", "F", "X", None] | None = None,
+    ) -> Individu:
+        ind = self.storage.get_person(id)
+        if not ind:
+            raise ValueError(f"Individu {id} introuvable")
+
+        if nom is not None:
+            ind.nom = nom
+        if prenom is not None:
+            ind.prenom = prenom
+        if sexe is not None:
+            ind.sexe = Sexe(sexe) if sexe else None
+        self.storage.update_person(ind)
+
+        self.touched.update({person_tag(id), ALL_TAG})
+        return ind
+
+    def del_individu(self, *, id: str, force: bool = False) -> None:
+        if not self.storage.person_exists(id):
+            raise ValueError(f"Individu {id} introuvable")
+
+        linked = self.storage.linked_families(id)
+        if linked and not force:
+            raise ValueError(f"Individu {id} lie aux familles {linked} (utiliser force=true)")
+
+        self.storage.delete_person(id)
+        self.touched.update({person_tag(id), ALL_TAG, *(family_tag(fid) for fid in linked)})
+
+    # --- Familles ---
+
+    def _check_members(self, pere_id: str | None, mere_id: str | None, enfants_ids: list[str] | None) -> None:
+        self._check_person(pere_id, "Père")
+        self._check_person(mere_id, "Mère")
+        for eid in enfants_ids or []:
+            if not self.storage.person_exists(eid):
+                raise ValueError(f"Enfant introuvable: {eid}")
 
-def add_famille(
-    base_dir: str | Path,
-    *,
-    id: str,
-    pere_id: str | None = None,
-    mere_id: str | None = None,
-    enfants_ids: list[str] | None = None,
-) -> Famille:
+    def add_famille(
+        self,
+        *,
+        id: str,
+        pere_id: str | None = None,
+        mere_id: str | None = None,
+        enfants_ids: list[str] | None = None,
+    ) -> Famille:
+        if self.storage.family_exists(id):
+            raise ValueError(f"Famille {id} existe déjà")
+
+        self._check_members(pere_id, mere_id, enfants_ids)
+        new_fam = Famille(id=id, pere_id=pere_id, mere_id=mere_id, enfants_ids=list(enfants_ids or []))
+        self.storage.add_family(new_fam)
+        self.touched.update(_family_tags(new_fam) | {ALL_TAG})
+        return new_fam
+
+    def mod_famille(
+        self,
+        *,
+        id: str,
+        pere_id: str | None = None,
+        mere_id: str | None = None,
+        enfants_ids: list[str] | None = None,
+    ) -> Famille:
+        fam = self.storage.get_family(id)
+        if not fam:
+            raise ValueError(f"Famille {id} introuvable")
+
+        self._check_members(pere_id, mere_id, enfants_ids)
+        self.touched.update(_family_tags(fam))  # anciens membres
+        if pere_id is not None:
+            fam.pere_id = pere_id or None
+        if mere_id is not None:
+            fam.mere_id = mere_id or None
+        if enfants_ids is not None:
+            fam.enfants_ids = list(enfants_ids)
+        self.storage.update_family(fam)
+
+        self.touched.update(_family_tags(fam))
+        return fam
+
+    def del_famille(self, *, id: str, force: bool = False) -> None:
+        fam = self.storage.get_family(id)
+        if not fam:
+            raise ValueError(f"Famille {id} introuvable")
+
+        if not force and (fam.pere_id or fam.mere_id or fam.enfants_ids):
+            raise ValueError(f"Famille {id} a des liens (utiliser force=true)")
+        self.touched.update(_family_tags(fam))
+        self.storage.delete_family(id)
+        self.touched.add(ALL_TAG)
+
+
+def _load(base_path: Path) -> _BaseEdit | _SqliteEdit:
+    kind = storage_kind(base_path)
+    if kind == "native":
+        # Écrire `index.json` masquerait la base OCaml: la convertir d'abord
+        raise ValueError(f"Base GeneWeb native en lecture seule: {base_path} (voir convert-storage)")
+    return _SqliteEdit(base_path) if kind == "sqlite" else _BaseEdit(base_path)
+
+
+def _save(base_path: Path, edit: _BaseEdit | _SqliteEdit) -> None:
+    if isinstance(edit, _SqliteEdit):
+        with get_response_cache().writing(base_path) as touched:
+            touched.update(edit.touched)
+            edit.touched.clear()
+            edit.storage.commit()
+        if snapshot_enabled():
+            get_snapshot_store().publish(base_path, revision=read_revision(base_path).token)
+        return
+    with get_response_cache().writing(base_path) as touched:
+        touched.update(edit.touched)
+        edit.touched.clear()
+        individus, familles = list(edit.individus.values()), list(edit.familles.values())
+        write_gwb_minimal(individus, familles, base_path, sources=edit.sources)
+    if snapshot_enabled():
+        # Nouvelle génération publiée depuis la copie résidente, sans relire la base
+        get_snapshot_store().publish(
+            base_path, (individus, familles, edit.sources), read_revision(base_path).token
+        )
+
+
+def _submit(
+    base_dir: str | Path, mutation: Callable[[_BaseEdit | _SqliteEdit], R], expected_revision: str | None = None
+) -> WriteResult[R]:
+    """Confie la mutation à l'écrivain de la base (file, écriture groupée, If-Match).
+
+    La valeur renvoyée est copiée: les objets de la copie résidente restent à l'écrivain.
+    """
     base_path = _resolve_base_dir(base_dir)
-    individus, familles, sources = load_gwb_minimal(base_path)
-
-    if any(f.id == id for f in familles):
-        raise ValueError(f"Famille {id} existe déjà")
-
-    # Valider existence des personnes référencées (si fournies)
-    ind_ids = {ind.id for ind in individus}
-    if pere_id and pere_id not in ind_ids:
-        raise ValueError(f"Père introuvable: {pere_id}")
-    if mere_id and mere_id not in ind_ids:
-        raise ValueError(f"Mère introuvable: {mere_id}")
-    enfants_ids = enfants_ids or []
-    for eid in enfants_ids:
-        if eid not in ind_ids:
-            raise ValueError(f"Enfant introuvable: {eid}")
-
-    new_fam = Famille(
-        id=id,
-        pere_id=pere_id,
-        mere_id=mere_id,
-        enfants_ids=list(enfants_ids),
+    return submit_write(
+        base_path, lambda edit: copy.deepcopy(mutation(edit)), _load, _save, expected_revision
     )
-    familles.append(new_fam)
-    write_gwb_minimal(individus, familles, base_path, sources=sources)
-    return new_fam
 
 
-def mod_famille(
-    base_dir: str | Path,
-    *,
-    id: str,
-    pere_id: str | None = None,
-    mere_id: str | None = None,
-    enfants_ids: list[str] | None = None,
-) -> Famille:
-    base_path = _resolve_base_dir(base_dir)
-    individus, familles, sources = load_gwb_minimal(base_path)
-
-    fam = next((f for f in familles if f.id == id), None)
-    if not fam:
-        raise ValueError(f"Famille {id} introuvable")
-
-    ind_ids = {ind.id for ind in individus}
-    if pere_id is not None:
-        if pere_id != "" and pere_id not in ind_ids:
-            raise ValueError(f"Père introuvable: {pere_id}")
-        fam.pere_id = pere_id or None
-    if mere_id is not None:
-        if mere_id != "" and mere_id not in ind_ids:
-            raise ValueError(f"Mère introuvable: {mere_id}")
-        fam.mere_id = mere_id or None
-    if enfants_ids is not None:
-        for eid in enfants_ids:
-            if eid not in ind_ids:
-                raise ValueError(f"Enfant introuvable: {eid}")
-        fam.enfants_ids = list(enfants_ids)
+class IndividuFields(TypedDict, total=False):
+    """Champs d'un individu acceptés par `add_individu` / `mod_individu`."""
 
-    write_gwb_minimal(individus, familles, base_path, sources=sources)
-    return fam
+    nom: str | None
+    prenom: str | None
+    sexe: Literal["M", "F", "X", None]
 
 
-# --- Suppressions ---
+class FamilleFields(TypedDict, total=False):
+    """Champs d'une famille acceptés par `add_famille` / `mod_famille`."""
 
+    pere_id: str | None
+    mere_id: str | None
+    enfants_ids: list[str] | None
 
-def del_individu(base_dir: str | Path, *, id: str, force: bool = False) -> None:
-    base_path = _resolve_base_dir(base_dir)
-    individus, familles, sources = load_gwb_minimal(base_path)
-
-    ind = next((x for x in individus if x.id == id), None)
-    if not ind:
-        raise ValueError(f"Individu {id} introuvable")
-
-    # Vérifier liens
-    linked = []
-    for fam in familles:
-        if fam.pere_id == id or fam.mere_id == id or id in fam.enfants_ids:
-            linked.append(fam.id)
-    if linked and not force:
-        raise ValueError(f"Individu {id} lie aux familles {linked} (utiliser force=true)")
-
-    # Si force, nettoyer les liens
-    if linked:
-        for fam in familles:
-            if fam.pere_id == id:
-                fam.pere_id = None
-            if fam.mere_id == id:
-                fam.mere_id = None
-            if id in fam.enfants_ids:
-                fam.enfants_ids = [e for e in fam.enfants_ids if e != id]
 
-    # Supprimer l'individu
-    individus = [x for x in individus if x.id != id]
-    write_gwb_minimal(individus, familles, base_path, sources=sources)
+def add_individu(
+    base_dir: str | Path, *, id: str, expected_revision: str | None = None, **fields: Unpack[IndividuFields]
+) -> Individu:
+    return _submit(base_dir, lambda edit: edit.add_individu(id=id, **fields), expected_revision).value
 
 
-def del_famille(base_dir: str | Path, *, id: str, force: bool = False) -> None:
-    base_path = _resolve_base_dir(base_dir)
-    individus, familles, sources = load_gwb_minimal(base_path)
+def mod_individu(
+    base_dir: str | Path, *, id: str, expected_revision: str | None = None, **fields: Unpack[IndividuFields]
+) -> Individu:
+    return _submit(base_dir, lambda edit: edit.mod_individu(id=id, **fields), expected_revision).value
+
+
+# --- Familles ---
+
+
+def add_famille(
+    base_dir: str | Path, *, id: str, expected_revision: str | None = None, **fields: Unpack[FamilleFields]
+) -> Famille:
+    return _submit(base_dir, lambda edit: edit.add_famille(id=id, **fields), expected_revision).value
 
-    fam = next((f for f in familles if f.id == id), None)
-    if not fam:
-        raise ValueError(f"Famille {id} introuvable")
 
-    # Famille avec parents/enfants => demander force
-    if not force and (fam.pere_id or fam.mere_id or fam.enfants_ids):
-        raise ValueError(f"Famille {id} a des liens (utiliser force=true)")
+def mod_famille(
+    base_dir: str | Path, *, id: str, expected_revision: str | None = None, **fields: Unpack[FamilleFields]
+) -> Famille:
+    return _submit(base_dir, lambda edit: edit.mod_famille(id=id, **fields), expected_revision).value
 
-    # Nettoyer les liens (force)
-    for ind in individus:
-        if ind.famille_enfance_id == id:
-            ind.famille_enfance_id = None
-        if ind.famille_adultes and id in ind.famille_adultes:
-            ind.famille_adultes = [fid for fid in ind.famille_adultes if fid != id]
 
-    familles = [f for f in familles if f.id != id]
-    write_gwb_minimal(individus, familles, base_path, sources=sources)
+# --- Suppressions ---
 
 
+def del_individu(
+    base_dir: str | Path, *, id: str, force: bool = False, expected_revision: str | None = None
+) -> None:
+    _submit(base_dir, lambda edit: edit.del_individu(id=id, force=force), expected_revision)
+
+
+def del_famille(
+    base_dir: str | Path, *, id: str, force: bool = False, expected_revision: str | None = None
+) -> None:
+    _submit(base_dir, lambda edit: edit.del_famille(id=id, force=force), expected_revision)
+
+
+# --- Lots ---
+
+# Opération de lot -> (méthode, champs acceptés)
+BATCH_OPERATIONS: dict[str, tuple[str, tuple[str, ...]]] = {
+    "add_ind": ("add_individu", ("id", "nom", "prenom", "sexe")),
+    "mod_ind": ("mod_individu", ("id", "nom", "prenom", "sexe")),
+    "del_ind": ("del_individu", ("id", "force")),
+    "add_fam": ("add_famille", ("id", "pere_id", "mere_id", "enfants_ids")),
+    "mod_fam": ("mod_famille", ("id", "pere_id", "mere_id", "enfants_ids")),
+    "del_fam": ("del_famille", ("id", "force")),
+}
+
+
+def _apply_operation(edit: _BaseEdit | _SqliteEdit, operation: Mapping[str, Any]) -> Any:
+    op = operation.get("op")
+    if op not in BATCH_OPERATIONS:
+        raise ValueError(f"Opération inconnue: {op!r}")
+    method, fields = BATCH_OPERATIONS[op]
+    unknown = set(operation) - {"op", *fields}
+    if unknown:
+        raise ValueError(f"Champs inconnus: {sorted(unknown)}")
+    if not operation.get("id"):
+        raise ValueError("Champ 'id' requis")
+    try:
+        return getattr(edit, method)(**{k: v for k, v in operation.items() if k != "op"})
+    except TypeError as e:  # type de champ invalide
+        raise ValueError(str(e)) from e
+
+
+def apply_operation(
+    base_dir: str | Path, operation: Mapping[str, Any], expected_revision: str | None = None
+) -> WriteResult[Any]:
+    """Applique une opération (format des lots) et renvoie son résultat et la nouvelle révision.
+
+    Raises:
+        WriteConflict: la base n'est plus à `expected_revision` (If-Match)
+    """
+    return _submit(base_dir, lambda edit: _apply_operation(edit, operation), expected_revision)
+
+
+def apply_batch(
+    base_dir: str | Path, operations: Sequence[Mapping[str, Any]], expected_revision: str | None = None
+) -> dict[str, Any]:
+    """Applique une liste ordonnée d'opérations en une seule transaction.
+
+    Chaque opération est un dict `{"op": "add_ind" | "mod_ind" | "del_ind" | "add_fam" |
+    "mod_fam" | "del_fam", "id": ..., <champs de la route correspondante>}`. Les
+    opérations sont validées et appliquées dans l'ordre sur la base en mémoire (une
+    opération voit l'effet des précédentes); la base est écrite une fois, et pas du tout
+    si une opération échoue.
+
+    Raises:
+        ValueError: opération invalide, préfixée de son rang (la base est inchangée)
+        WriteConflict: la base n'est plus à `expected_revision` (If-Match)
+        FileNotFoundError: base introuvable
+    """
+
+    def mutation(edit: _BaseEdit | _SqliteEdit) -> dict[str, int]:
+        counts: dict[str, int] = {}
+        for index, operation in enumerate(operations):
+            op = operation.get("op")
+            if not isinstance(op, str):
+                raise ValueError(f"Opération {index}: champ 'op' requis (chaîne), reçu {op!r}")
+            try:
+                _apply_operation(edit, operation)
+            except ValueError as e:
+                raise ValueError(f"Opération {index} ({op}): {e}") from e
+            counts[op] = counts.get(op, 0) + 1
+        return counts
+
+    result = _submit(base_dir, mutation, expected_revision)
+    return {"applied": sum(result.value.values()), "counts": result.value, "revision": result.revision}
@@ -7,9 +7,25 @@ Le rendu HTML sera ajouté progressivement.
 
 from __future__ import annotations
 
-from pathlib import Path
+from collections import deque
 
-from geneweb.io.gwb import load_gwb_minimal
+from geneweb.domain.models import Individu
+from geneweb.infra.response_cache import ALL_TAG, family_tag, person_tag
+from geneweb.infra.snapshot_store import get_snapshot_store, snapshot_enabled
+from geneweb.io.storage import StorageBackend, open_storage
+
+
+def _open(base_dir: str, snapshot: bool = True) -> StorageBackend:
+    """Moteur interrogé par une route: l'instantané partagé de la base si le mode
+    `GENEWEB_SNAPSHOT` est actif, sinon son stockage (SQLite, fragments, conteneur
+    compressé, base native ou `index.json` chargé une fois)."""
+    if snapshot and snapshot_enabled():
+        return get_snapshot_store().get(base_dir)
+    return open_storage(base_dir)
+
+
+def _summary(ind: Individu) -> dict:
+    return {"id": ind.id, "nom": ind.nom, "prenom": ind.prenom}
 
 
 def get_person_page(base_dir: str, person_id: str | None = None) -> dict:
@@ -22,37 +38,29 @@ def get_person_page(base_dir: str, person_id: str | None = None) -> dict:
     Returns:
         Dict avec les données de la page (à convertir en HTML plus tard)
     """
-    individus, familles, sources = load_gwb_minimal(base_dir)
-    
-    if person_id:
-        # Chercher l'individu
-        person = next((ind for ind in individus if ind.id == person_id), None)
-        if not person:
-            raise ValueError(f"Individu {person_id} introuvable")
-        
-        return {
-            "type": "person",
-            "person": {
-                "id": person.id,
-                "nom": person.nom,
-                "prenom": person.prenom,
-                "sexe": person.sexe.value if person.sexe else None,
-                "date_naissance": str(person.date_naissance) if person.date_naissance else None,
-                "lieu_naissance": person.lieu_naissance,
-                "date_deces": str(person.date_deces) if person.date_deces else None,
-                "lieu_deces": person.lieu_deces,
-                "note": person.note,
-            },
-        }
-    
-    # Page d'accueil : retourner un résumé de la base
+    with _open(base_dir) as storage:
+        if person_id:
+            # Chercher l'individu
+            person = storage.get_person(person_id)
+            if not person:
+                raise ValueError(f"Individu {person_id} introuvable")
+            return {
+                "type": "person",
+                "person": {
+                    **_summary(person),
+                    "sexe": person.sexe.value if person.sexe else None,
+                    "date_naissance": str(person.date_naissance) if person.date_naissance else None,
+                    "lieu_naissance": person.lieu_naissance,
+                    "date_deces": str(person.date_deces) if person.date_deces else None,
+                    "lieu_deces": person.lieu_deces,
+                    "note": person.note,
+                },
+            }
+        # Page d'accueil : retourner un résumé de la base
+        n_individus, n_familles, n_sources = storage.counts()
     return {
         "type": "home",
-        "base": {
-            "total_individus": len(individus),
-            "total_familles": len(familles),
-            "total_sources": len(sources),
-        },
+        "base": {"total_individus": n_individus, "total_familles": n_familles, "total_sources": n_sources},
     }
 
 
@@ -66,46 +74,12 @@ def search_persons(base_dir: str, query: str | None = None) -> dict:
     Returns:
         Dict avec les résultats de recherche
     """
-    individus, _, _ = load_gwb_minimal(base_dir)
-    
+    with _open(base_dir) as storage:
+        # Sans terme: tous les individus, triés par nom
+        results = [_summary(ind) for ind in storage.search(query)]
     if not query:
-        # Retourner tous les individus (triés par nom)
-        sorted_individus = sorted(
-            individus,
-            key=lambda ind: (ind.nom or "", ind.prenom or ""),
-        )
-        return {
-            "type": "search_all",
-            "results": [
-                {
-                    "id": ind.id,
-                    "nom": ind.nom,
-                    "prenom": ind.prenom,
-                }
-                for ind in sorted_individus
-            ],
-            "total": len(sorted_individus),
-        }
-    
-    # Recherche par nom/prénom
-    query_lower = query.lower()
-    results = []
-    for ind in individus:
-        nom = (ind.nom or "").lower()
-        prenom = (ind.prenom or "").lower()
-        if query_lower in nom or query_lower in prenom:
-            results.append({
-                "id": ind.id,
-                "nom": ind.nom,
-                "prenom": ind.prenom,
-            })
-    
-    return {
-        "type": "search",
-        "query": query,
-        "results": results,
-        "total": len(results),
-    }
+        return {"type": "search_all", "results": results, "total": len(results)}
+    return {"type": "search", "query": query, "results": results, "total": len(results)}
 
 
 def get_family_page(base_dir: str, family_id: str | None = None) -> dict:
@@ -118,42 +92,23 @@ def get_family_page(base_dir: str, family_id: str | None = None) -> dict:
     Returns:
         Dict avec les données de la famille
     """
-    individus, familles, _ = load_gwb_minimal(base_dir)
-    
     if not family_id:
         raise ValueError("family_id requis pour la route F")
-    
-    famille = next((fam for fam in familles if fam.id == family_id), None)
-    if not famille:
-        raise ValueError(f"Famille {family_id} introuvable")
-    
-    # Récupérer les détails des parents et enfants
-    pere = next((ind for ind in individus if ind.id == famille.pere_id), None) if famille.pere_id else None
-    mere = next((ind for ind in individus if ind.id == famille.mere_id), None) if famille.mere_id else None
-    enfants = [ind for ind in individus if ind.id in famille.enfants_ids]
-    
+    with _open(base_dir) as storage:
+        famille = storage.get_family(family_id)
+        if not famille:
+            raise ValueError(f"Famille {family_id} introuvable")
+        # Récupérer les détails des parents et enfants
+        pere = storage.get_person(famille.pere_id) if famille.pere_id else None
+        mere = storage.get_person(famille.mere_id) if famille.mere_id else None
+        enfants = storage.family_children(famille)
     return {
         "type": "family",
         "family": {
             "id": famille.id,
-            "pere": {
-                "id": pere.id,
-                "nom": pere.nom,
-                "prenom": pere.prenom,
-            } if pere else None,
-            "mere": {
-                "id": mere.id,
-                "nom": mere.nom,
-                "prenom": mere.prenom,
-            } if mere else None,
-            "enfants": [
-                {
-                    "id": enfant.id,
-                    "nom": enfant.nom,
-                    "prenom": enfant.prenom,
-                }
-                for enfant in enfants
-            ],
+            "pere": _summary(pere) if pere else None,
+            "mere": _summary(mere) if mere else None,
+            "enfants": [_summary(enfant) for enfant in enfants],
             "note": famille.note,
         },
     }
@@ -169,67 +124,32 @@ def get_ascendance(base_dir: str, person_id: str) -> dict:
     Returns:
         Dict avec l'arbre d'ascendance (2 parents par niveau lorsque disponibles)
     """
-    individus, familles, _ = load_gwb_minimal(base_dir)
-
-    # Index accélérateurs
-    ind_by_id = {ind.id: ind for ind in individus}
-    fam_by_id = {fam.id: fam for fam in familles}
-    child_to_family: dict[str, str] = {}
-    for fam in familles:
-        for child_id in fam.enfants_ids:
-            # Si un enfant apparaît dans plusieurs familles (cas rares),
-            # on garde la première occurrence.
-            child_to_family.setdefault(child_id, fam.id)
-
-    if person_id not in ind_by_id:
-        raise ValueError(f"Individu {person_id} introuvable")
-
-    # BFS sur les ascendants avec niveaux, pour capturer père et mère
-    max_levels = 5
-    visited: set[str] = set()
-    queue: list[tuple[str, int]] = [(person_id, 0)]
-    ancestors: list[dict] = []
-
-    while queue:
-        current_id, level = queue.pop(0)
-        if current_id in visited or level > max_levels:
-            continue
-        visited.add(current_id)
-
-        person = ind_by_id.get(current_id)
-        if not person:
-            continue
-
-        # Ajoute la personne courante au résultat
-        ancestors.append(
-            {
-                "id": person.id,
-                "nom": person.nom,
-                "prenom": person.prenom,
-                "level": level,
-            }
-        )
-
-        # Ajouter les parents pour le prochain niveau
-        if level < max_levels:
-            # D'abord essayer via la famille d'enfance si elle est présente
-            fam_id = person.famille_enfance_id
-            # Sinon, reconstruire via l'index enfant -> famille (format GWB minimal)
-            if not fam_id:
-                fam_id = child_to_family.get(person.id)
-            if fam_id:
-                fam = fam_by_id.get(fam_id)
-                if fam:
-                    if fam.pere_id:
-                        queue.append((fam.pere_id, level + 1))
-                    if fam.mere_id:
-                        queue.append((fam.mere_id, level + 1))
+    with _open(base_dir) as storage:
+        if storage.get_person(person_id) is None:
+            raise ValueError(f"Individu {person_id} introuvable")
 
-    return {
-        "type": "ascendance",
-        "person_id": person_id,
-        "ancestors": ancestors,
-    }
+        # BFS sur les ascendants avec niveaux, pour capturer père et mère
+        max_levels = 5
+        visited: set[str] = set()
+        queue: deque[tuple[str, int]] = deque([(person_id, 0)])
+        ancestors: list[dict] = []
+        while queue:
+            current_id, level = queue.popleft()
+            if current_id in visited or level > max_levels:
+                continue
+            visited.add(current_id)
+            person = storage.get_person(current_id)
+            if not person:
+                continue
+            ancestors.append({**_summary(person), "level": level})
+            # Parents pour le prochain niveau: première famille qui compte l'individu
+            # parmi ses enfants
+            fam = storage.parent_family(current_id) if level < max_levels else None
+            if fam:
+                for parent_id in (fam.pere_id, fam.mere_id):
+                    if parent_id:
+                        queue.append((parent_id, level + 1))
+    return {"type": "ascendance", "person_id": person_id, "ancestors": ancestors}
 
 
 def get_descendance(base_dir: str, person_id: str) -> dict:
@@ -242,60 +162,35 @@ def get_descendance(base_dir: str, person_id: str) -> dict:
 	Returns:
 		Dict avec l'arbre de descendance
 	"""
-	individus, familles, _ = load_gwb_minimal(base_dir)
-	
-	person = next((ind for ind in individus if ind.id == person_id), None)
-	if not person:
-		raise ValueError(f"Individu {person_id} introuvable")
-	
-	# Trouver toutes les familles où cette personne est parent
-	descendance = []
-	processed_ids = set()
-	
-	# Créer un index des individus et familles pour accès rapide
-	individus_dict = {ind.id: ind for ind in individus}
-	familles_dict = {fam.id: fam for fam in familles}
-	
-	def add_descendants(current_person_id: str, level: int = 0, max_levels: int = 5) -> None:
-		if current_person_id in processed_ids or level >= max_levels:
-			return
-		processed_ids.add(current_person_id)
-		
-		current_person = individus_dict.get(current_person_id)
-		if not current_person:
-			return
+	with _open(base_dir) as storage:
+		person = storage.get_person(person_id)
+		if not person:
+			raise ValueError(f"Individu {person_id} introuvable")
 		
-		descendance.append({
-			"id": current_person.id,
-			"nom": current_person.nom,
-			"prenom": current_person.prenom,
-			"level": level,
-		})
+		# Parcours en profondeur, familles dans l'ordre de la base
+		max_levels = 5
+		descendance = [{**_summary(person), "level": 0}]
+		processed_ids = {person_id}
 		
-		# Chercher toutes les familles où cette personne est parent
-		for famille in familles:
-			if famille.pere_id == current_person_id or famille.mere_id == current_person_id:
+		def add_descendants(current_person_id: str, level: int) -> None:
+			if current_person_id in processed_ids or level >= max_levels:
+				return
+			processed_ids.add(current_person_id)
+			current_person = storage.get_person(current_person_id)
+			if not current_person:
+				return
+			descendance.append({**_summary(current_person), "level": level})
+			# Chercher toutes les familles où cette personne est parent
+			for famille in storage.families_as_parent(current_person_id):
 				for enfant_id in famille.enfants_ids:
 					if enfant_id and enfant_id not in processed_ids:
-						add_descendants(enfant_id, level + 1, max_levels)
-	
-	# Démarrer avec la personne initiale (niveau 0)
-	current_person = individus_dict.get(person_id)
-	if current_person:
-		descendance.append({
-			"id": current_person.id,
-			"nom": current_person.nom,
-			"prenom": current_person.prenom,
-			"level": 0,
-		})
-		processed_ids.add(person_id)
-	
-	# Ajouter les descendants
-	for famille in familles:
-		if famille.pere_id == person_id or famille.mere_id == person_id:
+						add_descendants(enfant_id, level + 1)
+		
+		# Ajouter les descendants
+		for famille in storage.families_as_parent(person_id):
 			for enfant_id in famille.enfants_ids:
 				if enfant_id:
-					add_descendants(enfant_id, level=1, max_levels=5)
+					add_descendants(enfant_id, 1)
 	
 	return {
 		"type": "descendance",
@@ -315,7 +210,9 @@ def get_notes(base_dir: str, note_file: str | None = None, ajax: bool = False) -
     Returns:
         Dict avec les notes
     """
-    individus, familles, sources = load_gwb_minimal(base_dir)
+    # L'instantané ne conserve pas les sources: lecture du stockage de la base
+    with _open(base_dir, snapshot=False) as storage:
+        individus, familles, sources = storage.notes()
     
     # Récupérer toutes les notes des individus
     person_notes = []
@@ -358,3 +255,24 @@ def get_notes(base_dir: str, note_file: str | None = None, ajax: bool = False) -
         "total": len(person_notes) + len(family_notes) + len(source_notes),
     }
 
+
+
+def page_tags(page: dict) -> frozenset[str]:
+    """Étiquettes d'invalidation d'une page: individus et familles qu'elle affiche.
+
+    Les pages qui résument toute la base (accueil, recherche, notes) dépendent de
+    n'importe quelle écriture de données (`ALL_TAG`).
+    """
+    kind = page.get("type")
+    if kind == "person":
+        return frozenset({person_tag(page["person"]["id"])})
+    if kind == "family":
+        family = page["family"]
+        members = [family["pere"], family["mere"], *family["enfants"]]
+        return frozenset({family_tag(family["id"]), *(person_tag(m["id"]) for m in members if m)})
+    if kind in ("ascendance", "descendance"):
+        # Toute modification d'un individu affiché (ou de ses liens familiaux) peut
+        # changer l'arbre: les écrivains étiquettent chaque membre d'une famille touchée
+        entries = page["ancestors"] if kind == "ascendance" else page["descendants"]
+        return frozenset({person_tag(page["person_id"]), *(person_tag(e["id"]) for e in entries)})
+    return frozenset({ALL_TAG})
@@ -1,11 +1,14 @@
 from __future__ import annotations
 
-import json
 from pathlib import Path
 from typing import Any
 
+from geneweb.infra.response_cache import family_tag, get_response_cache, person_tag, source_tag
+from geneweb.io import codec, durable
+from geneweb.io.revision import bump_revision
 
 _FILENAME = "wizard_notes.json"
+_KEY_TAGS = {"IND": person_tag, "FAM": family_tag, "SRC": source_tag}
 
 
 def _file_path(base_dir: str | Path) -> Path:
@@ -20,14 +23,22 @@ def _load(base_dir: str | Path) -> dict[str, Any]:
     if not fp.exists():
         return {"notes": {}}
     try:
-        return json.loads(fp.read_text(encoding="utf-8"))
+        return codec.loads(fp.read_bytes())
     except Exception:
         return {"notes": {}}
 
 
 def _save(base_dir: str | Path, data: dict[str, Any]) -> None:
     fp = _file_path(base_dir)
-    fp.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8")
+    durable.write_atomic(fp, codec.dumps_file(data))
+    bump_revision(base_dir)
+
+
+def _note_tags(key: str) -> set[str]:
+    # Clé "IND:I001" -> pages de l'individu I001 (idem familles et sources)
+    kind, _, ident = key.partition(":")
+    tag = _KEY_TAGS.get(kind)
+    return {tag(ident)} if tag and ident else set()
 
 
 def list_wiznotes(base_dir: str | Path, query: str | None = None) -> dict[str, Any]:
@@ -48,19 +59,23 @@ def get_wiznote(base_dir: str | Path, key: str) -> dict[str, Any]:
 
 
 def set_wiznote(base_dir: str | Path, key: str, note: str) -> dict[str, Any]:
-    data = _load(base_dir)
-    notes: dict[str, str] = data.setdefault("notes", {})
-    notes[key] = note
-    _save(base_dir, data)
+    with get_response_cache().writing(base_dir) as touched:
+        data = _load(base_dir)
+        notes: dict[str, str] = data.setdefault("notes", {})
+        notes[key] = note
+        touched.update(_note_tags(key))
+        _save(base_dir, data)
     return {"key": key, "note": note}
 
 
 def del_wiznote(base_dir: str | Path, key: str) -> None:
-    data = _load(base_dir)
-    notes: dict[str, str] = data.setdefault("notes", {})
-    if key not in notes:
-        raise ValueError(f"Note wizard introuvable: {key}")
-    del notes[key]
-    _save(base_dir, data)
+    with get_response_cache().writing(base_dir) as touched:
+        data = _load(base_dir)
+        notes: dict[str, str] = data.setdefault("notes", {})
+        if key not in notes:
+            raise ValueError(f"Note wizard introuvable: {key}")
+        del notes[key]
+        touched.update(_note_tags(key))
+        _save(base_dir, data)
 
 
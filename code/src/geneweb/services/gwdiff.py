@@ -0,0 +1,291 @@
+"""Portage Python de gwdiff : comparaison de deux bases à partir de personnes ancres.
+
+Équivalent de `bin/gwdiff/gwdiff.ml`:
+- mode "d" (défaut): compare la personne ancre et sa descendance dans les deux bases
+- mode "ad": remonte d'abord aux ancêtres les plus anciens compatibles, puis compare
+  la descendance de chacun d'eux
+
+Les règles de compatibilité suivent l'OCaml (la base 2 peut être plus précise que la base 1):
+- noms/prénoms comparés sans casse ni accents
+- date: compatible si absente à gauche, sinon égale à droite
+- lieu: compatible si absent à gauche ou présent à droite
+- sexe: égalité stricte (non renseigné = X)
+- conjoints et enfants appariés par compatibilité de noms
+
+Les parcours utilisent les index de `LoadedBase` (familles d'un parent, famille d'enfance)
+et les bases sont obtenues via le cache partagé, de sorte que plusieurs ancres sur la même
+paire de bases ne rechargent rien. Les écarts sont produits au fil du parcours.
+"""
+
+from __future__ import annotations
+
+import unicodedata
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Literal
+
+from geneweb.domain.models import Famille, Individu, Sexe
+from geneweb.infra.base_cache import BaseCache, LoadedBase, get_loaded_base
+
+# Codes de messages (libellés identiques à la sortie OCaml)
+_LABELS = {
+    "bad_child": "can not isolate one child match",
+    "birth_date": "birth date",
+    "birth_place": "birth place",
+    "child_missing": "child missing",
+    "children": "more than one child match",
+    "death_date": "death (status or date)",
+    "death_place": "death place",
+    "first_name": "first name",
+    "no_match": "doesn't match",
+    "parents_missing": "parents missing",
+    "sex": "sex",
+    "spouse_missing": "spouse missing",
+    "spouses": "more than one spouse match",
+    "surname": "surname",
+}
+
+
+@dataclass(frozen=True)
+class GwdiffMessage:
+    """Écart élémentaire; `person_id` (base 1) pour les messages qui désignent une personne.
+
+    Exception: pour `no_match` (ascendant sans homologue), `person_id` est dans la base 2.
+    """
+
+    code: str
+    person_id: str | None = None
+
+
+@dataclass(frozen=True)
+class GwdiffEntry:
+    """Écarts constatés entre une personne de la base 1 et son homologue de la base 2.
+
+    `right_id` vaut None pour les avertissements de non-correspondance (mode "ad").
+    """
+
+    left_id: str
+    right_id: str | None
+    messages: tuple[GwdiffMessage, ...]
+
+
+_EMPTY = Individu(id="")
+
+
+def _lower(name: str | None) -> str:
+    # Équivalent simplifié de Name.lower: sans casse, sans accents, espaces compressés
+    decomposed = unicodedata.normalize("NFD", name or "")
+    stripped = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return " ".join(stripped.casefold().split())
+
+
+def _compatible_field(left: object, right: object) -> bool:
+    return left is None or left == "" or (right is not None and right != "")
+
+
+def _compatible_date(left: object, right: object) -> bool:
+    return left is None or left == right
+
+
+def _names_messages(p1: Individu, p2: Individu) -> list[GwdiffMessage]:
+    res: list[GwdiffMessage] = []
+    if _lower(p1.prenom) != _lower(p2.prenom):
+        res.append(GwdiffMessage("first_name"))
+    if _lower(p1.nom) != _lower(p2.nom):
+        res.append(GwdiffMessage("surname"))
+    return res
+
+
+def _person_messages(p1: Individu, p2: Individu) -> list[GwdiffMessage]:
+    res = _names_messages(p1, p2)
+    if (p1.sexe or Sexe.X) != (p2.sexe or Sexe.X):
+        res.append(GwdiffMessage("sex"))
+    if not _compatible_date(p1.date_naissance, p2.date_naissance):
+        res.append(GwdiffMessage("birth_date"))
+    if not _compatible_field(p1.lieu_naissance, p2.lieu_naissance):
+        res.append(GwdiffMessage("birth_place"))
+    if not _compatible_date(p1.date_deces, p2.date_deces):
+        res.append(GwdiffMessage("death_date"))
+    if not _compatible_field(p1.lieu_deces, p2.lieu_deces):
+        res.append(GwdiffMessage("death_place"))
+    return res
+
+
+class _Differ:
+    def __init__(self, base1: LoadedBase, base2: LoadedBase) -> None:
+        self.b1 = base1
+        self.b2 = base2
+        # Paires (iper1, iper2) déjà comparées en descendance
+        self.visited: set[tuple[str, str]] = set()
+
+    def person(self, base: LoadedBase, iid: str | None) -> Individu:
+        if not iid:
+            return _EMPTY
+        return base.ind_by_id.get(iid) or Individu(id=iid)
+
+    @staticmethod
+    def spouse(fam: Famille, iid: str) -> str | None:
+        return fam.mere_id if fam.pere_id == iid else fam.pere_id
+
+    def pdiff(self, i1: str | None, i2: str | None) -> Iterator[GwdiffEntry]:
+        if not i1 or not i2:
+            return
+        res = _person_messages(self.person(self.b1, i1), self.person(self.b2, i2))
+        if res:
+            yield GwdiffEntry(i1, i2, tuple(res))
+
+    def compatible_light(self, i1: str | None, i2: str | None) -> bool:
+        return not _names_messages(self.person(self.b1, i1), self.person(self.b2, i2))
+
+    def compatible_full(self, i1: str, i2: str) -> bool:
+        return not _person_messages(self.person(self.b1, i1), self.person(self.b2, i2))
+
+    def parents(self, i1: str | None, i2: str | None) -> Iterator[GwdiffEntry]:
+        if not i1 or not i2:
+            return
+        f1 = self.b1.parents_of.get(i1)
+        f2 = self.b2.parents_of.get(i2)
+        if f1 is None:
+            return
+        if f2 is None:
+            yield GwdiffEntry(i1, i2, (GwdiffMessage("parents_missing"),))
+            return
+        yield from self.pdiff(f1.pere_id, f2.pere_id)
+        yield from self.pdiff(f1.mere_id, f2.mere_id)
+
+    def children(self, i1: str, i2: str, f1: Famille, f2: Famille) -> Iterator[GwdiffEntry]:
+        for c1 in f1.enfants_ids:
+            candidates = [c2 for c2 in f2.enfants_ids if self.compatible_light(c1, c2)]
+            if len(candidates) == 1:
+                yield from self.ddiff(c1, candidates[0])
+                continue
+            if not candidates:
+                yield GwdiffEntry(i1, i2, (GwdiffMessage("child_missing", c1),))
+                continue
+            best = [c2 for c2 in candidates if self.compatible_full(c1, c2)]
+            if len(best) == 1:
+                yield from self.ddiff(c1, best[0])
+            elif not best:
+                yield GwdiffEntry(i1, i2, (GwdiffMessage("bad_child", c1),))
+            else:
+                yield GwdiffEntry(i1, i2, (GwdiffMessage("children", c1),))
+
+    def ddiff(self, i1: str, i2: str) -> Iterator[GwdiffEntry]:
+        if (i1, i2) in self.visited:
+            return
+        self.visited.add((i1, i2))
+        yield from self.pdiff(i1, i2)
+        unions2 = self.b2.families_of.get(i2, [])
+        for f1 in self.b1.families_of.get(i1, []):
+            s1 = self.spouse(f1, i1)
+            matches = [f2 for f2 in unions2 if self.compatible_light(s1, self.spouse(f2, i2))]
+            if len(matches) == 1:
+                f2 = matches[0]
+                s2 = self.spouse(f2, i2)
+                yield from self.parents(s1, s2)
+                yield from self.pdiff(s1, s2)
+                yield from self.children(i1, i2, f1, f2)
+            elif not matches:
+                yield GwdiffEntry(i1, i2, (GwdiffMessage("spouse_missing", s1),))
+            else:
+                yield GwdiffEntry(i1, i2, (GwdiffMessage("spouses", s1),))
+
+    def find_top(self, i1: str, i2: str, warnings: list[GwdiffEntry]) -> list[tuple[str, str]]:
+        # Parcours itératif des ascendants compatibles (évite la récursion profonde)
+        tops: list[tuple[str, str]] = []
+        stack = [(i1, i2)]
+        seen: set[tuple[str, str]] = set()
+        while stack:
+            a1, a2 = stack.pop()
+            if (a1, a2) in seen:
+                continue
+            seen.add((a1, a2))
+            if not self.compatible_light(a1, a2):
+                warnings.append(GwdiffEntry(a1, None, (GwdiffMessage("no_match", a2),)))
+                continue
+            f1 = self.b1.parents_of.get(a1)
+            f2 = self.b2.parents_of.get(a2)
+            if f1 is None or f2 is None:
+                tops.append((a1, a2))
+                continue
+            pending = [(f1.mere_id, f2.mere_id), (f1.pere_id, f2.pere_id)]
+            pushed = False
+            for p1, p2 in pending:
+                if p1 and p2:
+                    stack.append((p1, p2))
+                    pushed = True
+            if not pushed:
+                tops.append((a1, a2))
+        return tops
+
+
+def iter_gwdiff(
+    base1: LoadedBase,
+    base2: LoadedBase,
+    anchor1: str,
+    anchor2: str,
+    mode: Literal["d", "ad"] = "d",
+) -> Iterator[GwdiffEntry]:
+    """Compare deux bases depuis une paire de personnes ancres; produit les écarts en flux.
+
+    Raises:
+        ValueError: si une ancre est introuvable dans sa base
+    """
+    if anchor1 not in base1.ind_by_id:
+        raise ValueError(f"Individu {anchor1} introuvable dans la base 1")
+    if anchor2 not in base2.ind_by_id:
+        raise ValueError(f"Individu {anchor2} introuvable dans la base 2")
+
+    differ = _Differ(base1, base2)
+    if mode == "d":
+        yield from differ.ddiff(anchor1, anchor2)
+        return
+
+    warnings: list[GwdiffEntry] = []
+    tops = differ.find_top(anchor1, anchor2, warnings)
+    yield from warnings
+    for top1, top2 in tops:
+        yield from differ.ddiff(top1, top2)
+
+
+def gwdiff_bases(
+    base1_dir: str | Path,
+    base2_dir: str | Path,
+    anchors: Iterable[tuple[str, str]],
+    mode: Literal["d", "ad"] = "d",
+    cache: BaseCache | None = None,
+) -> Iterator[GwdiffEntry]:
+    """Compare deux bases GWB pour chaque paire d'ancres (base chargée une seule fois)."""
+    get = cache.get if cache is not None else get_loaded_base
+    base1 = get(base1_dir)
+    base2 = get(base2_dir)
+    for anchor1, anchor2 in anchors:
+        yield from iter_gwdiff(base1, base2, anchor1, anchor2, mode=mode)
+
+
+def person_string(base: LoadedBase, iid: str | None) -> str:
+    """Libellé d'une personne: "Prénom NOM (#id)"."""
+    if not iid:
+        return "? ?"
+    ind = base.ind_by_id.get(iid)
+    prenom = (ind.prenom if ind else None) or "?"
+    nom = (ind.nom if ind else None) or "?"
+    return f"{prenom} {nom} (#{iid})"
+
+
+def format_entry(entry: GwdiffEntry, base1: LoadedBase, base2: LoadedBase) -> list[str]:
+    """Rend une entrée comme la sortie texte de gwdiff."""
+    if entry.right_id is None:
+        other = entry.messages[0].person_id if entry.messages else None
+        return [
+            f" Warning: {person_string(base1, entry.left_id)} {_LABELS['no_match']} "
+            f"{person_string(base2, other)}"
+        ]
+    lines = [f"{person_string(base1, entry.left_id)} / {person_string(base2, entry.right_id)}"]
+    for msg in entry.messages:
+        label = _LABELS.get(msg.code, msg.code)
+        if msg.person_id is not None:
+            label = f"{label}: {person_string(base1, msg.person_id)}"
+        lines.append(f" {label}")
+    return lines
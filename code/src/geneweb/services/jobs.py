@@ -0,0 +1,130 @@
+"""Tâches exécutables en arrière-plan par le gestionnaire de travaux (`infra/jobs.py`).
+
+Chaque tâche reprend les paramètres et le format de résultat de la route HTTP
+synchrone correspondante (`/analytical/consang`, `/analytical/connex`,
+`/import/ged2gwb`). Elles s'exécutent dans un processus séparé: ce sont des fonctions de
+module, et les chemins reçus sont déjà résolus par l'appelant.
+
+Les commandes OCaml lancées par une tâche ne sont pas soumises au délai de 120 s des
+routes synchrones: sans limite par défaut (le gestionnaire annule les travaux
+abandonnés), ou `GENEWEB_JOBS_TIMEOUT` secondes si la variable est définie.
+"""
+
+from __future__ import annotations
+
+import os
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Any
+
+from geneweb.infra.jobs import ProgressFn, Task
+
+GENEWEB_JOBS_TIMEOUT_ENV = "GENEWEB_JOBS_TIMEOUT"
+
+
+def job_timeout() -> float | None:
+    """Délai des commandes OCaml d'un travail (secondes), None sans limite."""
+    try:
+        timeout = float(os.getenv(GENEWEB_JOBS_TIMEOUT_ENV, "") or 0)
+    except ValueError:
+        return None
+    return timeout if timeout > 0 else None
+
+
+def _python_base(base_dir: str) -> str:
+    base_path = Path(base_dir)
+    if (base_path / "base").exists():
+        base_path = base_path / "base"
+    return str(base_path)
+
+
+def task_consang(params: Mapping[str, Any], progress: ProgressFn) -> dict[str, Any]:
+    """Consanguinité d'une base (params: base_dir, use_python)."""
+    base = _python_base(params["base_dir"])
+    if params.get("use_python"):
+        from geneweb.io.gwb import load_gwb_minimal
+        from geneweb.io.parallel import load_workers
+        from geneweb.services.consanguinity import compute_inbreeding_coefficients
+
+        progress(0.1, "chargement de la base")
+        individus, familles, _ = load_gwb_minimal(base, workers=load_workers())
+        progress(0.3, f"calcul des coefficients ({len(individus)} individus)")
+        f_coefficients = compute_inbreeding_coefficients(individus, familles)
+        return {
+            "status": "ok",
+            "implementation": "python",
+            "coefficients": f_coefficients,
+            "summary": {
+                "total": len(f_coefficients),
+                "non_zero": len([f for f in f_coefficients.values() if f > 0.0]),
+                "max_f": max(f_coefficients.values()) if f_coefficients else 0.0,
+            },
+        }
+
+    from geneweb.adapters.ocaml_bridge.bridge import run_consang
+
+    progress(0.1, "consang OCaml")
+    stdout = run_consang([base], timeout=job_timeout())
+    return {"status": "ok", "implementation": "ocaml", "stdout": stdout}
+
+
+def task_connex(params: Mapping[str, Any], progress: ProgressFn) -> dict[str, Any]:
+    """Composantes connexes (params: base_dir, use_python, all_components)."""
+    base = _python_base(params["base_dir"])
+    all_components = bool(params.get("all_components"))
+    if params.get("use_python"):
+        from geneweb.io.gwb import load_gwb_minimal
+        from geneweb.io.parallel import load_workers
+        from geneweb.services.connectivity import compute_connected_components
+
+        progress(0.1, "chargement de la base")
+        individus, familles, _ = load_gwb_minimal(base, workers=load_workers())
+        progress(0.3, f"calcul des composantes ({len(individus)} individus)")
+        components = compute_connected_components(individus, familles)
+        if all_components:
+            return {
+                "status": "ok",
+                "implementation": "python",
+                "components": components,
+                "count": len(components),
+            }
+        largest = components[0] if components else []
+        return {
+            "status": "ok",
+            "implementation": "python",
+            "largest_component": largest,
+            "largest_size": len(largest),
+            "total_components": len(components),
+        }
+
+    from geneweb.adapters.ocaml_bridge.bridge import run_connex
+
+    progress(0.1, "connex OCaml")
+    args = ["-a", base] if all_components else [base]
+    stdout = run_connex(args, timeout=job_timeout())
+    return {"status": "ok", "implementation": "ocaml", "stdout": stdout}
+
+
+def task_ged2gwb(params: Mapping[str, Any], progress: ProgressFn) -> dict[str, Any]:
+    """Import GEDCOM (params: input_file, output_dir, use_python)."""
+    input_path = Path(params["input_file"])
+    output_path = Path(params["output_dir"])
+    if not input_path.exists():
+        raise FileNotFoundError(f"Fichier GEDCOM introuvable: {input_path}")
+    progress(0.1, "import GEDCOM")
+    if params.get("use_python"):
+        from geneweb.services.ged2gwb import ged2gwb_python
+
+        ged2gwb_python(input_path, output_path)
+    else:
+        from geneweb.adapters.ocaml_bridge.bridge import run_ged2gwb
+
+        run_ged2gwb(["-i", str(input_path), "-o", str(output_path)], timeout=job_timeout())
+    return {"status": "ok", "output_dir": str(output_path)}
+
+
+TASKS: dict[str, Task] = {
+    "consang": task_consang,
+    "connex": task_connex,
+    "ged2gwb": task_ged2gwb,
+}
@@ -0,0 +1,44 @@
+"""Fixtures partagées: une même base écrite en `index.json` et dans une autre disposition."""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from geneweb.domain.models import Famille, Individu, Sexe, Source
+from geneweb.io.gwb import write_gwb_minimal
+
+# Options de `write_gwb_minimal` de chaque disposition comparée à `index.json`
+LAYOUTS: dict[str, dict[str, Any]] = {
+    "sharded": {"shards": 8},
+    "packed": {"packed": True},
+}
+
+
+def layout_data(n: int = 2000) -> tuple[list[Individu], list[Famille], list[Source]]:
+    individus = [
+        Individu(id=f"I{k}", nom=f"Nom{k % 7}", prenom=f"Prénom{k}", sexe=Sexe.M if k % 2 else Sexe.F, note="né ici")
+        for k in range(n)
+    ]
+    familles = [
+        Famille(id=f"F{k}", pere_id=f"I{k + 1}", mere_id=f"I{k}", enfants_ids=[f"I{k + 3}", f"I{k + 2}"], note="n")
+        for k in range(0, n - 3, 2)
+    ]
+    return individus, familles, [Source(id="S1", titre="Registre", note="paroisse")]
+
+
+@pytest.fixture(params=sorted(LAYOUTS))
+def layout(request: pytest.FixtureRequest) -> str:
+    return str(request.param)
+
+
+@pytest.fixture
+def bases(layout: str, tmp_path: Path) -> tuple[Path, Path]:
+    """(base `index.json`, même base dans la disposition `layout`)."""
+    individus, familles, sources = layout_data()
+    json_base, other_base = tmp_path / "json", tmp_path / layout
+    write_gwb_minimal(individus, familles, json_base, sources=sources)
+    write_gwb_minimal(individus, familles, other_base, sources=sources, **LAYOUTS[layout])
+    return json_base, other_base
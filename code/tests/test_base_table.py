@@ -0,0 +1,77 @@
+"""Tests de la représentation compacte (slots, BaseTable, services sur tableaux)."""
+
+from __future__ import annotations
+
+import random
+from datetime import date
+from pathlib import Path
+
+import pytest
+
+from geneweb.domain.models import Famille, Individu, Sexe
+from geneweb.domain.table import BaseTable
+from geneweb.io.gwb import load_gwb_table, write_gwb_minimal
+from geneweb.services.connectivity import (
+    compute_connected_components,
+    compute_connected_components_from_gwb,
+    compute_connected_components_table,
+)
+from geneweb.services.consanguinity import compute_inbreeding_coefficients, compute_inbreeding_table
+
+
+def _random_base(seed: int, n: int = 300) -> tuple[list[Individu], list[Famille]]:
+    rng = random.Random(seed)
+    individus = [Individu(id=f"I{k}", sexe=rng.choice([Sexe.M, Sexe.F, None])) for k in range(n)]
+    familles = []
+    for f in range(n // 3):
+        pere, mere = rng.sample(range(n - 5), 2)
+        # Enfants plus récents que leurs parents: pas de cycle d'ascendance
+        children = [f"I{c}" for c in rng.sample(range(max(pere, mere) + 1, n), rng.randint(0, 4))]
+        if f % 17 == 0:
+            children.append(f"X{f}")  # enfant absent de la base
+        familles.append(
+            Famille(
+                id=f"F{f}",
+                pere_id=f"I{pere}" if f % 11 else f"P{f}",  # parent absent de la base
+                mere_id=f"I{mere}" if f % 7 else None,
+                enfants_ids=children,
+            )
+        )
+    return individus, familles
+
+
+def test_models_are_slotted_with_shared_empty_defaults() -> None:
+    a, b = Individu(id="I1"), Individu(id="I2")
+    assert not hasattr(a, "__dict__")
+    assert a.sources is b.sources == ()
+    with pytest.raises(AttributeError):
+        a.inconnu = 1  # type: ignore[attr-defined]
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_table_services_match_object_services(seed: int) -> None:
+    individus, familles = _random_base(seed)
+    table = BaseTable.from_models(individus, familles)
+    assert compute_connected_components_table(table) == compute_connected_components(individus, familles)
+    assert compute_inbreeding_table(table) == compute_inbreeding_coefficients(individus, familles)
+
+
+def test_load_gwb_table_columns(tmp_path: Path) -> None:
+    write_gwb_minimal(
+        [
+            Individu(id="I1", sexe=Sexe.M, date_naissance=date(1900, 1, 2)),
+            Individu(id="I2", sexe=Sexe.F, date_deces=date(1980, 5, 6)),
+            Individu(id="I3"),
+        ],
+        [Famille(id="F1", pere_id="I1", mere_id="I2", enfants_ids=["I3", "I9"])],
+        tmp_path,
+    )
+    table = load_gwb_table(tmp_path)
+    assert table.ids == ["I1", "I2", "I3", "I9"]
+    assert table.n_individus == 3 and not table.is_individu(3)
+    assert [table.sexe_of(k) for k in range(4)] == [Sexe.M, Sexe.F, None, None]
+    assert table.naissance_of(0) == date(1900, 1, 2) and table.deces_of(1) == date(1980, 5, 6)
+    assert list(table.children(0)) == [2, 3]
+    pere, mere = table.parents()
+    assert (pere[2], mere[2], pere[0]) == (0, 1, -1)
+    assert compute_connected_components_from_gwb(str(tmp_path)) == [["I1", "I2", "I3"]]
@@ -0,0 +1,129 @@
+"""Tests de l'écrivain unique par base (file, écriture groupée, If-Match)."""
+
+from __future__ import annotations
+
+import threading
+import time
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+import geneweb.adapters.http.app as http_app
+from geneweb.domain.models import Individu
+from geneweb.infra.writer import WriteConflict, writers_snapshot
+from geneweb.io.gwb import load_gwb_minimal, write_gwb_minimal
+from geneweb.io.revision import read_revision
+from geneweb.services.gwd_modify import _submit, add_individu, mod_individu
+
+
+@pytest.fixture
+def base(tmp_path: Path) -> Path:
+    write_gwb_minimal([Individu(id="I1", nom="A")], [], tmp_path)
+    return tmp_path
+
+
+def test_concurrent_editors_lose_nothing_and_share_writes(base: Path) -> None:
+    def editor(n: int) -> None:
+        for k in range(25):
+            add_individu(base, id=f"E{n}-{k}", nom="N")
+
+    threads = [threading.Thread(target=editor, args=(n,)) for n in range(16)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    individus, _, _ = load_gwb_minimal(base)
+    assert len(individus) == 1 + 16 * 25
+    stats = writers_snapshot()[str(base.resolve())]
+    assert stats["applied"] == 400
+    assert stats["flushes"] < 400  # écritures groupées
+
+
+def test_if_match_rejects_stale_revision(base: Path) -> None:
+    revision = read_revision(base).token
+    mod_individu(base, id="I1", nom="B", expected_revision=f'"{revision}"')
+    with pytest.raises(WriteConflict):
+        mod_individu(base, id="I1", nom="C", expected_revision=f'"{revision}"')
+    individus, _, _ = load_gwb_minimal(base)
+    assert individus[0].nom == "B"
+
+
+def test_failed_mutation_is_isolated_from_its_group(base: Path) -> None:
+    started = threading.Event()
+    release = threading.Event()
+    errors: list[BaseException] = []
+
+    def hold(edit):  # type: ignore[no-untyped-def]
+        started.set()
+        release.wait(5)
+        return edit.add_individu(id="H")
+
+    def partial_then_fail(edit):  # type: ignore[no-untyped-def]
+        edit.mod_individu(id="I1", nom="PARTIEL")
+        raise ValueError("refus")
+
+    def run(fn) -> None:  # type: ignore[no-untyped-def]
+        try:
+            _submit(base, fn)
+        except ValueError as e:
+            errors.append(e)
+
+    holder = threading.Thread(target=run, args=(hold,))
+    holder.start()
+    started.wait(5)
+    # Ces mutations attendent dans la file et forment le groupe suivant
+    others = [
+        threading.Thread(target=run, args=(lambda edit: edit.add_individu(id="X1"),)),
+        threading.Thread(target=run, args=(partial_then_fail,)),
+        threading.Thread(target=run, args=(lambda edit: edit.add_individu(id="X2"),)),
+    ]
+    for t in others:
+        t.start()
+    time.sleep(0.2)
+    release.set()
+    for t in [holder, *others]:
+        t.join()
+
+    assert [str(e) for e in errors] == ["refus"]
+    individus, _, _ = load_gwb_minimal(base)
+    assert {i.id for i in individus} == {"I1", "H", "X1", "X2"}
+    assert next(i for i in individus if i.id == "I1").nom == "A"
+
+
+def test_external_change_reloads_resident_copy(base: Path) -> None:
+    add_individu(base, id="I2")
+    write_gwb_minimal([Individu(id="Z1")], [], base)  # hors écrivain
+    add_individu(base, id="I3")
+    individus, _, _ = load_gwb_minimal(base)
+    assert [i.id for i in individus] == ["Z1", "I3"]
+
+
+def test_http_if_match_and_etag(base: Path) -> None:
+    client = TestClient(http_app.app)
+    page = client.get("/gwd", params={"base": str(base), "i": "I1", "use_python": True})
+    etag = page.headers["etag"]
+
+    ok = client.put(
+        "/gwd/mod_ind",
+        params={"base": str(base), "id": "I1", "nom": "B", "use_python": True},
+        headers={"If-Match": etag},
+    )
+    assert ok.status_code == 200, ok.text
+    assert ok.headers["etag"] == f'"{read_revision(base).token}"'
+
+    stale = client.put(
+        "/gwd/mod_ind",
+        params={"base": str(base), "id": "I1", "nom": "C", "use_python": True},
+        headers={"If-Match": etag},
+    )
+    assert stale.status_code == 412
+    batch = client.post(
+        "/gwd/batch",
+        params={"base": str(base), "use_python": True},
+        json={"operations": [{"op": "add_ind", "id": "I2"}]},
+        headers={"If-Match": ok.headers["etag"]},
+    )
+    assert batch.status_code == 200
+    assert batch.headers["etag"] != ok.headers["etag"]
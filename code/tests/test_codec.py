@@ -0,0 +1,81 @@
+"""Tests du codec JSON commun (geneweb.io.codec)."""
+
+from __future__ import annotations
+
+import json
+import sys
+from collections.abc import Iterator
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+import geneweb.adapters.http.app as http_app
+from geneweb.domain.models import Famille, Individu
+from geneweb.io import codec
+from geneweb.io.gwb import load_gwb_minimal, write_gwb_minimal
+
+
+def _available() -> list[str]:
+    names = []
+    for name in codec.BACKENDS:
+        try:
+            codec.set_backend(name)
+        except ImportError:
+            continue
+        names.append(name)
+    codec.set_backend(None)
+    return names
+
+
+@pytest.fixture(autouse=True)
+def reset_backend() -> Iterator[None]:
+    yield
+    codec.set_backend(None)
+
+
+SAMPLE = {"individus": [{"id": "I1", "nom": "Lefèvre", "note": None, "sources": []}], "n": 3, "ok": True}
+
+
+@pytest.mark.parametrize("name", _available())
+def test_backends_agree_with_stdlib(name: str) -> None:
+    backend = codec.set_backend(name)
+    assert backend is not None and backend.name == name
+    assert codec.loads(codec.dumps(SAMPLE)) == SAMPLE
+    assert codec.loads(codec.dumps(SAMPLE, indent=True).decode("utf-8")) == SAMPLE
+    # Fichiers indentés identiques quel que soit le moteur
+    assert codec.dumps(SAMPLE, indent=True) == json.dumps(SAMPLE, ensure_ascii=False, indent=2).encode("utf-8")
+    assert "Lefèvre".encode() in codec.dumps(SAMPLE)
+    with pytest.raises(ValueError):
+        codec.loads(b"{invalide")
+
+
+def test_auto_falls_back_to_stdlib(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setitem(sys.modules, "orjson", None)
+    assert codec.set_backend("auto").name == "stdlib"
+    with pytest.raises(ValueError, match="inconnu"):
+        codec.set_backend("ujson")
+
+
+def test_compact_on_disk_mode(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    individus = [Individu(id="I1", nom="Élise"), Individu(id="I2")]
+    familles = [Famille(id="F1", pere_id="I1", enfants_ids=["I2"])]
+    write_gwb_minimal(individus, familles, tmp_path)
+    indented = (tmp_path / "index.json").read_bytes()
+
+    monkeypatch.setenv("GENEWEB_JSON_COMPACT", "1")
+    write_gwb_minimal(individus, familles, tmp_path)
+    compact = (tmp_path / "index.json").read_bytes()
+    assert b"\n" not in compact and len(compact) < len(indented)
+    assert json.loads(compact) == json.loads(indented)
+    loaded, _, _ = load_gwb_minimal(tmp_path)
+    assert loaded[0].nom == "Élise"
+
+
+def test_http_responses_use_codec(tmp_path: Path) -> None:
+    write_gwb_minimal([Individu(id="I1", nom="Élise")], [], tmp_path)
+    client = TestClient(http_app.app)
+    res = client.get("/gwd", params={"base": str(tmp_path), "i": "I1", "use_python": True})
+    assert res.status_code == 200
+    assert "Élise".encode() in res.content
+    assert res.json()["person"]["nom"] == "Élise"
@@ -1,6 +1,16 @@
 from __future__ import annotations
 
-from geneweb.services.comparator import compare_gedcom, normalize_gedcom
+from pathlib import Path
+
+import pytest
+
+from geneweb.services.comparator import (
+    compare_files,
+    compare_gedcom,
+    files_equal,
+    iter_gedcom_record_diff,
+    normalize_gedcom,
+)
 
 
 def test_normalize_gedcom_basic() -> None:
@@ -60,3 +70,82 @@ def test_compare_diff_detects_difference() -> None:
     assert "+1 NAME Jean /MARTIN/" in res.diff
 
 
+
+def _write(path: Path, text: str) -> Path:
+    path.write_text(text, encoding="utf-8")
+    return path
+
+
+def test_compare_files_equal_mode_stops_at_first_difference(tmp_path: Path) -> None:
+    left = _write(tmp_path / "left.ged", "0 HEAD\n0 @I1@ INDI\n1 NAME Jean /DUPONT/\n0 TRLR\n")
+    right = _write(tmp_path / "right.ged", "0  HEAD\n\n0 @I1@ INDI\n1 NAME Jean /MARTIN/\n0 TRLR\n")
+
+    assert files_equal(left, left) is True
+    assert files_equal(left, right) is False
+
+    res = compare_files(left, right, mode="equal")
+    assert res.are_equal is False
+    assert res.diff.splitlines() == [
+        "@@ ligne 3 @@",
+        "-1 NAME Jean /DUPONT/",
+        "+1 NAME Jean /MARTIN/",
+    ]
+    # La dernière ligne (TRLR) n'a pas été lue
+    assert res.left_count == 3
+
+
+def test_compare_files_unified_mode_equal_files(tmp_path: Path) -> None:
+    left = _write(tmp_path / "left.ged", "0 HEAD\n1 CHAR UTF-8\n0 TRLR\n")
+    right = _write(tmp_path / "right.ged", "0 HEAD\n1  CHAR UTF-8\n\n0 TRLR\n")
+
+    res = compare_files(left, right)
+    assert res.are_equal is True
+    assert res.left_count == res.right_count == 3
+
+
+def test_compare_files_records_mode_resynchronizes(tmp_path: Path) -> None:
+    left = _write(
+        tmp_path / "left.ged",
+        "0 HEAD\n"
+        "0 @I1@ INDI\n1 NAME Jean /DUPONT/\n"
+        "0 @I2@ INDI\n1 NAME Anne /MARTIN/\n"
+        "0 @I3@ INDI\n1 NAME Paul /PETIT/\n"
+        "0 TRLR\n",
+    )
+    # I1 supprimé, I4 inséré, I3 modifié: le reste doit rester aligné
+    right = _write(
+        tmp_path / "right.ged",
+        "0 HEAD\n"
+        "0 @I2@ INDI\n1 NAME Anne /MARTIN/\n"
+        "0 @I4@ INDI\n1 NAME Luc /NOIR/\n"
+        "0 @I3@ INDI\n1 NAME Paul /GRAND/\n"
+        "0 TRLR\n",
+    )
+
+    res = compare_files(left, right, mode="records")
+    assert res.are_equal is False
+    lines = res.diff.splitlines()
+    assert "=== 0 @I3@ INDI" in lines
+    assert "-1 NAME Paul /PETIT/" in lines and "+1 NAME Paul /GRAND/" in lines
+    assert "--- 0 @I1@ INDI" in lines
+    assert "+++ 0 @I4@ INDI" in lines
+    assert not any("MARTIN" in line for line in lines)
+    assert not any("TRLR" in line for line in lines)
+
+
+@pytest.mark.parametrize("mode", ["unified", "equal", "records"])
+def test_compare_files_reordered_records_are_not_equal(tmp_path: Path, mode: str) -> None:
+    jean, anne = "0 @I1@ INDI\n1 NAME Jean /DUPONT/\n", "0 @I2@ INDI\n1 NAME Anne /MARTIN/\n"
+    left = _write(tmp_path / "left.ged", f"0 HEAD\n{jean}{anne}0 TRLR\n")
+    right = _write(tmp_path / "right.ged", f"0 HEAD\n{anne}{jean}0 TRLR\n")
+
+    res = compare_files(left, right, mode=mode)  # type: ignore[arg-type]
+    assert res.are_equal is False
+    if mode == "records":
+        # Appariement par en-tête: l'ordre seul ne produit pas de diff
+        assert res.diff == ""
+
+
+def test_iter_gedcom_record_diff_identical() -> None:
+    lines = ["0 HEAD", "0 @I1@ INDI", "1 NAME Jean /DUPONT/", "0 TRLR"]
+    assert list(iter_gedcom_record_diff(lines, list(lines))) == []
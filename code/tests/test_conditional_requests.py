@@ -0,0 +1,108 @@
+"""Tests des requêtes conditionnelles (ETag / Last-Modified sur la révision de base)."""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+import geneweb.adapters.http.app as http_app
+from geneweb.domain.models import Famille, Individu
+from geneweb.io.gwb import write_gwb_minimal
+from geneweb.io.revision import REVISION_FILE, bump_revision, read_revision
+from geneweb.services.gwd_images import set_blason_image
+from geneweb.services.gwd_wiznotes import set_wiznote
+
+
+@pytest.fixture
+def base(tmp_path: Path) -> Path:
+    individus = [Individu(id="I1", nom="A"), Individu(id="I2", nom="B"), Individu(id="I3", nom="C")]
+    familles = [Famille(id="F1", pere_id="I1", mere_id="I2", enfants_ids=["I3"])]
+    write_gwb_minimal(individus, familles, tmp_path)
+    return tmp_path
+
+
+@pytest.fixture
+def client() -> TestClient:
+    return TestClient(http_app.app)
+
+
+def test_writers_bump_revision(base: Path) -> None:
+    assert (base / REVISION_FILE).exists()
+    seen = {read_revision(base).token}
+    set_wiznote(base, "IND:I1", "note")
+    seen.add(read_revision(base).token)
+    set_blason_image(base, "I1", "blason.png")
+    seen.add(read_revision(base).token)
+    write_gwb_minimal([Individu(id="I1", nom="Z")], [], base)
+    seen.add(read_revision(base).token)
+    assert len(seen) == 4
+    # Lecture sans écriture: jeton stable
+    assert read_revision(base).token == read_revision(base).token
+
+
+def test_revision_follows_base_subdirectory(tmp_path: Path) -> None:
+    write_gwb_minimal([Individu(id="I1", nom="A")], [], tmp_path / "base")
+    before = read_revision(tmp_path)
+    assert before == read_revision(tmp_path / "base")
+    bump_revision(tmp_path)  # ex: notes wizard écrites à la racine
+    assert read_revision(tmp_path / "base").token != before.token
+
+
+def test_gwd_etag_304_until_write(base: Path, client: TestClient, monkeypatch: pytest.MonkeyPatch) -> None:
+    params = {"base": str(base), "mode": "D", "i": "I1", "use_python": True}
+    first = client.get("/gwd", params=params)
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+    assert first.headers["last-modified"]
+
+    # 304 sans charger la base
+    def fail(*_args: object) -> None:
+        raise AssertionError("base chargée malgré If-None-Match")
+
+    with monkeypatch.context() as m:
+        m.setattr(http_app, "get_descendance", fail)
+        cached = client.get("/gwd", params=params, headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.headers["etag"] == etag
+    assert cached.content == b""
+
+    set_wiznote(base, "IND:I1", "modifiée")
+    fresh = client.get("/gwd", params=params, headers={"If-None-Match": etag})
+    assert fresh.status_code == 200
+    assert fresh.headers["etag"] != etag
+
+
+def test_analytical_and_wiznotes_validators(base: Path, client: TestClient) -> None:
+    consang = client.get("/analytical/consang", params={"base_dir": str(base), "use_python": True})
+    assert consang.status_code == 200
+    etag = consang.headers["etag"]
+    again = client.get(
+        "/analytical/consang",
+        params={"base_dir": str(base), "use_python": True},
+        headers={"If-None-Match": f'W/"other", {etag}'},
+    )
+    assert again.status_code == 304
+
+    notes = client.get("/gwd/wiznotes", params={"base": str(base)})
+    assert notes.status_code == 200
+    since = client.get(
+        "/gwd/wiznotes", params={"base": str(base)}, headers={"If-Modified-Since": notes.headers["last-modified"]}
+    )
+    assert since.status_code == 304
+
+
+def test_carrousel_etag_tracks_image_files(base: Path, client: TestClient) -> None:
+    (base / "images").mkdir()
+    first = client.get("/gwd/images/carrousel", params={"base": str(base)})
+    assert first.json()["images"] == []
+    etag = first.headers["etag"]
+    assert client.get(
+        "/gwd/images/carrousel", params={"base": str(base)}, headers={"If-None-Match": etag}
+    ).status_code == 304
+
+    (base / "images" / "I1.png").write_bytes(b"png")
+    second = client.get("/gwd/images/carrousel", params={"base": str(base)}, headers={"If-None-Match": etag})
+    assert second.status_code == 200
+    assert len(second.json()["images"]) == 1
@@ -0,0 +1,105 @@
+"""Tests des écritures atomiques et durables (geneweb.io.durable)."""
+
+from __future__ import annotations
+
+import json
+import os
+import stat
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from geneweb.domain.models import Individu
+from geneweb.io import durable
+from geneweb.io.gwb import load_gwb_minimal, write_gwb_minimal
+
+
+def test_failed_write_keeps_previous_file(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    write_gwb_minimal([Individu(id="I1")], [], tmp_path)
+    before = (tmp_path / "index.json").read_bytes()
+    os.chmod(tmp_path / "index.json", 0o640)
+
+    def crash(*_args: object) -> None:
+        raise OSError("disque plein")
+
+    monkeypatch.setattr(os, "replace", crash)
+    with pytest.raises(OSError, match="disque plein"):
+        write_gwb_minimal([Individu(id="I2")], [], tmp_path)
+    monkeypatch.undo()
+
+    assert (tmp_path / "index.json").read_bytes() == before
+    assert sorted(p.name for p in tmp_path.iterdir()) == [".revision", "index.json"]
+    write_gwb_minimal([Individu(id="I2")], [], tmp_path)
+    assert (tmp_path / "index.json").stat().st_mode & 0o777 == 0o640
+
+
+def test_concurrent_reader_never_sees_torn_index(tmp_path: Path) -> None:
+    big = [Individu(id=f"I{k}", nom="N" * 50) for k in range(3000)]
+    write_gwb_minimal(big[:1], [], tmp_path)
+    stop = threading.Event()
+    errors: list[Exception] = []
+
+    def reader() -> None:
+        while not stop.is_set():
+            try:
+                load_gwb_minimal(tmp_path)
+            except Exception as e:  # noqa: BLE001 - tout échec de lecture compte
+                errors.append(e)
+
+    thread = threading.Thread(target=reader)
+    thread.start()
+    for n in range(30):
+        write_gwb_minimal(big[: 1 + n * 100], [], tmp_path)
+    stop.set()
+    thread.join()
+    assert errors == []
+
+
+def _trace_sync(monkeypatch: pytest.MonkeyPatch) -> list[str]:
+    """Journal des `fsync` (fichier ou répertoire) et des renommages."""
+    events: list[str] = []
+    real_fsync, real_replace = os.fsync, os.replace
+
+    def fsync(fd: int) -> None:
+        events.append("fsync-dir" if stat.S_ISDIR(os.fstat(fd).st_mode) else "fsync-file")
+        real_fsync(fd)
+
+    def replace(src: str, dst: str | Path) -> None:
+        events.append("replace")
+        real_replace(src, dst)
+
+    monkeypatch.setattr(os, "fsync", fsync)
+    monkeypatch.setattr(os, "replace", replace)
+    return events
+
+
+@pytest.mark.parametrize("write_behind_ms", ["0", "200"])
+def test_file_synced_before_rename(
+    write_behind_ms: str, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setenv("GENEWEB_WRITE_BEHIND_MS", write_behind_ms)
+    events = _trace_sync(monkeypatch)
+    durable.write_atomic(tmp_path / "notes.json", b"{}")
+    durable.flush()
+    assert events == ["fsync-file", "replace", "fsync-dir"]
+
+
+def test_write_behind_batches_directory_fsyncs(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    events = _trace_sync(monkeypatch)
+    target = tmp_path / "notes.json"
+    monkeypatch.setenv("GENEWEB_WRITE_BEHIND_MS", "200")
+    for n in range(20):
+        durable.write_atomic(target, json.dumps({"n": n}).encode())
+        # Renommage immédiat: la dernière version est lisible tout de suite
+        assert json.loads(target.read_bytes()) == {"n": n}
+    assert events == ["fsync-file", "replace"] * 20
+    assert durable.durable_snapshot()["pending"] == 1
+
+    deadline = time.monotonic() + 5
+    while durable.durable_snapshot()["pending"] and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert durable.flush() == 0
+    # Un seul fsync du répertoire pour les 20 renommages
+    assert events.count("fsync-dir") == 1
@@ -284,3 +284,90 @@ def test_compare_gwb_with_sources_references() -> None:
 	assert result.are_equal is False
 	assert "S002" in result.diff
 
+
+
+def test_iter_gwb_deltas_added_removed_modified() -> None:
+	"""Le moteur indexé classe chaque enregistrement avec des deltas champ par champ."""
+	from geneweb.services.comparator import iter_gwb_deltas
+
+	left = (
+		[
+			Individu(id="I001", nom="DUPONT", prenom="Jean"),
+			Individu(id="I002", nom="MARTIN", prenom="Anne"),
+		],
+		[Famille(id="F001", pere_id="I001", enfants_ids=["I002"])],
+		[],
+	)
+	right = (
+		[
+			Individu(id="I001", nom="DURAND", prenom="Jean", note="Ajout"),
+			Individu(id="I003", nom="PETIT", prenom="Paul"),
+		],
+		[Famille(id="F001", pere_id="I001", enfants_ids=["I002"])],
+		[Source(id="S001", titre="Registre")],
+	)
+
+	deltas = {(d.kind, d.id): d for d in iter_gwb_deltas(left, right)}
+	assert set(deltas) == {
+		("INDIVIDUS", "I001"),
+		("INDIVIDUS", "I002"),
+		("INDIVIDUS", "I003"),
+		("SOURCES", "S001"),
+	}
+	modified = deltas[("INDIVIDUS", "I001")]
+	assert modified.status == "modified"
+	assert modified.fields == {"Nom": ("DUPONT", "DURAND"), "Note": (None, "Ajout")}
+	assert deltas[("INDIVIDUS", "I002")].status == "removed"
+	assert deltas[("INDIVIDUS", "I003")].status == "added"
+	assert deltas[("SOURCES", "S001")].status == "added"
+
+
+def test_compare_gwb_keyed_renderer() -> None:
+	"""Le rendu indexé liste les champs modifiés plutôt qu'un unified diff."""
+	left = ([Individu(id="I001", nom="DUPONT", prenom="Jean")], [], [])
+	right = ([Individu(id="I001", nom="MARTIN", prenom="Jean")], [], [])
+
+	result = compare_gwb(left, right, renderer="keyed")
+	assert result.are_equal is False
+	assert result.diff.splitlines() == [
+		"~ [INDIVIDUS] ID: I001",
+		"    Nom: 'DUPONT' -> 'MARTIN'",
+	]
+
+
+def test_compare_gwb_auto_renderer_switches_to_keyed(monkeypatch) -> None:
+	"""Au-delà du seuil, le mode auto n'utilise plus difflib."""
+	import geneweb.services.comparator as comparator
+
+	monkeypatch.setattr(comparator, "UNIFIED_DIFF_MAX_RECORDS", 1)
+	left = ([Individu(id="I001"), Individu(id="I002")], [], [])
+	right = ([Individu(id="I001")], [], [])
+
+	result = compare_gwb(left, right)
+	assert result.diff == "- [INDIVIDUS] ID: I002"
+
+
+def test_compare_gwb_duplicate_ids() -> None:
+	"""Un id en double est traité de la même façon des deux côtés et signalé à part."""
+	from geneweb.services.comparator import iter_gwb_deltas
+
+	base = (
+		[Individu(id="I001", nom="DUPONT"), Individu(id="I001", nom="MARTIN")],
+		[Famille(id="F001", pere_id="I001"), Famille(id="F001", mere_id="I001")],
+		[],
+	)
+	assert compare_gwb(base, base, renderer="keyed").are_equal is True
+
+	# Première occurrence identique, doublon absent à droite
+	right = ([Individu(id="I001", nom="DUPONT")], base[1], [])
+	deltas = list(iter_gwb_deltas(base, right))
+	assert [(d.kind, d.id, d.status, d.fields) for d in deltas] == [
+		("INDIVIDUS", "I001", "duplicate", {"Occurrences": ("2", "1")}),
+	]
+	result = compare_gwb(base, right, renderer="keyed")
+	assert result.diff == "! [INDIVIDUS] ID: I001 en double (2 -> 1 occurrences)"
+
+	# Doublons inversés: la première occurrence fait foi des deux côtés
+	swapped = (base[0][::-1], base[1], [])
+	statuses = sorted(d.status for d in iter_gwb_deltas(base, swapped))
+	assert statuses == ["duplicate", "modified"]
@@ -0,0 +1,105 @@
+"""Tests du lot transactionnel de modifications (apply_batch, POST /gwd/batch)."""
+
+from __future__ import annotations
+
+import time
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+import geneweb.adapters.http.app as http_app
+from geneweb.domain.models import Famille, Individu
+from geneweb.io.gwb import load_gwb_minimal, write_gwb_minimal
+from geneweb.io.revision import read_revision
+from geneweb.services.gwd_modify import apply_batch
+
+
+@pytest.fixture
+def base(tmp_path: Path) -> Path:
+    write_gwb_minimal(
+        [Individu(id="I1", nom="A"), Individu(id="I2", nom="B")],
+        [Famille(id="F1", pere_id="I1", mere_id="I2")],
+        tmp_path,
+    )
+    return tmp_path
+
+
+def test_operations_see_previous_ones(base: Path) -> None:
+    res = apply_batch(
+        base,
+        [
+            {"op": "add_ind", "id": "I3", "nom": "C", "sexe": "F"},
+            {"op": "mod_fam", "id": "F1", "enfants_ids": ["I3"]},
+            {"op": "add_fam", "id": "F2", "mere_id": "I3"},
+            {"op": "mod_ind", "id": "I1", "prenom": "Jean"},
+            {"op": "del_fam", "id": "F2", "force": True},
+            {"op": "del_ind", "id": "I2", "force": True},
+        ],
+    )
+    assert res.pop("revision") == read_revision(base).token
+    assert res == {
+        "applied": 6,
+        "counts": {"add_ind": 1, "mod_fam": 1, "add_fam": 1, "mod_ind": 1, "del_fam": 1, "del_ind": 1},
+    }
+    individus, familles, _ = load_gwb_minimal(base)
+    assert [i.id for i in individus] == ["I1", "I3"]
+    assert individus[0].prenom == "Jean"
+    assert [(f.id, f.pere_id, f.mere_id, f.enfants_ids) for f in familles] == [("F1", "I1", None, ["I3"])]
+
+
+def test_invalid_operation_leaves_base_untouched(base: Path) -> None:
+    before = (base / "index.json").read_bytes()
+    with pytest.raises(ValueError, match=r"Opération 2 \(add_fam\): Enfant introuvable: I9"):
+        apply_batch(
+            base,
+            [
+                {"op": "add_ind", "id": "I3"},
+                {"op": "mod_ind", "id": "I1", "nom": "Z"},
+                {"op": "add_fam", "id": "F2", "enfants_ids": ["I9"]},
+            ],
+        )
+    assert (base / "index.json").read_bytes() == before
+
+    with pytest.raises(ValueError, match="lie aux familles"):
+        apply_batch(base, [{"op": "del_ind", "id": "I1"}])
+    with pytest.raises(ValueError, match="Champs inconnus"):
+        apply_batch(base, [{"op": "add_ind", "id": "I3", "age": 3}])
+    with pytest.raises(ValueError, match="Opération inconnue"):
+        apply_batch(base, [{"op": "merge", "id": "I1"}])
+    with pytest.raises(ValueError, match="Opération 1: champ 'op' requis"):
+        apply_batch(base, [{"op": "add_ind", "id": "I3"}, {"id": "I4"}])
+    with pytest.raises(ValueError, match="Opération 0: champ 'op' requis"):
+        apply_batch(base, [{"op": ["add_ind"], "id": "I3"}])
+    assert (base / "index.json").read_bytes() == before
+
+
+def test_large_batch_is_fast(tmp_path: Path) -> None:
+    write_gwb_minimal([], [], tmp_path)
+    ops: list[dict] = [{"op": "add_ind", "id": f"I{n}", "nom": "N"} for n in range(10_000)]
+    ops += [{"op": "add_fam", "id": f"F{n}", "pere_id": f"I{n}", "enfants_ids": [f"I{n + 1}"]} for n in range(0, 10_000, 2)]
+    ops += [{"op": "mod_ind", "id": f"I{n}", "prenom": "P"} for n in range(10_000)]
+    started = time.perf_counter()
+    assert apply_batch(tmp_path, ops)["applied"] == 25_000
+    assert time.perf_counter() - started < 20
+    individus, familles, _ = load_gwb_minimal(tmp_path)
+    assert len(individus) == 10_000 and len(familles) == 5_000
+
+
+def test_batch_route(base: Path) -> None:
+    client = TestClient(http_app.app)
+    ok = client.post(
+        "/gwd/batch",
+        params={"base": str(base), "use_python": True},
+        json={"operations": [{"op": "add_ind", "id": "I3"}, {"op": "del_fam", "id": "F1", "force": True}]},
+    )
+    assert ok.status_code == 200, ok.text
+    assert ok.json()["applied"] == 2
+
+    bad = client.post(
+        "/gwd/batch",
+        params={"base": str(base), "use_python": True},
+        json={"operations": [{"op": "del_ind", "id": "I404"}]},
+    )
+    assert bad.status_code == 400
+    assert "Opération 0" in bad.json()["detail"]
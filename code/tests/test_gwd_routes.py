@@ -220,3 +220,55 @@ def test_get_notes(tmp_path: Path) -> None:
 	assert len(result["family_notes"]) == 1
 	assert result["total"] == 2
 
+
+
+def _duplicate_base(root: Path) -> None:
+	from geneweb.domain.models import Famille, Individu
+	
+	individus = [
+		Individu(id="I1", nom="Dupont", prenom="Jean"),
+		Individu(id="I2", nom="Martin", prenom="Marie"),
+		Individu(id="I3", nom="Dupont", prenom="Paul"),
+		Individu(id="I3", nom="Dupont", prenom="Pierre"),
+		Individu(id="I4", nom="Dupont", prenom="Anne"),
+		Individu(id="I5", nom="Durand", prenom="Luc"),
+	]
+	familles = [
+		Famille(id="F1", pere_id="I1", mere_id="I2", enfants_ids=["I3", "I4"]),
+		Famille(id="F1", pere_id="I5", enfants_ids=["I4"], note="doublon"),
+		Famille(id="F2", pere_id="I5", mere_id="I2", enfants_ids=["I3"]),
+	]
+	write_gwb_minimal(individus, familles, root)
+
+
+@pytest.mark.parametrize("kind", ["json", "sharded", "packed", "sqlite", "snapshot"])
+def test_routes_agree_on_duplicate_ids(kind: str, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+	"""Identifiants en double et enfant de plusieurs familles: mêmes pages pour tous les moteurs."""
+	from geneweb.infra.snapshot_store import SnapshotStore
+	from geneweb.io.storage import convert_base
+	
+	base = tmp_path / "base"
+	_duplicate_base(base)
+	if kind == "snapshot":
+		store = SnapshotStore(tmp_path / "snapshots")
+		monkeypatch.setenv("GENEWEB_SNAPSHOT", "1")
+		monkeypatch.setattr("geneweb.services.gwd_routes.get_snapshot_store", lambda: store)
+	elif kind != "json":
+		convert_base(base, kind)  # type: ignore[arg-type]
+	b = str(base)
+	
+	assert get_person_page(b)["base"] == {"total_individus": 6, "total_familles": 3, "total_sources": 0}
+	assert get_person_page(b, "I3")["person"]["prenom"] == "Paul"
+	assert [(p["id"], p["prenom"]) for p in search_persons(b, "dupont")["results"]] == [
+		("I1", "Jean"), ("I3", "Paul"), ("I3", "Pierre"), ("I4", "Anne"),
+	]
+	family = get_family_page(b, "F1")["family"]
+	assert (family["pere"]["id"], family["mere"]["id"], family["note"]) == ("I1", "I2", None)
+	assert [e["prenom"] for e in family["enfants"]] == ["Paul", "Pierre", "Anne"]
+	# Première famille qui compte I3 parmi ses enfants: F1 (Jean et Marie), pas F2
+	ancestors = get_ascendance(b, "I3")["ancestors"]
+	assert [(a["id"], a["level"]) for a in ancestors] == [("I3", 0), ("I1", 1), ("I2", 1)]
+	descendants = get_descendance(b, "I5")["descendants"]
+	assert [(d["id"], d["prenom"], d["level"]) for d in descendants] == [
+		("I5", "Luc", 0), ("I4", "Anne", 1), ("I3", "Paul", 1),
+	]
@@ -0,0 +1,113 @@
+"""Tests du portage Python de gwdiff."""
+
+from __future__ import annotations
+
+from dataclasses import replace
+from datetime import date
+from pathlib import Path
+
+from typer.testing import CliRunner
+
+from geneweb.adapters.cli.main import app
+from geneweb.domain.models import Famille, Individu, Sexe
+from geneweb.infra.base_cache import BaseCache
+from geneweb.io.gwb import load_gwb_minimal, write_gwb_minimal
+from geneweb.services.gwdiff import GwdiffMessage, format_entry, gwdiff_bases
+
+runner = CliRunner()
+
+
+def _family_base(root: Path, *, child_birth: date | None, extra_child: bool = False) -> Path:
+    individus = [
+        Individu(id="GP", nom="DUPONT", prenom="Louis", sexe=Sexe.M),
+        Individu(id="GM", nom="DURAND", prenom="Rose", sexe=Sexe.F),
+        Individu(id="P", nom="DUPONT", prenom="Jean", sexe=Sexe.M, lieu_naissance="Paris"),
+        Individu(id="M", nom="MARTIN", prenom="Anne", sexe=Sexe.F),
+        Individu(id="C1", nom="DUPONT", prenom="Paul", sexe=Sexe.M, date_naissance=child_birth),
+    ]
+    enfants = ["C1"]
+    if extra_child:
+        individus.append(Individu(id="C2", nom="DUPONT", prenom="Marie", sexe=Sexe.F))
+        enfants.append("C2")
+    familles = [
+        Famille(id="F0", pere_id="GP", mere_id="GM", enfants_ids=["P"]),
+        Famille(id="F1", pere_id="P", mere_id="M", enfants_ids=enfants),
+    ]
+    write_gwb_minimal(individus, familles, root)
+    return root
+
+
+def test_gwdiff_identical_bases(tmp_path: Path) -> None:
+    b1 = _family_base(tmp_path / "b1", child_birth=date(1990, 1, 1))
+    b2 = _family_base(tmp_path / "b2", child_birth=date(1990, 1, 1))
+
+    assert list(gwdiff_bases(b1, b2, [("P", "P")])) == []
+
+
+def test_gwdiff_reports_descendant_mismatches(tmp_path: Path) -> None:
+    b1 = _family_base(tmp_path / "b1", child_birth=date(1990, 1, 1), extra_child=True)
+    b2 = _family_base(tmp_path / "b2", child_birth=date(1991, 1, 1))
+
+    entries = list(gwdiff_bases(b1, b2, [("P", "P")]))
+    codes = {(e.left_id, m.code, m.person_id) for e in entries for m in e.messages}
+    assert ("C1", "birth_date", None) in codes
+    assert ("P", "child_missing", "C2") in codes
+
+
+def test_gwdiff_base2_may_be_more_precise(tmp_path: Path) -> None:
+    b1 = _family_base(tmp_path / "b1", child_birth=None)
+    b2 = _family_base(tmp_path / "b2", child_birth=date(1991, 1, 1))
+
+    assert list(gwdiff_bases(b1, b2, [("P", "P")])) == []
+    # L'inverse est signalé: la base 2 perd une information
+    entries = list(gwdiff_bases(b2, b1, [("P", "P")]))
+    assert [m.code for e in entries for m in e.messages] == ["birth_date"]
+
+
+def test_gwdiff_ad_mode_starts_from_ancestors(tmp_path: Path) -> None:
+    b1 = _family_base(tmp_path / "b1", child_birth=None, extra_child=True)
+    b2 = _family_base(tmp_path / "b2", child_birth=None)
+
+    # Ancre sur l'enfant: le mode "d" ne voit pas la sœur manquante, le mode "ad"
+    # repart des ancêtres les plus anciens (grands-parents paternels, mère sans
+    # parents connus) et couvre toute leur descendance.
+    assert list(gwdiff_bases(b1, b2, [("C1", "C1")])) == []
+    entries = list(gwdiff_bases(b1, b2, [("C1", "C1")], mode="ad"))
+    codes = {(e.left_id, m.code, m.person_id) for e in entries for m in e.messages}
+    assert codes == {("P", "child_missing", "C2"), ("M", "child_missing", "C2")}
+
+
+def test_gwdiff_reuses_loaded_bases(tmp_path: Path) -> None:
+    b1 = _family_base(tmp_path / "b1", child_birth=None)
+    b2 = _family_base(tmp_path / "b2", child_birth=None)
+    cache = BaseCache()
+
+    list(gwdiff_bases(b1, b2, [("P", "P"), ("M", "M")], cache=cache))
+    list(gwdiff_bases(b1, b2, [("C1", "C1")], cache=cache))
+    assert cache.misses == 2
+    assert cache.hits == 2
+
+
+def test_cli_gwdiff(tmp_path: Path) -> None:
+    b1 = _family_base(tmp_path / "b1", child_birth=date(1990, 1, 1))
+    b2 = _family_base(tmp_path / "b2", child_birth=date(1991, 1, 1))
+
+    result = runner.invoke(app, ["gwdiff", str(b1), str(b2), "-1", "P", "-2", "P"])
+    assert result.exit_code == 0, result.output
+    assert "Paul DUPONT (#C1) / Paul DUPONT (#C1)" in result.stdout
+    assert " birth date" in result.stdout
+
+
+def test_gwdiff_ad_mode_warns_on_unmatched_ancestor(tmp_path: Path) -> None:
+    b1 = _family_base(tmp_path / "b1", child_birth=None)
+    b2 = _family_base(tmp_path / "b2", child_birth=None)
+    individus, familles, _ = load_gwb_minimal(b2)
+    individus = [replace(ind, prenom="Henri") if ind.id == "GP" else ind for ind in individus]
+    write_gwb_minimal(individus, familles, b2)
+
+    cache = BaseCache()
+    entries = list(gwdiff_bases(b1, b2, [("C1", "C1")], mode="ad", cache=cache))
+    warning = next(e for e in entries if e.right_id is None)
+    assert warning.messages == (GwdiffMessage("no_match", "GP"),)
+    lines = format_entry(warning, cache.get(b1), cache.get(b2))
+    assert lines == [" Warning: Louis DUPONT (#GP) doesn't match Henri DUPONT (#GP)"]
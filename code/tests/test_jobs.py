@@ -0,0 +1,189 @@
+"""Tests du gestionnaire de travaux en arrière-plan (processus séparés)."""
+
+from __future__ import annotations
+
+import json
+import socket
+import time
+from collections.abc import Iterator, Mapping
+from pathlib import Path
+from typing import Any
+
+import pytest
+from fastapi.testclient import TestClient
+
+from geneweb.adapters.http.app import app
+from geneweb.infra.jobs import JobManager, JobNotFound, ProgressFn, set_job_manager
+from geneweb.services import jobs
+from geneweb.services.jobs import TASKS
+
+
+def _task_double(params: Mapping[str, Any], progress: ProgressFn) -> dict[str, Any]:
+    progress(0.5, "à mi-chemin")
+    return {"value": params["x"] * 2}
+
+
+def _task_fail(params: Mapping[str, Any], progress: ProgressFn) -> dict[str, Any]:
+    raise ValueError("base corrompue")
+
+
+def _task_sleep(params: Mapping[str, Any], progress: ProgressFn) -> dict[str, Any]:
+    progress(0.1, "long calcul")
+    time.sleep(30)
+    return {}
+
+
+TEST_TASKS = {"double": _task_double, "fail": _task_fail, "sleep": _task_sleep}
+
+
+@pytest.fixture
+def manager(tmp_path: Path) -> Iterator[JobManager]:
+    jobs = JobManager(tmp_path / "jobs", TEST_TASKS, max_workers=1, poll_interval=0.05)
+    yield jobs
+    jobs.shutdown()
+
+
+def _wait_for(predicate, timeout: float = 20.0) -> None:  # type: ignore[no-untyped-def]
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return
+        time.sleep(0.05)
+    raise AssertionError("condition non atteinte")
+
+
+def test_job_result_is_persisted(manager: JobManager, tmp_path: Path) -> None:
+    job = manager.submit("double", {"x": 21})
+    assert manager.wait(job.id) == "succeeded"
+    assert manager.result(job.id) == ("succeeded", {"value": 42})
+    assert manager.status(job.id)["progress"] == {"fraction": 1.0, "message": "terminé"}
+
+    reloaded = JobManager(tmp_path / "jobs", TEST_TASKS)
+    try:
+        assert reloaded.result(job.id) == ("succeeded", {"value": 42})
+    finally:
+        reloaded.shutdown()
+
+
+def test_job_failure_is_reported(manager: JobManager) -> None:
+    job = manager.submit("fail", {})
+    assert manager.wait(job.id) == "failed"
+    assert manager.status(job.id)["error"] == "base corrompue"
+    assert manager.result(job.id) == ("failed", None)
+    with pytest.raises(ValueError):
+        manager.submit("unknown", {})
+
+
+def test_queue_and_cancel(manager: JobManager) -> None:
+    slow = manager.submit("sleep", {})
+    queued = manager.submit("double", {"x": 1})
+    status = manager.status(queued.id)
+    assert status["status"] == "queued"
+    assert status["queue_position"] == 1
+
+    _wait_for(lambda: (manager.status(slow.id)["progress"] or {}).get("message") == "long calcul")
+    assert manager.cancel(slow.id)
+    assert manager.status(slow.id)["status"] == "cancelled"
+    assert manager.wait(queued.id) == "succeeded"
+    assert not manager.cancel(queued.id)
+
+
+def test_abandoned_job_is_cancelled(tmp_path: Path) -> None:
+    jobs = JobManager(tmp_path / "jobs", TEST_TASKS, abandon_after=0.5, poll_interval=0.05)
+    try:
+        job = jobs.submit("sleep", {})
+        time.sleep(1.5)
+        meta = json.loads((tmp_path / "jobs" / job.id / "job.json").read_text(encoding="utf-8"))
+        assert meta["status"] == "cancelled"
+        assert "Abandonné" in meta["error"]
+    finally:
+        jobs.shutdown()
+
+
+def test_managers_share_jobs_through_disk(manager: JobManager, tmp_path: Path) -> None:
+    # Deuxième worker uvicorn: même répertoire, propriétaire vivant
+    other = JobManager(tmp_path / "jobs", TEST_TASKS, poll_interval=0.05)
+    try:
+        done = manager.submit("double", {"x": 2})
+        assert manager.wait(done.id) == "succeeded"
+        slow = manager.submit("sleep", {})
+        _wait_for(lambda: (other.status(slow.id)["progress"] or {}).get("message") == "long calcul")
+        assert other.status(slow.id)["status"] == "running"
+        assert other.result(done.id) == ("succeeded", {"value": 4})
+        assert {j["id"] for j in other.list_jobs()} == {done.id, slow.id}
+
+        restarted = JobManager(tmp_path / "jobs", TEST_TASKS)
+        restarted.shutdown()
+        assert manager.status(slow.id)["status"] == "running"
+
+        assert other.cancel(slow.id)
+        assert manager.wait(slow.id) == "cancelled"
+        assert other.status(slow.id)["status"] == "cancelled"
+    finally:
+        other.shutdown()
+
+
+def test_jobs_of_a_dead_owner_are_failed(tmp_path: Path) -> None:
+    job_dir = tmp_path / "jobs" / "abc123"
+    job_dir.mkdir(parents=True)
+    meta = {"id": "abc123", "kind": "sleep", "params": {}, "status": "running"}
+    meta |= {"owner_pid": 2**22 + 1, "owner_host": socket.gethostname(), "owner_token": "mort"}
+    (job_dir / "job.json").write_text(json.dumps(meta), encoding="utf-8")
+
+    jobs = JobManager(tmp_path / "jobs", TEST_TASKS)
+    try:
+        status = jobs.status("abc123")
+        assert status["status"] == "failed"
+        assert "Interrompu" in status["error"]
+        with pytest.raises(JobNotFound):
+            jobs.status("../abc123")
+    finally:
+        jobs.shutdown()
+
+
+def test_http_consang_job(tmp_path: Path) -> None:
+    base = tmp_path / "base"
+    base.mkdir()
+    data = {
+        "individus": [{"id": "A"}, {"id": "B"}, {"id": "C"}, {"id": "D"}, {"id": "E"}],
+        "familles": [
+            {"id": "F1", "pere_id": "A", "mere_id": "B", "enfants_ids": ["C", "D"]},
+            {"id": "F2", "pere_id": "C", "mere_id": "D", "enfants_ids": ["E"]},
+        ],
+    }
+    (base / "index.json").write_text(json.dumps(data), encoding="utf-8")
+    set_job_manager(JobManager(tmp_path / "jobs", TASKS, poll_interval=0.05))
+    try:
+        client = TestClient(app)
+        response = client.post("/jobs/analytical/consang", params={"base_dir": str(tmp_path), "use_python": True})
+        assert response.status_code == 202
+        job_id = response.json()["job_id"]
+
+        _wait_for(lambda: client.get(f"/jobs/{job_id}").json()["status"] == "succeeded")
+        result = client.get(f"/jobs/{job_id}/result").json()
+        assert result["implementation"] == "python"
+        assert result["coefficients"]["E"] == pytest.approx(0.25)
+        assert client.get("/jobs/inconnu").status_code == 404
+    finally:
+        set_job_manager(None)
+
+
+def test_ocaml_tasks_are_not_bound_by_route_timeout(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    from geneweb.adapters.ocaml_bridge import bridge
+
+    timeouts: list[float | None] = []
+
+    def fake_run(cmd: list[str], cwd: Path | None = None, timeout: float | None = bridge.DEFAULT_TIMEOUT) -> str:
+        timeouts.append(timeout)
+        return "ok"
+
+    monkeypatch.delenv("GENEWEB_OCAML_BRIDGE", raising=False)
+    monkeypatch.delenv(jobs.GENEWEB_JOBS_TIMEOUT_ENV, raising=False)
+    monkeypatch.setattr(bridge, "_tool_command", lambda name, args: ([name, *args], tmp_path))
+    monkeypatch.setattr(bridge, "_run", fake_run)
+    params = {"base_dir": str(tmp_path)}
+    assert jobs.task_consang(params, lambda *_: None)["stdout"] == "ok"
+    jobs.task_connex(params, lambda *_: None)
+    monkeypatch.setenv(jobs.GENEWEB_JOBS_TIMEOUT_ENV, "3600")
+    jobs.task_consang(params, lambda *_: None)
+    assert timeouts == [None, None, 3600.0]
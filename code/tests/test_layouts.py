@@ -0,0 +1,59 @@
+"""Tests communs aux dispositions de stockage (fragments, conteneur compressé)."""
+
+from __future__ import annotations
+
+import shutil
+from pathlib import Path
+
+from geneweb.io.gwb import load_gwb_minimal, load_gwb_table
+from geneweb.io.storage import convert_base, storage_kind
+from geneweb.services import gwd_routes
+from geneweb.services.gwd_modify import add_famille, mod_individu
+
+
+def test_layout_loads_like_index(layout: str, bases: tuple[Path, Path]) -> None:
+    json_base, other_base = bases
+    assert storage_kind(other_base) == layout
+    assert not (other_base / "index.json").exists()
+    assert load_gwb_minimal(other_base) == load_gwb_minimal(json_base)
+    assert load_gwb_table(other_base).ids == load_gwb_table(json_base).ids
+
+
+def test_routes_and_writer_match_json(layout: str, bases: tuple[Path, Path]) -> None:
+    json_base, other_base = bases
+    for base in bases:
+        add_famille(base, id="F9999", pere_id="I0", enfants_ids=["I1999"])
+        mod_individu(base, id="I5", nom="Renommé")
+    assert storage_kind(other_base) == layout
+
+    def pages(base: Path) -> list[dict]:
+        b = str(base)
+        return [
+            gwd_routes.get_person_page(b),
+            gwd_routes.get_person_page(b, "I5"),
+            gwd_routes.search_persons(b, "renom"),
+            gwd_routes.search_persons(b, "nom3"),
+            gwd_routes.get_family_page(b, "F9999"),
+            gwd_routes.get_ascendance(b, "I150"),
+            gwd_routes.get_descendance(b, "I0"),
+            gwd_routes.get_notes(b),
+        ]
+
+    assert pages(other_base) == pages(json_base)
+
+
+def test_convert_between_layouts(layout: str, bases: tuple[Path, Path], tmp_path: Path) -> None:
+    json_base, other_base = bases
+    copy = tmp_path / "copy"
+    shutil.copytree(json_base, copy)
+    convert_base(copy, layout, shards=4)
+    assert storage_kind(copy) == layout and not (copy / "index.json").exists()
+    other = "packed" if layout == "sharded" else "sharded"
+    convert_base(copy, other, shards=2)
+    assert storage_kind(copy) == other
+    convert_base(copy, layout, shards=2)
+    assert storage_kind(copy) == layout
+    convert_base(copy, "json")
+    assert storage_kind(copy) == "json"
+    assert sorted(p.name for p in copy.iterdir()) == sorted(p.name for p in json_base.iterdir())
+    assert load_gwb_minimal(copy) == load_gwb_minimal(other_base)
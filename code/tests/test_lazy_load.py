@@ -0,0 +1,87 @@
+"""Tests du chargement paresseux (geneweb.io.lazy)."""
+
+from __future__ import annotations
+
+import copy
+import dataclasses
+import pickle
+from datetime import date
+from pathlib import Path
+
+import pytest
+
+from geneweb.domain.models import Famille, Individu, Sexe, Source
+from geneweb.io.gwb import StringPool, load_gwb_minimal, write_gwb_minimal
+from geneweb.io.lazy import LazyFamille, LazyIndividu
+from geneweb.services import gwd_routes
+
+
+@pytest.fixture
+def base(tmp_path: Path) -> Path:
+    write_gwb_minimal(
+        [
+            Individu(id="I1", nom="Lefèvre", prenom="Jean", sexe=Sexe.M, date_naissance=date(1850, 3, 1)),
+            Individu(id="I2", nom="Martin", prenom="Marie", sexe=Sexe.F, sources=["S1"], note="née à Lyon"),
+            Individu(id="I3", nom="Lefèvre", prenom="Paul", date_deces=date(1920, 1, 2), lieu_deces="Paris"),
+        ],
+        [Famille(id="F1", pere_id="I1", mere_id="I2", enfants_ids=["I3"], note="mariage", sources=["S1"])],
+        tmp_path,
+        sources=[Source(id="S1", titre="Registre")],
+    )
+    return tmp_path
+
+
+def _decoded(obj: object, model: type, name: str) -> bool:
+    try:
+        model.__dict__[name].__get__(obj, model)
+    except AttributeError:
+        return False
+    return True
+
+
+def test_lazy_load_matches_eager(base: Path) -> None:
+    eager = load_gwb_minimal(base, lazy=False)
+    lazy = load_gwb_minimal(base, lazy=True)
+    individus, familles, _ = lazy
+    assert all(type(ind) is LazyIndividu for ind in individus)
+    assert isinstance(familles[0], LazyFamille) and isinstance(familles[0], Famille)
+
+    # Rien n'est décodé avant le premier accès, puis le champ est conservé
+    assert not _decoded(individus[0], Individu, "nom")
+    assert individus[0].nom == "Lefèvre"
+    assert _decoded(individus[0], Individu, "nom") and not _decoded(individus[0], Individu, "date_naissance")
+
+    assert lazy == eager and eager == lazy
+    assert individus[1].sources == ["S1"] and familles[0].enfants_ids == ["I3"]
+    with pytest.raises(ValueError, match="incompatibles"):
+        load_gwb_minimal(base, lazy=True, strings=StringPool())
+
+
+def test_lazy_records_behave_like_models(base: Path) -> None:
+    individus, familles, _ = load_gwb_minimal(base, lazy=True)
+    ind = individus[2]
+    ind.prenom = "Pierre"
+    assert ind.prenom == "Pierre"
+    assert dataclasses.asdict(ind)["lieu_deces"] == "Paris"
+    assert dataclasses.replace(ind, nom="X").nom == "X"
+    assert pickle.loads(pickle.dumps(individus[0])) == individus[0]
+    assert copy.deepcopy(familles[0]) == familles[0]
+    assert individus[0] != individus[1]
+
+
+def test_routes_with_lazy_env(base: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    b = str(base)
+
+    def pages() -> list[dict]:
+        return [
+            gwd_routes.get_person_page(b, "I1"),
+            gwd_routes.search_persons(b),
+            gwd_routes.get_family_page(b, "F1"),
+            gwd_routes.get_ascendance(b, "I3"),
+            gwd_routes.get_notes(b),
+        ]
+
+    eager = pages()
+    monkeypatch.setenv("GENEWEB_LAZY_LOAD", "1")
+    assert type(load_gwb_minimal(base)[0][0]) is LazyIndividu
+    assert pages() == eager
@@ -0,0 +1,199 @@
+"""Tests de la lecture des bases GeneWeb natives (geneweb.io.native).
+
+Les bases sont construites ici au format `base`/`base.acc` (sérialisation OCaml
+`Iovalue`), faute de base compilée par `gwc` dans le dépôt.
+"""
+
+from __future__ import annotations
+
+import struct
+from dataclasses import replace
+from datetime import date
+from pathlib import Path
+
+import pytest
+
+from geneweb.domain.models import Sexe
+from geneweb.io.gwb import load_gwb_minimal
+from geneweb.io.native import MAGIC, NativeBase
+from geneweb.io.revision import read_revision
+from geneweb.io.storage import NativeStorage, convert_base, storage_kind
+from geneweb.services import gwd_routes
+from geneweb.services.gwd_modify import mod_individu
+from geneweb.services.gwd_wiznotes import set_wiznote
+
+
+class B:
+    """Bloc OCaml à sérialiser."""
+
+    def __init__(self, tag: int, *fields: object) -> None:
+        self.tag, self.fields = tag, fields
+
+
+def _ocaml(value: object) -> bytes:
+    if isinstance(value, int):
+        if 0 <= value < 0x40:
+            return bytes([0x40 | value])
+        return b"\x02" + struct.pack(">i", value)
+    if isinstance(value, str):
+        data = value.encode("utf-8")
+        head = bytes([0x20 | len(data)]) if len(data) < 0x20 else b"\x0a" + struct.pack(">I", len(data))
+        return head + data
+    if isinstance(value, B):
+        size = len(value.fields)
+        if value.tag < 16 and size < 8:
+            head = bytes([0x80 | value.tag | size << 4])
+        else:
+            head = b"\x08" + struct.pack(">I", size << 10 | value.tag)
+        return head + b"".join(_ocaml(field) for field in value.fields)
+    raise TypeError(value)
+
+
+def _gregorian(d: date, precision: int = 0) -> B:
+    return B(0, ((precision * 32 + d.day) * 13 + d.month) * 2500 + d.year)
+
+
+def _person(first: int, surname: int, sex: int, birth: object = 0, birth_place: int = 0, death: object = 0, notes: int = 0) -> B:
+    fields: list[object] = [0] * 35
+    fields[0], fields[1], fields[13] = first, surname, sex
+    fields[15], fields[16], fields[23], fields[32] = birth, birth_place, death, notes
+    return B(0, *fields)
+
+
+def _family(comment: int = 0, index: int = 0) -> B:
+    fields: list[object] = [0] * 12
+    fields[8], fields[11] = comment, index
+    return B(0, *fields)
+
+
+STRINGS = ["", "?", "Jean", "Dupont", "Marie", "Martin", "Paul", "Paris", "Lyon", "mariés à Lyon", "Anne"]
+
+
+def _write_base(root: Path) -> None:
+    persons = [
+        _person(2, 3, 0, birth=_gregorian(date(1850, 3, 4)), birth_place=7, death=B(0, 0, _gregorian(date(1910, 1, 2)))),
+        _person(4, 5, 1, birth=_gregorian(date(1855, 1, 1), precision=1), notes=8),
+        _person(6, 3, 0, birth=B(5, B(0, B(0, 2, 5, 1880, 0, 0), 0))),
+        _person(10, 3, 2, death=1),
+    ]
+    ascends = [B(0, 0, 0), B(0, 0, 0), B(0, B(0, 0), 0), B(0, B(0, 0), 0)]
+    unions = [B(0, B(0, 0)), B(0, B(0, 0)), B(0, B(0)), B(0, B(0))]
+    families = [_family(comment=9), _family(index=-1)]
+    couples = [B(0, 0, 1), B(0, 0, 0)]
+    descends = [B(0, B(0, 3, 2)), B(0, B(0))]
+
+    arrays = [persons, ascends, unions, families, couples, descends, STRINGS]
+    header = MAGIC + struct.pack(">3i", len(persons), len(families), len(STRINGS))
+    body, access = bytearray(header + bytes(28)), bytearray()
+    starts = []
+    for array in arrays:
+        starts.append(len(body))
+        for item in array:
+            access += struct.pack(">i", len(body))
+            body += _ocaml(item)
+    body[len(header):len(header) + 28] = struct.pack(">7i", *starts)
+    root.mkdir(parents=True, exist_ok=True)
+    (root / "base").write_bytes(bytes(body))
+    (root / "base.acc").write_bytes(bytes(access))
+
+
+@pytest.fixture
+def base(tmp_path: Path) -> Path:
+    _write_base(tmp_path / "test.gwb")
+    return tmp_path / "test.gwb"
+
+
+def test_lazy_collections(base: Path) -> None:
+    with NativeBase(base) as native:
+        assert len(native.persons) == 4 and len(native.families) == 2
+        assert native.strings[3] == "Dupont" and native.strings[-1] == "Anne"
+        jean, marie, paul, anne = native.persons
+        assert (jean.prenom, jean.nom, jean.sexe) == ("Jean", "Dupont", Sexe.M)
+        assert jean.date_naissance == date(1850, 3, 4) and jean.lieu_naissance == "Paris"
+        assert jean.date_deces == date(1910, 1, 2) and jean.famille_adultes == ["F0"]
+        # Date approximative: pas d'équivalent dans le modèle
+        assert marie.date_naissance is None and marie.note == "Lyon"
+        assert paul.date_naissance == date(1880, 5, 2) and paul.famille_enfance_id == "F0"
+        assert anne.sexe == Sexe.X and anne.date_deces is None
+        family = native.families[0]
+        assert (family.pere_id, family.mere_id, family.enfants_ids) == ("I0", "I1", ["I3", "I2"])
+        assert family.note == "mariés à Lyon"
+        assert native.family_deleted(1)
+
+
+def test_storage_and_routes(base: Path) -> None:
+    assert storage_kind(base) == "native"
+    with NativeStorage(base) as storage:
+        assert storage.counts() == (4, 1, 0)
+        assert [ind.id for ind in storage.family_children(storage.get_family("F0"))] == ["I2", "I3"]
+        assert storage.parent_family("I2").id == "F0"
+        assert [fam.id for fam in storage.families_as_parent("I1")] == ["F0"]
+        assert storage.get_family("F1") is None and storage.get_person("X1") is None
+
+    individus, familles, _ = load_gwb_minimal(base)
+    assert [ind.id for ind in individus] == ["I0", "I1", "I2", "I3"] and [fam.id for fam in familles] == ["F0"]
+    page = gwd_routes.get_person_page(str(base), "I2")
+    assert page["person"]["prenom"] == "Paul"
+    assert [p["id"] for p in gwd_routes.search_persons(str(base), "dupont")["results"]] == ["I0", "I2", "I3"]
+    assert gwd_routes.get_descendance(str(base), "I0")
+
+
+def test_read_only_and_conversion(base: Path, tmp_path: Path) -> None:
+    with pytest.raises(ValueError, match="lecture seule"):
+        mod_individu(base, id="I0", nom="Durand")
+    with pytest.raises(ValueError, match="native"):
+        convert_base(base, "native", tmp_path / "copy")
+    converted = convert_base(base, "json", tmp_path / "json")
+    # Liens parent/famille redérivés des familles côté JSON
+    native = [replace(ind, famille_enfance_id=None, famille_adultes=()) for ind in load_gwb_minimal(base)[0]]
+    assert load_gwb_minimal(converted)[0] == native
+    assert load_gwb_minimal(converted)[1] == load_gwb_minimal(base)[1]
+
+
+def test_convert_in_place_keeps_new_index(base: Path) -> None:
+    (base / "names.inx").write_bytes(b"")
+    (base / "notes").write_text("notes de la base", encoding="utf-8")
+    expected = load_gwb_minimal(convert_base(base, "json", base.parent / "copy"))
+    convert_base(base, "json")
+    # Fichiers de données natifs supprimés, nouvel index et notes conservés
+    assert storage_kind(base) == "json"
+    assert sorted(p.name for p in base.iterdir()) == [".revision", "index.json", "notes"]
+    assert load_gwb_minimal(base) == expected
+    assert gwd_routes.get_person_page(str(base), "I2")["person"]["prenom"] == "Paul"
+
+
+def test_deleted_families_counted_once_per_version(base: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    with NativeStorage(base) as storage:
+        assert storage.counts() == (4, 1, 0)
+    calls: list[int] = []
+    real = NativeBase.family_deleted
+
+    def family_deleted(self: NativeBase, ifam: int) -> bool:
+        calls.append(ifam)
+        return real(self, ifam)
+
+    monkeypatch.setattr(NativeBase, "family_deleted", family_deleted)
+    for _ in range(3):
+        with NativeStorage(base) as storage:
+            assert storage.counts() == (4, 1, 0)
+    assert calls == []
+
+
+def test_unsupported_bases(base: Path) -> None:
+    (base / "patches").write_bytes(b"")
+    with pytest.raises(ValueError, match="patches"):
+        NativeBase(base)
+    (base / "patches").unlink()
+    (base / "base").write_bytes(b"GnWb0020" + (base / "base").read_bytes()[8:])
+    with pytest.raises(ValueError, match="GnWb0020"):
+        NativeBase(base)
+
+
+def test_revision_tracks_native_files(base: Path) -> None:
+    set_wiznote(base, "IND:I0", "note")
+    before = read_revision(base).token
+    assert read_revision(base).token == before
+    # Base recompilée hors de Python: `.revision` inchangé, jeton renouvelé
+    data = (base / "base").read_bytes()
+    (base / "base").write_bytes(data + b"\0")
+    assert read_revision(base).token != before
@@ -0,0 +1,159 @@
+"""Tests du bridge OCaml asynchrone (exécutables simulés par des scripts shell)."""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import stat
+import time
+from pathlib import Path
+
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+
+from geneweb.adapters.http.app import _unless_disconnected, app
+from geneweb.adapters.ocaml_bridge.async_bridge import arun_tool, astream_tool
+from geneweb.adapters.ocaml_bridge.bridge import OcamlCommandError
+
+pytestmark = pytest.mark.skipif(os.name != "posix", reason="scripts shell POSIX")
+
+
+@pytest.fixture
+def fake_root(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    root = tmp_path / "geneweb"
+    root.mkdir()
+    monkeypatch.setenv("GENEWEB_OCAML_ROOT", str(root))
+    monkeypatch.delenv("GENEWEB_OCAML_BRIDGE", raising=False)
+    monkeypatch.setenv("GENEWEB_BRIDGE_CACHE_DIR", str(tmp_path / "cache"))
+    return root
+
+
+def _tool(root: Path, name: str, script: str) -> None:
+    exe = root / "_build" / "default" / "bin" / name / f"{name}.exe"
+    exe.parent.mkdir(parents=True, exist_ok=True)
+    exe.write_text("#!/bin/sh\n" + script, encoding="utf-8")
+    exe.chmod(exe.stat().st_mode | stat.S_IXUSR)
+
+
+def test_arun_tool_returns_stdout(fake_root: Path) -> None:
+    _tool(fake_root, "consang", 'echo "base: $1"\necho "é"\n')
+    assert asyncio.run(arun_tool("consang", ["demo"])) == "base: demo\né\n"
+
+
+def test_arun_tool_raises_on_failure(fake_root: Path) -> None:
+    _tool(fake_root, "consang", 'echo partial\necho boom >&2\nexit 3\n')
+    with pytest.raises(OcamlCommandError) as exc:
+        asyncio.run(arun_tool("consang", []))
+    assert exc.value.returncode == 3
+    assert exc.value.stdout == "partial\n"
+    assert "boom" in exc.value.stderr
+
+
+def test_astream_tool_yields_before_exit(fake_root: Path) -> None:
+    _tool(fake_root, "connex", "echo first\nsleep 1\necho second\n")
+
+    async def scenario() -> tuple[str, float, list[str]]:
+        start = time.monotonic()
+        stream = astream_tool("connex", [])
+        first = await anext(stream)
+        first_at = time.monotonic() - start
+        rest = [chunk async for chunk in stream]
+        return first, first_at, rest
+
+    first, first_at, rest = asyncio.run(scenario())
+    assert first == "first\n"
+    assert first_at < 0.9
+    assert "".join(rest) == "second\n"
+
+
+def test_semaphore_limits_instances_per_binary(
+    fake_root: Path, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setenv("GENEWEB_OCAML_CONCURRENCY", "1")
+    log = tmp_path / "log"
+    _tool(fake_root, "consang", f'echo start >> {log}\nsleep 0.2\necho end >> {log}\n')
+
+    async def scenario() -> None:
+        await asyncio.gather(*(arun_tool("consang", []) for _ in range(3)))
+
+    asyncio.run(scenario())
+    assert log.read_text().split() == ["start", "end"] * 3
+
+
+def test_timeout_kills_process(fake_root: Path) -> None:
+    _tool(fake_root, "consang", "exec sleep 30\n")
+    start = time.monotonic()
+    with pytest.raises(TimeoutError):
+        asyncio.run(arun_tool("consang", [], timeout=0.2))
+    assert time.monotonic() - start < 5
+
+
+def test_cancellation_kills_process(fake_root: Path, tmp_path: Path) -> None:
+    pid_file = tmp_path / "pid"
+    _tool(fake_root, "consang", f"echo $$ > {pid_file}\nexec sleep 30\n")
+
+    async def scenario() -> int:
+        task = asyncio.ensure_future(arun_tool("consang", []))
+        while not pid_file.exists() or not pid_file.read_text().strip():
+            await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        return int(pid_file.read_text())
+
+    pid = asyncio.run(scenario())
+    with pytest.raises(ProcessLookupError):
+        os.kill(pid, 0)
+
+
+class _DisconnectingRequest:
+    def __init__(self, after: float) -> None:
+        self.after = after
+
+    async def receive(self) -> dict[str, str]:
+        await asyncio.sleep(self.after)
+        return {"type": "http.disconnect"}
+
+
+def test_unless_disconnected_cancels_work() -> None:
+    cancelled = asyncio.Event()
+
+    async def slow() -> str:
+        try:
+            await asyncio.sleep(30)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+        return "never"
+
+    async def scenario() -> None:
+        with pytest.raises(HTTPException) as exc:
+            await _unless_disconnected(_DisconnectingRequest(0.05), slow())  # type: ignore[arg-type]
+        assert exc.value.status_code == 499
+        assert cancelled.is_set()
+        assert await _unless_disconnected(_DisconnectingRequest(5), asyncio.sleep(0, "ok")) == "ok"  # type: ignore[arg-type]
+
+    asyncio.run(scenario())
+
+
+def test_http_consang_awaits_bridge(fake_root: Path) -> None:
+    base = fake_root / "distribution" / "bases" / "demo"
+    base.mkdir(parents=True)
+    _tool(fake_root, "consang", 'echo "consang $1"\n')
+    client = TestClient(app)
+
+    response = client.get("/analytical/consang", params={"base_dir": str(base)})
+    assert response.status_code == 200
+    assert response.json() == {"status": "ok", "implementation": "ocaml", "stdout": f"consang {base}\n"}
+
+    response = client.get("/analytical/consang", params={"base_dir": str(base), "stream": True})
+    assert response.status_code == 200
+    assert response.text == f"consang {base}\n"
+
+
+def test_http_missing_tool_is_reported(fake_root: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("PATH", "")
+    client = TestClient(app)
+    response = client.get("/analytical/connex", params={"base_dir": str(fake_root), "stream": True})
+    assert response.status_code == 404
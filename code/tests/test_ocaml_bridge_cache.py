@@ -0,0 +1,185 @@
+"""Tests du cache de résultats du bridge OCaml (révision de base, LRU, single-flight)."""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import stat
+import threading
+import time
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+from geneweb.adapters.http.app import app
+from geneweb.adapters.ocaml_bridge.cache import OUTPUT, ResultCache, arun_cached, normalize_args
+from geneweb.infra.singleflight import AsyncSingleFlight, SingleFlight
+from geneweb.io.revision import base_fingerprint
+
+pytestmark = pytest.mark.skipif(os.name != "posix", reason="scripts shell POSIX")
+
+
+@pytest.fixture
+def fake_root(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    root = tmp_path / "geneweb"
+    root.mkdir()
+    monkeypatch.setenv("GENEWEB_OCAML_ROOT", str(root))
+    monkeypatch.delenv("GENEWEB_OCAML_BRIDGE", raising=False)
+    monkeypatch.delenv("GENEWEB_BRIDGE_CACHE", raising=False)
+    monkeypatch.setenv("GENEWEB_BRIDGE_CACHE_DIR", str(tmp_path / "cache"))
+    return root
+
+
+@pytest.fixture
+def base(tmp_path: Path) -> Path:
+    base = tmp_path / "bases" / "demo"
+    base.mkdir(parents=True)
+    (base / "index.json").write_text("[]", encoding="utf-8")
+    return base
+
+
+def _tool(root: Path, name: str, script: str) -> None:
+    exe = root / "_build" / "default" / "bin" / name / f"{name}.exe"
+    exe.parent.mkdir(parents=True, exist_ok=True)
+    exe.write_text("#!/bin/sh\n" + script, encoding="utf-8")
+    exe.chmod(exe.stat().st_mode | stat.S_IXUSR)
+
+
+def _runs(log: Path) -> int:
+    return len(log.read_text().splitlines()) if log.exists() else 0
+
+
+def test_base_fingerprint_tracks_file_changes(base: Path) -> None:
+    first = base_fingerprint(base)
+    assert base_fingerprint(base) == first
+    (base / "index.json").write_text('[{"id": "I1"}]', encoding="utf-8")
+    assert base_fingerprint(base) != first
+    with pytest.raises(FileNotFoundError):
+        base_fingerprint(base / "absent")
+
+
+def test_normalize_args_resolves_paths(base: Path) -> None:
+    rel = os.path.relpath(base)
+    assert normalize_args([rel, "-o", OUTPUT]) == [str(base.resolve()), "-o", OUTPUT]
+
+
+def test_result_cache_evicts_least_recently_used(tmp_path: Path) -> None:
+    cache = ResultCache(tmp_path / "c", max_bytes=10)
+    cache.put("a", "aaaa")
+    time.sleep(0.01)
+    cache.put("b", "bbbb")
+    time.sleep(0.01)
+    assert cache.get("a") == "aaaa"  # "a" redevient la plus récente
+    time.sleep(0.01)
+    cache.put("c", "cccc")
+    assert cache.get("b") is None
+    assert cache.get("a") == "aaaa"
+    assert cache.get("c") == "cccc"
+    assert cache.size_bytes() <= 10
+
+
+def test_singleflight_shares_concurrent_calls() -> None:
+    flight: SingleFlight[int] = SingleFlight()
+    calls: list[int] = []
+    gate = threading.Event()
+
+    def work() -> int:
+        calls.append(1)
+        gate.wait(2)
+        return 42
+
+    results: list[int] = []
+    threads = [threading.Thread(target=lambda: results.append(flight.do("k", work))) for _ in range(4)]
+    for t in threads:
+        t.start()
+    time.sleep(0.1)
+    gate.set()
+    for t in threads:
+        t.join()
+    assert results == [42] * 4
+    assert len(calls) == 1
+
+
+def test_async_singleflight_survives_one_cancelled_waiter() -> None:
+    flight: AsyncSingleFlight[str] = AsyncSingleFlight()
+    calls: list[int] = []
+
+    async def work() -> str:
+        calls.append(1)
+        await asyncio.sleep(0.1)
+        return "done"
+
+    async def scenario() -> None:
+        first = asyncio.ensure_future(flight.do("k", work))
+        second = asyncio.ensure_future(flight.do("k", work))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        assert await second == "done"
+        assert first.cancelled()
+        assert flight.in_flight() == 0
+
+        alone = asyncio.ensure_future(flight.do("k", work))
+        await asyncio.sleep(0.01)
+        alone.cancel()
+        await asyncio.sleep(0)
+        assert await flight.do("k", work) == "done"
+
+    asyncio.run(scenario())
+    assert len(calls) == 3
+
+
+def test_arun_cached_reuses_result_until_base_changes(fake_root: Path, base: Path, tmp_path: Path) -> None:
+    log = tmp_path / "runs"
+    _tool(fake_root, "consang", f'echo run >> {log}\nsleep 0.2\necho "result $1"\n')
+
+    async def three_at_once() -> list[str]:
+        return list(await asyncio.gather(*(arun_cached("consang", [str(base)], base) for _ in range(3))))
+
+    assert asyncio.run(three_at_once()) == [f"result {base}\n"] * 3
+    assert _runs(log) == 1
+    assert asyncio.run(arun_cached("consang", [str(base)], base)) == f"result {base}\n"
+    assert _runs(log) == 1
+
+    (base / "index.json").write_text('[{"id": "I1"}]', encoding="utf-8")
+    asyncio.run(arun_cached("consang", [str(base)], base))
+    assert _runs(log) == 2
+
+
+def test_arun_cached_can_be_disabled(
+    fake_root: Path, base: Path, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setenv("GENEWEB_BRIDGE_CACHE", "0")
+    log = tmp_path / "runs"
+    _tool(fake_root, "connex", f"echo run >> {log}\necho ok\n")
+    for _ in range(2):
+        assert asyncio.run(arun_cached("connex", [str(base)], base)) == "ok\n"
+    assert _runs(log) == 2
+
+
+def test_http_gwb2ged_served_from_cache(fake_root: Path, base: Path, tmp_path: Path) -> None:
+    log = tmp_path / "runs"
+    _tool(fake_root, "gwb2ged", f'echo run >> {log}\necho "0 HEAD" > "$3"\n')
+    client = TestClient(app)
+    for _ in range(2):
+        response = client.get("/export/gwb2ged", params={"input_dir": str(base)})
+        assert response.status_code == 200
+        assert response.json() == {"stdout": "0 HEAD\n"}
+    assert _runs(log) == 1
+
+
+def test_arun_cached_output_survives_leader_cancellation(fake_root: Path, base: Path, tmp_path: Path) -> None:
+    outputs = tmp_path / "outputs"
+    _tool(fake_root, "gwb2ged", f'echo "$3" >> {outputs}\nsleep 0.3\necho "0 HEAD" > "$3"\n')
+
+    async def scenario() -> str:
+        leader = asyncio.ensure_future(arun_cached("gwb2ged", [str(base), "-o", OUTPUT], base, ".ged"))
+        follower = asyncio.ensure_future(arun_cached("gwb2ged", [str(base), "-o", OUTPUT], base, ".ged"))
+        await asyncio.sleep(0.1)
+        leader.cancel()
+        return await follower
+
+    assert asyncio.run(scenario()) == "0 HEAD\n"
+    # Un seul fichier de sortie, propre au calcul partagé et supprimé à la fin
+    (written,) = outputs.read_text().splitlines()
+    assert written.endswith(".ged") and not Path(written).exists()
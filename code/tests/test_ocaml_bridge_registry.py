@@ -0,0 +1,119 @@
+"""Tests du registre des exécutables OCaml (résolution unique, échauffement, santé)."""
+
+from __future__ import annotations
+
+import os
+import stat
+from collections.abc import Iterator
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+from geneweb.adapters.http.app import app
+from geneweb.adapters.ocaml_bridge.bridge import _tool_command
+from geneweb.adapters.ocaml_bridge.registry import (
+    TOOLS,
+    BridgeRegistry,
+    get_registry,
+    reset_registry,
+)
+
+pytestmark = pytest.mark.skipif(os.name != "posix", reason="scripts shell POSIX")
+
+
+@pytest.fixture
+def fake_root(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Iterator[Path]:
+    root = tmp_path / "geneweb"
+    root.mkdir()
+    monkeypatch.setenv("GENEWEB_OCAML_ROOT", str(root))
+    monkeypatch.delenv("GENEWEB_OCAML_BUILD", raising=False)
+    reset_registry()
+    yield root
+    reset_registry()
+
+
+def _script(path: Path, body: str) -> Path:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text("#!/bin/sh\n" + body, encoding="utf-8")
+    path.chmod(path.stat().st_mode | stat.S_IXUSR)
+    return path
+
+
+def _tool(root: Path, name: str) -> Path:
+    return _script(root / "_build" / "default" / "bin" / name / f"{name}.exe", "echo ok\n")
+
+
+def test_resolution_is_done_once(fake_root: Path) -> None:
+    exe = _tool(fake_root, "consang")
+    cmd, cwd = _tool_command("consang", ["base"])
+    assert cmd == [str(exe), "base"]
+    assert cwd == fake_root
+
+    # Plus aucun accès disque par la suite: le chemin mémorisé est réutilisé
+    exe.unlink()
+    assert _tool_command("consang", [])[0] == [str(exe)]
+    reset_registry()
+    with pytest.raises(FileNotFoundError, match="consang introuvable"):
+        _tool_command("consang", [])
+
+
+def test_distribution_layout_and_non_executable(fake_root: Path) -> None:
+    dist = _script(fake_root / "distribution" / "gw" / "connex", "echo ok\n")
+    assert get_registry().path("connex") == dist
+
+    plain = fake_root / "_build" / "default" / "bin" / "gwd" / "gwd.exe"
+    plain.parent.mkdir(parents=True)
+    plain.write_text("", encoding="utf-8")
+    plain.chmod(0o644)
+    with pytest.raises(FileNotFoundError, match="n'est pas exécutable"):
+        get_registry().path("gwd")
+
+
+def test_missing_tool_never_triggers_dune_at_request_time(
+    fake_root: Path, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    log = tmp_path / "dune.log"
+    bindir = tmp_path / "fakebin"
+    exe = fake_root / "_build" / "default" / "bin" / "gwb2ged" / "gwb2ged.exe"
+    _script(
+        bindir / "dune",
+        f'echo "$@" >> {log}\nmkdir -p {exe.parent}\nprintf "#!/bin/sh\\necho ok\\n" > {exe}\nchmod +x {exe}\n',
+    )
+    monkeypatch.setenv("PATH", f"{bindir}{os.pathsep}{os.environ.get('PATH', '')}")
+
+    with pytest.raises(FileNotFoundError):
+        _tool_command("gwb2ged", [])
+    assert not log.exists()
+
+    infos = BridgeRegistry(fake_root, tools=("gwb2ged",)).warm_up(build=True)
+    assert "build bin/gwb2ged/gwb2ged.exe" in log.read_text()
+    assert infos["gwb2ged"].ok
+
+
+def test_warm_up_records_version_and_build_id(fake_root: Path) -> None:
+    (fake_root / "lib").mkdir()
+    (fake_root / "lib" / "version.txt").write_text('let ver = "7.1-beta"\nlet src = ""\n', encoding="utf-8")
+    for name in TOOLS:
+        _tool(fake_root, name)
+    infos = BridgeRegistry(fake_root).warm_up()
+    assert {info.version for info in infos.values()} == {"7.1-beta"}
+    assert all(info.build_id and info.size for info in infos.values())
+
+
+def test_health_endpoint(fake_root: Path) -> None:
+    client = TestClient(app)
+    _tool(fake_root, "consang")
+    response = client.get("/healthz/bridge")
+    assert response.status_code == 503
+    body = response.json()
+    assert body["status"] == "degraded"
+    assert body["tools"]["consang"]["ok"] is True
+    assert body["tools"]["gwd"]["ok"] is False
+
+    for name in TOOLS:
+        _tool(fake_root, name)
+    assert client.get("/healthz/bridge").status_code == 503  # résolution mémorisée
+    response = client.get("/healthz/bridge", params={"refresh": True})
+    assert response.status_code == 200
+    assert response.json()["status"] == "ok"
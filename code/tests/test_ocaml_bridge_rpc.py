@@ -0,0 +1,175 @@
+"""Tests du pool de workers RPC du bridge OCaml (serveur JSON-RPC simulé)."""
+
+from __future__ import annotations
+
+import json
+import threading
+import time
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+pytest.importorskip("websockets")
+from websockets.sync.server import serve
+
+from geneweb.adapters.ocaml_bridge import bridge
+from geneweb.adapters.ocaml_bridge.rpc import (
+    METHOD_NOT_FOUND,
+    RpcConnection,
+    RpcError,
+    RpcRejected,
+    RpcUnavailable,
+    RpcWorker,
+    RpcWorkerPool,
+    reset_rpc_pool,
+)
+
+
+def _handler(ws) -> None:  # type: ignore[no-untyped-def]
+    # Comme rpc/server/route.ml: un seul service, chemin inconnu -> erreur sans id
+    path = ws.request.path
+    lock = threading.Lock()
+
+    def reply(req: dict) -> None:
+        if path != "/pingpong":
+            resp = {"jsonrpc": "2.0", "id": None, "error": {"code": -32600, "message": "Invalid Request"}}
+        elif req["method"] == "ping":
+            resp = {"jsonrpc": "2.0", "id": req["id"], "result": "pong"}
+        elif req["method"] == "sleep_echo":
+            delay, value = req["params"]
+            time.sleep(float(delay))
+            resp = {"jsonrpc": "2.0", "id": req["id"], "result": {"stdout": value}}
+        else:
+            resp = {
+                "jsonrpc": "2.0",
+                "id": req["id"],
+                "error": {"code": -32601, "message": "Method not found"},
+            }
+        with lock:
+            ws.send(json.dumps(resp))
+
+    for raw in ws:
+        threading.Thread(target=reply, args=(json.loads(raw),), daemon=True).start()
+
+
+@pytest.fixture
+def rpc_url() -> Iterator[str]:
+    server = serve(_handler, "127.0.0.1", 0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    port = server.socket.getsockname()[1]
+    yield f"ws://127.0.0.1:{port}"
+    server.shutdown()
+
+
+def test_connection_multiplexes_out_of_order_responses(rpc_url: str) -> None:
+    conn = RpcConnection(rpc_url + "/pingpong")
+    try:
+        with ThreadPoolExecutor(max_workers=3) as ex:
+            slow = ex.submit(conn.call, "sleep_echo", [0.3, "slow"])
+            fast = ex.submit(conn.call, "sleep_echo", [0.0, "fast"])
+            assert fast.result(timeout=5) == {"stdout": "fast"}
+            assert not slow.done()
+            assert slow.result(timeout=5) == {"stdout": "slow"}
+    finally:
+        conn.close()
+
+
+def test_connection_raises_rpc_errors(rpc_url: str) -> None:
+    conn = RpcConnection(rpc_url + "/pingpong")
+    try:
+        with pytest.raises(RpcError) as exc:
+            conn.call("unknown")
+        assert exc.value.code == METHOD_NOT_FOUND
+    finally:
+        conn.close()
+
+
+def test_pool_health_and_dispatch(rpc_url: str) -> None:
+    pool = RpcWorkerPool([RpcWorker(url=rpc_url), RpcWorker(url="ws://127.0.0.1:1")], health_interval=0)
+    pool.start()
+    try:
+        health = pool.health()
+        assert [h["healthy"] for h in health] == [True, False]
+        assert pool.call("sleep_echo", [0.0, "ok"]) == {"stdout": "ok"}
+    finally:
+        pool.close()
+
+
+def test_pool_keeps_worker_on_rejected_path(rpc_url: str) -> None:
+    pool = RpcWorkerPool([RpcWorker(url=rpc_url)], command_path="/bridge", health_interval=0)
+    pool.start()
+    try:
+        with pytest.raises(RpcRejected):
+            pool.call("consang", ["base"], timeout=5)
+        # Le worker répond au ping: il reste dans le pool (pas de va-et-vient)
+        assert [h["healthy"] for h in pool.health()] == [True]
+    finally:
+        pool.close()
+
+
+def test_pool_default_path_reports_unknown_commands(rpc_url: str) -> None:
+    pool = RpcWorkerPool([RpcWorker(url=rpc_url)], health_interval=0)
+    pool.start()
+    try:
+        with pytest.raises(RpcError) as exc:
+            pool.call("consang", ["base"], timeout=5)
+        assert exc.value.code == METHOD_NOT_FOUND
+        assert [h["healthy"] for h in pool.health()] == [True]
+    finally:
+        pool.close()
+
+
+def test_pool_remembers_unsupported_methods(rpc_url: str) -> None:
+    pool = RpcWorkerPool([RpcWorker(url=rpc_url)], health_interval=0)
+    pool.start()
+    sent: list[str] = []
+    worker = pool.workers[0]
+    real_call = worker.call
+
+    def counting_call(path: str, method: str, *args: object) -> object:
+        sent.append(method)
+        return real_call(path, method, *args)  # type: ignore[arg-type]
+
+    worker.call = counting_call  # type: ignore[method-assign]
+    try:
+        for _ in range(3):
+            with pytest.raises(RpcError) as exc:
+                pool.call("consang", ["base"], timeout=5)
+            assert exc.value.code == METHOD_NOT_FOUND
+        assert not pool.supports("consang")
+        assert pool.call("sleep_echo", [0.0, "ok"]) == {"stdout": "ok"}
+        # Un seul aller-retour pour la méthode refusée
+        assert sent == ["consang", "sleep_echo"]
+    finally:
+        pool.close()
+
+
+def test_pool_without_healthy_worker_is_unavailable() -> None:
+    pool = RpcWorkerPool([RpcWorker(url="ws://127.0.0.1:1")], health_interval=0)
+    pool.start()
+    with pytest.raises(RpcUnavailable):
+        pool.call("consang", ["base"])
+
+
+def test_bridge_rpc_mode_uses_pool(rpc_url: str, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("GENEWEB_OCAML_BRIDGE", "rpc")
+    monkeypatch.setenv("GENEWEB_RPC_URLS", rpc_url)
+    reset_rpc_pool()
+    try:
+        assert bridge._run_via_rpc("sleep_echo", ["0", "via rpc"]) == "via rpc"
+        # Méthode inconnue du serveur RPC -> repli subprocess
+        assert bridge._run_via_rpc("consang", ["base"]) is None
+    finally:
+        reset_rpc_pool()
+
+
+def test_bridge_falls_back_to_subprocess_when_rpc_unavailable(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("GENEWEB_OCAML_BRIDGE", "rpc")
+    monkeypatch.setenv("GENEWEB_RPC_URLS", "ws://127.0.0.1:1")
+    reset_rpc_pool()
+    try:
+        assert bridge._run_via_rpc("consang", ["base"]) is None
+    finally:
+        reset_rpc_pool()
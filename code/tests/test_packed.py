@@ -0,0 +1,60 @@
+"""Tests du conteneur compressé des bases GWB (geneweb.io.packed)."""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from geneweb.io.packed import PACKED_FILE, PackedReader, write_packed
+from geneweb.io.storage import PackedStorage
+
+# Bases de `conftest.bases` dans la seule disposition compressée
+packed_only = pytest.mark.parametrize("layout", ["packed"])
+
+
+@packed_only
+def test_packed_is_compact(bases: tuple[Path, Path]) -> None:
+    json_base, packed_base = bases
+    packed_size = (packed_base / PACKED_FILE).stat().st_size
+    assert packed_size * 5 < (json_base / "index.json").stat().st_size
+
+
+@packed_only
+def test_point_queries_decompress_one_block(bases: tuple[Path, Path]) -> None:
+    _, packed_base = bases
+    with PackedStorage(packed_base) as storage:
+        person = storage.get_person("I1500")
+        assert person is not None and person.prenom == "Prénom1500"
+        assert storage.reader.blocks_read == 1
+        parents = storage.parent_family("I10")
+        assert parents is not None and parents.id == "F8"
+        assert [fam.id for fam in storage.families_as_parent("I10")] == ["F10"]
+        assert storage.get_person("I404404") is None
+        assert storage.counts() == (2000, 999, 1)
+
+
+def test_scan_with_readahead(tmp_path: Path) -> None:
+    records = [{"id": f"I{k}", "nom": "N"} for k in range(100)]
+    write_packed(tmp_path, {"individus": records}, block_size=7)
+    with PackedReader(tmp_path) as reader:
+        assert len(reader.blocks["individus"]) == 15
+        assert list(reader.scan("individus", readahead=3)) == records
+        assert list(reader.scan("individus", readahead=0)) == records
+        assert reader.find("individus", "I50") == {"id": "I50", "nom": "N"}
+
+
+def test_id_tables_span_blocks(tmp_path: Path) -> None:
+    records = [{"id": f"I{k % 40}", "nom": str(k)} for k in range(100)]
+    familles = [{"id": "F1", "pere_id": "I3", "enfants_ids": ["I3", "I5"]}, {"id": "F2", "mere_id": "I3"}]
+    write_packed(tmp_path, {"individus": records, "familles": familles}, block_size=4)
+    with PackedReader(tmp_path) as reader:
+        # Occurrences à cheval sur deux blocs de table, dans l'ordre de la base
+        assert reader.positions("individus", "I1") == [1, 41, 81]
+        assert reader.positions("individus", "I0") == [0, 40, 80]
+        assert reader.positions("individus", "I40") == []
+        assert reader.positions("individus", "") == []
+        assert reader.links("I3") == [0, 1]
+        assert reader.links("I5") == [0]
+        assert reader.counts == {"individus": 100, "familles": 2, "sources": 0}
+        assert reader.blocks_read == 0
@@ -0,0 +1,117 @@
+"""Tests du décodage parallèle des bases GWB (geneweb.io.parallel)."""
+
+from __future__ import annotations
+
+import json
+from datetime import date
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from geneweb.domain.models import Famille, Individu, Sexe, Source
+from geneweb.io import parallel
+from geneweb.io.gwb import StringPool, load_gwb_minimal, parse_gwb_data, write_gwb_minimal
+from geneweb.io.parallel import decode_chunk, load_index_parallel, load_workers
+
+
+def _data(n: int = 60) -> tuple[list[Individu], list[Famille], list[Source]]:
+    individus = [
+        Individu(
+            id=f"I{k}",
+            nom=f"Nom{k % 5}",
+            prenom=f"Prénom{k}" if k % 4 else None,
+            sexe=(Sexe.M, Sexe.F, None)[k % 3],
+            date_naissance=date(1800 + k, 1 + k % 12, 1) if k % 2 else None,
+            lieu_naissance="Paris" if k % 3 else None,
+            note="note" if k % 7 == 0 else None,
+            sources=["S1"] if k % 5 == 0 else (),
+        )
+        for k in range(n)
+    ]
+    familles = [
+        Famille(id=f"F{k}", pere_id=f"I{k + 1}", mere_id=f"I{k}" if k % 4 else None, enfants_ids=[f"I{k + 2}"] if k % 3 else [])
+        for k in range(0, n - 2, 2)
+    ]
+    sources = [Source(id="S1", titre="Registre", date_publication=date(1900, 1, 1)), Source(id="S2", url="http://x")]
+    return individus, familles, sources
+
+
+@pytest.fixture
+def base(tmp_path: Path) -> Path:
+    individus, familles, sources = _data()
+    write_gwb_minimal(individus, familles, tmp_path / "base", sources=sources)
+    return tmp_path / "base"
+
+
+def _parallel(base: Path, **kwargs: Any) -> tuple[list[Individu], list[Famille], list[Source]]:
+    return load_index_parallel(base / "index.json", workers=2, min_bytes=0, chunk_bytes=300, **kwargs)
+
+
+@pytest.mark.parametrize("indent", [None, 2])
+def test_parallel_load_matches_sequential(base: Path, indent: int | None) -> None:
+    data = json.loads((base / "index.json").read_text(encoding="utf-8"))
+    (base / "index.json").write_text(json.dumps(data, indent=indent, ensure_ascii=False), encoding="utf-8")
+    sequential = load_gwb_minimal(base, workers=1)
+    assert load_gwb_minimal(base, workers=2) == sequential
+    assert _parallel(base) == sequential
+    # Un seul pool pour tout le processus
+    pool = parallel._pool
+    assert _parallel(base) == sequential and parallel._pool is pool
+
+
+def test_parallel_load_with_string_pool(base: Path) -> None:
+    data = json.loads((base / "index.json").read_text(encoding="utf-8"))
+    seq_pool, par_pool = StringPool(), StringPool()
+    sequential = parse_gwb_data(data, strings=seq_pool)
+    result = _parallel(base, strings=par_pool)
+    assert result == sequential
+    assert list(par_pool.ids) == list(seq_pool.ids)
+    # Chaînes et dates partagées entre tranches
+    assert result[0][1].nom is result[0][11].nom
+    births = [ind.date_naissance for ind in result[0] if ind.date_naissance]
+    assert births[0] is par_pool.date(births[0].isoformat())
+
+
+def test_non_string_values_and_old_format(tmp_path: Path) -> None:
+    records = [{"id": f"I{k}", "nom": "Dupont", "sexe": "m", "date_deces": "1900-01-02"} for k in range(30)]
+    (tmp_path / "index.json").write_text(json.dumps(records), encoding="utf-8")
+    assert _parallel(tmp_path) == parse_gwb_data(records)
+    familles = [{"id": f"F{k}", "pere_id": k, "enfants_ids": [k + 1, f"I{k}"]} for k in range(30)]
+    (tmp_path / "index.json").write_text(json.dumps({"individus": records, "familles": familles}), encoding="utf-8")
+    result = _parallel(tmp_path)
+    assert result == parse_gwb_data({"individus": records, "familles": familles})
+    assert result[1][3].pere_id == familles[3]["pere_id"]
+
+
+def test_split_inside_strings_falls_back(tmp_path: Path) -> None:
+    # Des notes pleines de faux points de coupe: les tranches mal coupées échouent
+    records = [{"id": f"I{k}", "note": '}, {"nom": "x"}, {' * (k % 5)} for k in range(60)]
+    (tmp_path / "index.json").write_text(json.dumps({"individus": records}), encoding="utf-8")
+    tasks = parallel._split((tmp_path / "index.json").read_bytes(), 100)
+    assert tasks is not None and len(tasks) > 1
+    assert _parallel(tmp_path) == parse_gwb_data({"individus": records})
+
+
+def test_chunk_is_compact() -> None:
+    records = [{"id": f"I{k}", "nom": "Dupont", "sexe": "m", "date_deces": "1900-01-02"} for k in range(10)]
+    chunk = decode_chunk("individus", records)
+    assert chunk.strings().count("Dupont") == 1
+    assert chunk.columns["sexe"].tolist() == [chunk.strings().index("M")] * 10
+
+
+def test_routes_ignore_environment(base: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("GENEWEB_LOAD_WORKERS", "4")
+
+    def forbidden(*_args: object, **_kwargs: object) -> None:
+        raise AssertionError("chargement parallèle hors CLI")
+
+    monkeypatch.setattr(parallel, "load_index_parallel", forbidden)
+    assert load_gwb_minimal(base)[0]
+
+
+def test_workers_from_environment(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("GENEWEB_LOAD_WORKERS", "3")
+    assert load_workers() == 3
+    monkeypatch.setenv("GENEWEB_LOAD_WORKERS", "abc")
+    assert load_workers() == 1
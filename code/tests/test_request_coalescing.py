@@ -0,0 +1,107 @@
+"""Tests du regroupement des requêtes lourdes identiques (single-flight HTTP)."""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+import geneweb.adapters.http.app as http_app
+from geneweb.domain.models import Famille, Individu
+from geneweb.infra.coalesce import RequestCoalescer, coalesce_key, get_coalescer
+from geneweb.io.gwb import write_gwb_minimal
+
+
+@pytest.fixture
+def base(tmp_path: Path) -> Path:
+    individus = [Individu(id="I1", nom="A"), Individu(id="I2", nom="B"), Individu(id="I3", nom="C")]
+    familles = [Famille(id="F1", pere_id="I1", mere_id="I2", enfants_ids=["I3"])]
+    write_gwb_minimal(individus, familles, tmp_path)
+    return tmp_path
+
+
+def _in_threads(n: int, fn) -> list:  # type: ignore[no-untyped-def]
+    results: list = []
+    threads = [threading.Thread(target=lambda: results.append(fn())) for _ in range(n)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return results
+
+
+def test_run_shares_in_flight_computation(base: Path) -> None:
+    coalescer = RequestCoalescer()
+    calls: list[int] = []
+
+    def slow() -> str:
+        calls.append(1)
+        time.sleep(0.2)
+        return "page"
+
+    results = _in_threads(4, lambda: coalescer.run("/gwd", {"mode": "D", "i": "I1"}, base, slow))
+    assert results == ["page"] * 4
+    assert len(calls) == 1
+    assert coalescer.snapshot()["routes"]["/gwd"] == {"requests": 4, "computed": 1, "saved": 3}
+
+    # Calcul terminé: la requête suivante recalcule
+    coalescer.run("/gwd", {"mode": "D", "i": "I1"}, base, slow)
+    assert len(calls) == 2
+
+
+def test_key_depends_on_params_and_revision(base: Path) -> None:
+    key = coalesce_key("/gwd", {"mode": "D", "i": "I1", "v": None}, base)
+    assert key == coalesce_key("/gwd", {"i": "I1", "mode": "D"}, base)
+    assert key != coalesce_key("/gwd", {"mode": "D", "i": "I2"}, base)
+    write_gwb_minimal([Individu(id="I1", nom="Z")], [], base)
+    assert key != coalesce_key("/gwd", {"mode": "D", "i": "I1"}, base)
+
+
+def test_arun_shares_coroutines(base: Path) -> None:
+    coalescer = RequestCoalescer()
+    calls: list[int] = []
+
+    async def slow() -> int:
+        calls.append(1)
+        await asyncio.sleep(0.1)
+        return 7
+
+    async def scenario() -> list[int]:
+        return list(await asyncio.gather(*(coalescer.arun("/a", {"b": 1}, base, slow) for _ in range(5))))
+
+    assert asyncio.run(scenario()) == [7] * 5
+    assert len(calls) == 1
+    assert coalescer.snapshot()["saved"] == 4
+
+
+def test_http_gwd_descendance_coalesced(base: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    real = http_app.get_descendance
+    calls: list[int] = []
+
+    def slow_descendance(base_dir: str, person_id: str) -> dict:
+        calls.append(1)
+        time.sleep(0.3)
+        return real(base_dir, person_id)
+
+    monkeypatch.setattr(http_app, "get_descendance", slow_descendance)
+    get_coalescer().reset_stats()
+    client = TestClient(http_app.app)
+    params = {"base": str(base), "mode": "D", "i": "I1", "use_python": True}
+
+    responses = _in_threads(4, lambda: client.get("/gwd", params=params))
+    assert [r.status_code for r in responses] == [200] * 4
+    assert len({r.text for r in responses}) == 1
+    assert len(calls) == 1
+
+    metrics = client.get("/metrics/coalescing").json()
+    assert metrics["routes"]["/gwd"] == {"requests": 4, "computed": 1, "saved": 3}
+
+
+def test_http_gwd_unknown_mode_is_bad_request(base: Path) -> None:
+    client = TestClient(http_app.app)
+    response = client.get("/gwd", params={"base": str(base), "mode": "ZZ", "use_python": True})
+    assert response.status_code == 400
@@ -0,0 +1,130 @@
+"""Tests du cache des pages /gwd et de son invalidation par les écritures."""
+
+from __future__ import annotations
+
+from collections.abc import Iterator
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+import geneweb.adapters.http.app as http_app
+from geneweb.adapters.ocaml_bridge.cache import ResultCache
+from geneweb.domain.models import Famille, Individu
+from geneweb.infra.response_cache import ResponseCache, person_tag, set_response_cache
+from geneweb.io.gwb import write_gwb_minimal
+from geneweb.io.revision import read_revision
+from geneweb.services.gwd_modify import add_famille, mod_individu
+from geneweb.services.gwd_wiznotes import set_wiznote
+
+
+@pytest.fixture
+def base(tmp_path: Path) -> Path:
+    individus = [
+        Individu(id="I1", nom="A"),
+        Individu(id="I2", nom="B"),
+        Individu(id="I3", nom="C"),
+        Individu(id="I4", nom="D"),
+        Individu(id="I5", nom="E"),
+    ]
+    familles = [Famille(id="F1", pere_id="I1", mere_id="I2", enfants_ids=["I3"])]
+    write_gwb_minimal(individus, familles, tmp_path / "base")
+    return tmp_path / "base"
+
+
+@pytest.fixture
+def cache() -> Iterator[ResponseCache]:
+    cache = ResponseCache(max_bytes=1024 * 1024)
+    set_response_cache(cache)
+    yield cache
+    set_response_cache(None)
+
+
+@pytest.fixture
+def counted(monkeypatch: pytest.MonkeyPatch) -> dict[str, int]:
+    calls: dict[str, int] = {}
+    for name in ("get_person_page", "get_descendance", "get_family_page", "search_persons"):
+        original = getattr(http_app, name)
+
+        def wrapper(*args, _original=original, _name=name, **kwargs):  # type: ignore[no-untyped-def]
+            calls[_name] = calls.get(_name, 0) + 1
+            return _original(*args, **kwargs)
+
+        monkeypatch.setattr(http_app, name, wrapper)
+    return calls
+
+
+def _get(client: TestClient, base: Path, **params: str) -> dict:
+    response = client.get("/gwd", params={"base": str(base), "use_python": True, **params})
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def test_repeat_views_skip_services(base: Path, cache: ResponseCache, counted: dict[str, int]) -> None:
+    client = TestClient(http_app.app)
+    first = _get(client, base, mode="D", i="I1")
+    assert _get(client, base, mode="D", i="I1") == first
+    assert counted["get_descendance"] == 1
+    assert cache.snapshot()["hits"] == 1
+
+
+def test_write_invalidates_only_affected_views(
+    base: Path, cache: ResponseCache, counted: dict[str, int]
+) -> None:
+    client = TestClient(http_app.app)
+    _get(client, base, i="I3")
+    _get(client, base, i="I4")
+    _get(client, base, mode="D", i="I1")
+    _get(client, base, mode="F", f="F1")
+    _get(client, base, mode="S")
+
+    mod_individu(base, id="I3", prenom="Jean")
+
+    # Vues affichant I3 et recherche recalculées, fiche de I4 ré-estampillée
+    assert _get(client, base, i="I3")["person"]["prenom"] == "Jean"
+    _get(client, base, i="I4")
+    _get(client, base, mode="D", i="I1")
+    _get(client, base, mode="F", f="F1")
+    _get(client, base, mode="S")
+    assert counted == {"get_person_page": 3, "get_descendance": 2, "get_family_page": 2, "search_persons": 2}
+    assert cache.snapshot()["restamped"] >= 1
+
+
+def test_structural_writes_reach_relatives(base: Path, cache: ResponseCache, counted: dict[str, int]) -> None:
+    client = TestClient(http_app.app)
+    assert len(_get(client, base, mode="D", i="I3")["descendants"]) == 1
+    _get(client, base, i="I1")
+
+    add_famille(base, id="F2", pere_id="I3", mere_id="I4", enfants_ids=["I5"])
+    assert [d["id"] for d in _get(client, base, mode="D", i="I3")["descendants"]] == ["I3", "I5"]
+    _get(client, base, i="I1")
+    assert counted["get_descendance"] == 2
+    assert counted["get_person_page"] == 1
+
+    set_wiznote(base, "IND:I1", "note")
+    _get(client, base, i="I1")
+    _get(client, base, mode="D", i="I3")
+    assert counted["get_person_page"] == 2
+    assert counted["get_descendance"] == 2
+
+
+def test_external_change_makes_entries_stale(base: Path, cache: ResponseCache) -> None:
+    client = TestClient(http_app.app)
+    _get(client, base, i="I1")
+    write_gwb_minimal([Individu(id="I1", nom="Z")], [], base)  # hors bloc writing()
+    assert _get(client, base, i="I1")["person"]["nom"] == "Z"
+
+
+def test_memory_tier_is_byte_bounded_with_disk_fallback(tmp_path: Path, base: Path) -> None:
+    disk = ResultCache(tmp_path / "disk", max_bytes=1024 * 1024)
+    cache = ResponseCache(max_bytes=100, disk=disk)
+    revision = read_revision(base).token
+    cache.put(base, "a", revision, b"x" * 60, {person_tag("I1")})
+    cache.put(base, "b", revision, b"y" * 60, {person_tag("I2")})
+    assert cache.snapshot()["bytes"] == 60  # "a" évincée de la mémoire
+
+    assert cache.get(base, "a", revision) == b"x" * 60
+    assert cache.snapshot()["disk_hits"] == 1
+    assert cache.get(base, "a", "autre-revision") is None
+    # Étiquettes conservées par le niveau disque
+    assert cache.invalidate(base, {person_tag("I1")}) == 1
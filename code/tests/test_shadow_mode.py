@@ -0,0 +1,138 @@
+"""Tests du mode shadow (rejeu échantillonné de l'autre implémentation)."""
+
+from __future__ import annotations
+
+import json
+import os
+import stat
+import threading
+from collections.abc import Iterator
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+from geneweb.adapters.http.app import app
+from geneweb.infra.shadow import ShadowRunner, set_shadow_runner
+
+
+@pytest.fixture
+def runner() -> Iterator[ShadowRunner]:
+    shadow = ShadowRunner(rate=1.0, max_workers=1)
+    set_shadow_runner(shadow)
+    yield shadow
+    set_shadow_runner(None)
+
+
+@pytest.fixture
+def fake_root(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    root = tmp_path / "geneweb"
+    root.mkdir()
+    monkeypatch.setenv("GENEWEB_OCAML_ROOT", str(root))
+    monkeypatch.delenv("GENEWEB_OCAML_BRIDGE", raising=False)
+    monkeypatch.delenv("GENEWEB_USE_PYTHON", raising=False)
+    monkeypatch.setenv("GENEWEB_BRIDGE_CACHE_DIR", str(tmp_path / "cache"))
+    return root
+
+
+@pytest.fixture
+def base(tmp_path: Path) -> Path:
+    base = tmp_path / "demo"
+    (base / "base").mkdir(parents=True)
+    data = {
+        "individus": [{"id": "I1", "nom": "A", "prenom": "x"}, {"id": "I2", "nom": "B", "prenom": "y"}],
+        "familles": [{"id": "F1", "pere_id": "I1", "mere_id": "I2", "enfants_ids": []}],
+    }
+    (base / "base" / "index.json").write_text(json.dumps(data), encoding="utf-8")
+    return base
+
+
+def _tool(root: Path, name: str, script: str) -> None:
+    exe = root / "_build" / "default" / "bin" / name / f"{name}.exe"
+    exe.parent.mkdir(parents=True, exist_ok=True)
+    exe.write_text("#!/bin/sh\n" + script, encoding="utf-8")
+    exe.chmod(exe.stat().st_mode | stat.S_IXUSR)
+
+
+def test_runner_records_latency_and_mismatches() -> None:
+    shadow = ShadowRunner(rate=1.0)
+    try:
+        compare = lambda a, b: (a == b, f"{a!r} != {b!r}")  # noqa: E731
+        assert shadow.submit("/r", "ocaml", "x", 10.0, lambda: "x", compare)
+        assert shadow.submit("/r", "ocaml", "x", 10.0, lambda: "y", compare)
+        assert shadow.submit("/r", "ocaml", "x", 10.0, lambda: 1 / 0, compare)
+        assert shadow.wait_idle()
+        stats = shadow.snapshot()["routes"]["/r"]["ocaml->python"]
+        assert stats["sampled"] == 3
+        assert stats["completed"] == 2
+        assert stats["mismatches"] == 1
+        assert stats["mismatch_samples"] == ["'x' != 'y'"]
+        assert stats["errors"] == 1
+        assert stats["last_error"].startswith("ZeroDivisionError")
+        assert stats["primary_latency"]["count"] == 3
+        assert stats["shadow_latency"]["count"] == 2
+    finally:
+        shadow.shutdown()
+
+
+def test_runner_sampling_and_backpressure() -> None:
+    assert not ShadowRunner(rate=0.0).should_sample()
+    assert ShadowRunner(rate=0.5, sampler=lambda: 0.4).should_sample()
+    assert not ShadowRunner(rate=0.5, sampler=lambda: 0.6).should_sample()
+
+    gate = threading.Event()
+    shadow = ShadowRunner(rate=1.0, max_workers=1, max_pending=1)
+    try:
+        assert shadow.submit("/r", "python", None, 1.0, gate.wait)
+        assert not shadow.submit("/r", "python", None, 1.0, gate.wait)
+        assert shadow.snapshot()["dropped"] == 1
+        gate.set()
+        assert shadow.wait_idle()
+    finally:
+        shadow.shutdown()
+
+
+def test_runner_shutdown_releases_cancelled_samples() -> None:
+    gate = threading.Event()
+    shadow = ShadowRunner(rate=1.0, max_workers=1, max_pending=4)
+    assert shadow.submit("/r", "python", None, 1.0, gate.wait)
+    assert shadow.submit("/r", "python", None, 1.0, gate.wait)
+    shadow.shutdown()
+    gate.set()
+    # L'échantillon annulé avant d'avoir tourné ne reste pas compté
+    assert shadow.wait_idle()
+    assert shadow.snapshot()["pending"] == 0
+
+
+@pytest.mark.skipif(os.name != "posix", reason="scripts shell POSIX")
+def test_http_gwb2ged_python_shadowed_by_ocaml(
+    runner: ShadowRunner, fake_root: Path, base: Path
+) -> None:
+    _tool(fake_root, "gwb2ged", 'echo "0 HEAD" > "$3"\n')
+    client = TestClient(app)
+    response = client.get("/export/gwb2ged", params={"input_dir": str(base / "base"), "use_python": True})
+    assert response.status_code == 200
+    assert runner.wait_idle()
+
+    metrics = client.get("/metrics/shadow").json()
+    stats = metrics["routes"]["/export/gwb2ged"]["python->ocaml"]
+    assert stats["completed"] == 1
+    assert stats["mismatches"] == 1
+    assert "0 HEAD" in stats["mismatch_samples"][0]
+
+
+@pytest.mark.skipif(os.name != "posix", reason="scripts shell POSIX")
+def test_http_connex_ocaml_shadowed_by_python(
+    runner: ShadowRunner, fake_root: Path, base: Path
+) -> None:
+    _tool(fake_root, "connex", 'echo "1 component"\n')
+    client = TestClient(app)
+    response = client.get("/analytical/connex", params={"base_dir": str(base)})
+    assert response.status_code == 200
+    assert response.json()["implementation"] == "ocaml"
+    assert runner.wait_idle()
+
+    stats = runner.snapshot()["routes"]["/analytical/connex"]["ocaml->python"]
+    assert stats["completed"] == 1
+    assert stats["errors"] == 0
+    assert stats["shadow_latency"]["count"] == 1
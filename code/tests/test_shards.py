@@ -0,0 +1,75 @@
+"""Tests de la disposition fragmentée des bases GWB (geneweb.io.shards)."""
+
+from __future__ import annotations
+
+import shutil
+from pathlib import Path
+
+import pytest
+
+from geneweb.io.gwb import load_gwb_minimal
+from geneweb.io.shards import SHARDS_DIR, read_manifest, shard_of
+from geneweb.io.storage import ShardedStorage, convert_base, storage_kind
+from geneweb.services.gwd_modify import add_individu, del_individu, mod_individu
+
+# Bases de `conftest.bases` dans la seule disposition fragmentée
+sharded_only = pytest.mark.parametrize("layout", ["sharded"])
+
+
+@sharded_only
+def test_sharded_layout_has_manifest(bases: tuple[Path, Path]) -> None:
+    _, sharded_base = bases
+    assert len(read_manifest(sharded_base)["shards"]) == 8
+
+
+@sharded_only
+def test_only_dirty_shards_are_rewritten(bases: tuple[Path, Path]) -> None:
+    _, sharded_base = bases
+    before = read_manifest(sharded_base)["shards"]
+    mod_individu(sharded_base, id="I42", nom="Renommé")
+    after = read_manifest(sharded_base)["shards"]
+    assert sum(a != b for a, b in zip(before, after, strict=True)) == 1
+    assert sorted(p.name for p in (sharded_base / SHARDS_DIR).glob("0*.json")) == sorted(after)
+    assert storage_kind(sharded_base) == "sharded"
+
+
+@sharded_only
+def test_insert_and_delete_rewrite_only_affected_shards(bases: tuple[Path, Path]) -> None:
+    json_base, sharded_base = bases
+    for base in bases:
+        add_individu(base, id="I10000", nom="Nouveau")
+    before = read_manifest(sharded_base)["shards"]
+    for base in bases:
+        del_individu(base, id="I150", force=True)
+    after = read_manifest(sharded_base)["shards"]
+    # Fragment de l'individu, et ceux de ses deux familles (F148, F150)
+    touched = {shard_of(ident, 8) for ident in ("I150", "F148", "F150")}
+    assert {k for k, (a, b) in enumerate(zip(before, after, strict=True)) if a != b} == touched
+    assert load_gwb_minimal(sharded_base) == load_gwb_minimal(json_base)
+
+
+@sharded_only
+def test_point_queries_open_few_shards(bases: tuple[Path, Path]) -> None:
+    _, sharded_base = bases
+    storage = ShardedStorage(sharded_base)
+    person = storage.get_person("I10")
+    parents = storage.parent_family("I10")
+    assert person is not None and person.prenom == "Prénom10"
+    assert parents is not None and parents.id == "F8"
+    assert [fam.id for fam in storage.families_as_parent("I10")] == ["F10"]
+    assert storage.reader.opened <= 3
+    assert storage.counts() == (2000, 999, 1)
+
+
+@sharded_only
+def test_reshard_in_place(bases: tuple[Path, Path], tmp_path: Path) -> None:
+    json_base, _ = bases
+    copy = tmp_path / "copy"
+    shutil.copytree(json_base, copy)
+    convert_base(copy, "sharded", shards=4)
+    assert len(read_manifest(copy)["shards"]) == 4
+    convert_base(copy, "sharded", shards=2)
+    assert len(read_manifest(copy)["shards"]) == 2
+    convert_base(copy, "json")
+    assert storage_kind(copy) == "json" and not (copy / SHARDS_DIR).exists()
+    assert load_gwb_minimal(copy) == load_gwb_minimal(json_base)
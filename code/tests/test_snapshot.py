@@ -0,0 +1,115 @@
+"""Tests des instantanés de bases partagés par mmap (GENEWEB_SNAPSHOT)."""
+
+from __future__ import annotations
+
+import json
+import subprocess
+import sys
+from collections.abc import Iterator
+from datetime import date
+from pathlib import Path
+
+import pytest
+
+from geneweb.domain.models import Famille, Individu, Sexe, Source
+from geneweb.infra.snapshot_store import SnapshotStore, set_snapshot_store
+from geneweb.io.gwb import write_gwb_minimal
+from geneweb.io.revision import read_revision
+from geneweb.services import gwd_routes
+from geneweb.services.gwd_modify import add_individu, mod_famille
+
+
+@pytest.fixture
+def base(tmp_path: Path) -> Path:
+    root = tmp_path / "base"
+    root.mkdir()
+    write_gwb_minimal(
+        [
+            Individu(id="I1", nom="Dupont", prenom="Jean", sexe=Sexe.M, lieu_naissance="Paris"),
+            Individu(id="I2", nom="Martin", prenom="Marie", sexe=Sexe.F, note="née à Lyon"),
+            Individu(id="I3", nom="Dupont", prenom="Paul", date_naissance=date(1901, 5, 2)),
+            Individu(id="I4", nom="Dupont", prenom="Anne"),
+            Individu(id="I5", nom="Durand", prenom="Luc"),
+            Individu(id="I6", nom="Dupont", prenom="Zoé"),
+        ],
+        [
+            Famille(id="F1", pere_id="I1", mere_id="I2", enfants_ids=["I4", "I3", "I404"], note="mariage"),
+            Famille(id="F2", pere_id="I3", mere_id="I5", enfants_ids=["I6"]),
+        ],
+        root,
+        sources=[Source(id="S1", titre="Registre")],
+    )
+    return root
+
+
+@pytest.fixture
+def store(tmp_path: Path) -> Iterator[SnapshotStore]:
+    store = SnapshotStore(tmp_path / "snapshots")
+    set_snapshot_store(store)
+    yield store
+    set_snapshot_store(None)
+
+
+def _pages(base: Path) -> list[dict]:
+    b = str(base)
+    return [
+        gwd_routes.get_person_page(b),
+        gwd_routes.get_person_page(b, "I1"),
+        gwd_routes.get_person_page(b, "I3"),
+        gwd_routes.search_persons(b),
+        gwd_routes.search_persons(b, "dup"),
+        gwd_routes.get_family_page(b, "F1"),
+        gwd_routes.get_ascendance(b, "I6"),
+        gwd_routes.get_descendance(b, "I1"),
+    ]
+
+
+def test_snapshot_pages_match_loaded_pages(base: Path, store: SnapshotStore, monkeypatch: pytest.MonkeyPatch) -> None:
+    expected = _pages(base)
+    monkeypatch.setenv("GENEWEB_SNAPSHOT", "1")
+    assert _pages(base) == expected
+    assert store.publications == 1
+    with pytest.raises(ValueError, match="introuvable"):
+        gwd_routes.get_person_page(str(base), "I404")
+    with pytest.raises(ValueError, match="introuvable"):
+        gwd_routes.get_family_page(str(base), "F404")
+
+
+def test_writes_publish_new_generation(base: Path, store: SnapshotStore, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("GENEWEB_SNAPSHOT", "1")
+    first = store.get(base)
+    add_individu(base, id="I7", nom="Dupont", prenom="Eve")
+    mod_famille(base, id="F2", enfants_ids=["I6", "I7"])
+
+    snap = store.get(base)
+    assert snap.generation > first.generation
+    assert snap.revision == read_revision(base).token
+    assert [c["id"] for c in gwd_routes.get_family_page(str(base), "F2")["family"]["enfants"]] == ["I6", "I7"]
+    # Publiées par l'écrivain, pas reconstruites à la lecture
+    assert store.publications == 3
+
+    # Écriture hors écrivain: le premier lecteur republie
+    write_gwb_minimal([Individu(id="Z1")], [], base)
+    assert gwd_routes.get_person_page(str(base))["base"]["total_individus"] == 1
+    assert len(list(store.directory.rglob("*.snap"))) == 1
+
+
+def test_other_process_attaches_published_snapshot(base: Path, store: SnapshotStore) -> None:
+    published = store.publish(base)
+    script = (
+        "import json, sys\n"
+        "from geneweb.infra.snapshot_store import SnapshotStore\n"
+        "store = SnapshotStore(sys.argv[1])\n"
+        "snap = store.get(sys.argv[2])\n"
+        "print(json.dumps([snap.generation, store.publications, snap.person(snap.person_index('I2'))]))\n"
+    )
+    out = subprocess.run(
+        [sys.executable, "-c", script, str(store.directory), str(base)],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    generation, publications, person = json.loads(out)
+    assert generation == published.generation
+    assert publications == 0
+    assert person["note"] == "née à Lyon"
@@ -0,0 +1,152 @@
+"""Tests du stockage SQLite (geneweb.io.storage) et de sa conversion."""
+
+from __future__ import annotations
+
+import shutil
+import sqlite3
+from datetime import date
+from pathlib import Path
+
+import pytest
+from typer.testing import CliRunner
+
+from geneweb.adapters.cli.main import app as cli_app
+from geneweb.domain.models import Famille, Individu, Sexe, Source
+from geneweb.io.gwb import load_gwb_minimal, write_gwb_minimal
+from geneweb.io.revision import read_revision
+from geneweb.io.storage import SQLITE_FILE, JsonStorage, SqliteStorage, convert_base, storage_kind
+from geneweb.services import gwd_routes
+from geneweb.services.gwd_modify import add_famille, apply_batch, del_individu, mod_individu
+
+DATA = (
+    [
+        Individu(id="I1", nom="Dupont", prenom="Jean", sexe=Sexe.M, lieu_naissance="Paris", sources=["S1"]),
+        Individu(id="I2", nom="Martin", prenom="Élise", sexe=Sexe.F, note="née à Lyon"),
+        Individu(id="I3", nom="Dupont", prenom="Paul", date_naissance=date(1901, 5, 2), date_deces=date(1970, 1, 1)),
+        Individu(id="I4", nom="dupont", prenom="Anne"),
+        Individu(id="I5", prenom="Luc"),
+        Individu(id="I6", nom="ÉTIENNE", prenom="Zoé"),
+    ],
+    [
+        Famille(id="F1", pere_id="I1", mere_id="I2", enfants_ids=["I4", "I3", "I404"], note="mariage"),
+        Famille(id="F2", pere_id="I3", mere_id="I5", enfants_ids=["I6"], sources=["S1"]),
+    ],
+    [Source(id="S1", titre="Registre", date_publication=date(1900, 1, 1), note="paroisse")],
+)
+
+
+def _pages(base: Path, persons: tuple[str, ...] = ("I1", "I2", "I3", "I4", "I5", "I6")) -> list[dict]:
+    b = str(base)
+    return [
+        gwd_routes.get_person_page(b),
+        *(gwd_routes.get_person_page(b, person_id) for person_id in persons),
+        gwd_routes.search_persons(b),
+        gwd_routes.search_persons(b, "dup"),
+        gwd_routes.search_persons(b, "étienne"),
+        gwd_routes.get_family_page(b, "F1"),
+        gwd_routes.get_family_page(b, "F2"),
+        gwd_routes.get_ascendance(b, "I6"),
+        gwd_routes.get_descendance(b, "I1"),
+        gwd_routes.get_notes(b),
+    ]
+
+
+@pytest.fixture
+def bases(tmp_path: Path) -> tuple[Path, Path]:
+    json_base, sqlite_base = tmp_path / "json", tmp_path / "sqlite"
+    write_gwb_minimal(*DATA[:2], json_base, sources=DATA[2])
+    shutil.copytree(json_base, sqlite_base)
+    convert_base(sqlite_base, "sqlite")
+    return json_base, sqlite_base
+
+
+def test_conversion_round_trip(bases: tuple[Path, Path], tmp_path: Path) -> None:
+    json_base, sqlite_base = bases
+    assert storage_kind(sqlite_base) == "sqlite" and not (sqlite_base / "index.json").exists()
+    conn = sqlite3.connect(sqlite_base / SQLITE_FILE)
+    assert conn.execute("PRAGMA journal_mode").fetchone() == ("wal",)
+    conn.close()
+
+    # Les lecteurs de base complète voient la base SQLite comme l'index JSON
+    assert load_gwb_minimal(sqlite_base) == load_gwb_minimal(json_base)
+    back = convert_base(sqlite_base, "json", tmp_path / "back")
+    assert storage_kind(back) == "json"
+    assert (back / "index.json").read_bytes() == (json_base / "index.json").read_bytes()
+    with pytest.raises(ValueError, match="déjà"):
+        convert_base(sqlite_base, "sqlite")
+
+
+def test_routes_match_json(bases: tuple[Path, Path]) -> None:
+    json_base, sqlite_base = bases
+    assert _pages(sqlite_base) == _pages(json_base)
+    with pytest.raises(ValueError, match="introuvable"):
+        gwd_routes.get_person_page(str(sqlite_base), "I404")
+
+
+def test_sqlite_takes_precedence_everywhere(bases: tuple[Path, Path]) -> None:
+    json_base, sqlite_base = bases
+    # `index.json` périmé laissé à côté de la base SQLite: lecteurs et routes suivent
+    # tous `storage_kind`, comme l'écrivain
+    shutil.copy(json_base / "index.json", sqlite_base / "index.json")
+    mod_individu(sqlite_base, id="I5", nom="Durand")
+    assert storage_kind(sqlite_base) == "sqlite"
+    assert load_gwb_minimal(sqlite_base)[0][4].nom == "Durand"
+    assert gwd_routes.get_person_page(str(sqlite_base), "I5")["person"]["nom"] == "Durand"
+
+
+def test_write_to_converted_base_stays_sqlite(bases: tuple[Path, Path]) -> None:
+    _json_base, sqlite_base = bases
+    individus = [*DATA[0], Individu(id="I7", nom="Nouveau")]
+    write_gwb_minimal(individus, DATA[1], sqlite_base, sources=DATA[2])
+    assert storage_kind(sqlite_base) == "sqlite"
+    assert not (sqlite_base / "index.json").exists()
+    assert load_gwb_minimal(sqlite_base)[0][-1].nom == "Nouveau"
+    assert [ind.id for ind in load_gwb_minimal(sqlite_base)[0]] == [ind.id for ind in individus]
+
+
+def test_queries_use_indexes(bases: tuple[Path, Path]) -> None:
+    _, sqlite_base = bases
+    with SqliteStorage(sqlite_base) as storage:
+        plans = {
+            sql: " ".join(row[-1] for row in storage.conn.execute(f"EXPLAIN QUERY PLAN {sql}", params))
+            for sql, params in [
+                ("SELECT * FROM persons WHERE id = ?", ("I1",)),
+                ("SELECT * FROM families WHERE pere_id = ?1 OR mere_id = ?1", ("I1",)),
+                ("SELECT family FROM children WHERE child_id = ?", ("I3",)),
+                ("SELECT * FROM persons WHERE date_naissance > ?", ("1900",)),
+            ]
+        }
+        assert all("USING" in plan and "SCAN" not in plan for plan in plans.values()), plans
+        assert [ind.id for ind in storage.search()] == [
+            ind.id for ind in JsonStorage(bases[0]).search()
+        ]
+
+
+def test_modifications_match_json(bases: tuple[Path, Path]) -> None:
+    json_base, sqlite_base = bases
+    for base in bases:
+        before = read_revision(base).token
+        mod_individu(base, id="I5", nom="Durand", sexe="M")
+        add_famille(base, id="F3", pere_id="I6", enfants_ids=["I2"])
+        with pytest.raises(ValueError, match="lie aux familles"):
+            del_individu(base, id="I3")
+        del_individu(base, id="I3", force=True)
+        with pytest.raises(ValueError, match="Opération 1"):
+            apply_batch(base, [{"op": "add_ind", "id": "I7"}, {"op": "add_ind", "id": "I1"}])
+        assert read_revision(base).token != before
+
+    remaining = ("I1", "I2", "I4", "I5", "I6")
+    assert _pages(sqlite_base, remaining) == _pages(json_base, remaining)
+    individus, familles, _ = load_gwb_minimal(sqlite_base)
+    assert "I7" not in {ind.id for ind in individus}
+    assert familles[0].enfants_ids == ["I4", "I404"]
+
+
+def test_cli_convert(bases: tuple[Path, Path]) -> None:
+    json_base, _ = bases
+    runner = CliRunner()
+    res = runner.invoke(cli_app, ["convert-storage", str(json_base), "--to", "sqlite"])
+    assert res.exit_code == 0, res.output
+    assert storage_kind(json_base) == "sqlite"
+    res = runner.invoke(cli_app, ["convert-storage", str(json_base), "--to", "xml"])
+    assert res.exit_code == 1
@@ -0,0 +1,72 @@
+"""Tests du chargement interné (StringPool, IdMap)."""
+
+from __future__ import annotations
+
+import tracemalloc
+from datetime import date
+from pathlib import Path
+
+from geneweb.domain.models import Famille, Individu, Sexe
+from geneweb.domain.table import BaseTable
+from geneweb.io.gwb import StringPool, load_gwb_minimal, write_gwb_minimal
+from geneweb.services.consanguinity import compute_inbreeding_table
+
+
+def _write_repetitive_base(root: Path, n: int = 5000) -> None:
+    write_gwb_minimal(
+        [
+            Individu(
+                id=f"I{k}",
+                nom=f"Lefèvre{k % 20}",
+                prenom=f"Hélène{k % 50}",
+                sexe=Sexe.M if k % 2 else Sexe.F,
+                date_naissance=date(1800 + k % 150, 1 + k % 12, 1),
+                lieu_naissance=f"Saint-Étienne-sur-Loire {k % 10}",
+                lieu_deces=f"Saint-Étienne-sur-Loire {k % 7}",
+                note="Recensement de 1901, registre paroissial" if k % 3 else None,
+            )
+            for k in range(n)
+        ],
+        [Famille(id=f"F{k}", pere_id=f"I{k}", mere_id=f"I{k + 1}", enfants_ids=[f"I{k + 2}"]) for k in range(0, n - 2, 2)],
+        root,
+    )
+
+
+def _measure(root: Path, strings: StringPool | None) -> tuple[tuple, int]:
+    tracemalloc.start()
+    try:
+        loaded = load_gwb_minimal(root, strings=strings)
+        return loaded, tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+
+
+def test_interned_load_matches_and_shares_strings(tmp_path: Path) -> None:
+    _write_repetitive_base(tmp_path)
+    plain, plain_bytes = _measure(tmp_path, None)
+    strings = StringPool()
+    interned, interned_bytes = _measure(tmp_path, strings)
+
+    assert interned == plain
+    individus, familles, _ = interned
+    assert individus[0].lieu_naissance is individus[10].lieu_naissance
+    assert individus[1].note is individus[2].note
+    assert familles[0].pere_id is individus[0].id
+    assert interned_bytes < plain_bytes * 0.9
+    assert len(strings) < 5000 * 2
+
+
+def test_id_map_is_dense_and_feeds_tables(tmp_path: Path) -> None:
+    write_gwb_minimal(
+        [Individu(id="A"), Individu(id="B"), Individu(id="C"), Individu(id="A")],
+        [Famille(id="F1", pere_id="A", mere_id="B", enfants_ids=["C", "X"])],
+        tmp_path,
+    )
+    strings = StringPool()
+    individus, familles, _ = load_gwb_minimal(tmp_path, strings=strings)
+    assert strings.ids.ids == ["A", "B", "C"]
+    assert (strings.ids.get("C"), strings.ids[1], "Z" in strings.ids) == (2, "B", False)
+
+    table = BaseTable.from_models(individus, familles, id_map=strings.ids)
+    assert table.n_individus == 3 and table.ids == ["A", "B", "C", "X"]
+    assert compute_inbreeding_table(table) == {"A": 0.0, "B": 0.0, "C": 0.0}